@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热路径日志开销基准（每个音频块一条VAD调试日志）
+- 改动前: f-string 先格式化，再由挂在logger上的 FileHandler 在采集线程中同步格式化、写文件
+- 改动后: isEnabledFor 缓存判断 + %参数延迟格式化，经队列交给后台线程写文件（轮换）
+- 两种情况：DEBUG开启（文件记录调试日志，识别器日志的默认情况）与DEBUG关闭
+- 报告每个音频块：调用线程（采集线程）自身花在日志上的CPU时间，以及含后台线程写完为止的总墙钟时间（µs）
+  单核机器上后台线程与采集线程争用GIL，总时间反映写文件的实际总成本；实际运行时采集线程大部分时间
+  阻塞在读音频上，后台写文件与之重叠
+
+用法:
+    python benchmarks/bench_async_logging.py --chunks 20000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_utils import LoggingManager
+
+
+def mute_console_logging() -> None:
+    """基准logger只写文件，不输出到控制台"""
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def sync_logger(log_dir: str, level: int) -> logging.Logger:
+    """改动前：FileHandler 直接挂在logger上"""
+    logger = logging.getLogger("bench_sync")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(level)
+    handler = logging.FileHandler(os.path.join(log_dir, "sync.log"), encoding="utf-8-sig")
+    handler.setFormatter(logging.Formatter(LoggingManager.DEFAULT_FORMAT, LoggingManager.DEFAULT_DATE_FORMAT))
+    logger.addHandler(handler)
+    return logger
+
+
+def async_logger(log_dir: str, level: int) -> logging.Logger:
+    """改动后：LoggingManager 的队列处理器"""
+    LoggingManager.LOGS_DIR = log_dir
+    LoggingManager._settings = dict(LoggingManager.settings(), **{"async": True})
+    logger = LoggingManager.get_logger("bench_async", level=level, log_file="async.log", log_to_console=False)
+    LoggingManager.flush()
+    return logger
+
+
+def before(logger: logging.Logger, energy: float, threshold: float) -> None:
+    is_speech = energy > threshold
+    logger.debug(f"能量阈值VAD: 能量={energy:.6f}, 阈值={threshold}, 结果={is_speech}")
+
+
+def after(logger: logging.Logger, energy: float, threshold: float) -> None:
+    debug = logger.isEnabledFor(logging.DEBUG)
+    is_speech = energy > threshold
+    if debug:
+        logger.debug("能量阈值VAD: 能量=%.6f, 阈值=%s, 结果=%s", energy, threshold, is_speech)
+
+
+def per_chunk_us(func: Callable, logger: logging.Logger, chunks: int, repeat: int) -> Tuple[float, float]:
+    """每个音频块的日志耗时（µs，重复取最短）：(调用线程CPU, 含写完为止的墙钟)"""
+    best_cpu = best_wall = float("inf")
+    for _ in range(repeat):
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+        for index in range(chunks):
+            func(logger, (index % 100) / 1000.0, 0.015)
+        best_cpu = min(best_cpu, time.thread_time() - cpu_start)
+        LoggingManager.flush()
+        best_wall = min(best_wall, time.perf_counter() - start)
+    return best_cpu / chunks * 1e6, best_wall / chunks * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="热路径日志开销基准")
+    parser.add_argument("--chunks", type=int, default=20000, help="音频块数（每块一条日志）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最短）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    results: Dict[str, Dict[str, Tuple[float, float]]] = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for level_name, level in (("DEBUG开启", logging.DEBUG), ("DEBUG关闭", logging.INFO)):
+            results[level_name] = {
+                "改动前（同步写文件）": per_chunk_us(before, sync_logger(tmp_dir, level), args.chunks, args.repeat),
+                "改动后（异步队列）": per_chunk_us(after, async_logger(tmp_dir, level), args.chunks, args.repeat),
+            }
+        LoggingManager.shutdown()
+        for handler in logging.getLogger("bench_sync").handlers:
+            handler.close()
+
+    print(f"📝 热路径日志开销（{args.chunks:,} 个音频块，每块一条VAD调试日志）")
+    print("=" * 72)
+    print(f"{'情况':<10} {'方式':<14} {'调用线程CPU(µs)':>16} {'加速':>6} {'含写完(µs)':>12}")
+    for level_name, rows in results.items():
+        baseline = rows["改动前（同步写文件）"][0]
+        for name, (cpu_us, wall_us) in rows.items():
+            print(f"{level_name:<10} {name:<12} {cpu_us:>16.2f} {baseline / cpu_us:>6.1f}x {wall_us:>12.2f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+停止到可开始下一批次的耗时基准（time-to-ready-for-next-batch）
+每种会话规模（默认1000/10000条记录）记录：
+- 原方式：停止时同步调用 finalize_excel_file，生成完报告后才能开始下一批次
+- 后台生成：提交给 FinalizeWorker 并换用新的导出器，立即可开始下一批次
+另记录后台任务本身的完成耗时（报告实际落盘时间）
+
+用法:
+    python benchmarks/bench_background_finalize.py --sizes 1000 10000
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Dict
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_utils import ExcelExporterEnhanced
+from utils.finalize_jobs import FinalizeWorker
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("excel_exporter_enhanced", "finalize_jobs", "measurement_store"):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def record_session(path: str, count: int) -> ExcelExporterEnhanced:
+    """录一个会话（不finalize）"""
+    exporter = ExcelExporterEnhanced(filename=path, part_no="P1", batch_no="B1", inspector="张三")
+    for index in range(count):
+        exporter.current_standard_id = 100 * (index // 50 % 10 + 1)
+        exporter.append_with_text([(10.0 + index % 97 * 0.01, "", "")])
+    return exporter
+
+
+def run(count: int, directory: str) -> Dict[str, float]:
+    """同一规模分别测同步与后台两种方式"""
+    exporter = record_session(os.path.join(directory, "Report_P1_sync.xlsx"), count)
+    start = time.perf_counter()
+    exporter.finalize_excel_file()
+    ExcelExporterEnhanced(filename=os.path.join(directory, "Report_P1_next1.xlsx"))
+    sync_ready = time.perf_counter() - start
+
+    worker = FinalizeWorker()
+    exporter = record_session(os.path.join(directory, "Report_P1_bg.xlsx"), count)
+    start = time.perf_counter()
+    job = worker.submit(exporter)
+    ExcelExporterEnhanced(filename=os.path.join(directory, "Report_P1_next2.xlsx"))
+    background_ready = time.perf_counter() - start
+    job.wait()
+    worker.shutdown()
+
+    return {
+        "sync_ready_ms": sync_ready * 1000,
+        "background_ready_ms": background_ready * 1000,
+        "job_ms": job.elapsed * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="停止到可开始下一批次的耗时基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="会话记录数")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    results = {}
+    for count in args.sizes:
+        directory = tempfile.mkdtemp(prefix="bench_background_finalize_")
+        try:
+            results[count] = run(count, directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print("⏱️ 停止 → 可开始下一批次")
+    print("=" * 68)
+    print(f"{'记录数':>8} {'同步finalize(ms)':>18} {'后台生成(ms)':>14} {'后台任务完成(ms)':>18}")
+    for count, stats in results.items():
+        print(f"{count:>10} {stats['sync_ready_ms']:>18.1f} {stats['background_ready_ms']:>16.2f} "
+              f"{stats['job_ms']:>20.1f}")
+    print("=" * 68)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部分结果命令快速通道反应延迟基准
+回放 fixtures/command_partials.json 中记录的部分/最终结果时间线，对比：
+- 原流程：命令在最终结果到达后执行（语音结束 + 静音判定 + 最终解码）
+- 快速通道：命令在连续K个部分结果稳定后执行（PartialCommandTracker）
+
+用法:
+    python benchmarks/bench_command_fast_path.py --stable 2
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+from typing import Dict, Any, List, Optional, Tuple
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_processor import VoiceCommandProcessor, PartialCommandTracker
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "command_partials.json")
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> List[Dict[str, Any]]:
+    """加载命令时间线样本"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["fixtures"]
+
+
+def default_commands() -> Dict[str, List[str]]:
+    """快速通道允许触发的命令（取自配置）"""
+    from utils.config_loader import config
+    return {
+        "pause": config.get_pause_commands(),
+        "resume": config.get_resume_commands(),
+        "stop": config.get_stop_commands(),
+    }
+
+
+def replay_fixture(fixture: Dict[str, Any], tracker: PartialCommandTracker,
+                   command_processor: VoiceCommandProcessor,
+                   commands: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    回放单个时间线
+
+    Returns:
+        {"fired": 快速通道触发的命令, "fast_latency": 快速通道反应时间(s),
+         "final_command": 最终结果命令, "final_latency": 原流程反应时间(s),
+         "suppressed": 最终结果是否被抑制, "match_cost_us": 部分结果平均匹配耗时}
+    """
+    tracker.reset()
+    fired: Optional[str] = None
+    fast_latency: Optional[float] = None
+    match_costs: List[float] = []
+    final_command: Optional[str] = None
+    final_latency: Optional[float] = None
+    suppressed = False
+
+    for event in fixture["events"]:
+        if event["type"] == "partial":
+            start = time.perf_counter()
+            command = tracker.feed_partial(event["text"])
+            cost = time.perf_counter() - start
+            match_costs.append(cost * 1e6)
+            if command and fired is None:
+                fired = command
+                fast_latency = event["t"] + cost
+        elif event["type"] == "final":
+            start = time.perf_counter()
+            final_command = command_processor.match_command(event["text"], commands)
+            final_latency = event["t"] + (time.perf_counter() - start)
+            suppressed = tracker.consume_final(final_command)
+
+    return {
+        "fired": fired,
+        "fast_latency": fast_latency,
+        "final_command": final_command,
+        "final_latency": final_latency,
+        "suppressed": suppressed,
+        "match_cost_us": statistics.mean(match_costs) if match_costs else 0.0,
+    }
+
+
+def run(stable_count: int) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], Dict[str, float]]:
+    """回放全部样本，返回逐条结果和汇总"""
+    command_processor = VoiceCommandProcessor()
+    commands = default_commands()
+    tracker = PartialCommandTracker(command_processor, commands, stable_count=stable_count)
+
+    rows = []
+    before: List[float] = []
+    after: List[float] = []
+    false_fires = 0
+    for fixture in load_fixtures():
+        result = replay_fixture(fixture, tracker, command_processor, commands)
+        rows.append((fixture, result))
+        if fixture["expected_command"]:
+            before.append(result["final_latency"])
+            after.append(result["fast_latency"] if result["fired"] else result["final_latency"])
+        elif result["fired"]:
+            false_fires += 1
+
+    summary = {
+        "before_mean": statistics.mean(before) if before else 0.0,
+        "after_mean": statistics.mean(after) if after else 0.0,
+        "before_p50": statistics.median(before) if before else 0.0,
+        "after_p50": statistics.median(after) if after else 0.0,
+        "false_fires": float(false_fires),
+    }
+    return rows, summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="部分结果命令快速通道反应延迟基准")
+    parser.add_argument("--stable", type=int, default=2, help="需要连续稳定的部分结果个数K")
+    args = parser.parse_args()
+
+    # 关闭控制台日志，避免干扰结果表
+    for handler in logging.getLogger("text_processor").handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.CRITICAL)
+
+    rows, summary = run(args.stable)
+
+    print(f"⚡ 命令反应延迟（K={args.stable}）")
+    print("=" * 92)
+    print(f"{'样本':<22} {'期望':<8} {'快速触发':<8} {'原流程(s)':>10} {'快速通道(s)':>12} {'抑制重复':>8} {'匹配(us)':>10}")
+    for fixture, result in rows:
+        fast = f"{result['fast_latency']:.3f}" if result["fast_latency"] is not None else "-"
+        print(f"{fixture['name']:<20} {str(fixture['expected_command']):<8} {str(result['fired']):<8} "
+              f"{result['final_latency']:>10.3f} {fast:>12} {str(result['suppressed']):>8} "
+              f"{result['match_cost_us']:>10.1f}")
+    print("-" * 92)
+    print(f"命令反应延迟 平均: {summary['before_mean']*1000:.0f}ms -> {summary['after_mean']*1000:.0f}ms, "
+          f"中位数: {summary['before_p50']*1000:.0f}ms -> {summary['after_p50']*1000:.0f}ms")
+    print(f"误触发: {int(summary['false_fires'])}")
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
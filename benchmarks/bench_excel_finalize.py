@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel finalize耗时基准
+对比停止时生成报告的两种方式（100 / 1000 / 10000 条记录）：
+- 原方式：load_workbook → 写入记录 → 表头 → 规范查询逐行扫描 → 全表逐格设置边框/居中
+          → 条件格式 → 再次逐格画网格 → save（多次全表扫描，每个单元格单独创建样式）
+- 单次遍历：由会话记录一次算出每行10列，套用共享命名样式；未使用模板时以只写模式生成
+
+每个规模都带测量规范文件（标准序号100~400），判断结果列全部填写
+
+用法:
+    python benchmarks/bench_excel_finalize.py
+    python benchmarks/bench_excel_finalize.py --sizes 100 1000 10000 --repeat 3
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict, List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+
+from excel_utils import ExcelExporterEnhanced
+
+PART_NO = "BENCH-001"
+STANDARD_IDS = (100, 200, 300, 400)
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("excel_exporter_enhanced", "session_journal", "batch_writer"):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def write_measure_spec(directory: str) -> None:
+    """生成测量规范文件 {PART_NO}_MeasureSpec.xlsx"""
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(["标准序号", "标准内容", "下限", "上限"])
+    for standard_id in STANDARD_IDS:
+        worksheet.append([standard_id, f"尺寸{standard_id}", 10.0, 20.0])
+    workbook.save(os.path.join(directory, f"{PART_NO}_MeasureSpec.xlsx"))
+    workbook.close()
+
+
+def record_session(filename: str, records: int) -> ExcelExporterEnhanced:
+    """用会话日志录入N条记录（录音阶段不写xlsx）"""
+    exporter = ExcelExporterEnhanced(filename=filename, part_no=PART_NO, batch_no="B01", inspector="张三")
+    exporter.use_journal = True
+    exporter.use_background_writer = False
+    exporter.create_new_file()
+    for i in range(records):
+        exporter.current_standard_id = STANDARD_IDS[(i // 25) % len(STANDARD_IDS)]
+        value = round(8.0 + (i % 97) * 0.15, 2)
+        exporter.append_with_text([(value, f"{value}", f"{value}")])
+    return exporter
+
+
+def legacy_finalize(exporter: ExcelExporterEnhanced) -> None:
+    """原finalize流程（多次全表扫描）"""
+    workbook = load_workbook(exporter.filename)
+    worksheet = workbook.active
+    exporter._write_entries(worksheet, exporter._collect_session_records())
+    exporter._update_header_info(worksheet)
+    exporter._apply_measure_spec_logic(worksheet)
+    exporter._apply_formatting_and_styles(worksheet)
+    exporter._apply_conditional_formatting(worksheet)
+    exporter.apply_table_borders(worksheet)
+    workbook.save(exporter.filename)
+    workbook.close()
+    exporter._close_journal()
+    exporter._pending_formatting = False
+
+
+def single_pass_finalize(exporter: ExcelExporterEnhanced) -> None:
+    """当前finalize（单次遍历）"""
+    if not exporter.finalize_excel_file():
+        raise RuntimeError("finalize失败")
+
+
+def time_finalize(directory: str, records: int, finalize: Callable[[ExcelExporterEnhanced], None],
+                  repeat: int) -> float:
+    """录入records条记录后计时finalize，返回多次中的最小值（秒）"""
+    best = float("inf")
+    for attempt in range(repeat):
+        filename = os.path.join(directory, f"bench_{finalize.__name__}_{records}_{attempt}.xlsx")
+        exporter = record_session(filename, records)
+        start = time.perf_counter()
+        finalize(exporter)
+        best = min(best, time.perf_counter() - start)
+        os.remove(filename)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Excel finalize耗时基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="记录条数")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模重复次数（取最小值）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    directory = tempfile.mkdtemp(prefix="bench_excel_finalize_")
+    results: Dict[int, List[float]] = {}
+    try:
+        write_measure_spec(directory)
+        for records in args.sizes:
+            results[records] = [time_finalize(directory, records, legacy_finalize, args.repeat),
+                                time_finalize(directory, records, single_pass_finalize, args.repeat)]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("📊 Excel finalize耗时（带测量规范，取最小值）")
+    print("=" * 60)
+    print(f"{'记录数':>8} {'原方式(s)':>12} {'单次遍历(s)':>14} {'加速比':>10}")
+    for records, (legacy, single_pass) in results.items():
+        print(f"{records:>10} {legacy:>12.3f} {single_pass:>14.3f} {legacy / single_pass:>9.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Excel录音阶段写入延迟基准
+模拟一次N条记录的录音会话（默认2000条），对比：
+- 原方式：每条记录 load_workbook → 写4个单元格 → save（整个会话O(n²)）
+- 会话日志：每条记录追加一行JSONL（批量fsync），停止时一次性生成xlsx
+- 后台写入：识别回调只入队，写入线程按batch_size/flush_interval批量写入（原方式/会话日志均可）
+
+输出每次写入延迟的p50/p90/p99/最大值，以及finalize耗时
+
+用法:
+    python benchmarks/bench_excel_journal.py --records 2000
+    python benchmarks/bench_excel_journal.py --records 2000 --skip-legacy   # 原方式2000条需要数分钟
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Dict, List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_utils import ExcelExporterEnhanced
+
+STANDARD_IDS = (100, 200, 300, 400)
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(percent / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("excel_exporter_enhanced", "session_journal", "batch_writer"):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def run_session(records: int, use_journal: bool, directory: str, background: bool = False) -> Dict[str, float]:
+    """
+    模拟一次录音会话
+
+    Returns:
+        {"p50_ms", "p90_ms", "p99_ms", "max_ms", "total_s", "finalize_s"}
+    """
+    mode = ("journal" if use_journal else "legacy") + ("_bg" if background else "")
+    filename = os.path.join(directory, f"bench_{mode}.xlsx")
+    exporter = ExcelExporterEnhanced(filename=filename)
+    exporter.use_journal = use_journal
+    exporter.use_background_writer = background
+    exporter.create_new_file()
+
+    latencies: List[float] = []
+    session_start = time.perf_counter()
+    for i in range(records):
+        exporter.current_standard_id = STANDARD_IDS[(i // 50) % len(STANDARD_IDS)]
+        value = round(10.0 + (i % 97) * 0.13, 2)
+        start = time.perf_counter()
+        exporter.append_with_text([(value, f"{value}", f"{value}")])
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    total = time.perf_counter() - session_start
+
+    start = time.perf_counter()
+    exporter.finalize_excel_file()
+    finalize = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "p50_ms": _percentile(latencies, 50),
+        "p90_ms": _percentile(latencies, 90),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "total_s": total,
+        "finalize_s": finalize,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Excel录音阶段写入延迟基准")
+    parser.add_argument("--records", type=int, default=2000, help="会话记录条数")
+    parser.add_argument("--skip-legacy", action="store_true", help="跳过原方式（每条load/save）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    directory = tempfile.mkdtemp(prefix="bench_excel_journal_")
+    try:
+        modes = [("会话日志", True, False), ("会话日志+后台写入", True, True)]
+        if not args.skip_legacy:
+            modes[:0] = [("原方式(load/save)", False, False), ("原方式+后台写入", False, True)]
+        results = {name: run_session(args.records, use_journal, directory, background)
+                   for name, use_journal, background in modes}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"📒 Excel录音阶段写入延迟（{args.records} 条记录）")
+    print("=" * 92)
+    print(f"{'模式':<20} {'p50(ms)':>10} {'p90(ms)':>10} {'p99(ms)':>10} {'最大(ms)':>10} "
+          f"{'录音总计(s)':>12} {'finalize(s)':>12}")
+    for name, stats in results.items():
+        print(f"{name:<18} {stats['p50_ms']:>10.3f} {stats['p90_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+              f"{stats['max_ms']:>10.3f} {stats['total_s']:>12.2f} {stats['finalize_s']:>12.2f}")
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式导出目标吞吐量基准
+每个导出目标按录音时的方式逐条写入N条记录（每次write一条），记录：
+- 吞吐量（条/秒）和单次写入p99延迟
+- finalize耗时（Parquet在此一次写出）
+另测一次所有目标同时启用（ExportSinkManager）
+
+用法:
+    python benchmarks/bench_export_sinks.py --records 20000
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict, List, Union
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.export_sinks import CsvSink, SqliteSink, ParquetSink, ExportSink, ExportSinkManager, PYARROW_AVAILABLE
+
+# 单个导出目标或同时驱动多个目标的管理器（接口相同）
+SinkFactory = Callable[[str], Union[ExportSink, ExportSinkManager]]
+
+STANDARD_IDS = (100, 200, 300, 400)
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for handler in logging.getLogger("export_sinks").handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.CRITICAL)
+
+
+def make_records(count: int) -> List[Dict]:
+    """生成录音会话记录（与ExcelExporterEnhanced的行记录格式一致）"""
+    records = []
+    for i in range(count):
+        value = round(10.0 + (i % 97) * 0.13, 2)
+        records.append({
+            "voice_id": i + 1,
+            "standard_id": STANDARD_IDS[(i // 50) % len(STANDARD_IDS)],
+            "value": value if i % 20 else "OK",
+            "timestamp": "2025-01-01 08:00:00",
+            "original_text": f"{value}",
+            "row": i + 5,
+            "judgment": {"result": "OK", "deviation": 0.5},
+        })
+    return records
+
+
+def run_sink(make_sink: SinkFactory, directory: str, records: List[Dict]) -> Dict[str, float]:
+    """逐条写入并计时"""
+    sink = make_sink(directory)
+    sink.open_session({"session": "bench", "filename": os.path.join(directory, "bench.xlsx"),
+                       "part_no": "P1", "batch_no": "B1", "inspector": "张三"})
+    latencies = []
+    start = time.perf_counter()
+    for record in records:
+        t0 = time.perf_counter()
+        sink.write([record])
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    t0 = time.perf_counter()
+    sink.finalize()
+    finalize = time.perf_counter() - t0
+    sink.close()
+
+    latencies.sort()
+    return {
+        "rate": len(records) / total,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "finalize_ms": finalize * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="流式导出目标吞吐量基准")
+    parser.add_argument("--records", type=int, default=20000, help="记录条数")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    records = make_records(args.records)
+    single_sinks: Dict[str, Callable[[str], ExportSink]] = {
+        "CSV": lambda d: CsvSink(),
+        "SQLite": lambda d: SqliteSink(os.path.join(d, "measurements.db")),
+    }
+    if PYARROW_AVAILABLE:
+        single_sinks["Parquet"] = lambda d: ParquetSink()
+    sinks: Dict[str, SinkFactory] = dict(single_sinks)
+    sinks["全部同时启用"] = lambda d: ExportSinkManager([factory(d) for factory in single_sinks.values()])
+
+    results = {}
+    for name, factory in sinks.items():
+        directory = tempfile.mkdtemp(prefix="bench_export_sinks_")
+        try:
+            results[name] = run_sink(factory, directory, records)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"📤 流式导出吞吐量（{args.records} 条记录，逐条写入）")
+    if not PYARROW_AVAILABLE:
+        print("   （未安装pyarrow，跳过Parquet）")
+    print("=" * 64)
+    print(f"{'导出目标':<14} {'吞吐量(条/秒)':>14} {'p99(µs)':>12} {'finalize(ms)':>14}")
+    for name, stats in results.items():
+        print(f"{name:<14} {stats['rate']:>16,.0f} {stats['p99_us']:>12.1f} {stats['finalize_ms']:>14.1f}")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热路径计时开销基准：每个 with 块的纳秒数
+- 空 with（nullcontext）作为基线
+- PerformanceStep（音频路径原写法：每块新建元数据字典）
+- FastStep 全部计时 / 每10次采样1次 / 监控禁用
+另用4个线程同时计时，验证无锁记录合并后的次数
+
+用法:
+    python benchmarks/bench_fast_step.py --iterations 1000000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from contextlib import nullcontext
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.performance_monitor as pm
+from utils.performance_monitor import FastStep, PerformanceMonitor, PerformanceStep
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("utils.performance_monitor",):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def ns_per_block(make_block, iterations: int, repeat: int) -> float:
+    """最短一轮的每个 with 块纳秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        make_block(iterations)
+        best = min(best, (time.perf_counter_ns() - start) / iterations)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="热路径计时开销基准")
+    parser.add_argument("--iterations", type=int, default=1_000_000, help="每种方式的 with 次数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最短）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    monitor = PerformanceMonitor(raw_records=False)
+    pm.performance_monitor = monitor  # PerformanceStep 使用模块级实例
+    chunk_size = 200
+
+    def empty(n):
+        for _ in range(n):
+            with nullcontext():
+                pass
+
+    def legacy(n):
+        for current_time in range(n):
+            with PerformanceStep("音频输入", {'chunk_size': chunk_size, 'current_time': current_time}):
+                pass
+
+    def fast_loop(step):
+        def run(n):
+            for _ in range(n):
+                with step:
+                    pass
+        return run
+
+    full = FastStep("音频输入", monitor=monitor)
+    sampled = FastStep("音频处理", sample_every=10, monitor=monitor)
+
+    results = [
+        ("空 with（基线）", ns_per_block(empty, args.iterations, args.repeat)),
+        ("PerformanceStep（原方式）", ns_per_block(legacy, args.iterations, args.repeat)),
+        ("FastStep", ns_per_block(fast_loop(full), args.iterations, args.repeat)),
+        ("FastStep 每10次采样1次", ns_per_block(fast_loop(sampled), args.iterations, args.repeat)),
+    ]
+    monitor.disable()
+    results.append(("FastStep 监控禁用", ns_per_block(fast_loop(full), args.iterations, args.repeat)))
+    monitor.enable()
+
+    monitor.stop_aggregator()
+
+    # 多线程：各线程写自己的缓冲区，汇总后次数完整
+    # （紧循环每秒数十万次，远超音频块频率，缓冲区按单线程总次数分配以免被覆盖）
+    per_thread = args.iterations // 4
+    monitor = PerformanceMonitor(raw_records=False)
+    monitor._ring_size = 1 << per_thread.bit_length()
+    threaded = FastStep("结果处理", monitor=monitor)
+    threads = [threading.Thread(target=fast_loop(threaded), args=(per_thread,)) for _ in range(4)]
+    start = time.perf_counter_ns()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    threaded_ns = (time.perf_counter_ns() - start) / (per_thread * 4)
+    summary = monitor.get_summary_by_step("结果处理")
+    merged = summary.total_count if summary is not None else 0
+    monitor.stop_aggregator()
+
+    legacy_ns = results[1][1]
+    print(f"⏱️ 每个 with 块的开销（{args.iterations:,} 次，取{args.repeat}次最短）")
+    print("=" * 64)
+    print(f"{'方式':<28} {'ns/次':>10} {'相对原方式':>12}")
+    for name, value in results:
+        print(f"{name:<28} {value:>10.0f} {legacy_ns / value:>11.1f}x")
+    print("-" * 64)
+    print(f"4线程 FastStep: {threaded_ns:.0f} ns/次，合并 {merged:,} / {per_thread * 4:,} 次，"
+          f"丢弃 {monitor.dropped_samples()} 次")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
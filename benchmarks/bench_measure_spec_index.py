@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测量规范查询耗时基准
+对比一次finalize中"查找 + 加载规范"的耗时：
+- 原方式：os.path.exists 查两个目录 + load_workbook 完整解析规范xlsx
+- 索引冷启动：首次解析（只读模式）并写旁路缓存
+- 旁路缓存：新进程（新索引实例）从 .spec_cache/*.json 读取
+- 内存命中：文件未变化，只做 stat 校验
+
+用法:
+    python benchmarks/bench_measure_spec_index.py --specs 500 --repeat 200
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from typing import Callable, Dict
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+
+from utils.measure_spec_index import MeasureSpecIndex
+
+PART_NO = "BENCH-001"
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for handler in logging.getLogger("measure_spec_index").handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.CRITICAL)
+
+
+def legacy_lookup(reports_dir: str) -> Dict[int, Dict]:
+    """原方式：每次finalize查找文件并完整解析"""
+    spec_filename = f"{PART_NO}_MeasureSpec.xlsx"
+    spec_path = os.path.join(reports_dir, "templates", spec_filename)
+    if not os.path.exists(spec_path):
+        spec_path = os.path.join(reports_dir, spec_filename)
+
+    workbook = load_workbook(spec_path)
+    worksheet = workbook.active
+    spec_data = {}
+    for row in range(2, worksheet.max_row + 1):
+        standard_id = worksheet.cell(row=row, column=1).value
+        if standard_id is None:
+            continue
+        lower_limit = worksheet.cell(row=row, column=3).value
+        upper_limit = worksheet.cell(row=row, column=4).value
+        spec_data[int(standard_id)] = {
+            'content': worksheet.cell(row=row, column=2).value or "",
+            'lower_limit': float(lower_limit) if lower_limit is not None else None,
+            'upper_limit': float(upper_limit) if upper_limit is not None else None
+        }
+    workbook.close()
+    return spec_data
+
+
+def time_call(func: Callable[[], object], repeat: int) -> float:
+    """平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="测量规范查询耗时基准")
+    parser.add_argument("--specs", type=int, default=500, help="规范文件中的标准序号数")
+    parser.add_argument("--repeat", type=int, default=200, help="内存命中的重复次数")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    reports_dir = tempfile.mkdtemp(prefix="bench_spec_index_")
+    try:
+        os.makedirs(os.path.join(reports_dir, "templates"))
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.append(["标准序号", "标准内容", "下限", "上限"])
+        for i in range(args.specs):
+            worksheet.append([100 + i, f"尺寸{i}", 10.0 + i, 20.0 + i])
+        workbook.save(os.path.join(reports_dir, f"{PART_NO}_MeasureSpec.xlsx"))
+        workbook.close()
+
+        search_dirs = [os.path.join(reports_dir, "templates"), reports_dir]
+        slow_repeat = max(1, args.repeat // 20)
+
+        results = {"原方式(load_workbook)": time_call(lambda: legacy_lookup(reports_dir), slow_repeat)}
+
+        def cold() -> None:
+            index = MeasureSpecIndex(search_dirs)
+            shutil.rmtree(os.path.join(reports_dir, ".spec_cache"), ignore_errors=True)
+            index.get(PART_NO)
+
+        results["索引冷启动(解析+写缓存)"] = time_call(cold, slow_repeat)
+        results["旁路缓存(新进程)"] = time_call(lambda: MeasureSpecIndex(search_dirs).get(PART_NO), slow_repeat)
+
+        warm_index = MeasureSpecIndex(search_dirs)
+        expected = warm_index.get(PART_NO)[1]
+        assert expected == legacy_lookup(reports_dir)
+        results["内存命中(stat校验)"] = time_call(lambda: warm_index.get(PART_NO), args.repeat)
+    finally:
+        shutil.rmtree(reports_dir, ignore_errors=True)
+
+    baseline = results["原方式(load_workbook)"]
+    print(f"📊 测量规范查找+加载耗时（{args.specs} 个标准序号）")
+    print("=" * 60)
+    print(f"{'方式':<24} {'平均(µs)':>12} {'加速比':>10}")
+    for name, micros in results.items():
+        print(f"{name:<22} {micros:>12.1f} {baseline / micros:>9.1f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨会话测量数据库查询基准
+生成N条（默认100万）合成测量记录，记录常见查询的p50/p99延迟：
+- 零件号+标准序号+时间范围（SPC趋势）
+- 批次号（批次追溯）
+- 检验员+时间范围
+另对比原方式：逐个打开xlsx报告过滤（--reports 个报告）vs 历史报告导入后的索引查询
+
+用法:
+    python benchmarks/bench_measurement_store.py --rows 1000000 --reports 20
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.measurement_store import MeasurementStore, import_reports, read_report
+
+PARTS = [f"PART-{i:03d}" for i in range(50)]
+STANDARD_IDS = [100 * (i + 1) for i in range(20)]
+INSPECTORS = ["张三", "李四", "王五", "赵六", "钱七"]
+SESSION_SIZE = 500
+START = datetime(2025, 1, 1)
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("measurement_store", "excel_exporter_enhanced"):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def populate(store: MeasurementStore, rows: int, batch_size: int = 50000) -> None:
+    """按会话生成合成记录（每个会话同一零件号、批次号、检验员，时间递增）"""
+    rng = random.Random(42)
+    batch: List[Dict] = []
+    for session_index in range(rows // SESSION_SIZE):
+        part_no = PARTS[session_index % len(PARTS)]
+        batch_no = f"B{session_index:05d}"
+        inspector = INSPECTORS[session_index % len(INSPECTORS)]
+        session_start = START + timedelta(minutes=30 * session_index)
+        for i in range(SESSION_SIZE):
+            batch.append({
+                "session": f"Report_{part_no}_{batch_no}",
+                "part_no": part_no, "batch_no": batch_no, "inspector": inspector,
+                "voice_id": i + 1, "standard_id": STANDARD_IDS[i % len(STANDARD_IDS)],
+                "value": round(rng.gauss(50.0, 1.0), 3), "judgment": "OK", "deviation": 0.0,
+                "timestamp": (session_start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S"),
+            })
+            if len(batch) >= batch_size:
+                store.upsert_measurements(batch)
+                batch = []
+    store.upsert_measurements(batch)
+
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """重复执行并返回p50/p99（毫秒）"""
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return {"p50": latencies[len(latencies) // 2], "p99": latencies[max(0, int(len(latencies) * 0.99) - 1)]}
+
+
+def write_reports(directory: str, count: int) -> None:
+    """用导出器生成xlsx报告（不写数据库，模拟历史报告）"""
+    from utils.config_loader import config
+    from excel_utils import ExcelExporterEnhanced
+
+    mute_console_logging()
+    config._config.setdefault("excel", {}).setdefault("store", {})["enabled"] = False
+    for index in range(count):
+        part_no = PARTS[index % 3]
+        exporter = ExcelExporterEnhanced(
+            filename=os.path.join(directory, f"Report_{part_no}_B{index:05d}_20250101_080000.xlsx"),
+            part_no=part_no, batch_no=f"B{index:05d}", inspector=INSPECTORS[index % len(INSPECTORS)])
+        for standard_id in STANDARD_IDS[:5]:
+            exporter.current_standard_id = standard_id
+            exporter.append_with_text([(50.0 + i * 0.01, "", "") for i in range(20)])
+        exporter.finalize_excel_file()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="跨会话测量数据库查询基准")
+    parser.add_argument("--rows", type=int, default=1000000, help="合成记录条数")
+    parser.add_argument("--repeat", type=int, default=200, help="每个查询重复次数")
+    parser.add_argument("--reports", type=int, default=20, help="对比原方式的xlsx报告数（0跳过）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    directory = tempfile.mkdtemp(prefix="bench_measurement_store_")
+    try:
+        store = MeasurementStore(os.path.join(directory, "measurements.db"))
+        t0 = time.perf_counter()
+        populate(store, args.rows)
+        build = time.perf_counter() - t0
+        size_mb = os.path.getsize(store.path) / 1024 / 1024
+
+        rng = random.Random(7)
+        queries = {
+            "零件号+标准序号+时间范围": lambda: store.query(
+                part_no=rng.choice(PARTS), standard_id=rng.choice(STANDARD_IDS),
+                since="2025-01-05", until="2025-01-12"),
+            "批次号": lambda: store.query(batch_no=f"B{rng.randrange(args.rows // SESSION_SIZE):05d}"),
+            "检验员+时间范围(计数)": lambda: store.count(
+                inspector=rng.choice(INSPECTORS), since="2025-01-10", until="2025-01-11"),
+        }
+        plans = {
+            "零件号+标准序号+时间范围": store.explain(part_no=PARTS[0], standard_id=100, since="2025-01-05"),
+            "批次号": store.explain(batch_no="B00001"),
+            "检验员+时间范围(计数)": store.explain(inspector="张三", since="2025-01-10"),
+        }
+        results = {name: measure(func, args.repeat) for name, func in queries.items()}
+        store.close()
+
+        print(f"🗄️ 测量数据库查询（{args.rows:,} 条记录，建库 {build:.1f}s，{size_mb:.0f}MB）")
+        print("=" * 72)
+        print(f"{'查询':<22} {'p50(ms)':>10} {'p99(ms)':>10}  查询计划")
+        for name, stats in results.items():
+            print(f"{name:<22} {stats['p50']:>10.2f} {stats['p99']:>10.2f}  {plans[name]}")
+        print("=" * 72)
+
+        if args.reports:
+            reports_dir = os.path.join(directory, "reports")
+            os.makedirs(reports_dir)
+            write_reports(reports_dir, args.reports)
+            paths = [os.path.join(reports_dir, name) for name in sorted(os.listdir(reports_dir))]
+
+            def legacy_scan():
+                return [row for path in paths for session, rows in [read_report(path)]
+                        if session["part_no"] == PARTS[0] for row in rows if row["standard_id"] == 300]
+
+            legacy = measure(legacy_scan, 3)
+            report_store = MeasurementStore(os.path.join(reports_dir, "imported.db"))
+            t0 = time.perf_counter()
+            import_reports(reports_dir, report_store)
+            imported = time.perf_counter() - t0
+            indexed = measure(lambda: report_store.query(part_no=PARTS[0], standard_id=300), args.repeat)
+            assert len(report_store.query(part_no=PARTS[0], standard_id=300)) == len(legacy_scan())
+            report_store.close()
+
+            print(f"📂 原方式对比（{args.reports} 个xlsx报告，导入耗时 {imported:.2f}s）")
+            print(f"   逐个打开xlsx过滤: p50 {legacy['p50']:.1f} ms")
+            print(f"   导入后索引查询:   p50 {indexed['p50']:.2f} ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能监控内存与开销基准（默认1000万次计时）
+- 每次 start_timer/end_timer 的开销：原始记录模式 vs 直方图模式
+- 内存：原始记录随计时次数线性增长（按 --raw-samples 实测后外推到 --samples），直方图固定
+- 汇总耗时：原方式（过滤记录 + statistics.quantiles）vs 直方图百分位
+- 精度：1000万个对数正态分布耗时，直方图 p50/p95/p99/最大值 与精确值（numpy）的相对误差
+
+用法:
+    python benchmarks/bench_performance_histogram.py --samples 10000000 --raw-samples 1000000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.latency_histogram import LatencyHistogram
+from utils.performance_monitor import PerformanceMonitor, PerformanceRecord
+
+STEP = "音频处理"
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("utils.performance_monitor",):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def time_timers(monitor: PerformanceMonitor, count: int) -> float:
+    """count次 start_timer/end_timer，返回每次的纳秒数"""
+    start_timer, end_timer = monitor.start_timer, monitor.end_timer
+    metadata = {"chunk_size": 200}
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        end_timer(start_timer(STEP, metadata))
+    return (time.perf_counter_ns() - start) / count
+
+
+def traced_bytes(raw_records: bool, count: int) -> int:
+    """count次计时后监控器保留的内存（tracemalloc）"""
+    tracemalloc.start()
+    monitor = PerformanceMonitor(raw_records=raw_records, max_raw_records=count)
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        monitor.end_timer(monitor.start_timer(STEP, {"chunk_size": 200}))
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained
+
+
+def legacy_summary(records: List[PerformanceRecord]) -> Dict[str, float]:
+    """原方式：过滤记录后用 statistics 求中位数与分位数"""
+    durations = [record.duration for record in records if record.step_name == STEP]
+    quantiles = statistics.quantiles(durations, n=100)
+    return {"p50": statistics.median(durations), "p95": quantiles[94], "p99": quantiles[98]}
+
+
+def best_ms(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="性能监控内存与开销基准")
+    parser.add_argument("--samples", type=int, default=10_000_000, help="直方图模式计时次数")
+    parser.add_argument("--raw-samples", type=int, default=1_000_000,
+                        help="原始记录模式实测次数（内存按比例外推到 --samples）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+
+    raw_monitor = PerformanceMonitor(raw_records=True, max_raw_records=args.raw_samples)
+    raw_ns = time_timers(raw_monitor, args.raw_samples)
+    raw_summary_ms = best_ms(lambda: legacy_summary(list(raw_monitor._records)))
+    del raw_monitor
+    raw_bytes = traced_bytes(True, args.raw_samples)
+
+    hist_monitor = PerformanceMonitor(raw_records=False)
+    hist_ns = time_timers(hist_monitor, args.samples)
+    hist_summary_ms = best_ms(lambda: hist_monitor.get_summary_by_step(STEP))
+    hist_bytes = traced_bytes(False, args.raw_samples)
+
+    # 精度：对数正态分布（中位数约11ms，长尾）
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(mean=-4.5, sigma=0.8, size=args.samples)
+    histogram = LatencyHistogram()
+    record_ns = histogram.record_ns
+    start = time.perf_counter_ns()
+    for value in (values * 1e9).astype(np.int64).tolist():
+        record_ns(value)
+    record_only_ns = (time.perf_counter_ns() - start) / args.samples
+    exact = np.percentile(values, [50, 95, 99])
+
+    scale = args.samples / args.raw_samples
+    print(f"📊 性能监控：原始记录 vs 直方图（{args.samples:,} 次计时）")
+    print("=" * 78)
+    print(f"{'模式':<14} {'每次计时(ns)':>14} {'保留内存(MB)':>16} {'汇总耗时(ms)':>14}")
+    print(f"{'原始记录':<14} {raw_ns:>16.0f} {raw_bytes * scale / 2**20:>17.1f}* {raw_summary_ms * scale:>14.1f}*")
+    print(f"{'直方图':<15} {hist_ns:>16.0f} {hist_bytes / 2**20:>18.3f} {hist_summary_ms:>15.2f}")
+    print("-" * 78)
+    print(f"* 原始记录按 {args.raw_samples:,} 次实测后线性外推（每条 {raw_bytes / args.raw_samples:.0f} 字节）")
+    print(f"直方图单次 record_ns: {record_only_ns:.0f} ns，"
+          f"固定 {LatencyHistogram.bucket_count()} 个桶/步骤")
+    print("=" * 78)
+    print(f"{'分位':<8} {'精确值(ms)':>12} {'直方图(ms)':>12} {'相对误差':>10}")
+    for percent, value in zip((50, 95, 99), exact):
+        estimate = histogram.percentile(percent)
+        print(f"p{percent:<7} {value * 1000:>12.4f} {estimate * 1000:>12.4f} {abs(estimate - value) / value:>10.3%}")
+    print(f"{'max':<8} {values.max() * 1000:>12.4f} {histogram.max_ns / 1e6:>12.4f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
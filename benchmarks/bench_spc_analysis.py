@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SPC过程能力分析耗时基准
+N条（默认10万）测量值、M个标准序号，记录：
+- 原方式：逐值调用 _calculate_judgment + 按组 statistics.fmean/stdev
+- 向量化：utils.spc_analysis.analyze（判断、偏差、均值、标准差、Cp/Cpk一次完成）
+- 从测量数据库加载同样数据的耗时（数组装载）及加载+分析总耗时
+
+用法:
+    python benchmarks/bench_spc_analysis.py --values 100000 --standards 50
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_utils import ExcelExporterEnhanced
+from utils.measurement_store import MeasurementStore
+from utils.spc_analysis import analyze, load_from_store
+
+
+def mute_console_logging() -> None:
+    """关闭控制台日志，避免干扰结果表"""
+    for name in ("measurement_store", "spc_analysis", "excel_exporter_enhanced"):
+        for handler in logging.getLogger(name).handlers:
+            if type(handler) is logging.StreamHandler:
+                handler.setLevel(logging.CRITICAL)
+
+
+def make_data(count: int, standards: int) -> Tuple[List[int], List[float], Dict[int, Dict]]:
+    """生成测量值和规范（每4个标准序号中1个单边上限、1个单边下限）"""
+    rng = random.Random(1)
+    spec = {}
+    for index in range(standards):
+        standard_id = 100 * (index + 1)
+        lower: Optional[float] = 9.0
+        upper: Optional[float] = 11.0
+        if index % 4 == 1:
+            lower = None
+        elif index % 4 == 2:
+            upper = None
+        spec[standard_id] = {"content": f"尺寸{index}", "lower_limit": lower, "upper_limit": upper}
+    standard_ids = [100 * (rng.randrange(standards) + 1) for _ in range(count)]
+    values = [rng.gauss(10.0, 0.4) for _ in range(count)]
+    return standard_ids, values, spec
+
+
+def legacy_analyze(standard_ids: List[int], values: List[float], spec: Dict[int, Dict]) -> List[Dict]:
+    """原方式：逐值判断 + 逐组统计"""
+    exporter = ExcelExporterEnhanced(filename="unused.xlsx")
+    groups: Dict[int, List[float]] = {}
+    nok: Dict[int, int] = {}
+    for standard_id, value in zip(standard_ids, values):
+        judgment = exporter._calculate_judgment(spec[standard_id], value)
+        nok[standard_id] = nok.get(standard_id, 0) + (judgment["result"] == "NOK")
+        groups.setdefault(standard_id, []).append(value)
+
+    summary = []
+    for standard_id in sorted(groups):
+        group = groups[standard_id]
+        mean, sigma = statistics.fmean(group), statistics.stdev(group)
+        lower, upper = spec[standard_id]["lower_limit"], spec[standard_id]["upper_limit"]
+        cpk_sides = [x for x in ((upper - mean) if upper is not None else None,
+                                 (mean - lower) if lower is not None else None) if x is not None]
+        summary.append({
+            "standard_id": standard_id, "mean": mean, "sigma": sigma,
+            "cp": (upper - lower) / (6 * sigma) if lower is not None and upper is not None else None,
+            "cpk": min(cpk_sides) / (3 * sigma), "nok_count": nok[standard_id],
+        })
+    return summary
+
+
+T = TypeVar("T")
+
+
+def best_of(func: Callable[[], T], repeat: int) -> Tuple[float, T]:
+    """取多次运行的最短耗时（秒）与最后一次的结果"""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SPC过程能力分析耗时基准")
+    parser.add_argument("--values", type=int, default=100000, help="测量值个数")
+    parser.add_argument("--standards", type=int, default=50, help="标准序号个数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数（取最短）")
+    args = parser.parse_args()
+
+    mute_console_logging()
+    standard_ids, values, spec = make_data(args.values, args.standards)
+
+    legacy_time, legacy = best_of(lambda: legacy_analyze(standard_ids, values, spec), args.repeat)
+    vector_time, result = best_of(lambda: analyze(standard_ids, values, spec), args.repeat)
+    id_array, value_array = np.asarray(standard_ids), np.asarray(values)
+    array_time, _ = best_of(lambda: analyze(id_array, value_array, spec), args.repeat)
+
+    # 结果一致性
+    for old, new in zip(legacy, result.summary):
+        assert old["standard_id"] == new["standard_id"] and old["nok_count"] == new["nok_count"]
+        assert abs(old["mean"] - new["mean"]) < 1e-9 and abs(old["cpk"] - new["cpk"]) < 1e-6
+
+    directory = tempfile.mkdtemp(prefix="bench_spc_analysis_")
+    try:
+        store = MeasurementStore(os.path.join(directory, "measurements.db"))
+        store.upsert_measurements({"session": "bench", "part_no": "P1", "voice_id": i, "standard_id": s, "value": v}
+                                  for i, (s, v) in enumerate(zip(standard_ids, values)))
+        load_time, _ = best_of(lambda: load_from_store(store, "P1"), args.repeat)
+        total_time, _ = best_of(lambda: analyze(*load_from_store(store, "P1"), spec), args.repeat)
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"📈 SPC分析（{args.values:,} 个测量值，{args.standards} 个标准序号，取{args.repeat}次最短）")
+    print("=" * 56)
+    print(f"{'方式':<28} {'耗时(ms)':>12}")
+    print(f"{'原方式（逐值判断+逐组统计）':<22} {legacy_time * 1000:>16.1f}")
+    print(f"{'向量化 analyze（Python列表输入）':<22} {vector_time * 1000:>12.1f}")
+    print(f"{'向量化 analyze（NumPy数组输入）':<22} {array_time * 1000:>12.1f}")
+    print(f"{'从测量数据库加载数组':<24} {load_time * 1000:>14.1f}")
+    print(f"{'数据库加载 + 分析':<26} {total_time * 1000:>13.1f}")
+    print("=" * 56)
+    print(f"加速比: {legacy_time / vector_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动导入耗时基准
+在独立子进程中以 `python -X importtime -c "import <模块>"` 导入各入口模块，统计：
+- 累计导入耗时（毫秒）和最耗时的模块
+- 进程峰值内存（RSS）
+- 重量级依赖（pandas / cn2an / openpyxl）是否在启动时被导入
+
+与JSON基线对比，导入耗时增长超过容忍度或重量级依赖重新出现在启动路径时以非零状态退出。
+当前环境缺少依赖（如pyaudio、PySide6）而无法导入的入口会标记为"不可用"并跳过对比。
+
+用法:
+    python benchmarks/bench_startup_imports.py                    # 与基线对比
+    python benchmarks/bench_startup_imports.py --update-baseline  # 重新生成基线
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from typing import Dict, Any, List, Optional, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines", "startup_imports.json")
+
+ENTRY_MODULES = ("text_processor", "excel_utils", "main_f", "voice_gui")
+HEAVY_MODULES = ("pandas", "cn2an", "openpyxl")
+
+DEFAULT_TOLERANCE = 0.5   # 导入耗时允许增长50%（冷启动受磁盘缓存影响较大）
+DEFAULT_REPEATS = 3       # 重复次数，取最快的一次
+TOP_N = 8
+
+# 子进程内执行：导入模块后报告重量级依赖加载情况和峰值内存
+_PROBE_CODE = """
+import sys, json, resource
+import {module}
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print("__PROBE__" + json.dumps({{
+    "loaded": [name for name in {heavy!r} if name in sys.modules],
+    "rss_mb": round(rss_kb / 1024.0, 1),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        [(模块名, 嵌套深度, 累计耗时us)]，按输出顺序
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue
+        # 模块名前每两个空格表示一层嵌套
+        raw_name = parts[2][1:]
+        name = raw_name.lstrip(" ")
+        rows.append((name, (len(raw_name) - len(name)) // 2, cumulative_us))
+    return rows
+
+
+def profile_module(module: str, python: str = sys.executable) -> Optional[Dict[str, Any]]:
+    """
+    在子进程中导入模块并统计耗时
+
+    Returns:
+        {"import_ms", "rss_mb", "heavy_loaded", "top"}，导入失败时返回None
+    """
+    code = _PROBE_CODE.format(module=module, heavy=HEAVY_MODULES)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8", errors="replace"
+    )
+    probe_line = next((line for line in proc.stdout.splitlines() if line.startswith("__PROBE__")), None)
+    if proc.returncode != 0 or probe_line is None:
+        return None
+
+    probe = json.loads(probe_line[len("__PROBE__"):])
+    rows = parse_importtime(proc.stderr)
+    target = next((row for row in reversed(rows) if row[0] == module and row[1] == 0), None)
+    # 入口模块的直接依赖（深度1）按累计耗时排序，即启动路径上最重的依赖
+    top = sorted(
+        ((name, cumulative) for name, depth, cumulative in rows if depth == 1),
+        key=lambda item: item[1], reverse=True
+    )[:TOP_N]
+    return {
+        "import_ms": round((target[2] if target else 0) / 1000.0, 1),
+        "rss_mb": probe["rss_mb"],
+        "heavy_loaded": probe["loaded"],
+        "top": [{"module": name, "ms": round(us / 1000.0, 1)} for name, us in top],
+    }
+
+
+def measure(modules=ENTRY_MODULES, repeats: int = DEFAULT_REPEATS) -> Dict[str, Optional[Dict[str, Any]]]:
+    """逐个入口测量，每个入口取最快的一次"""
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for module in modules:
+        best = None
+        for _ in range(max(1, repeats)):
+            result = profile_module(module)
+            if result is None:
+                break
+            if best is None or result["import_ms"] < best["import_ms"]:
+                best = result
+        results[module] = best
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Optional[Dict[str, Any]]], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """对比基线，返回回归描述（耗时超出容忍度、重量级依赖重新进入启动路径）"""
+    regressions = []
+    for module, stats in results.items():
+        base = baseline.get("modules", {}).get(module)
+        if not stats or not base:
+            continue
+        ceiling = base["import_ms"] * (1.0 + tolerance)
+        if stats["import_ms"] > ceiling:
+            regressions.append(
+                f"{module}: 导入 {stats['import_ms']:.1f}ms > 基线 {base['import_ms']:.1f}ms "
+                f"× (1 + {tolerance:.0%}) = {ceiling:.1f}ms")
+        new_heavy = sorted(set(stats["heavy_loaded"]) - set(base.get("heavy_loaded", [])))
+        if new_heavy:
+            regressions.append(f"{module}: 启动时新增导入重量级依赖 {', '.join(new_heavy)}")
+    return regressions
+
+
+def print_results(results: Dict[str, Optional[Dict[str, Any]]], baseline: Dict[str, Any]) -> None:
+    """打印结果表"""
+    print(f"{'入口模块':<18} {'导入(ms)':>10} {'基线(ms)':>10} {'RSS(MB)':>10}  重量级依赖")
+    for module, stats in results.items():
+        if stats is None:
+            print(f"{module:<18} {'不可用（当前环境缺少依赖）':>10}")
+            continue
+        base = baseline.get("modules", {}).get(module, {}).get("import_ms")
+        base_text = f"{base:.1f}" if base else "-"
+        heavy = ", ".join(stats["heavy_loaded"]) or "无"
+        print(f"{module:<18} {stats['import_ms']:>10.1f} {base_text:>10} {stats['rss_mb']:>10.1f}  {heavy}")
+        for item in stats["top"][:3]:
+            print(f"{'':<20}└ {item['module']}: {item['ms']:.1f}ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="启动导入耗时基准")
+    parser.add_argument("--modules", nargs="+", default=list(ENTRY_MODULES), help="要测量的入口模块")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="重复次数（取最快一次）")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许的导入耗时增长比例")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    args = parser.parse_args()
+
+    print("🚀 启动导入耗时基准")
+    print("=" * 78)
+    results = measure(args.modules, args.repeats)
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+    print("=" * 78)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "repeats": args.repeats,
+                "modules": {module: stats for module, stats in results.items() if stats},
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"📝 基线已更新: {BASELINE_PATH}")
+        return 0
+
+    if not baseline:
+        print("⚠️ 未找到基线文件，使用 --update-baseline 生成")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("❌ 启动导入回归:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+
+    print(f"✅ 所有入口导入耗时在容忍度 {args.tolerance:.0%} 以内，未引入重量级依赖")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
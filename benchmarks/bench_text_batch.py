@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量文本处理吞吐量基准测试
+对比逐条创建TextProcessor、批量顺序处理、进程池批量处理三种方式的行/秒
+
+用法:
+    python benchmarks/bench_text_batch.py --lines 20000 --workers 4
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_processor import TextProcessor, VoiceCommandProcessor
+
+# 典型的产线转录文本
+UTTERANCES = [
+    "三 十 七 点 五", "一 百 二 十 三", "二 十 五 点 五", "零 点 五", "点 八 四",
+    "十二点五", "十二点六", "十二点四", "二百", "一千三百", "长度二百",
+    "切换到三百", "暂停", "继续", "OK", "不合格", "今天气温二 十五度",
+    "价格是一 百二 十三点五元", "四十五点零二", "一百一十三",
+]
+
+
+def build_corpus(lines: int):
+    """生成指定行数的测试语料"""
+    return [UTTERANCES[i % len(UTTERANCES)] for i in range(lines)]
+
+
+def bench_legacy(corpus):
+    """旧方式：每行新建处理器（等同于旧版模块级process_text）"""
+    command_processor = VoiceCommandProcessor()
+    start = time.perf_counter()
+    for text in corpus:
+        processor = TextProcessor()
+        processed = processor.process_text(text)
+        processor.extract_numbers(text, processed, command_processor)
+    return time.perf_counter() - start
+
+
+def bench_batch(corpus):
+    """批量顺序处理：复用同一个处理器"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+    start = time.perf_counter()
+    for _ in processor.extract_numbers_batch(corpus, command_processor):
+        pass
+    return time.perf_counter() - start
+
+
+def bench_pool(corpus, workers: int):
+    """进程池批量处理"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+    start = time.perf_counter()
+    for _ in processor.extract_numbers_batch(iter(corpus), command_processor, workers=workers):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量文本处理吞吐量基准测试")
+    parser.add_argument("--lines", type=int, default=20000, help="测试行数")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="进程池进程数")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.lines)
+
+    print("🚀 批量文本处理吞吐量基准测试")
+    print("=" * 60)
+    print(f"行数: {args.lines}, 进程数: {args.workers}")
+    print("-" * 60)
+
+    results = [
+        ("逐条新建处理器", bench_legacy(corpus)),
+        ("批量顺序处理", bench_batch(corpus)),
+        (f"进程池({args.workers})", bench_pool(corpus, args.workers)),
+    ]
+
+    baseline = results[0][1]
+    print(f"{'方式':<16} {'耗时(s)':<10} {'行/秒':<12} {'加速比':<8}")
+    for name, elapsed in results:
+        print(f"{name:<16} {elapsed:<10.3f} {args.lines / elapsed:<12.0f} {baseline / elapsed:<8.2f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
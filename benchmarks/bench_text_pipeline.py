@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本处理流水线微基准测试
+基于版本化的黄金语料（真实语音转录 + 期望输出）：
+1. 先校验每个阶段的输出与黄金语料一致（规则变化必须显式更新语料）
+2. 再逐阶段计时，记录 p50/p99（微秒）和吞吐量（次/秒）
+3. 与JSON基线对比，吞吐量下降超过容忍度时以非零状态退出
+
+覆盖阶段: process_text / extract_numbers / match_command /
+          match_standard_id_command / check_special_text
+
+用法:
+    python benchmarks/bench_text_pipeline.py                    # 校验 + 与基线对比
+    python benchmarks/bench_text_pipeline.py --update-baseline  # 重新生成基线
+    python benchmarks/bench_text_pipeline.py --update-golden    # 规则有意变更后刷新期望输出
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+from typing import Dict, Any, List, Callable, Tuple
+
+# 添加项目根目录到Python路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from text_processor import TextProcessor, VoiceCommandProcessor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_CORPUS_PATH = os.path.join(BENCH_DIR, "golden", "text_pipeline_corpus.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines", "text_pipeline.json")
+
+STAGES = ("process_text", "extract_numbers", "match_command",
+          "match_standard_id_command", "check_special_text")
+
+DEFAULT_TOLERANCE = 0.25   # 吞吐量允许下降25%（不同机器/负载下的噪声）
+DEFAULT_ROUNDS = 20        # 每条语料每个阶段的计时轮数
+DEFAULT_REPEATS = 3        # 重复次数，吞吐量取最好的一次以降低调度噪声
+
+
+def load_corpus(path: str = GOLDEN_CORPUS_PATH) -> Dict[str, Any]:
+    """加载黄金语料"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_processors(corpus: Dict[str, Any]) -> Tuple[TextProcessor, VoiceCommandProcessor]:
+    """按语料中冻结的命令配置创建处理器（不受config.yaml改动影响）"""
+    settings = corpus["settings"]
+    command_processor = VoiceCommandProcessor()
+    command_processor.configure(**settings["command_config"])
+    return TextProcessor(), command_processor
+
+
+def run_case(text: str, corpus: Dict[str, Any], processor: TextProcessor,
+             command_processor: VoiceCommandProcessor) -> Dict[str, Any]:
+    """对单条语料执行完整流水线，返回各阶段输出"""
+    settings = corpus["settings"]
+    processed = processor.process_text(text)
+    return {
+        "processed": processed,
+        "numbers": processor.extract_numbers(text, processed, command_processor),
+        "command": command_processor.match_command(processed, settings["commands"]),
+        "standard_id": command_processor.match_standard_id_command(
+            processed, settings["standard_id_prefixes"]),
+        "special_text": processor.check_special_text(
+            processed, settings["exportable_texts"], True),
+    }
+
+
+def verify_corpus(corpus: Dict[str, Any]) -> List[str]:
+    """校验输出与黄金语料一致，返回不一致项描述列表"""
+    processor, command_processor = build_processors(corpus)
+    mismatches = []
+    for case in corpus["cases"]:
+        actual = run_case(case["text"], corpus, processor, command_processor)
+        for key, value in actual.items():
+            if case["expected"].get(key) != value:
+                mismatches.append(
+                    f"'{case['text']}' {key}: 期望 {case['expected'].get(key)!r}, 实际 {value!r}")
+    return mismatches
+
+
+def _stage_callables(corpus: Dict[str, Any], processor: TextProcessor,
+                     command_processor: VoiceCommandProcessor) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """各阶段的计时目标（输入取自黄金语料，阶段之间互不依赖）"""
+    settings = corpus["settings"]
+    commands = settings["commands"]
+    prefixes = settings["standard_id_prefixes"]
+    exportable_texts = settings["exportable_texts"]
+    return {
+        "process_text": lambda case: processor.process_text(case["text"]),
+        "extract_numbers": lambda case: processor.extract_numbers(
+            case["text"], case["expected"]["processed"], command_processor),
+        "match_command": lambda case: command_processor.match_command(
+            case["expected"]["processed"], commands),
+        "match_standard_id_command": lambda case: command_processor.match_standard_id_command(
+            case["expected"]["processed"], prefixes),
+        "check_special_text": lambda case: processor.check_special_text(
+            case["expected"]["processed"], exportable_texts, True),
+    }
+
+
+def _percentile(sorted_values: List[int], percent: float) -> float:
+    """最近秩百分位数"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(percent / 100.0 * len(sorted_values))) - 1))
+    return float(sorted_values[index])
+
+
+def mute_console_logging() -> None:
+    """关闭text_processor的控制台输出（保留文件日志，计时仍包含真实的日志开销）"""
+    for handler in logging.getLogger("text_processor").handlers:
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.CRITICAL)
+
+
+def measure_stages(corpus: Dict[str, Any], rounds: int = DEFAULT_ROUNDS,
+                   repeats: int = DEFAULT_REPEATS) -> Dict[str, Dict[str, float]]:
+    """
+    逐阶段计时
+
+    Returns:
+        {阶段: {"p50_us", "p99_us", "ops_per_sec", "samples"}}
+    """
+    processor, command_processor = build_processors(corpus)
+    stages = _stage_callables(corpus, processor, command_processor)
+    cases = corpus["cases"]
+    results: Dict[str, Dict[str, float]] = {}
+
+    for stage_name in STAGES:
+        func = stages[stage_name]
+        # 预热（填充cn2an等内部缓存）
+        for case in cases:
+            func(case)
+
+        samples: List[int] = []
+        best_ns = 0
+        for _ in range(max(1, repeats)):
+            repeat_start = time.perf_counter_ns()
+            for _ in range(rounds):
+                for case in cases:
+                    start = time.perf_counter_ns()
+                    func(case)
+                    samples.append(time.perf_counter_ns() - start)
+            repeat_ns = time.perf_counter_ns() - repeat_start
+            best_ns = repeat_ns if best_ns == 0 else min(best_ns, repeat_ns)
+
+        samples.sort()
+        results[stage_name] = {
+            "p50_us": round(_percentile(samples, 50) / 1000.0, 2),
+            "p99_us": round(_percentile(samples, 99) / 1000.0, 2),
+            "ops_per_sec": round(rounds * len(cases) / (best_ns / 1e9), 1),
+            "samples": len(samples),
+        }
+
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """对比基线，返回吞吐量回归超过容忍度的阶段描述"""
+    regressions = []
+    for stage_name, stats in results.items():
+        base = baseline.get("stages", {}).get(stage_name)
+        if not base:
+            continue
+        floor = base["ops_per_sec"] * (1.0 - tolerance)
+        if stats["ops_per_sec"] < floor:
+            regressions.append(
+                f"{stage_name}: {stats['ops_per_sec']:.0f} 次/秒 < 基线 {base['ops_per_sec']:.0f} "
+                f"× (1 - {tolerance:.0%}) = {floor:.0f}")
+    return regressions
+
+
+def update_golden(corpus: Dict[str, Any], path: str = GOLDEN_CORPUS_PATH) -> None:
+    """用当前实现的输出刷新黄金语料的期望值（仅在规则有意变更时使用）"""
+    processor, command_processor = build_processors(corpus)
+    for case in corpus["cases"]:
+        case["expected"] = run_case(case["text"], corpus, processor, command_processor)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any]) -> None:
+    """打印计时结果表"""
+    print(f"{'阶段':<28} {'p50(us)':>10} {'p99(us)':>10} {'次/秒':>12} {'基线次/秒':>12}")
+    for stage_name, stats in results.items():
+        base = baseline.get("stages", {}).get(stage_name, {}).get("ops_per_sec")
+        base_text = f"{base:.0f}" if base else "-"
+        print(f"{stage_name:<28} {stats['p50_us']:>10.2f} {stats['p99_us']:>10.2f} "
+              f"{stats['ops_per_sec']:>12.0f} {base_text:>12}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="文本处理流水线微基准测试")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="每条语料每个阶段的计时轮数")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="重复次数（吞吐量取最好一次）")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许的吞吐量下降比例")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--update-golden", action="store_true", help="用当前实现刷新黄金语料期望输出")
+    parser.add_argument("--quiet-logs", action="store_true", help="计时期间关闭text_processor日志")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    mute_console_logging()
+
+    if args.update_golden:
+        update_golden(corpus)
+        print(f"📝 黄金语料已更新: {GOLDEN_CORPUS_PATH}")
+        return 0
+
+    print("🧪 文本处理流水线基准测试")
+    print("=" * 78)
+    print(f"语料版本: {corpus['version']}, 条数: {len(corpus['cases'])}, 轮数: {args.rounds}")
+
+    mismatches = verify_corpus(corpus)
+    if mismatches:
+        print(f"❌ 输出与黄金语料不一致 ({len(mismatches)} 项):")
+        for line in mismatches:
+            print(f"   {line}")
+        return 2
+    print("✅ 输出与黄金语料一致")
+    print("-" * 78)
+
+    if args.quiet_logs:
+        logging.getLogger("text_processor").disabled = True
+
+    results = measure_stages(corpus, args.rounds, args.repeats)
+
+    baseline: Dict[str, Any] = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_results(results, baseline)
+    print("=" * 78)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump({
+                "corpus_version": corpus["version"],
+                "rounds": args.rounds,
+                "repeats": args.repeats,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "stages": results,
+            }, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"📝 基线已更新: {BASELINE_PATH}")
+        return 0
+
+    if not baseline:
+        print("⚠️ 未找到基线文件，使用 --update-baseline 生成")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ 吞吐量回归超过容忍度 {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+
+    print(f"✅ 所有阶段吞吐量在容忍度 {args.tolerance:.0%} 以内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线重放慢语音段现场（debug/slow/ 下由 utils/slow_capture.py 自动保存）
+把现场的音频重新送入识别器，对比当时与现在的识别文本和耗时，用于复现“卡了几秒”的问题
+
+用法:
+    python debug/replay_slow_utterance.py                       # 列出现有现场
+    python debug/replay_slow_utterance.py latest                # 重放最新的现场
+    python debug/replay_slow_utterance.py debug/slow/slow_20251030_101502_utt42 --repeat 3
+    python debug/replay_slow_utterance.py latest --no-vad       # 跳过VAD，整段直接最终识别
+    python debug/replay_slow_utterance.py latest --realtime     # 按采集节奏逐块送入
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.slow_capture import load_bundle, slow_capture
+
+
+def print_bundle(path: str, bundle: dict) -> None:
+    """显示现场记录的当时情况"""
+    print(f"🐢 现场: {path}")
+    print("=" * 64)
+    print(f"语音段#{bundle.get('utt')}  会话 {bundle.get('session') or '-'}  保存于 {bundle.get('captured_at')}")
+    print(f"耗时 {bundle.get('latency_ms')}ms（阈值 {bundle.get('slo_ms')}ms） 结果: {bundle.get('outcome')}")
+    print(f"最终文本: {bundle.get('text')!r}")
+    partials = bundle.get("partial_results") or []
+    if partials:
+        print(f"部分结果: {' → '.join(partials[-5:])}")
+    print("各环节耗时(ms):")
+    for stage, value in (bundle.get("stages_ms") or {}).items():
+        print(f"   {stage:<28} {value:>10.1f}")
+    queues = bundle.get("queues") or {}
+    for name, gauge in queues.items():
+        print(f"   {name}: 最近 {gauge.get('last')}  最大 {gauge.get('max')}")
+    cpu = bundle.get("cpu") or {}
+    print(f"CPU: 进程 {cpu.get('process_cpu_percent', '-')}%  负载 {cpu.get('loadavg', '-')}")
+    pauses = bundle.get("gc_pauses") or []
+    if pauses:
+        longest = max(pauses, key=lambda pause: pause["ms"])
+        print(f"GC停顿: {len(pauses)} 次，最长 {longest['ms']:.1f}ms（第{longest['generation']}代）")
+    print("=" * 64)
+
+
+def resolve_bundle(argument: str) -> str:
+    if argument == "latest":
+        bundles = slow_capture.list_bundles()
+        if not bundles:
+            raise SystemExit(f"❌ {slow_capture.output_dir} 下没有慢语音段现场")
+        return bundles[-1]
+    return argument
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="离线重放慢语音段现场")
+    parser.add_argument("bundle", nargs="?", help="现场目录，或 latest；省略时列出现有现场")
+    parser.add_argument("--repeat", type=int, default=1, help="重放次数（首次含模型预热）")
+    parser.add_argument("--no-vad", action="store_true", help="跳过VAD，整段音频直接做最终识别")
+    parser.add_argument("--realtime", action="store_true", help="按音频实际时长逐块送入")
+    args = parser.parse_args()
+
+    if not args.bundle:
+        bundles = slow_capture.list_bundles()
+        print(f"📂 {slow_capture.output_dir}: {len(bundles)} 个现场")
+        for path in bundles:
+            print(f"   {os.path.basename(path)}")
+        return
+
+    path = resolve_bundle(args.bundle)
+    bundle, audio, sample_rate = load_bundle(path)
+    print_bundle(path, bundle)
+
+    from funasr_voice_combined import FunASRVoiceRecognizer
+    from utils.config_loader import config
+
+    recognizer = FunASRVoiceRecognizer(model_path=config.get_funasr_path(), sample_rate=sample_rate,
+                                       silent_mode=True)
+    load_start = time.perf_counter()
+    if not recognizer.initialize():
+        raise SystemExit("❌ 识别器初始化失败")
+    print(f"📦 模型加载: {time.perf_counter() - load_start:.2f}s  音频: {len(audio) / sample_rate:.2f}s")
+
+    for run in range(1, args.repeat + 1):
+        start = time.perf_counter()
+        results = recognizer.replay_audio(audio, use_vad=not args.no_vad, realtime=args.realtime)
+        elapsed = time.perf_counter() - start
+        texts = [result.text for result in results]
+        asr_ms = sum(result.asr_time for result in results) * 1000
+        same = "✅ 一致" if "".join(texts) == bundle.get("text", "") else "⚠️ 不一致"
+        print(f"第{run}次: 总耗时 {elapsed * 1000:.1f}ms  最终识别 {asr_ms:.1f}ms "
+              f"（当时 {bundle.get('asr_time_ms')}ms）  文本 {texts} {same}")
+
+    recognizer.unload_model()
+
+
+if __name__ == "__main__":
+    main()
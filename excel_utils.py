@@ -5,16 +5,11 @@
 所有格式化和公式生成都在系统停止时处理，避免识别过程中的性能损失
 """
 
-import pandas as pd
 import os
-from openpyxl import load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.formatting.rule import CellIsRule
-from openpyxl.utils import get_column_letter
 import threading
 import logging
-from typing import Any, List, Tuple, Union, Optional, Dict
+from copy import copy
+from typing import Any, Callable, List, Tuple, Union, Optional, Dict, TYPE_CHECKING
 from datetime import datetime
 
 # 使用统一的日志工具类
@@ -33,6 +28,60 @@ logger = LoggingManager.get_logger(
 # 新增：导入配置系统
 from utils.config_loader import config
 
+# 会话日志（录音阶段追加写，停止时生成xlsx）
+from utils.session_journal import SessionJournal, JournalState, JOURNAL_SUFFIX
+
+# 后台批量写入线程（录音回调中不做文件I/O）
+from utils.batch_writer import BackgroundBatchWriter
+
+# 测量规范索引（按mtime缓存解析结果）
+from utils.measure_spec_index import get_measure_spec_index
+
+# 模板结构描述（按mtime缓存，新建报告时不再打开模板）
+from utils.template_descriptor import TemplateDescriptor, get_template_descriptor
+
+# openpyxl延迟导入（导入耗时约150ms），首次读写Excel时才加载，main_f启动时在后台预热
+from utils.lazy_imports import lazy_callable
+
+if TYPE_CHECKING:
+    from openpyxl.worksheet.worksheet import Worksheet
+    from utils.export_sinks import ExportSinkManager
+
+Workbook = lazy_callable("openpyxl", "Workbook")
+load_workbook = lazy_callable("openpyxl", "load_workbook")
+Font = lazy_callable("openpyxl.styles", "Font")
+Alignment = lazy_callable("openpyxl.styles", "Alignment")
+PatternFill = lazy_callable("openpyxl.styles", "PatternFill")
+Border = lazy_callable("openpyxl.styles", "Border")
+Side = lazy_callable("openpyxl.styles", "Side")
+CellIsRule = lazy_callable("openpyxl.formatting.rule", "CellIsRule")
+get_column_letter = lazy_callable("openpyxl.utils", "get_column_letter")
+NamedStyle = lazy_callable("openpyxl.styles", "NamedStyle")
+WriteOnlyCell = lazy_callable("openpyxl.cell", "WriteOnlyCell")
+
+# 报告数据表头（第4行）和列宽
+REPORT_HEADERS = ["标准序号", "标准内容", "下限", "上限", "测量序号", "测量值", "判断结果", "偏差", "时间戳", "语音录入编号"]
+REPORT_COLUMN_WIDTHS = {
+    'A': 12,   # 标准序号
+    'B': 20,   # 标准内容
+    'C': 10,   # 下限
+    'D': 10,   # 上限
+    'E': 10,   # 测量序号
+    'F': 12,   # 测量值
+    'G': 10,   # 判断结果
+    'H': 10,   # 偏差
+    'I': 22,   # time
+    'J': 12    # 语音录入编号
+}
+REPORT_COLUMN_COUNT = len(REPORT_HEADERS)
+
+# finalize共享的命名样式（整个工作簿只创建一次）
+DATA_STYLE_NAME = "measure_data"    # 有内容的单元格：细边框 + 居中
+GRID_STYLE_NAME = "measure_grid"    # 空单元格：细边框
+
+# finalize写入数据时每多少行回报一次进度
+FINALIZE_PROGRESS_INTERVAL = 500
+
 class ExcelExporterEnhanced:
     """增强的Excel导出器 - 支持测量规范格式化"""
 
@@ -60,9 +109,33 @@ class ExcelExporterEnhanced:
 
         # 会话数据存储
         self._session_data: List[Tuple[Union[int, str, float], Any, str]] = []
+        # 完整的行记录（行号、标准序号、时间戳等），finalize直接由此生成报告
+        self._session_entries: List[Dict[str, Any]] = []
+
+        # 实时判断：会话开始时预加载测量规范，每条记录写入时即时判断OK/NOK
+        self._live_spec: Optional[Tuple[str, Dict[int, Dict[str, Any]]]] = None
+        self._judgments: Dict[int, Dict[str, Any]] = {}
 
         # 延迟格式化标志
         self._pending_formatting: bool = False
+        # finalize进度回调（仅在finalize_excel_file执行期间设置）
+        self._progress_callback: Optional[Callable[[str, int, int], None]] = None
+
+        # 会话日志：启用后录音阶段只追加写日志，finalize时一次性写入xlsx
+        journal_config = config.get_excel_journal_config()
+        self.use_journal: bool = bool(journal_config.get("enabled", True))
+        self._journal_config: Dict[str, Any] = journal_config
+        self._journal: Optional[SessionJournal] = None
+        self._from_template: bool = False
+        self._template_descriptor: Optional[TemplateDescriptor] = None
+
+        # 后台写入线程：按 excel.performance.batch_size 条或 flush_interval_ms 毫秒批量写入
+        self._performance_config: Dict[str, Any] = config.get_excel_performance_config()
+        self.use_background_writer: bool = bool(self._performance_config.get("background_writer", False))
+        self._writer: Optional[BackgroundBatchWriter] = None
+
+        # 流式导出目标（CSV / SQLite / Parquet），由FunASRVoiceSystem按配置设置
+        self.export_sinks: Optional['ExportSinkManager'] = None
 
     @staticmethod
     def _float_cell(val: Any) -> float:
@@ -81,26 +154,32 @@ class ExcelExporterEnhanced:
     def create_from_template(self, part_no: str = "", batch_no: str = "", inspector: str = "") -> bool:
         """从模板创建Excel文件"""
         try:
+            # 保存报告信息（模板不存在时默认方式创建的报告同样需要）
+            self.part_no = part_no
+            self.batch_no = batch_no
+            self.inspector = inspector
+
             # 检查模板文件是否存在
             if not os.path.exists(self.template_path):
                 logger.warning(f"模板文件不存在: {self.template_path}，使用默认方式")
                 self.create_new_file()
                 return False
 
-            # 保存报告信息
-            self.part_no = part_no
-            self.batch_no = batch_no
-            self.inspector = inspector
-
             # 复制模板文件
             import shutil
             shutil.copy2(self.template_path, self.filename)
 
             # 查找下一个可用的插入位置（跳过模板中的现有数据）
-            self._find_next_available_row()
+            # 模板结构按mtime缓存，同一模板只解析一次，不再打开复制出的工作簿
+            self._template_descriptor = get_template_descriptor(self.template_path)
+            if self._template_descriptor is not None:
+                self.next_insert_row = self._template_descriptor.next_free_row
+            else:
+                self._find_next_available_row()
 
             # 设置标志，表示需要在停止时进行格式化
             self._pending_formatting = True
+            self._from_template = True
 
             logger.info(f"从模板创建Excel文件: {self.filename}")
             logger.info(f"报告信息: 零件号={part_no}, 批次号={batch_no}, 检验员={inspector}")
@@ -152,20 +231,7 @@ class ExcelExporterEnhanced:
             worksheet = workbook.active
 
             # 设置列宽（基于内容合理设置）
-            column_widths = {
-                'A': 12,   # 标准序号
-                'B': 20,   # 标准内容
-                'C': 10,   # 下限
-                'D': 10,   # 上限
-                'E': 10,   # 测量序号
-                'F': 12,   # 测量值
-                'G': 10,   # 判断结果
-                'H': 10,   # 偏差
-                'I': 22,   # time
-                'J': 12    # 语音录入编号
-            }
-
-            for col, width in column_widths.items():
+            for col, width in REPORT_COLUMN_WIDTHS.items():
                 worksheet.column_dimensions[col].width = width
 
             workbook.save(self.filename)
@@ -244,18 +310,25 @@ class ExcelExporterEnhanced:
             empty_row = ["", "", "", "", "", "", "", "", "", ""]
 
             # 第4行：数据表头
-            data_headers = ["标准序号", "标准内容", "下限", "上限", "测量序号", "测量值", "判断结果", "偏差", "时间戳", "语音录入编号"]
+            data_headers = REPORT_HEADERS
 
-            # 创建DataFrame
-            data = [title_row, info_row, empty_row, data_headers]
-            df = pd.DataFrame(data)
+            # 直接用openpyxl写入4行表头（不再经过pandas）
+            workbook = Workbook()
+            worksheet = workbook.active
+            worksheet.title = "Sheet1"
+            for row in [title_row, info_row, empty_row, data_headers]:
+                worksheet.append([value if value != "" else None for value in row])
 
             # 保存Excel
-            df.to_excel(self.filename, index=False, header=False)
+            workbook.save(self.filename)
+            workbook.close()
 
             # 设置列宽
             self.set_column_widths()
 
+            self._from_template = False
+            self._template_descriptor = None
+
             logger.info(f"创建新Excel文件: {self.filename}")
 
         except Exception as e:
@@ -295,8 +368,16 @@ class ExcelExporterEnhanced:
 
                         result.append((voice_id, record_val, original_text))
 
-                    # 使用openpyxl直接写入数据，避免pandas的格式化开销
-                    self._write_data_direct(data)
+                    # 在内存中分配行号（不打开工作簿），标准序号和时间戳在此刻确定
+                    entries = self._allocate_rows(result)
+
+                    if self.use_background_writer:
+                        # 交给后台写入线程批量写入，ID立即返回给调用方
+                        if self.use_journal:
+                            self._ensure_journal()
+                        self._ensure_writer().submit(entries)
+                    else:
+                        self._persist_entries(entries)
 
                     # 标记需要格式化
                     self._pending_formatting = True
@@ -308,45 +389,231 @@ class ExcelExporterEnhanced:
                     logger.error(f"写入Excel失败: {e}")
                     return []
 
-    def _write_data_direct(self, data: List[Tuple[Union[float, str], str, str]]) -> None:
-        """直接写入数据，避免格式化开销 - 录音阶段写入record ID + record value + 测量标准序号 + 时间戳"""
-        workbook = load_workbook(self.filename)
-        worksheet = workbook.active
+    def _allocate_rows(self, records: List[Tuple[int, Union[float, str], str]]) -> List[Dict[str, Any]]:
+        """为记录分配行号并更新内存映射，返回待写入的记录"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # 从session_data中获取最新添加的数据（对应本次写入的数据）
-        start_index = max(0, len(self._session_data) - len(data))
-        recent_data = self._session_data[start_index:]
-
-        for i, (voice_id, val, original_text) in enumerate(recent_data):
+        entries = []
+        for voice_id, val, original_text in records:
             # 获取下一个插入位置
             row = self.get_next_insert_position()
-
-            # 录音阶段：写入 record ID + record value + 测量标准序号 + 时间戳
-            # 写入标准序号 (第1列)
-            if worksheet:
-                worksheet.cell(row=row, column=1, value=self.current_standard_id)
-
-            # 写入测量值 (第6列) - 对应"测量值"
-            if isinstance(val, str):
-                worksheet.cell(row=row, column=6, value=val)
-            else:
-                worksheet.cell(row=row, column=6, value=self._float_cell(val))
-
-            # 写入时间戳 (第9列) - 对应"时间戳"
-            worksheet.cell(row=row, column=9, value=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-
-            # 写入语音录入编号 (第10列) - voice_id
-            if worksheet:
-                worksheet.cell(row=row, column=10, value=voice_id)
+            entry: Dict[str, Any] = {
+                "voice_id": voice_id,
+                "standard_id": self.current_standard_id,
+                "value": val,
+                "timestamp": timestamp,
+                "original_text": original_text,
+                "row": row,
+            }
+            judgment = self._judge_live(self.current_standard_id, val)
+            if judgment is not None:
+                entry["judgment"] = judgment
+                self._judgments[voice_id] = judgment
+            entries.append(entry)
 
             # 更新内存映射
             self.voice_id_to_row[voice_id] = row
             self.next_insert_row = row + 1
             self.active_record_count += 1
 
+        self._session_entries.extend(entries)
+        return entries
+
+    def preload_measure_spec(self) -> bool:
+        """
+        预加载当前零件号的测量规范（会话开始时调用），之后每条记录写入时即时判断
+
+        Returns:
+            是否找到有效的测量规范
+        """
+        self._live_spec = self._resolve_measure_spec()
+        return self._live_spec[0] == "ok"
+
+    def _judge_live(self, standard_id: Any, val: Any) -> Optional[Dict[str, Any]]:
+        """按预加载的规范判断一个测量值，无规范或非数值时返回None"""
+        if self._live_spec is None or self._live_spec[0] != "ok":
+            return None
+        try:
+            spec_info = self._live_spec[1].get(int(standard_id))
+            measured_value = float(val)
+        except (ValueError, TypeError):
+            return None
+        if spec_info is None:
+            return None
+
+        judgment = self._calculate_judgment(spec_info, measured_value)
+        return {"result": judgment["result"], "deviation": judgment["deviation"]}
+
+    def get_judgment(self, voice_id: int) -> Optional[Dict[str, Any]]:
+        """
+        获取记录的实时判断结果
+
+        Returns:
+            {"result": "OK"/"NOK"/"无规范", "deviation": 偏差}；未判断时返回None
+        """
+        return self._judgments.get(voice_id)
+
+    def compute_session_spc(self) -> List[Dict[str, Any]]:
+        """
+        本次会话按标准序号的SPC统计（均值、标准差、Cp/Cpk，见utils.spc_analysis）
+
+        Returns:
+            每个标准序号一行的汇总
+        """
+        from utils.spc_analysis import analyze, arrays_from_records
+
+        spec_status, spec_data = self._live_spec or self._resolve_measure_spec()
+        standard_ids, values = arrays_from_records(self._session_entries)
+        return analyze(standard_ids, values, spec_data if spec_status == "ok" else {}).summary
+
+    def _persist_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """写入记录：启用会话日志时追加写日志（xlsx在finalize时生成），否则直接写工作簿"""
+        if self.use_journal:
+            self._ensure_journal().append(entries)
+        else:
+            self._write_data_direct(entries)
+        self._export_entries(entries)
+
+    def _export_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """把记录写入流式导出目标（单个目标失败不影响xlsx）"""
+        if not self.export_sinks:
+            return
+        if not self.export_sinks.session_open:
+            self.export_sinks.open_session({
+                "session": os.path.splitext(os.path.basename(self.filename))[0],
+                "filename": self.filename,
+                "part_no": self.part_no,
+                "batch_no": self.batch_no,
+                "inspector": self.inspector,
+            })
+        self.export_sinks.write(entries)
+
+    def _write_data_direct(self, entries: List[Dict[str, Any]]) -> None:
+        """直接写入数据，避免格式化开销 - 录音阶段写入record ID + record value + 测量标准序号 + 时间戳"""
+        workbook = load_workbook(self.filename)
+        worksheet = workbook.active
+        self._write_entries(worksheet, entries)
         workbook.save(self.filename)
         workbook.close()
 
+    def _write_entries(self, worksheet: 'Worksheet', entries: List[Dict[str, Any]]) -> None:
+        """录音阶段的4列：标准序号(第1列)、测量值(第6列)、时间戳(第9列)、语音录入编号(第10列)"""
+        for entry in entries:
+            row = entry["row"]
+            val = entry["value"]
+            worksheet.cell(row=row, column=1, value=entry["standard_id"])
+            worksheet.cell(row=row, column=6, value=val if isinstance(val, str) else self._float_cell(val))
+            worksheet.cell(row=row, column=9, value=entry["timestamp"])
+            worksheet.cell(row=row, column=10, value=entry["voice_id"])
+
+    def _ensure_writer(self) -> BackgroundBatchWriter:
+        """首次写入时启动后台写入线程"""
+        if self._writer is None:
+            self._writer = BackgroundBatchWriter(
+                self._persist_entries,
+                batch_size=self._performance_config.get("batch_size", 50),
+                flush_interval=self._performance_config.get("flush_interval_ms", 500) / 1000.0,
+                max_queue_size=self._performance_config.get("max_queue_size", 1000),
+                name="Excel写入"
+            )
+            self._writer.start()
+        return self._writer
+
+    def flush_pending_writes(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待后台写入线程写完已提交的记录并停止线程（停止录音/finalize前调用）
+        写入失败时线程继续运行并保留未写入的记录，稍后可再次调用重试
+
+        Returns:
+            是否全部写入成功
+        """
+        if self._writer is None:
+            return True
+        if not self._writer.flush(timeout):
+            logger.error("❌ 后台写入未全部完成，未写入的记录保留在写入队列中")
+            return False
+        writer, self._writer = self._writer, None
+        return writer.stop(timeout)
+
+    def _ensure_journal(self) -> SessionJournal:
+        """首次写入时打开会话日志（文件名可能在创建导出器后才由GUI确定）"""
+        if self._journal is None:
+            self._journal = SessionJournal(
+                SessionJournal.path_for(self.filename),
+                fsync_every=self._journal_config.get("fsync_every", 20),
+                fsync_interval=self._journal_config.get("fsync_interval", 1.0)
+            )
+        if not self._journal.is_open:
+            self._journal.open({
+                "filename": self.filename,
+                "part_no": self.part_no,
+                "batch_no": self.batch_no,
+                "inspector": self.inspector,
+                "from_template": self._from_template,
+                "template_path": self.template_path,
+            })
+        return self._journal
+
+    def _collect_session_records(self) -> List[Dict[str, Any]]:
+        """本次会话的全部行记录：启用会话日志时以日志为准，否则取内存记录"""
+        if self.use_journal and self._journal is not None:
+            self._journal.sync()
+            records = SessionJournal.load(self._journal.path).records
+            logger.info(f"📒 从会话日志读取 {len(records)} 条记录")
+            return records
+        return list(self._session_entries)
+
+    def _close_journal(self) -> None:
+        """xlsx生成后标记日志完成，按配置删除"""
+        if self._journal is None:
+            return
+        self._journal.mark_finalized()
+        if self._journal_config.get("keep_after_finalize", False):
+            self._journal.close()
+        else:
+            self._journal.remove()
+        self._journal = None
+
+    def restore_from_journal(self, state: JournalState) -> None:
+        """
+        从会话日志恢复导出器状态（崩溃恢复）
+
+        Args:
+            state: SessionJournal.load() 读取的日志
+        """
+        metadata = state.metadata
+        self.part_no = metadata.get("part_no", self.part_no)
+        self.batch_no = metadata.get("batch_no", self.batch_no)
+        self.inspector = metadata.get("inspector", self.inspector)
+        self.template_path = metadata.get("template_path", self.template_path)
+
+        # xlsx只在创建时写入了表头，不存在时按原方式重新创建
+        if not os.path.exists(self.filename):
+            if metadata.get("from_template"):
+                self.create_from_template(self.part_no, self.batch_no, self.inspector)
+            else:
+                self.create_new_file()
+        else:
+            # 已有的报告文件：模板报告在原工作簿上finalize，不用只写模式覆盖
+            self._from_template = bool(metadata.get("from_template"))
+
+        self._session_data.clear()
+        self._session_entries = list(state.records)
+        self._judgments = {record["voice_id"]: record["judgment"] for record in state.records if "judgment" in record}
+        self.voice_id_to_row.clear()
+        for record in state.records:
+            voice_id = record["voice_id"]
+            self._session_data.append((voice_id, record["value"], record["original_text"]))
+            self.voice_id_to_row[voice_id] = record["row"]
+            self.voice_id_counter = max(self.voice_id_counter, voice_id)
+            self.next_insert_row = max(self.next_insert_row, record["row"] + 1)
+            self.current_standard_id = record["standard_id"]
+        self.active_record_count = len(state.records)
+
+        self.use_journal = True
+        self._journal = SessionJournal(state.path)
+        self._pending_formatting = True
+
     def get_next_voice_id(self) -> int:
         """获取下一个语音录入ID"""
         self.voice_id_counter += 1
@@ -359,43 +626,55 @@ class ExcelExporterEnhanced:
         """获取下一个插入位置"""
         return self.next_insert_row
 
-    def finalize_excel_file(self) -> bool:
+    def finalize_excel_file(self, progress_callback: Optional[Callable[[str, int, int], None]] = None) -> bool:
         """
         最终格式化Excel文件
         在系统停止时调用，添加测量规范查询、判断结果和格式化
+
+        单次遍历会话记录生成报告：规范查询、判断结果、样式一次写完；
+        未使用模板时以openpyxl只写模式直接生成整个文件
+
+        Args:
+            progress_callback: 进度回调 (阶段, 已处理行数, 总行数)，阶段依次为
+                collect / spec / write / save / store（见utils.finalize_jobs.FINALIZE_PHASE_NAMES）
         """
+        # 先写完后台队列中的记录；写入失败时不生成报告，保留会话日志和待格式化状态以便重试
+        if not self.flush_pending_writes():
+            logger.error("❌ 记录未全部写入，已取消Excel最终格式化")
+            return False
+
         if not self._pending_formatting:
             logger.info("无需格式化Excel文件")
             return True
 
+        self._progress_callback = progress_callback
         try:
             logger.info("🔧 开始最终格式化Excel文件...")
 
-            workbook = load_workbook(self.filename)
-            worksheet = workbook.active
-
-            # 1. 更新表头信息
-            self._update_header_info(worksheet)
-
-            # 2. 应用测量规范和判断逻辑
-            self._apply_measure_spec_logic(worksheet)
+            self._report_progress("collect", 0, 0)
+            records = sorted(self._collect_session_records(), key=lambda record: record["row"])
+            self._report_progress("spec", 0, len(records))
+            spec_status, spec_data = self._resolve_measure_spec()
 
-            # 3. 应用格式化和样式
-            self._apply_formatting_and_styles(worksheet)
+            if self._from_template or not self._performance_config.get("write_only_finalize", True):
+                row_values = self._finalize_in_place(records, spec_status, spec_data)
+            else:
+                row_values = self._finalize_write_only(records, spec_status, spec_data)
 
-            # 4. 添加条件格式
-            self._apply_conditional_formatting(worksheet)
+            # 写入跨会话测量数据库（失败不影响报告）
+            self._report_progress("store", len(records), len(records))
+            self._store_session(records, row_values)
 
-            # 5. 添加表格边框
-            self.apply_table_borders(worksheet)
+            # xlsx已完整保存，会话日志不再需要用于恢复
+            self._close_journal()
 
-            workbook.save(self.filename)
-            workbook.close()
+            if self.export_sinks:
+                self.export_sinks.finalize()
 
             # 清除格式化标志
             self._pending_formatting = False
 
-            logger.info("✅ Excel文件格式化完成")
+            logger.info(f"✅ Excel文件格式化完成（{len(records)} 条记录）")
             return True
 
         except Exception as e:
@@ -403,19 +682,335 @@ class ExcelExporterEnhanced:
             import traceback
             traceback.print_exc()
             return False
+        finally:
+            self._progress_callback = None
 
-    def _update_header_info(self, worksheet: Worksheet) -> None:
-        """更新表头信息"""
+    def _report_progress(self, phase: str, done: int, total: int) -> None:
+        """回报finalize进度（回调出错不影响报告生成）"""
+        if self._progress_callback is None:
+            return
+        try:
+            self._progress_callback(phase, done, total)
+        except Exception as e:
+            logger.debug(f"finalize进度回调出错: {e}")
+
+    def _resolve_measure_spec(self) -> Tuple[str, Dict[int, Dict[str, Any]]]:
+        """
+        查找并加载测量规范
+
+        Returns:
+            (状态, 规范数据)，状态为 "ok" / "missing"（文件不存在）/ "empty"（加载失败或为空）
+        """
+        spec_path = self._find_measure_spec_path()
+        if spec_path is None:
+            logger.warning(f"测量规范文件不存在: {self.part_no}_MeasureSpec.xlsx")
+            return "missing", {}
+
+        logger.info(f"📊 正在加载测量规范数据: {spec_path}")
+        spec_data = self._load_measure_spec_data(spec_path)
+        if not spec_data:
+            logger.warning("测量规范数据加载失败或为空")
+            return "empty", {}
+
+        logger.info(f"✅ 成功加载测量规范数据，包含 {len(spec_data)} 个标准序号")
+        return "ok", spec_data
+
+    def _find_measure_spec_path(self) -> Optional[str]:
+        """测量规范文件路径：优先reports/templates目录，其次reports目录"""
+        spec_path = get_measure_spec_index(os.path.dirname(self.filename)).find(self.part_no)
+        if spec_path:
+            logger.debug(f"使用测量规范文件: {spec_path}")
+        return spec_path
+
+    def _spec_warning_text(self, spec_status: str) -> str:
+        """规范缺失/加载失败时写入报告的警告文字"""
+        if spec_status == "missing":
+            return (f"⚠️ 警告: 未找到零件号 {self.part_no} 的测量规范文件\n"
+                    f"期望文件: {self.part_no}_MeasureSpec.xlsx\n(历史识别数据已保留)")
+        spec_path = self._find_measure_spec_path()
+        return f"⚠️ 警告: 测量规范文件加载失败\n文件: {spec_path}\n请检查文件格式是否正确\n(历史识别数据已保留)"
+
+    def _build_row_values(self, record: Dict[str, Any], row: int, spec_status: str,
+                          spec_data: Dict[int, Dict[str, Any]]) -> List[Any]:
+        """
+        计算一行10列的最终值（录音阶段的4列 + 测量序号/规范/判断结果）
+
+        Args:
+            record: 会话记录
+            row: 实际行号
+            spec_status: 规范状态（见_resolve_measure_spec）
+            spec_data: 规范数据
+        """
+        val = record["value"]
+        values: List[Any] = [None] * REPORT_COLUMN_COUNT
+        values[0] = record["standard_id"]
+        values[5] = val if isinstance(val, str) else self._float_cell(val)
+        values[8] = record["timestamp"]
+        values[9] = record["voice_id"]
+
+        if values[0] is None or values[5] is None:
+            return values
+
+        excel_id = row - 4  # 第5行开始，所以excel_id = row - 4
+        if spec_status == "missing":
+            # 没有测量规范文件时只填写测量序号
+            try:
+                int(values[0])
+            except (ValueError, TypeError):
+                return values
+            values[4] = excel_id
+        elif spec_status == "ok":
+            try:
+                spec_info = self._find_spec_by_id(spec_data, int(values[0]))
+                measured_value = float(values[5])
+            except (ValueError, TypeError):
+                return values
+            if spec_info is None:
+                return values
+
+            # 规范未变化时直接使用写入时的判断结果
+            judgment = record.get("judgment")
+            if judgment is None or self._live_spec is None or self._live_spec[1] is not spec_data:
+                judgment = self._calculate_judgment(spec_info, measured_value)
+            values[1] = spec_info['content']
+            values[2] = spec_info['lower_limit']
+            values[3] = spec_info['upper_limit']
+            values[4] = excel_id
+            values[6] = judgment['result']
+            values[7] = judgment['deviation']
+        return values
+
+    def _register_report_styles(self, workbook: Any) -> None:
+        """在工作簿中注册共享的命名样式（沿用工作簿默认字体，不改变模板字体）"""
+        thin = Side(style='thin')
+        thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        fonts = getattr(workbook, "_fonts", None)
+        default_font = copy(fonts[0]) if fonts else Font()
+
+        existing = set(workbook.named_styles)
+        if DATA_STYLE_NAME not in existing:
+            workbook.add_named_style(NamedStyle(
+                name=DATA_STYLE_NAME, font=default_font, border=thin_border,
+                alignment=Alignment(horizontal="center", vertical="center")
+            ))
+        if GRID_STYLE_NAME not in existing:
+            workbook.add_named_style(NamedStyle(name=GRID_STYLE_NAME, font=copy(default_font), border=thin_border))
+
+    def _add_judgment_rules(self, worksheet: Any, first_row: int, last_row: int) -> None:
+        """判断结果列(G列)条件格式：OK绿色、NOK红色"""
+        green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+        red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+        judgment_range = f"G{first_row}:G{last_row}"
+        worksheet.conditional_formatting.add(
+            judgment_range, CellIsRule(operator='equal', formula=['"OK"'], fill=green_fill))
+        worksheet.conditional_formatting.add(
+            judgment_range, CellIsRule(operator='equal', formula=['"NOK"'], fill=red_fill))
+
+    def _style_warning_cell(self, cell: Any) -> None:
+        """规范警告单元格：橙色粗体、自动换行"""
+        cell.font = Font(color="FF6600", bold=True, size=10)
+        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+
+    def _save_workbook_atomic(self, workbook: Any) -> None:
+        """先保存到临时文件再替换，保存中途崩溃不会损坏原报告"""
+        temp_path = self.filename + ".tmp"
+        workbook.save(temp_path)
+        os.replace(temp_path, self.filename)
+
+    def _finalize_write_only(self, records: List[Dict[str, Any]], spec_status: str,
+                             spec_data: Dict[int, Dict[str, Any]]) -> List[List[Any]]:
+        """未使用模板：只写模式按行顺序一次生成整个报告，返回每条记录的10列值"""
+        data_start_row = 5
+        row_values = []
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Sheet1")
+        self._register_report_styles(workbook)
+
+        for col, width in REPORT_COLUMN_WIDTHS.items():
+            worksheet.column_dimensions[col].width = width
+
+        def make_row(values: List[Any], bordered: bool) -> List[Any]:
+            cells: List[Any] = []
+            for col_index, value in enumerate(values):
+                if value is None and not (bordered and col_index < REPORT_COLUMN_COUNT):
+                    cells.append(None)
+                    continue
+                cell = WriteOnlyCell(worksheet, value=value)
+                cell.style = DATA_STYLE_NAME if value is not None else GRID_STYLE_NAME
+                cells.append(cell)
+            return cells
+
+        empty_row = [None] * REPORT_COLUMN_COUNT
+
+        # 第1-4行：标题、报告信息、空行、数据表头
+        worksheet.append(make_row(["测量报告"], bordered=False))
+        worksheet.append(make_row([
+            "零件号: " + self.part_no, self.part_no,
+            "批次号: " + self.batch_no, self.batch_no,
+            "检验员: " + self.inspector, self.inspector,
+            None, None, None, None
+        ], bordered=True))
+        worksheet.append(make_row(empty_row, bordered=True))
+        worksheet.append(make_row(REPORT_HEADERS, bordered=True))
+
+        # 数据行：按行号顺序一次写完（行号之间的空行也画网格）
+        has_warning = spec_status != "ok"
+        current_row = data_start_row
+        self._report_progress("write", 0, len(records))
+        for index, record in enumerate(records, start=1):
+            if index % FINALIZE_PROGRESS_INTERVAL == 0:
+                self._report_progress("write", index, len(records))
+            row = record["row"]
+            while current_row < row:
+                worksheet.append(make_row(empty_row, bordered=True))
+                current_row += 1
+            values = self._build_row_values(record, row, spec_status, spec_data)
+            row_values.append(values)
+            cells = make_row(values, bordered=True)
+            if has_warning and row == data_start_row:
+                cells[1] = self._make_warning_cell(worksheet, spec_status)
+            worksheet.append(cells)
+            current_row = row + 1
+
+        if has_warning and current_row == data_start_row:
+            # 没有任何记录时仍显示警告
+            cells = make_row(empty_row, bordered=True)
+            cells[1] = self._make_warning_cell(worksheet, spec_status)
+            worksheet.append(cells)
+            current_row += 1
+
+        if has_warning:
+            worksheet.merged_cells.add(f"B{data_start_row}:D{data_start_row}")
+        self._add_judgment_rules(worksheet, data_start_row, max(data_start_row, current_row - 1))
+
+        self._report_progress("save", len(records), len(records))
+        self._save_workbook_atomic(workbook)
+        logger.info(f"📝 只写模式生成报告: {len(records)} 条记录")
+        return row_values
+
+    def _make_warning_cell(self, worksheet: Any, spec_status: str) -> Any:
+        """只写模式下的规范警告单元格"""
+        cell = WriteOnlyCell(worksheet, value=self._spec_warning_text(spec_status))
+        cell.style = DATA_STYLE_NAME
+        self._style_warning_cell(cell)
+        return cell
+
+    def _finalize_in_place(self, records: List[Dict[str, Any]], spec_status: str,
+                           spec_data: Dict[int, Dict[str, Any]]) -> List[List[Any]]:
+        """使用模板：加载工作簿，单次遍历写入数据、规范、判断结果和样式，返回每条记录的10列值"""
+        workbook = load_workbook(self.filename)
+        worksheet = workbook.active
+        self._register_report_styles(workbook)
+
+        # 表头信息（模板缺少标题行时会在顶部插入一行，数据整体下移；模板描述已记录是否有标题行）
+        descriptor = self._template_descriptor
+        has_title = descriptor.has_title if descriptor is not None else None
+        offset = 1 if self._update_header_info(worksheet, has_title) else 0
+        if descriptor is not None and descriptor.data_start_row is not None:
+            data_start_row = descriptor.data_start_row + offset
+        else:
+            data_start_row = self._find_data_start_row(worksheet) or 5
+
+        thin = Side(style='thin')
+        thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        center_alignment = Alignment(horizontal="center", vertical="center")
+
+        # 会话记录：一次写入全部10列并套用命名样式
+        session_rows = set()
+        row_values = []
+        self._report_progress("write", 0, len(records))
+        for index, record in enumerate(records, start=1):
+            if index % FINALIZE_PROGRESS_INTERVAL == 0:
+                self._report_progress("write", index, len(records))
+            row = record["row"] + offset
+            session_rows.add(row)
+            values = self._build_row_values(record, row, spec_status, spec_data)
+            row_values.append(values)
+            for col_index, value in enumerate(values, start=1):
+                cell = worksheet.cell(row=row, column=col_index)
+                if value is not None:
+                    cell.value = value
+                cell.style = DATA_STYLE_NAME if cell.value is not None else GRID_STYLE_NAME
+
+        # 模板自带的行（表头、示例数据）：保留原字体，只加边框和居中
+        max_row = worksheet.max_row
+        max_column = max(worksheet.max_column, REPORT_COLUMN_COUNT)
+        for row_cells in worksheet.iter_rows(min_row=1, max_row=max_row, max_col=max_column):
+            if row_cells[0].row in session_rows:
+                continue
+            for cell in row_cells:
+                if cell.value is not None:
+                    cell.border = thin_border
+                    cell.alignment = center_alignment
+                elif cell.row >= 2 and cell.column <= REPORT_COLUMN_COUNT:
+                    cell.border = thin_border
+
+        if spec_status != "ok":
+            worksheet.merge_cells(start_row=data_start_row, start_column=2, end_row=data_start_row, end_column=4)
+            warning_cell = worksheet.cell(row=data_start_row, column=2)
+            warning_cell.value = self._spec_warning_text(spec_status)
+            warning_cell.border = thin_border
+            self._style_warning_cell(warning_cell)
+
+        self._add_judgment_rules(worksheet, data_start_row, max(data_start_row, worksheet.max_row))
+
+        self._report_progress("save", len(records), len(records))
+        self._save_workbook_atomic(workbook)
+        workbook.close()
+        return row_values
+
+    def _store_session(self, records: List[Dict[str, Any]], row_values: List[List[Any]]) -> None:
+        """把本次会话（含最终判断结果）upsert到跨会话测量数据库"""
+        store_config = config.get_excel_store_config()
+        if not store_config.get("enabled", True):
+            return
+        try:
+            from utils.export_sinks import flatten_record
+            from utils.measurement_store import get_measurement_store, resolve_store_path
+
+            session = {
+                "session": os.path.splitext(os.path.basename(self.filename))[0],
+                "part_no": self.part_no,
+                "batch_no": self.batch_no,
+                "inspector": self.inspector,
+                "report_path": os.path.abspath(self.filename),
+            }
+            rows = []
+            for record, values in zip(records, row_values):
+                judgment = {"result": values[6], "deviation": values[7]} if values[6] is not None else None
+                rows.append(flatten_record(session, dict(record, judgment=judgment)))
+
+            store = get_measurement_store(store_config.get("path") or resolve_store_path(os.path.dirname(self.filename)))
+            store.store_session(session, rows)
+            logger.debug(f"🗄️ 已写入测量数据库: {store.path} ({len(rows)} 条)")
+        except Exception as e:
+            logger.warning(f"⚠️ 写入测量数据库失败: {e}")
+
+    def _update_header_info(self, worksheet: 'Worksheet', has_title: Optional[bool] = None) -> bool:
+        """
+        更新表头信息
+
+        Args:
+            worksheet: 工作表
+            has_title: 第1行是否已是标题（来自模板描述）；None时读取A1判断
+
+        Returns:
+            是否在顶部插入了标题行（插入后原有数据整体下移一行）
+        """
+        inserted = False
         try:
             # 不删除模板的第2行，保持模板原样
             # 直接填写报告信息到模板的第2行
 
             # 检查是否已有第1行（标题行）
-            cell_a1 = worksheet.cell(row=1, column=1).value
-            if not cell_a1 or str(cell_a1).strip() != "测量报告":
+            if has_title is None:
+                cell_a1 = worksheet.cell(row=1, column=1).value
+                has_title = bool(cell_a1) and str(cell_a1).strip() == "测量报告"
+            if not has_title:
                 # 在第1行插入标题
                 worksheet.insert_rows(1)
                 worksheet.cell(row=1, column=1, value=f"测量报告")
+                inserted = True
 
             # 填写报告信息到模板的第2行（保持模板格式不变）
             if worksheet.max_row >= 2:
@@ -434,8 +1029,9 @@ class ExcelExporterEnhanced:
 
         except Exception as e:
             logger.error(f"更新表头信息失败: {e}")
+        return inserted
 
-    def _apply_measure_spec_logic(self, worksheet: Worksheet) -> None:
+    def _apply_measure_spec_logic(self, worksheet: 'Worksheet') -> None:
         """应用测量规范查询和判断逻辑"""
         try:
             logger.info(f"🔍 开始应用测量规范逻辑，零件号: {self.part_no}")
@@ -450,32 +1046,12 @@ class ExcelExporterEnhanced:
 
             spec_filename = f"{self.part_no}_MeasureSpec.xlsx"
             # 首先在reports/templates目录查找，然后在reports目录查找
-            reports_dir = os.path.dirname(self.filename)
-            template_dir = os.path.join(reports_dir, "templates")
-            spec_path_template = os.path.join(template_dir, spec_filename)
-            spec_path_reports = os.path.join(reports_dir, spec_filename)
-
-            logger.debug(f"查找测量规范文件:")
-            logger.debug(f"  零件号: {self.part_no}")
-            logger.debug(f"  模板目录: {template_dir}")
-            logger.debug(f"  报告目录: {reports_dir}")
-            logger.debug(f"  模板路径: {spec_path_template}")
-            logger.debug(f"  报告路径: {spec_path_reports}")
-            logger.debug(f"  模板文件存在: {os.path.exists(spec_path_template)}")
-            logger.debug(f"  报告文件存在: {os.path.exists(spec_path_reports)}")
-
-            # 优先使用templates目录中的文件
-            if os.path.exists(spec_path_template):
-                spec_path = spec_path_template
-                logger.debug(f"使用templates目录中的测量规范文件: {spec_path}")
-            elif os.path.exists(spec_path_reports):
-                spec_path = spec_path_reports
-                logger.debug(f"使用reports目录中的测量规范文件: {spec_path}")
-            else:
+            spec_path = self._find_measure_spec_path()
+            if spec_path is None:
                 # 测量规范文件不存在，在Excel中显示警告
                 warning_message = f"⚠️ 警告: 未找到零件号 {self.part_no} 的测量规范文件"
                 expected_filename = spec_filename
-                logger.warning(f"测量规范文件不存在: {spec_path_template} 或 {spec_path_reports}")
+                logger.warning(f"测量规范文件不存在: {spec_filename}")
 
                 # 在Excel文件中写入警告信息，但不删除现有数据
                 # 只在第一行显示警告，保留所有历史识别数据
@@ -560,7 +1136,7 @@ class ExcelExporterEnhanced:
             import traceback
             traceback.print_exc()
 
-    def _fill_measure_sequence_only(self, worksheet: Worksheet, data_start_row: int) -> None:
+    def _fill_measure_sequence_only(self, worksheet: 'Worksheet', data_start_row: int) -> None:
         """仅填写测量序号，不应用测量规范"""
         try:
             logger.info("🔢 开始填写测量序号")
@@ -593,39 +1169,12 @@ class ExcelExporterEnhanced:
             traceback.print_exc()
 
     def _load_measure_spec_data(self, spec_path: str) -> Dict[int, Dict[str, Any]]:
-        """加载测量规范数据"""
-        try:
-            workbook = load_workbook(spec_path)
-            worksheet = workbook.active
-
-            spec_data = {}
-            # 从第2行开始读取数据（跳过标题行）
-            for row in range(2, worksheet.max_row + 1):
-                standard_id_cell = worksheet.cell(row=row, column=1).value
-                if standard_id_cell is None:
-                    continue
-
-                try:
-                    standard_id = int(standard_id_cell)
-                except (ValueError, TypeError):
-                    continue
-
-                content = worksheet.cell(row=row, column=2).value or ""
-                lower_limit = worksheet.cell(row=row, column=3).value
-                upper_limit = worksheet.cell(row=row, column=4).value
-
-                spec_data[standard_id] = {
-                    'content': content,
-                    'lower_limit': float(lower_limit) if lower_limit is not None else None,
-                    'upper_limit': float(upper_limit) if upper_limit is not None else None
-                }
-
-            workbook.close()
-            return spec_data
+        """
+        加载测量规范数据（经规范索引缓存，文件未变化时不重新解析）
 
-        except Exception as e:
-            logger.error(f"加载测量规范数据失败: {e}")
-            return {}
+        返回的字典由索引共享，调用方不要修改
+        """
+        return get_measure_spec_index(os.path.dirname(self.filename)).load(spec_path)
 
     def _find_spec_by_id(self, spec_data: Dict[int, Dict[str, Any]], standard_id: int) -> Optional[Dict[str, Any]]:
         """根据标准序号查找测量规范"""
@@ -682,7 +1231,7 @@ class ExcelExporterEnhanced:
             'deviation': round(deviation, 2) if deviation is not None else None
         }
 
-    def _apply_formatting_and_styles(self, worksheet: Worksheet) -> None:
+    def _apply_formatting_and_styles(self, worksheet: 'Worksheet') -> None:
         """应用格式化和样式"""
         try:
             # 不修改列宽，保持模板原样
@@ -710,7 +1259,7 @@ class ExcelExporterEnhanced:
         except Exception as e:
             logger.error(f"应用格式化和样式失败: {e}")
 
-    def _apply_conditional_formatting(self, worksheet: Worksheet) -> None:
+    def _apply_conditional_formatting(self, worksheet: 'Worksheet') -> None:
         """应用条件格式"""
         try:
             data_start_row = self._find_data_start_row(worksheet)
@@ -733,7 +1282,7 @@ class ExcelExporterEnhanced:
         except Exception as e:
             logger.error(f"应用条件格式失败: {e}")
 
-    def _find_data_start_row(self, worksheet: Worksheet) -> Optional[int]:
+    def _find_data_start_row(self, worksheet: 'Worksheet') -> Optional[int]:
         """查找数据开始行"""
         for row in range(1, worksheet.max_row + 1):
             # 查找包含"标准序号"的行
@@ -750,6 +1299,42 @@ class ExcelExporterEnhanced:
     def clear_session_data(self) -> None:
         """清空会话数据"""
         self._session_data.clear()
+        self._session_entries.clear()
+        self._judgments.clear()
+
+def recover_unfinished_sessions(directory: str, exclude: Optional[List[str]] = None) -> List[str]:
+    """
+    从未完成的会话日志恢复xlsx（程序崩溃或异常退出后启动时调用）
+
+    Args:
+        directory: 报告目录
+        exclude: 跳过的报告文件（正在后台生成的报告，其日志尚未完成）
+
+    Returns:
+        恢复成功的Excel文件路径列表
+    """
+    recovered: List[str] = []
+    skipped = {os.path.abspath(path) for path in exclude or []}
+    for journal_path in SessionJournal.find_unfinished(directory):
+        if os.path.abspath(journal_path[:-len(JOURNAL_SUFFIX)]) in skipped:
+            continue
+        try:
+            state = SessionJournal.load(journal_path)
+            if not state.records:
+                # 会话没有任何记录，只清理日志
+                SessionJournal(journal_path).remove()
+                continue
+
+            filename = state.metadata.get("filename") or journal_path[:-len(JOURNAL_SUFFIX)]
+            exporter = ExcelExporterEnhanced(filename=filename)
+            exporter.restore_from_journal(state)
+
+            logger.info(f"♻️ 从会话日志恢复: {os.path.basename(filename)} ({len(state.records)} 条记录)")
+            if exporter.finalize_excel_file():
+                recovered.append(filename)
+        except Exception as e:
+            logger.error(f"恢复会话日志失败: {journal_path}: {e}")
+    return recovered
 
 # 使用示例
 if __name__ == "__main__":
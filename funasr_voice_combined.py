@@ -32,11 +32,19 @@ import pyaudio
 import threading
 from contextlib import contextmanager
 from typing import List, Dict, Optional, Callable, Union, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from collections import deque
 
 # 导入性能监控
-from utils.performance_monitor import performance_monitor, PerformanceStep
+from utils.performance_monitor import performance_monitor, PerformanceStep, FastStep
+
+# 语音段关联ID（各环节打点，统计端到端延迟）
+from utils.production_latency_logger import begin_utterance, mark_utterance, finish_utterance
+from utils.trace_export import pipeline_tracer
+
+# 每个音频块都会经过的步骤（静态步骤ID，记录时不加锁）
+_STEP_AUDIO_INPUT = FastStep("音频输入")
+_STEP_AUDIO_PROCESS = FastStep("音频处理")
 
 # 导入Debug性能追踪模块
 try:
@@ -236,6 +244,9 @@ class RecognitionResult:
     duration: float              # 识别时长
     timestamp: float             # 时间戳
     audio_buffer: List[np.ndarray]  # 音频缓冲区
+    segments: List[str] = field(default_factory=list)  # 多值模式下按短停顿切分的子片段文本
+    utterance_id: int = 0        # 语音段关联ID（speech_start时分配，0表示无）
+    asr_time: float = 0.0        # 最终识别耗时（秒，含FFmpeg预处理）
 
 @dataclass
 class VADConfig:
@@ -338,11 +349,14 @@ class FunASRVoiceRecognizer:
         self._is_running = False
         self._stop_event = threading.Event()
         self._speech_detected = False
+        self._utterance_id = 0  # 当前语音段关联ID
 
         # 音频处理
         self._audio_buffer: deque[np.ndarray] = deque(maxlen=sample_rate * 5)  # 5秒缓冲
         self._speech_buffer: List[np.ndarray] = []
         self._funasr_cache: Dict[str, Any] = {}
+        self._pause_boundaries: List[int] = []  # 语音缓冲区内的短停顿位置（采样点）
+        self._last_partial_time = 0.0  # 上一次快速通道部分识别的时间
 
         # 识别结果
         self._current_text = ""
@@ -355,7 +369,11 @@ class FunASRVoiceRecognizer:
             'successful_recognitions': 0,
             'total_audio_time': 0.0,
             'total_processing_time': 0.0,
-            'average_confidence': 0.0
+            'average_confidence': 0.0,
+            # 音频采集计数（采集线程单写，指标导出时直接读取，不加锁）
+            'audio_chunks': 0,
+            'audio_overflows': 0,
+            'audio_read_errors': 0
         }
 
         # 回调函数
@@ -390,6 +408,18 @@ class FunASRVoiceRecognizer:
             self._decimal_optimization_config = config.get_decimal_optimization_config()
             self._extended_capture_time = config.get_extended_capture_time()
 
+            # 加载多值语句停顿切分配置
+            multi_value_config = config.get_multi_value_config()
+            self._pause_split_enabled = bool(multi_value_config.get("enabled", False)
+                                             and multi_value_config.get("pause_split", True))
+            self._pause_split_duration = float(multi_value_config.get("pause_split_duration", 0.25))
+
+            # 加载部分结果命令快速通道配置（需要更早、更频繁的流式识别）
+            partial_command_config = config.get_partial_command_config()
+            self._partial_fast_path = bool(partial_command_config.get("enabled", False))
+            self._partial_trigger_seconds = float(partial_command_config.get("partial_trigger_seconds", 0.3))
+            self._partial_interval = float(partial_command_config.get("partial_interval", 0.2))
+
             logger.info(f"🔧 FFmpeg预处理: {'启用' if self._ffmpeg_enabled else '禁用'}")
             if self._ffmpeg_enabled:
                 logger.info(f"   滤镜链: {self._ffmpeg_filter_chain}")
@@ -419,6 +449,11 @@ class FunASRVoiceRecognizer:
                 "confidence_threshold": 0.5
             }
             self._extended_capture_time = 1.0
+            self._pause_split_enabled = False
+            self._pause_split_duration = 0.25
+            self._partial_fast_path = False
+            self._partial_trigger_seconds = 0.3
+            self._partial_interval = 0.2
             return VADConfig()
 
     def _load_vad_type(self) -> str:
@@ -695,6 +730,8 @@ class FunASRVoiceRecognizer:
         is_speech = False
         vad_confidence = 0.0
         event_type = None
+        # 每个音频块都会调用：日志级别检查（Logger内部有缓存）一次，关闭时不构造任何消息
+        debug = logger.isEnabledFor(logging.DEBUG)
 
         # 根据配置选择VAD类型
         if self._vad_type == "ten":
@@ -712,8 +749,9 @@ class FunASRVoiceRecognizer:
                         vad_confidence, vad_flag = ten_vad_model.process(vad_int16)
                         is_speech = (vad_flag == 1)
 
-                        logger.debug(f"TEN VAD: 置信度={vad_confidence:.3f}, 标志={vad_flag}, 结果={is_speech}")
-                    else:
+                        if debug:
+                            logger.debug("TEN VAD: 置信度=%.3f, 标志=%s, 结果=%s", vad_confidence, vad_flag, is_speech)
+                    elif debug:
                         logger.debug("音频数据不足256个采样点，跳过TEN VAD检测")
 
                 except Exception as ten_vad_error:
@@ -723,19 +761,24 @@ class FunASRVoiceRecognizer:
                     energy = np.sqrt(np.mean(audio_data ** 2))
                     is_speech = energy > self.vad_config.energy_threshold
                     vad_confidence = float(energy)
-                    logger.debug(f"回退到能量阈值VAD: 能量={energy:.6f}, 阈值={self.vad_config.energy_threshold}, 结果={is_speech}")
+                    if debug:
+                        logger.debug("回退到能量阈值VAD: 能量=%.6f, 阈值=%s, 结果=%s",
+                                     energy, self.vad_config.energy_threshold, is_speech)
             else:
                 # 如果TEN VAD不可用，回退到传统能量阈值VAD
                 energy = np.sqrt(np.mean(audio_data ** 2))
                 is_speech = energy > self.vad_config.energy_threshold
                 vad_confidence = float(energy)
-                logger.debug(f"回退到能量阈值VAD: 能量={energy:.6f}, 阈值={self.vad_config.energy_threshold}, 结果={is_speech}")
+                if debug:
+                    logger.debug("回退到能量阈值VAD: 能量=%.6f, 阈值=%s, 结果=%s",
+                                 energy, self.vad_config.energy_threshold, is_speech)
         else:
             # 使用传统的能量阈值VAD
             energy = np.sqrt(np.mean(audio_data ** 2))
             is_speech = energy > self.vad_config.energy_threshold
             vad_confidence = float(energy)
-            logger.debug(f"能量阈值VAD: 能量={energy:.6f}, 阈值={self.vad_config.energy_threshold}, 结果={is_speech}")
+            if debug:
+                logger.debug("能量阈值VAD: 能量=%.6f, 阈值=%s, 结果=%s", energy, self.vad_config.energy_threshold, is_speech)
 
         # 检测语音开始和结束
         if is_speech:
@@ -743,7 +786,10 @@ class FunASRVoiceRecognizer:
                 event_type = "speech_start"
                 self._speech_detected = True
                 self._speech_start_time = current_time
-                logger.debug(f"🎤 语音开始 ({'TEN VAD' if self._vad_type == 'ten' and self._ten_vad_available else '能量阈值'}: 置信度={vad_confidence:.3f}, 标志={is_speech})")
+                if debug:
+                    logger.debug("🎤 语音开始 (%s: 置信度=%.3f, 标志=%s)",
+                                 'TEN VAD' if self._vad_type == 'ten' and self._ten_vad_available else '能量阈值',
+                                 vad_confidence, is_speech)
         else:
             if hasattr(self, '_speech_detected') and self._speech_detected:
                 silence_duration = current_time - getattr(self, '_last_speech_time', current_time)
@@ -894,6 +940,12 @@ class FunASRVoiceRecognizer:
 
         # VAD检测
         is_speech, vad_event = self._detect_vad(audio_data, current_time)
+        if vad_event == "speech_start":
+            self._utterance_id = begin_utterance()
+            pipeline_tracer.instant("speech_start", "vad", utt=self._utterance_id)
+        elif vad_event == "speech_end":
+            mark_utterance(self._utterance_id, "speech_end")
+            pipeline_tracer.instant("speech_end", "vad", utt=self._utterance_id)
 
         # 计算音频能量
         audio_energy = np.sqrt(np.mean(audio_data ** 2))
@@ -927,6 +979,12 @@ class FunASRVoiceRecognizer:
             # 定期进行流式识别
             if len(self._speech_buffer) >= self.sample_rate * self._extended_capture_time:  # 使用配置的extended_capture_time
                 self._perform_streaming_recognition()
+            elif (self._partial_fast_path and
+                  len(self._speech_buffer) >= self.sample_rate * self._partial_trigger_seconds and
+                  current_time - self._last_partial_time >= self._partial_interval):
+                # 命令快速通道：短语音也按固定间隔产生部分结果
+                self._last_partial_time = current_time
+                self._perform_streaming_recognition()
         else:
             # 如果静音时间足够长且有语音缓冲区，进行最终识别
             if (len(self._speech_buffer) > 0 and
@@ -940,6 +998,64 @@ class FunASRVoiceRecognizer:
                         debug_tracker.record_asr_start(len(self._speech_buffer))  # type: ignore[union-attr]
 
                     self._perform_final_recognition()
+            elif (self._pause_split_enabled and
+                  len(self._speech_buffer) > 0 and
+                  hasattr(self, '_last_speech_time') and
+                  current_time - self._last_speech_time >= self._pause_split_duration):
+                # 多值模式：读数之间的短停顿，记录子片段边界
+                self._mark_pause_boundary()
+
+    def _mark_pause_boundary(self):
+        """在当前语音缓冲区末尾记录一个短停顿边界（同一停顿只记录一次）"""
+        boundary = len(self._speech_buffer)
+        last_boundary = self._pause_boundaries[-1] if self._pause_boundaries else 0
+        min_samples = int(self.sample_rate * self.vad_config.min_speech_duration)
+
+        if boundary - last_boundary >= min_samples:
+            self._pause_boundaries.append(boundary)
+            logger.debug(f"⏸️ 检测到读数停顿，子片段边界: {boundary / self.sample_rate:.2f}s")
+
+    def _recognize_sub_segments(self, audio_array: np.ndarray) -> List[str]:
+        """
+        按短停顿边界分别识别各子片段
+
+        Args:
+            audio_array: 完整语音段（可能经过FFmpeg预处理）
+
+        Returns:
+            各子片段的识别文本（已去除空结果）
+        """
+        # FFmpeg预处理可能轻微改变长度，按比例换算边界
+        scale = len(audio_array) / max(1, len(self._speech_buffer))
+        min_samples = int(self.sample_rate * self.vad_config.min_speech_duration)
+
+        cut_points = [int(b * scale) for b in self._pause_boundaries]
+        # 尾部片段过短时并入前一片段
+        while cut_points and len(audio_array) - cut_points[-1] < min_samples:
+            cut_points.pop()
+
+        # 调用方已确认模型加载
+        model = self._model
+        assert model is not None, "子片段识别前模型应已加载"
+
+        texts: List[str] = []
+        start = 0
+        for end in cut_points + [len(audio_array)]:
+            result = model.generate(
+                input=audio_array[start:end],
+                cache={},
+                is_final=True,
+                chunk_size=self.funasr_config.chunk_size,
+                encoder_chunk_look_back=self.funasr_config.encoder_chunk_look_back,
+                decoder_chunk_look_back=self.funasr_config.decoder_chunk_look_back
+            )
+            if result and isinstance(result, list) and len(result) > 0:
+                segment_text = result[0].get("text", "").strip()
+                if segment_text:
+                    texts.append(segment_text)
+            start = end
+
+        return texts
 
     def _perform_streaming_recognition(self):
         """执行流式识别"""
@@ -950,14 +1066,15 @@ class FunASRVoiceRecognizer:
             # 取最近的音频数据进行识别
             audio_array = np.array(list(self._speech_buffer))
 
-            result = self._model.generate(
-                input=audio_array,
-                cache=self._funasr_cache,
-                is_final=False,
-                chunk_size=self.funasr_config.chunk_size,
-                encoder_chunk_look_back=self.funasr_config.encoder_chunk_look_back,
-                decoder_chunk_look_back=self.funasr_config.decoder_chunk_look_back
-            )
+            with pipeline_tracer.span("流式识别", "asr", utt=self._utterance_id, samples=len(audio_array)):
+                result = self._model.generate(
+                    input=audio_array,
+                    cache=self._funasr_cache,
+                    is_final=False,
+                    chunk_size=self.funasr_config.chunk_size,
+                    encoder_chunk_look_back=self.funasr_config.encoder_chunk_look_back,
+                    decoder_chunk_look_back=self.funasr_config.decoder_chunk_look_back
+                )
 
             if result and isinstance(result, list) and len(result) > 0:
                 text = result[0].get("text", "").strip()
@@ -971,6 +1088,9 @@ class FunASRVoiceRecognizer:
 
                     if not self.silent_mode:
                         logger.info(f"🗣️ 流式识别: '{text}'")
+                elif text and self._partial_fast_path and self._on_partial_result:
+                    # 命令快速通道需要重复的部分结果来判断稳定性
+                    self._on_partial_result(text)
 
         except Exception as e:
             logger.debug(f"流式识别异常: {e}")
@@ -980,7 +1100,12 @@ class FunASRVoiceRecognizer:
         if not self._model or not self._model_loaded or not self._speech_buffer:
             return
 
+        utterance_id, self._utterance_id = self._utterance_id, 0
+        delivered = False
+        # 本线程后续的耗时段（识别、回调、文本处理、Excel写入）都带上该语音段ID
+        pipeline_tracer.set_utterance(utterance_id)
         try:
+            mark_utterance(utterance_id, "asr_start")
             start_time = time.time()
 
             audio_array = np.array(list(self._speech_buffer))
@@ -995,16 +1120,24 @@ class FunASRVoiceRecognizer:
                     # 使用完整的语音段进行预处理，而不是每个chunk
                     audio_array = self._apply_ffmpeg_preprocessing(audio_array, "final_segment")
 
-            result = self._model.generate(
-                input=audio_array,
-                cache=self._funasr_cache,
-                is_final=True,
-                chunk_size=self.funasr_config.chunk_size,
-                encoder_chunk_look_back=self.funasr_config.encoder_chunk_look_back,
-                decoder_chunk_look_back=self.funasr_config.decoder_chunk_look_back
-            )
+            segments: List[str] = []
+            with pipeline_tracer.span("最终识别", "asr", samples=len(audio_array)):
+                if self._pause_split_enabled and self._pause_boundaries:
+                    # 多值模式：按读数间停顿分别识别，子片段文本用于逐个提取测量值
+                    segments = self._recognize_sub_segments(audio_array)
+                    result = [{"text": " ".join(segments)}]
+                else:
+                    result = self._model.generate(
+                        input=audio_array,
+                        cache=self._funasr_cache,
+                        is_final=True,
+                        chunk_size=self.funasr_config.chunk_size,
+                        encoder_chunk_look_back=self.funasr_config.encoder_chunk_look_back,
+                        decoder_chunk_look_back=self.funasr_config.decoder_chunk_look_back
+                    )
 
             processing_time = time.time() - start_time
+            mark_utterance(utterance_id, "asr_end")
 
             if result and isinstance(result, list) and len(result) > 0:
                 text = result[0].get("text", "").strip()
@@ -1016,16 +1149,21 @@ class FunASRVoiceRecognizer:
                         confidence=0.9,  # FunASR暂不提供置信度，使用默认值
                         duration=len(self._speech_buffer) / self.sample_rate,
                         timestamp=time.time(),
-                        audio_buffer=self._speech_buffer.copy()
+                        audio_buffer=self._speech_buffer.copy(),
+                        segments=segments,
+                        utterance_id=utterance_id,
+                        asr_time=processing_time
                     )
 
                     self._final_results.append(recognition_result)
                     self.stats['total_recognitions'] += 1
                     self.stats['successful_recognitions'] += 1
                     self.stats['total_processing_time'] += processing_time
+                    self.stats['total_audio_time'] += recognition_result.duration
 
-                    # 触发最终结果回调
+                    # 触发最终结果回调（语音段由回调方处理完后结束）
                     if self._on_final_result:
+                        delivered = True
                         self._on_final_result(recognition_result)
 
                     if not self.silent_mode:
@@ -1034,9 +1172,13 @@ class FunASRVoiceRecognizer:
         except Exception as e:
             logger.error(f"最终识别异常: {e}")
         finally:
+            pipeline_tracer.set_utterance(0)
+            if not delivered:
+                finish_utterance(utterance_id, "empty")
             # 清空语音缓冲区
             self._speech_buffer = []
             self._current_text = ""
+            self._pause_boundaries = []
 
     def get_status(self) -> Dict[str, Any]:
         """获取识别器状态"""
@@ -1080,8 +1222,10 @@ class FunASRVoiceRecognizer:
         self._stop_event.clear()
         self._audio_buffer.clear()
         self._speech_buffer = []
+        self._pause_boundaries = []
         self._current_text = ""
         self._partial_results = []
+        self._utterance_id = 0
 
         start_time = time.time()
         current_time = 0.0  # 初始化current_time变量
@@ -1095,17 +1239,12 @@ class FunASRVoiceRecognizer:
                         current_time = time.time() - start_time
 
                         # 读取音频数据
-                        with PerformanceStep("音频输入", {
-                            'chunk_size': self.chunk_size,
-                            'current_time': current_time
-                        }):
+                        with _STEP_AUDIO_INPUT:
                             data = stream.read(self.chunk_size, exception_on_overflow=False)
+                        self.stats['audio_chunks'] += 1
 
                         # 转换为numpy数组
-                        with PerformanceStep("音频处理", {
-                            'data_length': len(data),
-                            'current_time': current_time
-                        }):
+                        with _STEP_AUDIO_PROCESS:
                             audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
 
                         # 处理音频
@@ -1128,12 +1267,14 @@ class FunASRVoiceRecognizer:
                         logger.error(f"🎤 音频流异常: {audio_error}")
                         # 检查是否是设备断开连接
                         if "Input overflowed" in str(audio_error):
+                            self.stats['audio_overflows'] += 1
                             logger.warning("⚠️ 音频缓冲区溢出，继续处理...")
                             continue
                         elif "No such device" in str(audio_error) or "Device unavailable" in str(audio_error):
                             logger.error("❌ 音频设备断开连接或不可用")
                             raise RuntimeError("音频设备断开连接")
                         else:
+                            self.stats['audio_read_errors'] += 1
                             logger.warning(f"⚠️ 音频流错误，尝试继续: {audio_error}")
                             continue
 
@@ -1217,6 +1358,7 @@ class FunASRVoiceRecognizer:
                     while self._is_running and not self._stop_event.is_set():
                         try:
                             data = stream.read(self.chunk_size, exception_on_overflow=False)
+                            self.stats['audio_chunks'] += 1
                             current_time = time.time()
 
                             audio_data = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
@@ -1232,9 +1374,11 @@ class FunASRVoiceRecognizer:
                                 self._is_running = False
                                 break
                             elif "Input overflowed" in str(audio_error):
+                                self.stats['audio_overflows'] += 1
                                 logger.warning("⚠️ 音频缓冲区溢出，继续处理...")
                                 continue
                             else:
+                                self.stats['audio_read_errors'] += 1
                                 logger.warning(f"⚠️ 音频流错误，尝试继续: {audio_error}")
                                 continue
 
@@ -1266,6 +1410,46 @@ class FunASRVoiceRecognizer:
         if self._speech_buffer:
             self._perform_final_recognition()
 
+    def replay_audio(self, audio: np.ndarray, use_vad: bool = True,
+                     realtime: bool = False) -> List[RecognitionResult]:
+        """
+        离线重放一段音频（如 debug/slow/ 下的慢语音段现场），不打开麦克风
+
+        Args:
+            audio: float32单声道音频（[-1, 1]，采样率与识别器一致）
+            use_vad: True时按采集块大小逐块经过VAD、流式识别和最终识别；False时整段直接做最终识别
+            realtime: 逐块重放时按实际时长等待（复现采集节奏）
+
+        Returns:
+            本次重放产生的识别结果
+        """
+        if not self._is_initialized:
+            if not self.initialize():
+                raise RuntimeError("初始化失败")
+
+        self._stop_event.clear()
+        self._speech_buffer = []
+        self._pause_boundaries = []
+        self._current_text = ""
+        self._partial_results = []
+        self._utterance_id = 0
+        first_result = len(self._final_results)
+
+        audio = np.asarray(audio, dtype=np.float32)
+        if use_vad:
+            chunk_duration = self.chunk_size / self.sample_rate
+            for index, start in enumerate(range(0, len(audio), self.chunk_size)):
+                self._process_audio_chunk(audio[start:start + self.chunk_size], index * chunk_duration)
+                if realtime:
+                    time.sleep(chunk_duration)
+        else:
+            self._speech_buffer = list(audio)
+
+        # VAD未判定语音结束时（音频末尾无足够静音）直接结束该语音段
+        if self._speech_buffer:
+            self._perform_final_recognition()
+        return self._final_results[first_result:]
+
     def configure_vad(self, **kwargs):
         """配置VAD参数"""
         for key, value in kwargs.items():
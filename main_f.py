@@ -48,10 +48,19 @@ warnings.filterwarnings('ignore')
 # 导入FunASR相关模块
 from funasr_voice_combined import FunASRVoiceRecognizer
 #from funasr_voice_module import FunASRVoiceRecognizer #能量阈值VAD
-from text_processor import TextProcessor, VoiceCommandProcessor
+from text_processor import TextProcessor, VoiceCommandProcessor, PartialCommandTracker
 
 # 导入性能监控模块
 from utils.performance_monitor import performance_monitor, PerformanceStep
+from utils.trace_export import pipeline_tracer
+from utils.slow_capture import slow_capture
+from utils.recognition_events import recognition_events, record_recognition_event
+from utils.sampling_profiler import sampling_profiler, install_signal_toggle
+from utils.memory_accounting import memory_tracker, model_size
+from utils.metrics_endpoint import metrics_registry, recognizer_collector, state_collector, start_metrics_export, stop_metrics_export
+
+# 延迟导入工具（cn2an/openpyxl在后台预热，不阻塞启动）
+from utils.lazy_imports import warm_up_modules
 
 # 导入Debug性能追踪模块
 #from debug.debug_performance_tracker import debug_tracker
@@ -60,7 +69,8 @@ from utils.performance_monitor import performance_monitor, PerformanceStep
 try:
     from utils.production_latency_logger import (
         start_latency_session, end_latency_session,
-        log_voice_input_end, log_asr_complete, log_terminal_display
+        log_voice_input_end, log_asr_complete, log_terminal_display,
+        mark_utterance, finish_utterance
     )
 except ImportError:
     # 如果导入失败，提供空函数
@@ -69,10 +79,14 @@ except ImportError:
     def log_voice_input_end(audio_duration: float): pass
     def log_asr_complete(text: str, asr_latency: float): pass
     def log_terminal_display(text: str, display_latency: float = 0.0): pass
+    def mark_utterance(utterance_id: int, stage: str): pass
+    def finish_utterance(utterance_id: int, outcome: Optional[str] = None, text: str = ""): return None
 
 # 导入Excel导出模块
 try:
-    from excel_utils import ExcelExporterEnhanced
+    from excel_utils import ExcelExporterEnhanced, recover_unfinished_sessions
+    from utils.export_sinks import create_export_sinks_from_config
+    from utils.finalize_jobs import FinalizeJob, get_finalize_worker
     EXCEL_AVAILABLE = True
     ExcelExporterType = ExcelExporterEnhanced
 except ImportError:
@@ -139,6 +153,15 @@ except ImportError:
         def get_exportable_texts(self):
             return []
 
+        def get_multi_value_config(self):
+            return {"enabled": False, "separators": ["、", "然后", "，", ",", "；", ";"]}
+
+        def get_partial_command_config(self):
+            return {"enabled": False, "stable_partials": 2}
+
+        def get_excel_journal_config(self):
+            return {"enabled": True, "recover_on_startup": False}
+
     # 使用替代配置
     config_loader = ConfigPlaceholder()
 
@@ -181,6 +204,15 @@ class FunASRVoiceSystem:
         # VAD事件回调函数（用于语音能量显示）
         self.vad_callback = None
 
+        # 部分识别结果回调函数（用于GUI实时显示）
+        self.partial_result_callback = None
+        self._last_partial_text = ""
+
+        # 正在处理的语音段关联ID（process_recognition_result写入Excel后打点）
+        self._utterance_id = 0
+        # 正在处理的语音段的结构化事件字段（处理结束后写入识别事件日志）
+        self._utterance_event: Dict[str, Any] = {}
+
         # 启用性能监控
         performance_monitor.enable()
         logger.info("🔍 性能监控已启用")
@@ -189,6 +221,7 @@ class FunASRVoiceSystem:
         self.state = SystemState.STOPPED
         self.results_buffer: List[Dict[str, Any]] = []
         self.number_results: List[Tuple[int, Union[float, str], str]] = []  # (ID, number/str, original_text)
+        self.record_judgments: Dict[int, Dict[str, Any]] = {}  # ID -> 实时判断结果 {"result", "deviation"}
 
         # 当前标准序号状态
         self.current_standard_id = 100  # 默认标准序号
@@ -208,8 +241,27 @@ class FunASRVoiceSystem:
         self.processor = TextProcessor()
         self.command_processor = VoiceCommandProcessor()
 
+        # 指标导出来源：识别器计数与系统状态（采集时读取，不影响识别线程）
+        metrics_registry.register("recognizer", recognizer_collector(self.recognizer))
+        metrics_registry.register("system", state_collector("system_state", lambda: self.state, list(SystemState)))
+
+        # 内存统计：模型、音频缓冲与结果列表（统计时通过getter读取，不持有对象）
+        memory_tracker.track("asr_model", lambda: self.recognizer._model, size_func=model_size, warn_items=0, warn_mb=0)
+        memory_tracker.track("audio_buffer", lambda: self.recognizer._audio_buffer)
+        memory_tracker.track("speech_buffer", lambda: getattr(self.recognizer, '_speech_buffer', None))
+        memory_tracker.track("results_buffer", lambda: self.results_buffer)
+        memory_tracker.track("number_results", lambda: self.number_results)
+        memory_tracker.track("record_judgments", lambda: self.record_judgments)
+
+        # 模型加载前在后台预热延迟导入的模块，首次识别/写入时无需再等待导入
+        warm_up_modules(("cn2an", "openpyxl"))
+
         # Excel导出器
         self.excel_exporter: Optional[ExcelExporterEnhanced] = None
+        # 停止时的后台报告生成：最近一次任务和GUI进度回调
+        self.last_finalize_job: Optional['FinalizeJob'] = None
+        self.finalize_progress_callback: Optional[Callable[['FinalizeJob'], None]] = None
+        self.finalize_done_callback: Optional[Callable[['FinalizeJob'], None]] = None
         self._setup_excel_exporter()
 
         # 日志设置
@@ -252,6 +304,25 @@ class FunASRVoiceSystem:
         self.export_special_texts = config_loader.is_special_text_export_enabled()
         self.exportable_texts = config_loader.get_exportable_texts()
 
+        # 加载多值语句配置（一句话录入多个测量值）
+        multi_value_config = config_loader.get_multi_value_config()
+        self.multi_value_enabled = bool(multi_value_config.get('enabled', False))
+        self.multi_value_separators: Optional[List[str]] = multi_value_config.get('separators') or None
+
+        # 部分结果命令快速通道（暂停/继续/停止在流式结果稳定后立即执行）
+        partial_command_config = config_loader.get_partial_command_config()
+        self.partial_command_tracker: Optional[PartialCommandTracker] = None
+        if partial_command_config.get('enabled', False):
+            self.partial_command_tracker = PartialCommandTracker(
+                self.command_processor,
+                {
+                    command_type.value: self.voice_commands[command_type]
+                    for command_type in (VoiceCommandType.PAUSE, VoiceCommandType.RESUME, VoiceCommandType.STOP)
+                },
+                stable_count=int(partial_command_config.get('stable_partials', 2))
+            )
+            logger.info(f"⚡ 部分结果命令快速通道已启用 (稳定次数: {self.partial_command_tracker.stable_count})")
+
         # 键盘监听线程和停止标志
         self.keyboard_thread = None
         self.keyboard_active = False
@@ -273,17 +344,33 @@ class FunASRVoiceSystem:
             reports_dir = os.path.join(os.getcwd(), "reports")
             os.makedirs(reports_dir, exist_ok=True)
 
-            # 🎯 修复：使用正确的文件命名格式 (大写R)
-            # 暂时使用默认文件名，稍后在GUI中创建时使用模板
-            now = datetime.now()
-            filename = f"Report_{now.strftime('%Y%m%d_%H%M%S')}.xlsx"
-            filepath = os.path.join(reports_dir, filename)
+            # 上次异常退出时未生成的报告：从会话日志恢复（跳过正在后台生成的报告）
+            if config_loader.get_excel_journal_config().get("recover_on_startup", True):
+                in_progress = get_finalize_worker().active_filenames()
+                for recovered_file in recover_unfinished_sessions(reports_dir, exclude=in_progress):
+                    logger.info(f"♻️ 已从会话日志恢复报告: {os.path.basename(recovered_file)}")
 
-            self.excel_exporter = ExcelExporterEnhanced(filename=filepath)
-            logger.info(f"Excel导出器已设置: {filepath}")
+            self.excel_exporter = self._create_excel_exporter()
+            logger.info(f"Excel导出器已设置: {self.excel_exporter.filename}")
         except Exception as e:
             logger.error(f"设置Excel导出器失败: {e}")
 
+    def _create_excel_exporter(self) -> 'ExcelExporterEnhanced':
+        """创建新批次的Excel导出器（默认文件名，GUI设置零件号等信息时再改名）"""
+        reports_dir = os.path.join(os.getcwd(), "reports")
+
+        # 🎯 修复：使用正确的文件命名格式 (大写R)
+        # 暂时使用默认文件名，稍后在GUI中创建时使用模板
+        now = datetime.now()
+        filename = f"Report_{now.strftime('%Y%m%d_%H%M%S')}.xlsx"
+        filepath = os.path.join(reports_dir, filename)
+
+        exporter = ExcelExporterEnhanced(filename=filepath)
+        exporter.current_standard_id = self.current_standard_id
+        # CSV / SQLite / Parquet 导出目标（excel.export.sinks，默认不启用）
+        exporter.export_sinks = create_export_sinks_from_config()
+        return exporter
+
     def setup_excel_from_gui(self, part_no: str, batch_no: str, inspector: str):
         """从GUI设置Excel模板"""
         if not EXCEL_AVAILABLE or not self.excel_exporter:
@@ -302,6 +389,13 @@ class FunASRVoiceSystem:
 
             # 使用模板创建Excel文件
             success = self.excel_exporter.create_from_template(part_no, batch_no, inspector)
+
+            # 预加载测量规范，录入时即时判断OK/NOK
+            if self.excel_exporter.preload_measure_spec():
+                logger.info(f"📊 已预加载零件号 {part_no} 的测量规范，录入时实时判断")
+            else:
+                logger.info(f"ℹ️ 零件号 {part_no} 无可用测量规范，判断结果在停止时处理")
+
             if success:
                 # 同步设置Excel导出器的标准序号
                 self.excel_exporter.current_standard_id = self.current_standard_id
@@ -348,6 +442,21 @@ class FunASRVoiceSystem:
         """设置VAD事件回调函数（用于语音能量显示）"""
         self.vad_callback = callback
 
+    def set_partial_result_callback(self, callback):
+        """设置部分识别结果回调函数"""
+        self.partial_result_callback = callback
+
+    def set_finalize_callbacks(self, on_progress=None, on_done=None):
+        """
+        设置后台报告生成的回调（在后台线程中调用，GUI需转发到界面线程）
+
+        Args:
+            on_progress: 进度回调 on_progress(job)，job.phase / job.done / job.total
+            on_done: 完成回调 on_done(job)，job.success / job.filename / job.record_count
+        """
+        self.finalize_progress_callback = on_progress
+        self.finalize_done_callback = on_done
+
     def set_standard_id(self, standard_id: int):
         """设置当前标准序号"""
         # 支持所有100的倍数作为标准序号
@@ -382,6 +491,9 @@ class FunASRVoiceSystem:
         logger.debug(f"[🔗 MAIN接收] ← 收到VAD事件: {event_type} | 能量: {energy:.8f} | 数据: {event_data}")
         logger.debug(f"[🔗 MAIN检查] VAD回调已设置: {self.vad_callback is not None}")
 
+        if event_type == 'speech_start':
+            self._reset_partial_commands()
+
         # 🔥 关键修复：添加防护检查，防止语音命令处理期间的VAD回调错误
         if self.vad_callback and event_type in ['speech_start', 'speech_end', 'energy_update']:
             logger.debug(f"[🔗 MAIN转发] → 转发VAD事件给GUI | 事件: {event_type} | 能量: {energy:.8f}")
@@ -629,27 +741,45 @@ class FunASRVoiceSystem:
                     'result_value': result_value
                 }):
                     excel_result = self.excel_exporter.append_with_text(excel_data)
+                if excel_result:
+                    mark_utterance(self._utterance_id, "excel_written")
 
                 # Excel写入结束
                 excel_time = time.time() - excel_start
                 #debug_tracker.record_excel_write(processed_text, excel_time)
 
                 if excel_result:
-                    record_id, record_number, record_text = excel_result[0]
-
-                    # 根据结果类型处理record_number
-                    if result_type == "特定文本":
-                        # 特定文本结果：直接存储特殊文本，便于GUI区分
-                        number_value = record_number  # 存储OK/Not OK文本
-                    else:
-                        # 数字结果：record_number是数值
-                        number_value = float(record_number) if isinstance(record_number, (int, float)) else 0.0
-
-                    self.number_results.append((record_id, number_value, record_text))
+                    # 多值语句一次批量写入多行，逐条记录（顺序与语序一致）
+                    for record_id, record_number, record_text in excel_result:
+                        # 根据结果类型处理record_number
+                        if result_type == "特定文本":
+                            # 特定文本结果：直接存储特殊文本，便于GUI区分
+                            number_value = record_number  # 存储OK/Not OK文本
+                        else:
+                            # 数字结果：record_number是数值
+                            number_value = float(record_number) if isinstance(record_number, (int, float)) else 0.0
+
+                        self.number_results.append((record_id, number_value, record_text))
+
+                        judgment = self.excel_exporter.get_judgment(record_id)
+                        if judgment is not None:
+                            self.record_judgments[record_id] = judgment
+
+                    self._utterance_event.update(
+                        records=[record[0] for record in excel_result],
+                        judgments=[self.record_judgments[record[0]]['result']
+                                   for record in excel_result if record[0] in self.record_judgments],
+                        special=special_text_match if result_type == "特定文本" else None
+                    )
 
                     # 统一使用logger.info记录识别结果
                     if hasattr(self, 'recognition_logger'):
-                        log_message = f"识别文本: '{processed_text}' -> {result_type}: {record_id}: {result_value}"
+                        record_ids = ', '.join(str(record[0]) for record in excel_result)
+                        log_message = f"识别文本: '{processed_text}' -> {result_type}: {record_ids}: {result_value}"
+                        judgments = [self.record_judgments[record[0]]['result']
+                                     for record in excel_result if record[0] in self.record_judgments]
+                        if judgments:
+                            log_message += f" [{', '.join(judgments)}]"
                         self.recognition_logger.info(log_message)
                 else:
                     # Excel写入失败，使用logger.info记录
@@ -670,48 +800,143 @@ class FunASRVoiceSystem:
             if hasattr(self, 'recognition_logger'):
                 self.recognition_logger.info(f"识别文本: '{processed_text}'")
 
+    def get_record_judgment(self, record_id: int) -> Optional[Dict[str, Any]]:
+        """
+        获取记录的实时判断结果（需在setup_excel_from_gui时预加载到测量规范）
+
+        Returns:
+            {"result": "OK"/"NOK"/"无规范", "deviation": 偏差}；未判断时返回None
+        """
+        return self.record_judgments.get(record_id)
+
     def on_recognition_result(self, result):
-        """识别结果回调函数"""
+        """识别结果回调函数（处理结束后结束该语音段的延迟记录）"""
+        utterance_id = getattr(result, 'utterance_id', 0)
+        self._utterance_event = {"raw": result.text.strip(),
+                                 "asr_ms": round(getattr(result, 'asr_time', 0.0) * 1000, 1)}
+        with pipeline_tracer.span("识别结果回调", "callback", utt=utterance_id):
+            try:
+                outcome = self._handle_recognition_result(result, utterance_id)
+            finally:
+                # 空结果、被忽略的结果也结束本句，避免已触发命令残留到下一句
+                self._reset_partial_commands()
+        entry = finish_utterance(utterance_id, outcome, result.text)
+        # 超过延迟阈值时保存现场（音频、文本、各环节耗时等，后台写入 debug/slow/）
+        slow_capture.check(entry, result, self.recognizer.sample_rate)
+
+        # 结构化识别事件（一行JSONL，后台写入；空结果不记录）
+        event, self._utterance_event = self._utterance_event, {}
+        if event["raw"]:
+            event["standard_id"] = self.current_standard_id
+            if entry is None:
+                event["outcome"] = outcome or ("row" if event.get("records") else "text")
+            record_recognition_event(entry, event)
+
+    def _handle_recognition_result(self, result, utterance_id: int) -> Optional[str]:
+        """
+        处理最终识别结果
+
+        Returns:
+            语音段结果类型（command / empty / ignored）；普通结果返回None，由是否写入Excel判断
+        """
         # 如果系统已经停止，不再处理任何识别结果
         if self.system_should_stop:
-            return
+            return "ignored"
+
+        self._last_partial_text = ""
 
         if result.text.strip():
             # 记录ASR结果完成
             #debug_tracker.record_asr_result(result.text, getattr(result, 'confidence', 0.0))
 
-            # 记录生产环境ASR完成
-            log_asr_complete(result.text, 0.0)  # 这里可以传入实际的ASR处理时间
+            # 记录生产环境ASR完成（识别器给出的最终识别耗时）
+            log_asr_complete(result.text, getattr(result, 'asr_time', 0.0))
 
             # 文本处理开始
             #debug_tracker.record_text_processing_start(result.text)
+            mark_utterance(utterance_id, "text_start")
             text_processing_start = time.time()
 
-            processed = self.processor.process_text(result.text)
-            numbers = self.processor.extract_numbers(result.text, processed, self.command_processor)
+            with pipeline_tracer.span("文本处理", "text"):
+                processed = self.processor.process_text(result.text)
+                if self.multi_value_enabled:
+                    # 多值模式：按分隔符/停顿子片段逐个提取，每个片段独立严格验证
+                    numbers = self.processor.extract_multiple_numbers(
+                        result.text, self.command_processor,
+                        separators=self.multi_value_separators,
+                        segments=getattr(result, 'segments', None)
+                    )
+                else:
+                    numbers = self.processor.extract_numbers(result.text, processed, self.command_processor)
 
             # 文本处理结束
             text_processing_time = time.time() - text_processing_start
+            mark_utterance(utterance_id, "text_end")
             #debug_tracker.record_text_processing_end(processed, len(numbers) > 0)
 
             # 记录详细处理时间到日志
             logger.debug(f"[LATENCY] ASR结果: '{result.text}' | 文本处理: {text_processing_time*1000:.2f}ms")
 
+            self._utterance_event.update(text=processed, numbers=list(numbers))
+
             # 检查是否为语音命令
             command_type, standard_id = self.recognize_voice_command(processed)
+            if command_type != VoiceCommandType.UNKNOWN:
+                self._utterance_event["command"] = command_type.value
+
+            # 快速通道已执行过的命令，最终结果不再重复执行
+            if self.partial_command_tracker and self.partial_command_tracker.consume_final(
+                    command_type.value if command_type != VoiceCommandType.UNKNOWN else None):
+                logger.debug(f"⚡ 命令已由部分结果快速执行，忽略最终结果: {command_type.value}")
+                return "ignored"
 
             if command_type == VoiceCommandType.STANDARD_ID:
                 # 直接处理标准序号命令（避免重复调用）
                 # 标准序号命令的 standard_id 不会是 None
                 assert standard_id is not None, "标准序号命令的 standard_id 不应为 None"
                 self._handle_standard_id_command(processed, standard_id)
+                mark_utterance(utterance_id, "command")
+                return "command"
             elif command_type != VoiceCommandType.UNKNOWN:
                 # 处理其他语音命令（暂停、继续、停止）
                 self.handle_voice_command(command_type)
+                mark_utterance(utterance_id, "command")
+                return "command"
             else:
                 # 处理普通识别结果
                 if self.state == SystemState.RUNNING:
-                    self.process_recognition_result(result.text, processed, numbers)
+                    self._utterance_id = utterance_id
+                    try:
+                        self.process_recognition_result(result.text, processed, numbers)
+                    finally:
+                        self._utterance_id = 0
+                    return None
+                return "ignored"
+        return "empty"
+
+    def _reset_partial_commands(self):
+        """重置快速通道的本句状态（最终结果、语音开始、会话开始/停止时调用）"""
+        if self.partial_command_tracker:
+            self.partial_command_tracker.reset()
+
+    def on_partial_result(self, text: str):
+        """部分识别结果回调函数：转发给GUI，并运行命令快速通道"""
+        if self.system_should_stop:
+            return
+
+        # 快速通道会重复上报相同的部分结果，GUI只需要显示变化
+        if self.partial_result_callback and text != self._last_partial_text:
+            self._last_partial_text = text
+            try:
+                self.partial_result_callback(text)
+            except Exception as e:
+                logger.error(f"部分结果回调出错: {e}")
+
+        if self.partial_command_tracker:
+            command = self.partial_command_tracker.feed_partial(text)
+            if command:
+                logger.info(f"⚡ 部分结果命令快速执行: '{text}' -> {command}")
+                self.handle_voice_command(VoiceCommandType(command))
 
     def handle_voice_command(self, command_type: VoiceCommandType):
         """处理语音命令"""
@@ -758,6 +983,14 @@ class FunASRVoiceSystem:
                                 logger.debug(f"\n⌨️ 键盘命令：开始识别")
                                 self.run_recognition_cycle()
 
+                        elif key in (b'p', b'P'):  # P键：开关采样性能分析
+                            paths = sampling_profiler.toggle()
+                            if paths:
+                                logger.info(f"\n🔬 火焰图: {paths['collapsed']}")
+
+                        elif key in (b'm', b'M'):  # M键：各子系统内存占用
+                            logger.info("\n" + "\n".join(memory_tracker.format_report()))
+
                         elif key == b'\x1b':  # ESC键
                             self.system_stop()
                             logger.debug(f"\n⌨️ 键盘命令：停止")
@@ -789,6 +1022,7 @@ class FunASRVoiceSystem:
             return
 
         self.state = SystemState.RUNNING
+        self._reset_partial_commands()
         logger.info(f"\n🎯 开始语音识别")
         logger.debug("请说话...")
         logger.debug("控制：空格键-暂停/恢复 | ESC键-停止 | 语音命令-暂停/继续/停止")
@@ -814,12 +1048,14 @@ class FunASRVoiceSystem:
         """停止当前识别（不停止系统）"""
         if self.state != SystemState.STOPPED:
             self.state = SystemState.STOPPED
+            self._reset_partial_commands()
             logger.debug(f"\n🛑 识别已停止")
 
     def system_stop(self):
         """完全停止系统"""
         self.state = SystemState.STOPPED
         self.system_should_stop = True
+        self._reset_partial_commands()
         logger.info(f"\n🛑 系统停止")
 
         # 立即停止识别器
@@ -851,10 +1087,28 @@ class FunASRVoiceSystem:
         performance_monitor.clear_records()
 
     def _finalize_excel(self):
-        """Excel最终处理：格式化、测量规范查询和保存"""
+        """
+        Excel最终处理：格式化、测量规范查询和保存
+
+        excel.finalize.background 启用时把当前导出器交给后台线程生成报告并立即返回，
+        本系统换用新的导出器，可以马上开始下一批次
+        """
         if not EXCEL_AVAILABLE or not self.excel_exporter:
             return
 
+        if config_loader.get_excel_finalize_config().get("background", True):
+            try:
+                exporter = self.excel_exporter
+                self.last_finalize_job = get_finalize_worker().submit(
+                    exporter,
+                    on_progress=self.finalize_progress_callback,
+                    on_done=self._on_finalize_done
+                )
+                self.excel_exporter = self._create_excel_exporter()
+                return
+            except Exception as e:
+                logger.error(f"提交后台报告生成失败，改为同步生成: {e}")
+
         try:
             # 执行Excel最终格式化（包括测量规范查询、判断结果、格式化等）
             logger.info("🔄 正在执行Excel最终格式化...")
@@ -878,6 +1132,23 @@ class FunASRVoiceSystem:
         except Exception as e:
             logger.error(f"Excel最终处理失败: {e}")
 
+    def _on_finalize_done(self, job: 'FinalizeJob'):
+        """后台报告生成完成（后台线程中调用）"""
+        if job.success and os.path.exists(job.filename):
+            file_size = os.path.getsize(job.filename)
+            logger.info(f"📁 Excel文件已保存: {os.path.basename(job.filename)}")
+            logger.info(f"📊 文件大小: {self._format_file_size(file_size)}")
+            logger.info(f"📈 记录数量: {job.record_count} 条")
+        if self.finalize_done_callback:
+            self.finalize_done_callback(job)
+
+    @property
+    def last_report_filename(self) -> Optional[str]:
+        """最近一次停止时生成（或正在生成）的报告文件"""
+        if self.last_finalize_job is not None:
+            return self.last_finalize_job.filename
+        return self.excel_exporter.filename if self.excel_exporter else None
+
     def _format_file_size(self, size_bytes):
         """格式化文件大小显示"""
         if size_bytes == 0:
@@ -893,6 +1164,7 @@ class FunASRVoiceSystem:
         """运行识别循环"""
         # 设置回调（保留VAD回调）
         self.recognizer.set_callbacks(
+            on_partial_result=self.on_partial_result,
             on_final_result=self.on_recognition_result,
             on_vad_event=self._handle_vad_event  # 🔧 修复：保留VAD回调
         )
@@ -985,6 +1257,8 @@ class FunASRVoiceSystem:
 
             # 停止生产环境延迟记录
             end_latency_session()
+            # 识别事件写入文件（班后分析）
+            recognition_events.flush(timeout=5.0)
 
             # 清理资源
             try:
@@ -1045,6 +1319,21 @@ def main():
     else:
         logger.info("🏭 生产模式")
 
+    # 流水线追踪：退出时导出Chrome Trace JSON
+    if "--trace" in sys.argv:
+        pipeline_tracer.enable()
+
+    # 本地指标导出（system.metrics 或 --metrics）
+    start_metrics_export(force="--metrics" in sys.argv)
+
+    # 采样性能分析：--profile 从启动开始采样；运行中可按P键或 kill -USR1 开关
+    install_signal_toggle()
+    if "--profile" in sys.argv:
+        sampling_profiler.start()
+
+    # 内存统计：定期检查增长阈值；debug模式下同时输出tracemalloc增长最多的代码行
+    memory_tracker.start(trace_allocations=True if debug_mode else None)
+
     # 创建系统实例
     system = FunASRVoiceSystem(
         recognition_duration=60,  # 每次识别60秒
@@ -1066,8 +1355,24 @@ def main():
 
     finally:
         # 显示Excel文件路径（如果有数字数据）
-        if system.number_results and system.excel_exporter:
-            logger.info(f"\n📊 数据已保存到: {system.excel_exporter.filename}")
+        if system.number_results and system.last_report_filename:
+            logger.info(f"\n📊 数据已保存到: {system.last_report_filename}")
+
+        if pipeline_tracer.enabled:
+            try:
+                pipeline_tracer.dump()
+            except OSError as e:
+                logger.error(f"性能追踪导出失败: {e}")
+
+        stop_metrics_export()
+        recognition_events.close()
+        memory_tracker.stop()
+
+        if sampling_profiler.running:
+            try:
+                sampling_profiler.stop()
+            except OSError as e:
+                logger.error(f"火焰图输出失败: {e}")
 
         logger.info("\n👋 感谢使用FunASR语音输入系统！")
 
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步日志测试
+验证经队列写入文件、控制台不显示DEBUG、消息参数在入队时确定、按大小轮换并gzip压缩、队列满时丢弃计数
+"""
+
+import sys
+import os
+import gzip
+import queue
+import logging
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_utils import LoggingManager, _RoutedQueueHandler
+
+
+def make_logger(tmp_dir: str, name: str, **settings) -> logging.Logger:
+    """在临时目录下创建一个经队列输出的logger（覆盖system.logging配置）"""
+    LoggingManager.LOGS_DIR = tmp_dir
+    LoggingManager._settings = dict(LoggingManager.settings(), **{"async": True}, **settings)
+    return LoggingManager.get_logger(name, log_file=f"{name}.log")
+
+
+def read_log(path: str) -> str:
+    with open(path, encoding="utf-8-sig") as f:
+        return f.read()
+
+
+def test_queue_route_and_lazy_message():
+    """logger上只有入队处理器；文件收到DEBUG，控制台只收到INFO；参数在记录时确定"""
+    saved_dir, saved_settings = LoggingManager.LOGS_DIR, LoggingManager._settings
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            logger = make_logger(tmp_dir, "async_route_test")
+            assert [type(handler) for handler in logger.handlers] == [_RoutedQueueHandler]
+            console = [handler for handler in LoggingManager._router.routes["async_route_test"]
+                       if not isinstance(handler, logging.FileHandler)][0]
+            records = []
+            console.emit = records.append
+
+            values = [1]
+            logger.debug("能量=%.3f, 块=%s", 0.12345, values)
+            values.append(2)  # 入队后修改参数，不影响已记录的消息
+            logger.info("🎤 语音开始")
+            LoggingManager.flush()
+
+            content = read_log(os.path.join(tmp_dir, "async_route_test.log"))
+            assert "DEBUG - 能量=0.123, 块=[1]" in content and "INFO - 🎤 语音开始" in content
+            assert [record.getMessage() for record in records] == ["🎤 语音开始"]
+            assert LoggingManager.queue_depth() == 0
+        finally:
+            LoggingManager._router.set_route("async_route_test", [])
+            LoggingManager.LOGS_DIR, LoggingManager._settings = saved_dir, saved_settings
+
+
+def test_rotation_gzip():
+    """超过max_file_mb时轮换，旧文件压缩为 .1.gz，最多保留backup_count个"""
+    saved_dir, saved_settings = LoggingManager.LOGS_DIR, LoggingManager._settings
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            logger = make_logger(tmp_dir, "async_rotate_test", max_file_mb=0.002, backup_count=2, compress=True)
+            for index in range(200):
+                logger.info("第%d行 %s", index, "x" * 40)
+            LoggingManager.flush()
+
+            names = sorted(os.listdir(tmp_dir))
+            assert names == ["async_rotate_test.log", "async_rotate_test.log.1.gz", "async_rotate_test.log.2.gz"]
+            with gzip.open(os.path.join(tmp_dir, "async_rotate_test.log.1.gz"), "rt", encoding="utf-8-sig") as f:
+                assert "INFO - 第" in f.read()
+            assert "第199行" in read_log(os.path.join(tmp_dir, "async_rotate_test.log"))
+        finally:
+            LoggingManager._router.set_route("async_rotate_test", [])
+            LoggingManager.LOGS_DIR, LoggingManager._settings = saved_dir, saved_settings
+
+
+def test_full_queue_drops():
+    """队列满时不阻塞，丢弃并计数"""
+    handler = _RoutedQueueHandler(queue.Queue(maxsize=2), "drop_test")
+    logger = logging.getLogger("async_drop_test")
+    logger.propagate = False
+    logger.addHandler(handler)
+    dropped = LoggingManager.dropped_records
+    try:
+        for index in range(5):
+            logger.warning("记录%d", index)
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2 and LoggingManager.dropped_records == dropped + 3
+    assert handler.queue.get_nowait().msg == "记录0"
+
+    # 多个线程同时丢弃，计数不丢失
+    handler = _RoutedQueueHandler(queue.Queue(maxsize=1), "drop_test")
+    logger.addHandler(handler)
+    dropped = LoggingManager.dropped_records
+    threads = [threading.Thread(target=lambda: [logger.warning("并发%d", index) for index in range(500)])
+               for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        logger.removeHandler(handler)
+    assert LoggingManager.dropped_records == dropped + 4 * 500 - 1
+
+
+if __name__ == "__main__":
+    test_queue_route_and_lazy_message()
+    test_rotation_gzip()
+    test_full_queue_drops()
+    print("✅ 异步日志测试全部通过")
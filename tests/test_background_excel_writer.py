@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台Excel写入线程测试
+验证按条数/时间批量写入、flush语义、失败重试、以及导出器立即返回ID
+"""
+
+import sys
+import os
+import time
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from utils.batch_writer import BackgroundBatchWriter
+from utils.session_journal import SessionJournal
+from utils.performance_monitor import performance_monitor
+from excel_utils import ExcelExporterEnhanced
+
+
+def test_flush_on_batch_size():
+    """攒够batch_size条立即写入，顺序不变"""
+    batches = []
+    writer = BackgroundBatchWriter(batches.append, batch_size=3, flush_interval=10.0)
+    writer.submit([1, 2, 3, 4])
+    deadline = time.time() + 2
+    while not batches and time.time() < deadline:
+        time.sleep(0.01)
+    assert batches == [[1, 2, 3]]
+
+    assert writer.stop()
+    assert batches == [[1, 2, 3], [4]]
+    assert writer.flushed_items == 4
+
+
+def test_flush_on_interval():
+    """不足batch_size时在flush_interval后写入"""
+    batches = []
+    writer = BackgroundBatchWriter(batches.append, batch_size=100, flush_interval=0.05)
+    writer.submit(["a"])
+    time.sleep(0.3)
+    assert batches == [["a"]]
+    writer.stop()
+
+
+def test_failed_flush_is_retried():
+    """写入失败的批次保留并重试"""
+    calls = []
+
+    def flaky(items):
+        calls.append(list(items))
+        if len(calls) == 1:
+            raise IOError("磁盘忙")
+
+    writer = BackgroundBatchWriter(flaky, batch_size=2, flush_interval=0.02)
+    writer.submit([1, 2])
+    assert writer.flush(timeout=2)
+    writer.stop()
+    assert calls[0] == [1, 2] and calls[-1] == [1, 2]
+    assert writer.failed_flushes == 1
+
+
+def test_exporter_returns_ids_before_write():
+    """导出器立即返回ID，finalize前写完，队列深度和刷新耗时上报到性能监控"""
+    performance_monitor.clear_records()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bg.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.use_background_writer = True
+        exporter._performance_config = {"batch_size": 2, "flush_interval_ms": 1000, "max_queue_size": 10}
+
+        # 模拟慢磁盘：写入线程被阻塞时调用方仍立即拿到ID
+        gate = threading.Event()
+        original_persist = exporter._persist_entries
+
+        def slow_persist(entries):
+            gate.wait(2)
+            original_persist(entries)
+
+        exporter._persist_entries = slow_persist
+
+        start = time.perf_counter()
+        ids = [exporter.append_with_text([(float(i), "原文", "处理")])[0][0] for i in range(5)]
+        elapsed = time.perf_counter() - start
+        assert ids == [1, 2, 3, 4, 5]
+        assert elapsed < 1.0
+        gate.set()
+
+        assert exporter.finalize_excel_file()
+        workbook = load_workbook(path)
+        voice_ids = [row[9] for row in workbook.active.iter_rows(min_row=5, values_only=True) if row[9]]
+        workbook.close()
+        assert voice_ids == [1, 2, 3, 4, 5]
+
+    assert performance_monitor.get_gauge("Excel写入队列深度") is not None
+    assert performance_monitor.get_summary_by_step("Excel写入批量刷新") is not None
+
+
+def test_finalize_aborts_when_flush_fails():
+    """后台写入失败时取消finalize：保留待格式化状态、会话日志和未写入的记录，恢复后重试成功"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "bg_fail.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.use_background_writer = True
+        exporter._performance_config = {"batch_size": 10, "flush_interval_ms": 20, "max_queue_size": 10}
+
+        disk_full = threading.Event()
+        original_persist = exporter._persist_entries
+
+        def failing_persist(entries):
+            if disk_full.is_set():
+                raise IOError("磁盘已满")
+            original_persist(entries)
+
+        exporter._persist_entries = failing_persist
+        exporter.append_with_text([(1.0, "一", "1")])
+        assert exporter.flush_pending_writes()
+        disk_full.set()
+        exporter.append_with_text([(float(i), "原文", "处理") for i in range(2, 5)])
+
+        assert exporter.finalize_excel_file() is False
+        assert exporter._pending_formatting
+        assert exporter._writer is not None and exporter._writer.is_running
+        if exporter.use_journal:
+            assert os.path.exists(exporter._journal.path) and len(SessionJournal.load(exporter._journal.path).records) == 1
+
+        disk_full.clear()
+        assert exporter.finalize_excel_file()
+        workbook = load_workbook(path)
+        voice_ids = [row[9] for row in workbook.active.iter_rows(min_row=5, values_only=True) if row[9]]
+        workbook.close()
+        assert voice_ids == [1, 2, 3, 4]
+
+
+if __name__ == "__main__":
+    test_flush_on_batch_size()
+    test_flush_on_interval()
+    test_failed_flush_is_retried()
+    test_exporter_returns_ids_before_write()
+    test_finalize_aborts_when_flush_fails()
+    print("✅ 后台Excel写入线程测试全部通过")
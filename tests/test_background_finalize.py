@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台报告生成测试
+验证finalize进度回调、后台生成期间可开始下一批次、失败任务由会话日志恢复、以及进程退出前完成未结束的报告
+"""
+
+import sys
+import os
+import subprocess
+import tempfile
+import textwrap
+import threading
+
+# 添加项目根目录到Python路径
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from openpyxl import load_workbook
+
+from excel_utils import ExcelExporterEnhanced, FINALIZE_PROGRESS_INTERVAL, recover_unfinished_sessions
+from utils.finalize_jobs import FinalizeWorker
+from utils.session_journal import SessionJournal
+
+
+def _record(path, count, part_no="P1"):
+    exporter = ExcelExporterEnhanced(filename=path, part_no=part_no, batch_no="B1", inspector="张三")
+    exporter.current_standard_id = 100
+    exporter.append_with_text([(float(i), str(i), str(i)) for i in range(count)])
+    return exporter
+
+
+def test_progress_phases():
+    """finalize按阶段回报进度，写入阶段按行数递增"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        count = FINALIZE_PROGRESS_INTERVAL * 2 + 10
+        exporter = _record(os.path.join(tmp_dir, "Report_P1_B1.xlsx"), count)
+        events = []
+        assert exporter.finalize_excel_file(progress_callback=lambda *event: events.append(event))
+
+        phases = [phase for phase, _, _ in events]
+        assert phases[0] == "collect" and phases[-1] == "store"
+        assert [p for i, p in enumerate(phases) if i == 0 or phases[i - 1] != p] == \
+            ["collect", "spec", "write", "save", "store"]
+        writes = [done for phase, done, total in events if phase == "write"]
+        assert writes == [0, FINALIZE_PROGRESS_INTERVAL, FINALIZE_PROGRESS_INTERVAL * 2]
+        assert events[-1] == ("store", count, count)
+
+
+def test_next_batch_while_finalizing():
+    """报告在后台生成时，新的导出器可以立即开始录入"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        first = _record(os.path.join(tmp_dir, "Report_P1_B1.xlsx"), 200)
+        gate = threading.Event()
+        progress = []
+
+        def on_progress(job):
+            progress.append(job.phase)
+            gate.wait(5)  # 让任务停在第一个阶段，模拟大报告保存耗时
+
+        worker = FinalizeWorker()
+        job = worker.submit(first, on_progress=on_progress)
+        assert worker.active_filenames() == [first.filename]
+
+        # 上一批次仍在生成，下一批次已开始录入
+        second = _record(os.path.join(tmp_dir, "Report_P1_B2.xlsx"), 50)
+        assert not job.finished
+        gate.set()
+        assert job.wait(30) and job.success and job.record_count == 200
+        assert progress[0] == "collect" and "save" in progress
+        assert second.finalize_excel_file()
+        assert worker.shutdown(5)
+
+        for path, rows in ((first.filename, 200), (second.filename, 50)):
+            workbook = load_workbook(path)
+            assert workbook.active.cell(row=4 + rows, column=10).value == rows
+            workbook.close()
+
+
+def test_failed_job_recovered_from_journal():
+    """失败的任务保留会话日志；正在生成的报告不被启动恢复抢先处理"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exporter = _record(os.path.join(tmp_dir, "Report_P1_B1.xlsx"), 20)
+        exporter.flush_pending_writes()
+        original = exporter._finalize_write_only
+        exporter._finalize_write_only = lambda *args: (_ for _ in ()).throw(IOError("磁盘已满"))
+
+        worker = FinalizeWorker()
+        job = worker.submit(exporter)
+        assert job.wait(30) and job.success is False and job.phase == "failed"
+        assert SessionJournal.find_unfinished(tmp_dir)
+
+        # 仍在生成时跳过；任务失败后由恢复流程生成报告
+        assert recover_unfinished_sessions(tmp_dir, exclude=[exporter.filename]) == []
+        exporter._finalize_write_only = original
+        assert recover_unfinished_sessions(tmp_dir) == [exporter.filename]
+        assert not SessionJournal.find_unfinished(tmp_dir)
+        worker.shutdown(5)
+
+
+def test_pending_job_completed_at_exit():
+    """提交后立即退出进程，退出前仍完成报告"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "Report_P1_B1.xlsx")
+        script = textwrap.dedent(f"""
+            import sys
+            sys.path.insert(0, {PROJECT_ROOT!r})
+            from excel_utils import ExcelExporterEnhanced
+            from utils.finalize_jobs import get_finalize_worker
+            exporter = ExcelExporterEnhanced(filename={path!r}, part_no="P1", batch_no="B1", inspector="张三")
+            exporter.append_with_text([(float(i), str(i), str(i)) for i in range(3000)])
+            get_finalize_worker().submit(exporter)
+        """)
+        subprocess.run([sys.executable, "-c", script], cwd=tmp_dir, check=True, timeout=120,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        assert os.path.exists(path) and not SessionJournal.find_unfinished(tmp_dir)
+        workbook = load_workbook(path)
+        assert workbook.active.cell(row=4 + 3000, column=10).value == 3000
+        workbook.close()
+
+
+if __name__ == "__main__":
+    test_progress_phases()
+    test_next_batch_while_finalizing()
+    test_failed_job_recovered_from_journal()
+    test_pending_job_completed_at_exit()
+    print("✅ 后台报告生成测试全部通过")
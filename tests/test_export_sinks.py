@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式导出目标测试
+验证CSV/SQLite与xlsx并行输出、多个目标同时运行、以及单个目标出错不影响其他目标
+"""
+
+import sys
+import os
+import csv
+import sqlite3
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.export_sinks import (
+    CsvSink, SqliteSink, ParquetSink, ExportSink, ExportSinkManager, PYARROW_AVAILABLE, flatten_record
+)
+from excel_utils import ExcelExporterEnhanced
+
+
+class _BrokenSink(ExportSink):
+    name = "broken"
+
+    def write(self, records):
+        raise IOError("磁盘已满")
+
+
+def test_flatten_record():
+    """数值与特定文本分列，判断结果展开"""
+    session = {"session": "S1", "part_no": "P1", "batch_no": "B1", "inspector": "张三"}
+    row = flatten_record(session, {"voice_id": 1, "standard_id": 100, "value": 12.5,
+                                   "judgment": {"result": "OK", "deviation": 0.5}})
+    assert (row["value"], row["text_value"], row["judgment"], row["deviation"]) == (12.5, None, "OK", 0.5)
+    row = flatten_record(session, {"voice_id": 2, "standard_id": 100, "value": "OK"})
+    assert (row["value"], row["text_value"], row["judgment"]) == (None, "OK", None)
+    row = flatten_record(session, {"voice_id": 3, "standard_id": 100, "value": 7})
+    assert row["value"] == 7.0 and isinstance(row["value"], float) and row["text_value"] is None
+
+
+def test_write_before_open_session():
+    """未打开会话就写入时给出明确错误"""
+    for sink in (CsvSink(), SqliteSink()):
+        try:
+            sink.write([{"voice_id": 1, "value": 1.0}])
+        except RuntimeError as e:
+            assert "导出会话未打开" in str(e)
+        else:
+            raise AssertionError(f"{sink.name} 未打开会话时应抛出RuntimeError")
+
+
+def test_exporter_streams_to_multiple_sinks():
+    """导出器写入时同时输出CSV和SQLite，出错的目标不影响其他目标"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "measurements.db")
+        csv_sink, sqlite_sink = CsvSink(), SqliteSink(db_path)
+        manager = ExportSinkManager([_BrokenSink(), csv_sink, sqlite_sink])
+
+        exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, "Report_P1_B1.xlsx"),
+                                         part_no="P1", batch_no="B1", inspector="张三")
+        exporter.export_sinks = manager
+        exporter.current_standard_id = 200
+        exporter.append_with_text([(1.5, "一点五", "1.5"), ("OK", "OK", "OK")])
+
+        # 写入时即可读取，无需等待finalize
+        with open(csv_sink.path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [(row["voice_id"], row["standard_id"], row["value"], row["text_value"]) for row in rows] == \
+            [("1", "200", "1.5", ""), ("2", "200", "", "OK")]
+        assert rows[0]["part_no"] == "P1" and rows[0]["session"] == "Report_P1_B1"
+
+        assert exporter.finalize_excel_file()
+        assert not manager.session_open
+        assert manager.errors == 1
+        manager.close()
+
+        conn = sqlite3.connect(db_path)
+        result = conn.execute(
+            "SELECT voice_id, value, text_value FROM measurements "
+            "WHERE part_no = ? AND batch_no = ? AND standard_id = ? ORDER BY voice_id", ("P1", "B1", 200)).fetchall()
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM measurements WHERE part_no = 'P1' AND standard_id = 200"))
+        conn.close()
+        assert result == [(1, 1.5, None), (2, None, "OK")]
+        assert "USING INDEX idx_measurements_part" in plan
+
+
+def test_parquet_sink():
+    """Parquet在会话结束时一次写出（未安装pyarrow时跳过）"""
+    if not PYARROW_AVAILABLE:
+        print("⏭️ 未安装pyarrow，跳过Parquet测试")
+        return
+    import pyarrow.parquet
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sink = ParquetSink()
+        sink.open_session({"session": "S1", "filename": os.path.join(tmp_dir, "S1.xlsx")})
+        sink.write([{"voice_id": 1, "standard_id": 100, "value": 2.5}])
+        sink.finalize()
+        table = pyarrow.parquet.read_table(sink.path)
+        assert table.column("value").to_pylist() == [2.5]
+
+
+if __name__ == "__main__":
+    test_flatten_record()
+    test_write_before_open_session()
+    test_exporter_streams_to_multiple_sinks()
+    test_parquet_sink()
+    print("✅ 流式导出目标测试全部通过")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FastStep热路径计时测试
+验证静态步骤ID、多线程无锁记录后的汇总、采样、禁用时不记录，以及缓冲区写满时的丢弃计数
+"""
+
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.performance_monitor import FastStep, PerformanceMonitor
+
+
+def test_static_step_ids():
+    """同名步骤共用一个ID，汇总与PerformanceStep使用同一直方图"""
+    monitor = PerformanceMonitor(raw_records=False)
+    first, second = FastStep("音频输入", monitor=monitor), FastStep("音频输入", monitor=monitor)
+    other = FastStep("音频处理", monitor=monitor)
+    assert first.step_id == second.step_id != other.step_id
+
+    with first:
+        time.sleep(0.002)
+    with other:
+        pass
+    monitor.end_timer(monitor.start_timer("音频输入"))
+
+    summary = monitor.get_summary_by_step("音频输入")
+    assert summary.total_count == 2 and summary.max_duration >= 0.002
+    assert monitor.get_summary_by_step("音频处理").total_count == 1
+    monitor.stop_aggregator()
+
+
+def test_multithreaded_aggregation():
+    """多个线程同时计时，后台汇总线程合并后次数完整"""
+    monitor = PerformanceMonitor(raw_records=False)
+    monitor._aggregate_interval = 0.01
+    step = FastStep("音频处理", monitor=monitor)
+
+    def worker():
+        for _ in range(3000):
+            with step:
+                pass
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    deadline = time.monotonic() + 5
+    while monitor._histograms.get("音频处理") is None or monitor._histograms["音频处理"].count < 12000:
+        assert time.monotonic() < deadline, "后台汇总线程未合并样本"
+        time.sleep(0.02)
+    assert monitor.get_summary_by_step("音频处理").total_count == 12000
+    assert monitor.dropped_samples() == 0
+    # 已退出线程的缓冲区合并后移除
+    assert not any(ring.thread in threads for ring in monitor._rings)
+    monitor.stop_aggregator()
+
+
+def test_sampling_and_disabled():
+    """每N次计时1次；禁用监控时不记录"""
+    monitor = PerformanceMonitor(raw_records=False)
+    sampled = FastStep("结果处理", sample_every=10, monitor=monitor)
+    for _ in range(100):
+        with sampled:
+            pass
+    assert monitor.get_summary_by_step("结果处理").total_count == 10
+
+    monitor.disable()
+    for _ in range(100):
+        with sampled:
+            pass
+    monitor.enable()
+    assert monitor.get_summary_by_step("结果处理").total_count == 10
+
+    monitor.clear_records()
+    assert monitor.get_summary_by_step("结果处理") is None
+    monitor.stop_aggregator()
+
+
+def test_ring_overflow_counted():
+    """汇总前写满一圈时，保留最近的样本并记录丢弃数"""
+    monitor = PerformanceMonitor(raw_records=False)
+    monitor._ring_size = 16
+    monitor._aggregate_interval = 60
+    step = FastStep("音频输入", monitor=monitor)
+    for _ in range(40):
+        with step:
+            pass
+    assert monitor.get_summary_by_step("音频输入").total_count == 16
+    assert monitor.dropped_samples() == 24
+    monitor.stop_aggregator()
+
+
+if __name__ == "__main__":
+    test_static_step_ids()
+    test_multithreaded_aggregation()
+    test_sampling_and_disabled()
+    test_ring_overflow_counted()
+    print("✅ FastStep热路径计时测试全部通过")
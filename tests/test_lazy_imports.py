@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入测试
+验证导入text_processor / excel_utils时不加载cn2an、pandas、openpyxl，
+且首次使用时能正确延迟加载
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_startup_imports import profile_module, parse_importtime, compare_with_baseline
+from utils.lazy_imports import lazy_import, lazy_callable, is_module_available, warm_up_modules
+
+
+def test_startup_does_not_load_heavy_modules():
+    """入口模块导入时不加载重量级依赖"""
+    for module in ("text_processor", "excel_utils"):
+        result = profile_module(module)
+        assert result is not None, f"{module} 导入失败"
+        assert result["heavy_loaded"] == [], f"{module} 启动时加载了 {result['heavy_loaded']}"
+
+
+def test_lazy_module_loads_on_first_access():
+    """延迟模块首次访问属性时才导入"""
+    module = lazy_import("json")
+    assert lazy_import("json") is module
+    assert module.dumps({"a": 1}) == '{"a": 1}'
+    assert module.is_loaded
+
+    dumps = lazy_callable("json", "dumps")
+    assert dumps([1]) == "[1]"
+
+    assert is_module_available("json")
+    assert not is_module_available("module_that_does_not_exist_xyz")
+
+
+def test_warm_up_modules():
+    """预热在后台线程中完成导入，不存在的模块被忽略"""
+    thread = warm_up_modules(("json", "module_that_does_not_exist_xyz"))
+    assert thread is not None
+    thread.join(timeout=10)
+    assert lazy_import("json").is_loaded
+
+
+def test_text_processing_still_converts_numbers():
+    """cn2an延迟加载后中文数字转换结果不变"""
+    from text_processor import TextProcessor, CN2AN_AVAILABLE
+
+    if not CN2AN_AVAILABLE:
+        print("⚠️ cn2an未安装，跳过")
+        return
+    processor = TextProcessor()
+    assert processor.extract_numbers("十二点五") == [12.5]
+
+
+def test_create_excel_without_pandas():
+    """不依赖pandas创建Excel文件"""
+    if not is_module_available("openpyxl"):
+        print("⚠️ openpyxl未安装，跳过")
+        return
+    from excel_utils import ExcelExporterEnhanced
+    from openpyxl import load_workbook
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "lazy.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.create_new_file()
+        assert os.path.exists(path)
+
+        workbook = load_workbook(path)
+        worksheet = workbook.active
+        assert worksheet.max_row >= 4
+        workbook.close()
+
+
+def test_parse_importtime_and_baseline():
+    """解析-X importtime输出并判定回归"""
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   json.decoder",
+        "import time:       200 |        300 | json",
+    ])
+    rows = parse_importtime(stderr)
+    assert rows == [("json.decoder", 1, 100), ("json", 0, 300)]
+
+    baseline = {"modules": {"text_processor": {"import_ms": 100.0, "heavy_loaded": []}}}
+    ok = {"text_processor": {"import_ms": 140.0, "heavy_loaded": []}}
+    assert compare_with_baseline(ok, baseline, 0.5) == []
+
+    slow = {"text_processor": {"import_ms": 160.0, "heavy_loaded": ["pandas"]}}
+    assert len(compare_with_baseline(slow, baseline, 0.5)) == 2
+
+
+if __name__ == "__main__":
+    test_startup_does_not_load_heavy_modules()
+    test_lazy_module_loads_on_first_access()
+    test_warm_up_modules()
+    test_text_processing_still_converts_numbers()
+    test_create_excel_without_pandas()
+    test_parse_importtime_and_baseline()
+    print("✅ 延迟导入测试全部通过")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+实时OK/NOK判断测试
+验证预加载规范后写入时即返回判断结果、finalize复用判断结果，以及规范变化后重新判断
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+
+from excel_utils import ExcelExporterEnhanced
+
+
+def _write_spec(path, lower, upper):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(["标准序号", "标准内容", "下限", "上限"])
+    worksheet.append([100, "外径", lower, upper])
+    workbook.save(path)
+    workbook.close()
+
+
+def _judgment_column(path):
+    workbook = load_workbook(path)
+    values = [(row[6], row[7]) for row in workbook.active.iter_rows(min_row=5, values_only=True) if row[9]]
+    workbook.close()
+    return values
+
+
+def _exporter(tmp_dir):
+    exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, "live.xlsx"), part_no="P1")
+    exporter.template_path = os.path.join(tmp_dir, "missing_template.xlsx")
+    exporter.create_from_template("P1", "B1", "张三")
+    return exporter
+
+
+def test_judgment_available_at_write_time():
+    """写入时即可拿到判断结果，finalize直接复用（不再计算）"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_spec(os.path.join(tmp_dir, "P1_MeasureSpec.xlsx"), 10, 20)
+        exporter = _exporter(tmp_dir)
+        assert exporter.preload_measure_spec()
+
+        result = exporter.append_with_text([(15.0, "十五", "15"), (25.0, "二十五", "25"), ("OK", "OK", "OK")])
+        ids = [record[0] for record in result]
+        assert exporter.get_judgment(ids[0]) == {"result": "OK", "deviation": 5.0}
+        assert exporter.get_judgment(ids[1]) == {"result": "NOK", "deviation": 5.0}
+        assert exporter.get_judgment(ids[2]) is None
+
+        calls = []
+        original = exporter._calculate_judgment
+        exporter._calculate_judgment = lambda *args: calls.append(args) or original(*args)
+        assert exporter.finalize_excel_file()
+        assert calls == []
+        assert _judgment_column(exporter.filename) == [("OK", 5), ("NOK", 5), (None, None)]
+
+
+def test_spec_changed_during_session():
+    """会话中规范文件被修改：finalize按新规范重新判断"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = os.path.join(tmp_dir, "P1_MeasureSpec.xlsx")
+        _write_spec(spec_path, 10, 20)
+        exporter = _exporter(tmp_dir)
+        exporter.preload_measure_spec()
+        voice_id = exporter.append_with_text([(15.0, "十五", "15")])[0][0]
+        assert exporter.get_judgment(voice_id)["result"] == "OK"
+
+        time.sleep(0.01)
+        _write_spec(spec_path, 16, 20)
+        assert exporter.finalize_excel_file()
+        assert _judgment_column(exporter.filename) == [("NOK", 1)]
+
+
+def test_no_spec_no_live_judgment():
+    """没有规范文件时不做实时判断"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exporter = _exporter(tmp_dir)
+        assert not exporter.preload_measure_spec()
+        voice_id = exporter.append_with_text([(15.0, "十五", "15")])[0][0]
+        assert exporter.get_judgment(voice_id) is None
+        assert exporter.finalize_excel_file()
+
+
+if __name__ == "__main__":
+    test_judgment_available_at_write_time()
+    test_spec_changed_during_session()
+    test_no_spec_no_live_judgment()
+    print("✅ 实时判断测试全部通过")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测量规范索引测试
+验证目录扫描优先级、内存/旁路缓存命中、以及规范文件修改后按mtime失效
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+
+from utils.measure_spec_index import MeasureSpecIndex, get_measure_spec_index
+from excel_utils import ExcelExporterEnhanced
+
+
+def _write_spec(path, rows):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(["标准序号", "标准内容", "下限", "上限"])
+    for row in rows:
+        worksheet.append(row)
+    workbook.save(path)
+    workbook.close()
+
+
+def _index(reports_dir):
+    return MeasureSpecIndex([os.path.join(reports_dir, "templates"), reports_dir])
+
+
+def test_templates_dir_has_priority():
+    """templates目录优先；目录内新增文件后重新扫描"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, "templates"))
+        _write_spec(os.path.join(tmp_dir, "P1_MeasureSpec.xlsx"), [[100, "外径", 1, 2]])
+        index = _index(tmp_dir)
+        assert index.find("P1") == os.path.join(tmp_dir, "P1_MeasureSpec.xlsx")
+        assert index.find("P2") is None
+
+        template_spec = os.path.join(tmp_dir, "templates", "P1_MeasureSpec.xlsx")
+        _write_spec(template_spec, [[100, "外径", 1, 2]])
+        assert index.find("P1") == template_spec
+
+
+def test_parse_and_cache():
+    """解析结果与导出器原逻辑一致，未变化时不重复解析，修改后重新解析"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = os.path.join(tmp_dir, "P1_MeasureSpec.xlsx")
+        _write_spec(spec_path, [[100, "外径", 10, 20], ["标题", None, None, None],
+                                [200, None, None, 5.5], [300, "孔深", 1.5, None]])
+        index = _index(tmp_dir)
+
+        path, spec_data = index.get("P1")
+        assert path == spec_path
+        assert spec_data == {
+            100: {'content': "外径", 'lower_limit': 10.0, 'upper_limit': 20.0},
+            200: {'content': "", 'lower_limit': None, 'upper_limit': 5.5},
+            300: {'content': "孔深", 'lower_limit': 1.5, 'upper_limit': None},
+        }
+        assert index.get("P1")[1] is spec_data
+        assert index.parses == 1
+
+        # 规范文件修改后按mtime失效
+        time.sleep(0.01)
+        _write_spec(spec_path, [[100, "外径", 11, 19]])
+        assert index.load(spec_path)[100]['lower_limit'] == 11.0
+        assert index.parses == 2
+
+
+def test_sidecar_survives_restart():
+    """新的索引实例（模拟进程重启）从旁路文件读取，不再解析xlsx"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        spec_path = os.path.join(tmp_dir, "P1_MeasureSpec.xlsx")
+        _write_spec(spec_path, [[100, "外径", 10, 20]])
+        expected = _index(tmp_dir).load(spec_path)
+        assert os.path.exists(MeasureSpecIndex.sidecar_path(spec_path))
+
+        restarted = _index(tmp_dir)
+        assert restarted.load(spec_path) == expected
+        assert restarted.parses == 0 and restarted.sidecar_hits == 1
+
+
+def test_exporter_uses_shared_index():
+    """导出器通过索引查找规范，finalize多次不重复解析"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _write_spec(os.path.join(tmp_dir, "P1_MeasureSpec.xlsx"), [[100, "外径", 10, 20]])
+        index = get_measure_spec_index(tmp_dir)
+        for name in ("a.xlsx", "b.xlsx"):
+            exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, name), part_no="P1")
+            exporter.append_with_text([(15.0, "十五", "15")])
+            assert exporter.finalize_excel_file()
+        assert index.parses == 1
+
+
+if __name__ == "__main__":
+    test_templates_dir_has_priority()
+    test_parse_and_cache()
+    test_sidecar_survives_restart()
+    test_exporter_uses_shared_index()
+    print("✅ 测量规范索引测试全部通过")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨会话测量数据库测试
+验证finalize时幂等入库、按零件号/批次号/检验员/标准序号/时间查询走索引、以及历史报告并行导入
+"""
+
+import sys
+import os
+import json
+import tempfile
+import contextlib
+import io
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config_loader import config
+from utils.measurement_store import MeasurementStore, get_measurement_store, import_reports, main
+from excel_utils import ExcelExporterEnhanced
+
+
+def _record_session(directory, part_no, batch_no, inspector, values, standard_id=100, stamp="20250101_080000"):
+    """录一个会话并finalize，返回导出器"""
+    exporter = ExcelExporterEnhanced(
+        filename=os.path.join(directory, f"Report_{part_no}_{batch_no}_{stamp}.xlsx"),
+        part_no=part_no, batch_no=batch_no, inspector=inspector)
+    exporter.current_standard_id = standard_id
+    exporter.append_with_text([(value, str(value), str(value)) for value in values])
+    assert exporter.finalize_excel_file()
+    return exporter
+
+
+def test_finalize_upserts_session():
+    """finalize后写入报告目录下的measurements.db，重复finalize不产生重复记录"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exporter = _record_session(tmp_dir, "P1", "B1", "张三", [1.5, 2.5, "OK"])
+        store = get_measurement_store(os.path.join(tmp_dir, "measurements.db"))
+        rows = store.query(part_no="P1")
+        assert [(row["voice_id"], row["standard_id"], row["value"], row["text_value"]) for row in rows] == \
+            [(1, 100, 1.5, None), (2, 100, 2.5, None), (3, 100, None, "OK")]
+        assert rows[0]["inspector"] == "张三" and rows[0]["session"] == "Report_P1_B1_20250101_080000"
+
+        exporter._pending_formatting = True
+        assert exporter.finalize_excel_file()
+        assert store.count(part_no="P1") == 3
+        store.close()
+
+
+def test_query_filters_use_indexes():
+    """各类过滤条件的结果正确且查询计划走索引"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = MeasurementStore(os.path.join(tmp_dir, "measurements.db"))
+        rows = []
+        for i in range(40):
+            rows.append({"session": f"S{i // 10}", "part_no": "PA" if i < 20 else "PB", "batch_no": f"B{i // 10}",
+                         "inspector": "张三" if i % 2 else "李四", "voice_id": i, "standard_id": 100 + i % 4 * 100,
+                         "value": float(i), "timestamp": f"2025-01-{1 + i // 10:02d} 08:00:{i:02d}"})
+        assert store.upsert_measurements(rows) == 40
+
+        assert store.count(part_no="PA", standard_id=200) == 5
+        assert store.count(batch_no="B3") == 10
+        assert store.count(inspector="张三", since="2025-01-02", until="2025-01-04") == 10
+        assert [row["voice_id"] for row in store.query(part_no="PB", standard_id=100, limit=2)] == [20, 24]
+        assert sorted(store.numeric_values(part_no="PA", standard_id=200)) == [(200, float(i)) for i in (1, 5, 9, 13, 17)]
+
+        for filters in ({"part_no": "PA", "standard_id": 200, "since": "2025-01-02"},
+                        {"part_no": "PA", "batch_no": "B1", "standard_id": 200},
+                        {"batch_no": "B3"},
+                        {"inspector": "张三", "since": "2025-01-02"},
+                        {"since": "2025-01-03"}):
+            assert "USING INDEX" in store.explain(**filters), filters
+        store.close()
+
+
+def test_import_reports_backfill():
+    """未入库的历史报告可并行导入，未变化的报告第二次导入时跳过"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store_config = config._config.setdefault("excel", {}).setdefault("store", {})
+        original = store_config.get("enabled", True)
+        store_config["enabled"] = False
+        try:
+            _record_session(tmp_dir, "P1", "B1", "张三", [1.0, 2.0], stamp="20250101_080000")
+            _record_session(tmp_dir, "P1", "B2", "李四", [3.0], standard_id=200, stamp="20250102_080000")
+        finally:
+            store_config["enabled"] = original
+        assert not os.path.exists(os.path.join(tmp_dir, "measurements.db"))
+
+        db_path = os.path.join(tmp_dir, "imported.db")
+        store = MeasurementStore(db_path)
+        stats = import_reports(tmp_dir, store, workers=2)
+        assert (stats["reports"], stats["measurements"], stats["failed"]) == (2, 3, 0)
+        assert [(row["batch_no"], row["inspector"], row["value"]) for row in store.query(part_no="P1")] == \
+            [("B1", "张三", 1.0), ("B1", "张三", 2.0), ("B2", "李四", 3.0)]
+        assert import_reports(tmp_dir, store, workers=2)["skipped"] == 2
+        store.close()
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert main(["query", "--db", db_path, "--batch", "B2", "--format", "json"]) == 0
+        assert [row["standard_id"] for row in json.loads(output.getvalue())] == [200]
+
+
+if __name__ == "__main__":
+    test_finalize_upserts_session()
+    test_query_filters_use_indexes()
+    test_import_reports_backfill()
+    print("✅ 跨会话测量数据库测试全部通过")
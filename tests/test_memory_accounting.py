@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存统计测试
+验证大小估算（抽样外推、numpy数组、共享对象）、子系统报告、增长告警（翻倍再告警、有界deque）、
+tracemalloc差异和指标导出
+"""
+
+import sys
+import os
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.memory_accounting import MB, MemoryTracker, deep_sizeof
+from utils.metrics_endpoint import MetricsRegistry, memory_collector
+
+
+def make_results(count: int) -> list:
+    return [{"original": f"第{i}个", "processed": str(i), "numbers": [float(i)]} for i in range(count)]
+
+
+def test_deep_sizeof():
+    """抽样估算与逐个统计接近；numpy数组按数据大小；共享对象只计一次"""
+    results = make_results(20000)
+    exact = deep_sizeof(results, sample_items=10 ** 9)
+    sampled = deep_sizeof(results, sample_items=500)
+    assert abs(sampled - exact) / exact < 0.05
+
+    audio = np.zeros(16000, dtype=np.float32)
+    assert 64000 <= deep_sizeof(audio) < 64000 + 200
+    assert deep_sizeof([audio, audio]) < deep_sizeof([audio, audio.copy()])
+
+
+def test_report_and_alerts():
+    """报告各子系统；超过阈值告警一次，翻倍后再告警；降回后重置；有界deque不按条数告警"""
+    tracker = MemoryTracker(warn_items=100, warn_mb=0)
+    results = make_results(50)
+    history = deque(maxlen=100)
+    tracker.track("results_buffer", lambda: results)
+    tracker.track("history", lambda: history)
+    tracker.track("missing", lambda: None)
+    tracker.track("broken", lambda: 1 / 0)
+    messages = []
+    tracker.add_alert_callback(lambda message, alert: messages.append((alert["subsystem"], alert["threshold"])))
+
+    report = tracker.report()
+    assert set(report) >= {"results_buffer", "history"} and "missing" not in report and "broken" not in report
+    assert report["results_buffer"]["items"] == 50 and report["results_buffer"]["bytes"] > 50 * 100
+    assert not tracker.check()
+
+    results.extend(make_results(60))
+    history.extend(range(100))
+    assert [alert["kind"] for alert in tracker.check()] == ["items"]
+    assert not tracker.check()  # 未翻倍，不重复告警
+    results.extend(make_results(100))
+    tracker.check()
+    del results[10:]
+    tracker.check()
+    results.extend(make_results(100))
+    tracker.check()
+    assert messages == [("results_buffer", 100), ("results_buffer", 200), ("results_buffer", 100)]
+    assert tracker.alert_counts == {"results_buffer": 3}
+
+    # 按大小告警
+    big = MemoryTracker(warn_items=0, warn_mb=0.5)
+    arrays = [np.zeros(100000)]  # 0.8MB
+    big.track("audio", lambda: arrays)
+    assert [alert["kind"] for alert in big.check()] == ["bytes"]
+    assert big.check() == []
+
+    lines = tracker.format_report()
+    assert lines[0].startswith("🧠 内存占用") and any("results_buffer" in line for line in lines)
+
+    registry = MetricsRegistry()
+    registry.register("memory", memory_collector(tracker))
+    text = registry.render()
+    assert 'voice_memory_subsystem_items{subsystem="results_buffer"} 110' in text
+    assert 'voice_memory_growth_alerts_total{subsystem="results_buffer"} 3' in text
+    assert 'voice_memory_subsystem_bytes{subsystem="history"}' in text
+
+
+def test_tracemalloc_diff():
+    """tracemalloc差异指出增长的代码行"""
+    was_tracing = tracemalloc.is_tracing()
+    tracker = MemoryTracker()
+    tracker.start_tracemalloc(frames=1)
+    try:
+        leak = [bytearray(1024) for _ in range(2000)]  # 约2MB
+        diff = tracker.tracemalloc_diff(top_n=3)
+        assert diff and "test_memory_accounting.py" in diff[0]["location"]
+        assert diff[0]["size_diff"] > 1.5 * MB and diff[0]["count_diff"] >= 2000
+        assert any("tracemalloc" in line for line in tracker.format_report())
+        del leak
+    finally:
+        if not was_tracing:
+            tracker.stop_tracemalloc()
+
+
+if __name__ == "__main__":
+    test_deep_sizeof()
+    test_report_and_alerts()
+    test_tracemalloc_diff()
+    print("✅ 内存统计测试全部通过")
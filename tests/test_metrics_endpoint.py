@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地指标导出测试
+用本机HTTP客户端采集 /metrics，验证识别器计数、实时率、每分钟识别数、系统状态、步骤与语音段耗时直方图、
+队列深度、进程内存，以及指标文件的原子重写
+"""
+
+import sys
+import os
+import tempfile
+import urllib.request
+import urllib.error
+from enum import Enum
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.latency_histogram import LatencyHistogram
+from utils.metrics_endpoint import (
+    CONTENT_TYPE, MetricsFileWriter, MetricsRegistry, MetricsServer, latency_collector,
+    performance_collector, process_collector, recognizer_collector, state_collector
+)
+from utils.performance_monitor import FastStep, PerformanceMonitor
+from utils.production_latency_logger import ProductionLatencyLogger
+
+
+class FakeRecognizer:
+    """只有 stats 字典和初始化标志的识别器"""
+
+    def __init__(self):
+        self._is_initialized = True
+        self._model_loaded = True
+        self.stats = {
+            'total_recognitions': 0,
+            'successful_recognitions': 0,
+            'total_audio_time': 0.0,
+            'total_processing_time': 0.0,
+            'average_confidence': 0.0,
+            'audio_chunks': 0,
+            'audio_overflows': 0,
+            'audio_read_errors': 0
+        }
+
+
+class State(Enum):
+    STOPPED = "stopped"
+    RUNNING = "running"
+
+
+def parse_samples(text):
+    """{'名称{标签}': 值}（跳过注释行）"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, value = line.rsplit(" ", 1)
+            samples[key] = float(value)
+    return samples
+
+
+def build_registry():
+    monitor = PerformanceMonitor(raw_records=False)
+    latency = ProductionLatencyLogger()
+    latency.utterance_log_enabled = False
+    recognizer = FakeRecognizer()
+    state = {"value": State.STOPPED}
+
+    registry = MetricsRegistry()
+    registry.register("process", process_collector(registry))
+    registry.register("performance", performance_collector(monitor))
+    registry.register("latency", latency_collector(latency))
+    registry.register("recognizer", recognizer_collector(recognizer))
+    registry.register("system", state_collector("system_state", lambda: state["value"], list(State)))
+    return registry, monitor, latency, recognizer, state
+
+
+def test_scrape_over_http():
+    """启动本机端点（端口0），用urllib采集并检查各类指标"""
+    registry, monitor, latency, recognizer, state = build_registry()
+    server = MetricsServer(registry, "127.0.0.1", 0).start()
+    host, port = server.address
+    url = f"http://{host}:{port}/metrics"
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            first = parse_samples(response.read().decode("utf-8"))
+        assert first["voice_recognitions_per_minute"] == 0
+        assert first['voice_system_state{state="stopped"}'] == 1
+        assert first["voice_process_resident_memory_bytes"] > 0
+
+        # 模拟运行：识别器计数、步骤耗时、队列深度、FastStep样本、语音段
+        state["value"] = State.RUNNING
+        recognizer.stats.update(total_recognitions=3, successful_recognitions=3, total_audio_time=6.0,
+                                total_processing_time=1.5, audio_chunks=480, audio_overflows=2)
+        monitor.end_timer(monitor.start_timer("Excel写入"))
+        monitor.record_gauge("Excel写入队列深度", 4)
+        with FastStep("音频输入", monitor=monitor):
+            pass
+        utterance_id = latency.begin_utterance()
+        for stage in ("speech_end", "asr_start", "asr_end", "excel_written"):
+            latency.mark_utterance(utterance_id, stage)
+        latency.finish_utterance(utterance_id)
+
+        with urllib.request.urlopen(url, timeout=5) as response:
+            text = response.read().decode("utf-8")
+        samples = parse_samples(text)
+
+        # 其他路径返回404
+        try:
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+            assert False, "未知路径应返回404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.stop()
+        monitor.stop_aggregator()
+
+    assert samples['voice_system_state{state="running"}'] == 1
+    assert samples['voice_system_state{state="stopped"}'] == 0
+    assert samples["voice_recognizer_initialized"] == 1
+    assert samples["voice_recognitions_total"] == 3
+    assert samples["voice_real_time_factor"] == 0.25
+    assert samples["voice_recognitions_per_minute"] > 0
+    assert samples["voice_audio_chunks_total"] == 480
+    assert samples["voice_audio_overflows_total"] == 2
+    assert samples["voice_perf_dropped_samples_total"] == 0
+    assert samples['voice_gauge_last{name="Excel写入队列深度"}'] == 4
+    assert samples['voice_step_duration_seconds_count{step="Excel写入"}'] == 1
+    assert samples['voice_step_duration_seconds_bucket{step="Excel写入",le="+Inf"}'] == 1
+    assert samples['voice_step_duration_seconds_count{step="音频输入"}'] == 1
+    assert samples['voice_utterance_stage_seconds_count{stage="asr_start→asr_end"}'] == 1
+    assert samples["voice_utterance_e2e_seconds_count"] == 1
+    assert samples['voice_utterances_total{outcome="row"}'] == 1
+    # 每个指标只有一组HELP/TYPE
+    type_lines = [line for line in text.splitlines() if line.startswith("# TYPE")]
+    assert len(type_lines) == len(set(type_lines))
+    assert "# TYPE voice_step_duration_seconds histogram" in type_lines
+
+
+def test_histogram_buckets_cumulative():
+    """le桶单调递增，与对数分桶直方图的计数一致"""
+    histogram = LatencyHistogram()
+    for seconds in (0.0002, 0.003, 0.003, 0.04, 0.6, 20.0):
+        histogram.record(seconds)
+    counts = histogram.cumulative_counts([int(bound * 1e9) for bound in (0.001, 0.005, 0.05, 1.0, 10.0)])
+    assert counts == [1, 3, 4, 5, 5]
+    assert histogram.copy().summary() == histogram.summary()
+
+
+def test_failing_collector_and_file_writer():
+    """出错的来源不影响其他来源，失败次数累计；指标文件原子重写"""
+    registry = MetricsRegistry()
+    registry.register("process", process_collector(registry))
+
+    def broken(writer):
+        raise RuntimeError("boom")
+
+    registry.register("broken", broken)
+    samples = parse_samples(registry.render())
+    assert samples['voice_metrics_collector_errors_total{collector="broken"}'] == 1
+    assert "voice_process_uptime_seconds" in samples
+    samples = parse_samples(registry.render())
+    assert samples['voice_metrics_collector_errors_total{collector="broken"}'] == 2
+
+    # 来源恢复正常后计数保持不变（计数器不回退）
+    registry.register("broken", lambda writer: None)
+    samples = parse_samples(registry.render())
+    assert samples['voice_metrics_collector_errors_total{collector="broken"}'] == 2
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "metrics", "voice.prom")
+        writer = MetricsFileWriter(registry, path, interval=60)
+        writer.write()
+        with open(path, encoding="utf-8") as f:
+            assert "voice_process_threads" in f.read()
+        assert os.listdir(os.path.dirname(path)) == ["voice.prom"]
+
+
+if __name__ == "__main__":
+    test_scrape_over_http()
+    test_histogram_buckets_cumulative()
+    test_failing_collector_and_file_writer()
+    print("✅ 本地指标导出测试全部通过")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多值语句测试
+验证一句话中多个测量值的切分、提取，以及严格验证规则在多值模式下仍然成立
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_processor import TextProcessor, VoiceCommandProcessor
+
+
+def test_split_measurement_segments():
+    """显式分隔符切分"""
+    processor = TextProcessor()
+
+    assert processor.split_measurement_segments("十二点五、十二点六、十二点四") == ["十二点五", "十二点六", "十二点四"]
+    assert processor.split_measurement_segments("十 二 点 五 然后 十 二 点 六") == ["十 二 点 五", "十 二 点 六"]
+    # 多余分隔符不产生空片段
+    assert processor.split_measurement_segments("、十二点五，，") == ["十二点五"]
+    # 自定义分隔符
+    assert processor.split_measurement_segments("五十 再来 六十", separators=["再来"]) == ["五十", "六十"]
+    assert processor.split_measurement_segments("") == []
+
+
+def test_extract_multiple_numbers_in_order():
+    """按语序提取多个测量值"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+
+    cases = [
+        ("十二点五、十二点六、十二点四", [12.5, 12.6, 12.4]),
+        ("十 二 点 五 然后 十 二 点 六 然后 十 二 点 四", [12.5, 12.6, 12.4]),
+        # 每个片段是独立读数：纯数字的100倍数可以提取
+        ("二百、三百", [200.0, 300.0]),
+        # 文本上下文中的100倍数仍然被跳过
+        ("长度二百、五十", [50.0]),
+        # 没有识别器子片段时，原始文本中的空格也是读数之间的分隔
+        ("十二点五 十二点六 十二点四", [12.5, 12.6, 12.4]),
+        ("12.5 12.6 12.4", [12.5, 12.6, 12.4]),
+        ("12.5、12.6 12.4", [12.5, 12.6, 12.4]),
+        # 逐字带空格的单个读数整体有效，不按空格拆开
+        ("三 十 七 点 五", [37.5]),
+    ]
+    for text, expected in cases:
+        result = processor.extract_multiple_numbers(text, command_processor)
+        print(f"'{text}' -> {result}")
+        assert result == expected
+
+
+def test_pause_segments_from_vad():
+    """识别器按停顿切分的子片段优先于文本分隔符"""
+    processor = TextProcessor()
+    segments = ["十 二 点 五", "十 二 点 六", "十 二 点 四"]
+
+    result = processor.extract_multiple_numbers(" ".join(segments), segments=segments)
+    assert result == [12.5, 12.6, 12.4]
+
+
+def test_strict_validation_still_holds():
+    """单片段时与extract_numbers完全一致（test_strict_validation.py中的保证）"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+
+    strict_cases = [
+        ("200", [200.0]),
+        ("1300", [1300.0]),
+        ("吃饭200", []),
+        ("价格为300元", []),
+        ("50", [50.0]),
+        ("价格200长度50", [50.0]),
+        ("切换到200", []),
+        ("二百", [200.0]),
+        ("长度二百", []),
+    ]
+    for text, expected in strict_cases:
+        assert processor.extract_multiple_numbers(text, command_processor) == expected
+        # 命令仍不会被当作测量值
+        assert processor.extract_multiple_numbers(f"十二点五、{text}", command_processor) == [12.5] + expected
+
+
+def test_multi_values_written_as_consecutive_rows():
+    """多个测量值通过一次append_with_text写入连续的行"""
+    from excel_utils import ExcelExporterEnhanced
+
+    processor = TextProcessor()
+    text = "十二点五、十二点六、十二点四"
+    numbers = processor.extract_multiple_numbers(text)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        exporter = ExcelExporterEnhanced(filename=os.path.join(temp_dir, "multi_value.xlsx"))
+        result = exporter.append_with_text([(num, text, text) for num in numbers])
+
+        assert [record[1] for record in result] == [12.5, 12.6, 12.4]
+        record_ids = [record[0] for record in result]
+        assert record_ids == list(range(record_ids[0], record_ids[0] + 3))
+        rows = [exporter.voice_id_to_row[record_id] for record_id in record_ids]
+        assert rows == list(range(rows[0], rows[0] + 3))
+
+
+if __name__ == "__main__":
+    test_split_measurement_segments()
+    test_extract_multiple_numbers_in_order()
+    test_pause_segments_from_vad()
+    test_strict_validation_still_holds()
+    test_multi_values_written_as_consecutive_rows()
+    print("✅ 多值语句测试全部通过")
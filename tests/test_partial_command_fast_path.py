@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部分结果命令快速通道测试
+验证命令在连续K个部分结果稳定后触发、每句只触发一次、最终结果重复命令被抑制
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_processor import VoiceCommandProcessor, PartialCommandTracker
+
+COMMANDS = {
+    "pause": ["暂停", "暂停录音", "暂停一下"],
+    "resume": ["继续", "恢复"],
+    "stop": ["停止", "停止录音", "结束"],
+}
+
+
+def _tracker(stable_count=2):
+    return PartialCommandTracker(VoiceCommandProcessor(), COMMANDS, stable_count=stable_count)
+
+
+def test_fires_after_stable_partials():
+    """连续K个部分结果匹配同一命令才触发"""
+    tracker = _tracker(stable_count=2)
+
+    assert tracker.feed_partial("停") is None
+    assert tracker.feed_partial("停止") is None
+    assert tracker.feed_partial("停止") == "stop"
+    # 本句已触发，不再重复触发
+    assert tracker.feed_partial("停止") is None
+    assert tracker.fired_command == "stop"
+
+
+def test_unstable_partials_reset_streak():
+    """识别抖动打断连续计数"""
+    tracker = _tracker(stable_count=2)
+
+    assert tracker.feed_partial("暂停") is None
+    assert tracker.feed_partial("挺直") is None
+    assert tracker.feed_partial("暂停") is None
+    assert tracker.feed_partial("暂停") == "pause"
+
+
+def test_final_duplicate_suppressed():
+    """最终结果与已触发命令相同时抑制，并重置状态"""
+    tracker = _tracker(stable_count=1)
+
+    assert tracker.feed_partial("继续") == "resume"
+    assert tracker.consume_final("resume") is True
+    assert tracker.fired_command is None
+
+    # 未触发时最终结果正常处理
+    assert tracker.consume_final("resume") is False
+    assert tracker.consume_final(None) is False
+
+
+def test_reset_after_empty_final():
+    """已触发后最终结果为空（或语音段被丢弃）：重置后下一句正常触发，最终结果不被误抑制"""
+    tracker = _tracker(stable_count=1)
+
+    assert tracker.feed_partial("停止") == "stop"
+    # 空的最终结果不会调用consume_final，由识别结果回调统一重置
+    tracker.reset()
+    assert tracker.fired_command is None
+
+    # 下一句的快速通道未被禁用
+    assert tracker.feed_partial("暂停") == "pause"
+    tracker.reset()
+    # 下一句没有部分结果时，最终结果的同名命令不被抑制
+    assert tracker.consume_final("stop") is False
+
+
+def test_measurements_never_fire():
+    """测量值和标准序号命令不走快速通道"""
+    tracker = _tracker(stable_count=1)
+
+    for text in ["十二", "十二点五", "十二点五", "切换到二百", "200"]:
+        assert tracker.feed_partial(text) is None
+
+
+def test_recorded_fixtures_latency():
+    """回放命令时间线：命令全部提前触发、无误触发、最终结果被抑制"""
+    from benchmarks.bench_command_fast_path import run
+
+    rows, summary = run(stable_count=2)
+    for fixture, result in rows:
+        assert result["fired"] == fixture["expected_command"], fixture["name"]
+        if fixture["expected_command"]:
+            assert result["suppressed"], fixture["name"]
+            assert result["fast_latency"] < result["final_latency"], fixture["name"]
+
+    assert summary["false_fires"] == 0
+    assert summary["after_mean"] < summary["before_mean"]
+
+
+if __name__ == "__main__":
+    test_fires_after_stable_partials()
+    test_unstable_partials_reset_streak()
+    test_final_duplicate_suppressed()
+    test_reset_after_empty_final()
+    test_measurements_never_fire()
+    test_recorded_fixtures_latency()
+    print("✅ 部分结果命令快速通道测试全部通过")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能监控直方图测试
+验证对数分桶直方图的百分位精度、合并，以及PerformanceMonitor默认只保留直方图、原始记录为可选模式
+"""
+
+import sys
+import os
+import random
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.latency_histogram import LatencyHistogram
+from utils.performance_monitor import PerformanceMonitor, PerformanceStep, performance_monitor
+
+
+def test_histogram_accuracy():
+    """百分位相对误差小于1%，最小/最大/总和精确"""
+    rng = random.Random(7)
+    values = [rng.lognormvariate(-4.5, 0.8) for _ in range(50000)] + [3.5, 0.0]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    quantiles = statistics.quantiles(values, n=100)
+    for percent in (50, 95, 99):
+        expected = quantiles[percent - 1]
+        assert abs(histogram.percentile(percent) - expected) / expected < 0.01, percent
+    assert histogram.count == len(values)
+    assert histogram.min_ns == 0 and histogram.max_ns == 3_500_000_000
+    assert histogram.percentile(100) == 3.5
+    assert abs(histogram.mean - statistics.fmean(values)) < 1e-6
+
+    # 超过可追踪范围的耗时计入最高桶，最大值仍精确
+    histogram.record(10 * 3600)
+    assert histogram.max_ns == 10 * 3600 * 10 ** 9
+
+
+def test_histogram_merge():
+    """合并后与直接记录全部数据一致"""
+    left, right, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for index in range(1, 2001):
+        (left if index % 2 else right).record_ns(index * 1000)
+        combined.record_ns(index * 1000)
+    left.merge(right)
+    assert left.summary() == combined.summary()
+    assert left.nonzero_buckets() == combined.nonzero_buckets()
+
+    left.reset()
+    assert left.count == 0 and left.percentile(99) == 0.0
+
+
+def test_monitor_histogram_only():
+    """默认不保留原始记录，汇总与报告来自直方图"""
+    monitor = PerformanceMonitor(raw_records=False)
+    for index in range(500):
+        monitor.end_timer(monitor.start_timer("音频处理", {"chunk": index}))
+    assert monitor.get_records_by_step("音频处理") == []
+
+    summary = monitor.get_summary_by_step("音频处理")
+    assert summary.total_count == 500
+    assert summary.min_duration <= summary.median_duration <= summary.p95_duration <= summary.p99_duration
+    assert summary.p99_duration <= summary.max_duration
+    assert monitor.total_count() == 500
+    assert "音频处理" in monitor.export_performance_report()
+
+    monitor.clear_records()
+    assert monitor.get_summary_by_step("音频处理") is None
+    assert monitor.export_performance_report() == "暂无性能数据"
+
+
+def test_monitor_raw_records_optional():
+    """原始记录模式保留元数据，且数量有上限"""
+    monitor = PerformanceMonitor(raw_records=True, max_raw_records=100)
+    for index in range(150):
+        monitor.end_timer(monitor.start_timer("Excel写入", {"index": index}), {"rows": 1})
+    records = monitor.get_records_by_step("Excel写入")
+    assert len(records) == 100
+    assert records[0].metadata == {"index": 50, "rows": 1}
+    assert monitor.get_summary_by_step("Excel写入").total_count == 150
+
+    monitor.set_raw_records(False)
+    monitor.end_timer(monitor.start_timer("Excel写入"))
+    assert len(monitor.get_records_by_step("Excel写入")) == 100
+
+
+def test_performance_step_context():
+    """上下文管理器仍记录到全局监控器"""
+    performance_monitor.clear_records()
+    with PerformanceStep("结果处理", {"text_length": 3}):
+        pass
+    assert performance_monitor.get_summary_by_step("结果处理").total_count == 1
+    performance_monitor.clear_records()
+
+
+if __name__ == "__main__":
+    test_histogram_accuracy()
+    test_histogram_merge()
+    test_monitor_histogram_only()
+    test_monitor_raw_records_optional()
+    test_performance_step_context()
+    print("✅ 性能监控直方图测试全部通过")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化识别事件日志测试
+验证事件合并与空字段省略、后台写入、按天分文件和压缩、流式查询过滤与跨天统计、命令行
+"""
+
+import sys
+import os
+import io
+import gzip
+import json
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.recognition_events import RecognitionEventLog, aggregate, event_matches, iter_events, main
+
+
+def day_ts(days_ago: int, hour: int = 10) -> float:
+    return (datetime.now() - timedelta(days=days_ago)).replace(hour=hour, minute=0, second=0).timestamp()
+
+
+def test_record_and_rotate():
+    """事件写入当天文件；跨天后前一天的文件压缩；过期文件删除；写了一半的行被跳过"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = RecognitionEventLog(log_dir=tmp_dir, enabled=True, batch_size=10, flush_interval=0.05,
+                                  compress=True, keep_days=30)
+        entry = {"type": "utterance", "session": "S1", "utt": 7, "ts": day_ts(1), "outcome": "row",
+                 "hops_ms": {"speech_start": 0.0, "speech_end": 800.0, "excel_written": 1050.0}, "e2e_ms": 250.0}
+        assert log.record_utterance(entry, {"raw": "一百二十三点五", "text": "123.5", "numbers": [123.5],
+                                            "standard_id": 300, "records": [17], "judgments": ["OK"],
+                                            "command": None, "special": None, "asr_ms": 180.0})
+        assert log.flush(timeout=5)
+        yesterday = datetime.fromtimestamp(day_ts(1)).strftime("%Y%m%d")
+        with open(os.path.join(tmp_dir, f"recognition_{yesterday}.jsonl"), encoding="utf-8") as f:
+            event = json.loads(f.readline())
+        assert event["utt"] == 7 and event["numbers"] == [123.5] and event["e2e_ms"] == 250.0
+        assert "command" not in event and "special" not in event and event["hops_ms"]["excel_written"] == 1050.0
+
+        # 过期文件
+        expired = os.path.join(tmp_dir, f"recognition_{(datetime.now() - timedelta(days=40)):%Y%m%d}.jsonl.gz")
+        with gzip.open(expired, "wt", encoding="utf-8") as f:
+            f.write("{}\n")
+
+        # 写到今天：昨天的文件压缩，过期文件删除
+        log.record({"raw": "暂停", "text": "暂停", "command": "pause", "outcome": "command", "ts": day_ts(0)})
+        log.record({"raw": "一", "text": "1", "numbers": [1.0], "outcome": "row", "ts": day_ts(0, 11)})
+        assert log.close()
+        today = datetime.now().strftime("%Y%m%d")
+        assert sorted(os.listdir(tmp_dir)) == [f"recognition_{yesterday}.jsonl.gz", f"recognition_{today}.jsonl"]
+
+        # 跨天后又写入前一天的事件：今天的文件不压缩，前一天的追加为新的gzip成员
+        late = RecognitionEventLog(log_dir=tmp_dir, enabled=True, compress=True, keep_days=30)
+        late._write_batch([{"raw": "二", "outcome": "text", "ts": day_ts(1, 23)}])
+        late._write_batch([{"raw": "三", "outcome": "text", "ts": day_ts(0, 12)}])
+        late.close()
+        assert sorted(os.listdir(tmp_dir)) == [f"recognition_{yesterday}.jsonl.gz", f"recognition_{today}.jsonl"]
+        with open(os.path.join(tmp_dir, f"recognition_{today}.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"raw":"写了一')  # 崩溃时写了一半的行
+
+        events = list(iter_events(tmp_dir))
+        assert [event["raw"] for event in events] == ["一百二十三点五", "二", "暂停", "一", "三"]
+        assert [event["raw"] for event in iter_events(tmp_dir, since=datetime.now().strftime("%Y-%m-%d"))] == \
+            ["暂停", "一", "三"]
+
+        assert not RecognitionEventLog(log_dir=tmp_dir, enabled=False).record({"raw": "x"})
+
+
+def test_filters_and_aggregate():
+    """过滤条件与分组统计"""
+    events = [
+        {"ts": day_ts(2), "outcome": "row", "raw": "一", "numbers": [1.0], "records": [1], "judgments": ["OK"],
+         "standard_id": 100, "e2e_ms": 200.0},
+        {"ts": day_ts(2), "outcome": "row", "raw": "九", "numbers": [9.0], "records": [2], "judgments": ["NOK"],
+         "standard_id": 100, "e2e_ms": 1500.0},
+        {"ts": day_ts(1), "outcome": "command", "raw": "切换三百", "command": "standard_id", "standard_id": 300},
+        {"ts": day_ts(1), "outcome": "row", "raw": "二三", "numbers": [2.0, 3.0], "records": [3, 4],
+         "judgments": ["OK", "NOK"], "standard_id": 300, "e2e_ms": 400.0},
+    ]
+    assert [e["raw"] for e in events if event_matches(e, judgment="NOK")] == ["九", "二三"]
+    assert [e["raw"] for e in events if event_matches(e, standard_id=100, min_latency_ms=1000)] == ["九"]
+    assert [e["raw"] for e in events if event_matches(e, command="standard_id")] == ["切换三百"]
+    assert [e["raw"] for e in events if event_matches(e, text="三")] == ["切换三百", "二三"]
+
+    by_day = aggregate(events, "day")
+    first, second = by_day.values()
+    assert first["events"] == 2 and first["numbers"] == 2 and first["e2e_ms"]["count"] == 2
+    assert second["outcomes"] == {"command": 1, "row": 1} and second["records"] == 2
+    by_judgment = aggregate(events, "judgment")
+    assert {key: group["events"] for key, group in by_judgment.items()} == {"-": 1, "NOK": 2, "OK": 2}
+
+
+def test_cli():
+    """命令行 query / stats 读取压缩与未压缩文件"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log = RecognitionEventLog(log_dir=tmp_dir, enabled=True, compress=True, keep_days=0)
+        log._write_batch([{"ts": day_ts(3), "outcome": "row", "raw": "五", "numbers": [5.0], "e2e_ms": 300.0,
+                           "standard_id": 200}])
+        log._write_batch([{"ts": day_ts(0), "outcome": "row", "raw": "六", "numbers": [6.0], "e2e_ms": 600.0,
+                           "standard_id": 200},
+                          {"ts": day_ts(0), "outcome": "text", "raw": "你好"}])
+        log.close()
+        assert any(name.endswith(".gz") for name in os.listdir(tmp_dir))
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert main(["query", "--dir", tmp_dir, "--outcome", "row"]) == 0
+        assert [json.loads(line)["raw"] for line in output.getvalue().splitlines()] == ["五", "六"]
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert main(["stats", "--dir", tmp_dir, "--by", "standard_id", "--json"]) == 0
+        stats = json.loads(output.getvalue())
+        assert stats["200"]["events"] == 2 and stats["-"]["outcomes"] == {"text": 1}
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            assert main(["query", "--dir", tmp_dir, "--count", "--min-latency", "500"]) == 0
+        assert output.getvalue().strip() == "1"
+
+
+if __name__ == "__main__":
+    test_record_and_rotate()
+    test_filters_and_aggregate()
+    test_cli()
+    print("✅ 结构化识别事件日志测试全部通过")
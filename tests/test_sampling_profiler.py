@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采样性能分析器测试
+验证各线程调用栈被采样、折叠栈与speedscope输出格式、开关与重复开始
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sampling_profiler import SamplingProfiler
+
+
+def busy_leaf(seconds: float) -> int:
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        busy_leaf(0.01)
+
+
+def test_samples_threads_and_outputs():
+    """工作线程的调用栈出现在折叠栈和speedscope中，采样线程自身不出现"""
+    profiler = SamplingProfiler(hz=200)
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="识别线程")
+    worker.start()
+    assert profiler.start()
+    assert not profiler.start()  # 运行中不重复开始
+    time.sleep(0.4)
+    stop.set()
+    worker.join()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        profiler.output_dir = tmp_dir
+        paths = profiler.stop()
+        assert not profiler.running and profiler.samples > 10
+        assert sorted(os.path.basename(path).split(".", 1)[1] for path in paths.values()) == \
+            ["collapsed", "speedscope.json"]
+
+        with open(paths["collapsed"], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        with open(paths["speedscope"], encoding="utf-8") as f:
+            speedscope = json.load(f)
+
+    worker_lines = [line for line in lines if line.startswith("识别线程;")]
+    assert worker_lines and not any(line.startswith("SamplingProfiler;") for line in lines)
+    assert any("busy_worker (test_sampling_profiler.py:" in line and "busy_leaf" in line for line in worker_lines)
+    stack, count = worker_lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and stack.split(";")[1].startswith("_bootstrap ")
+
+    profiles = {profile["name"]: profile for profile in speedscope["profiles"]}
+    assert "识别线程" in profiles and speedscope["$schema"].endswith("file-format-schema.json")
+    profile = profiles["识别线程"]
+    assert profile["type"] == "sampled" and len(profile["samples"]) == len(profile["weights"])
+    frame_names = {frame["name"] for frame in speedscope["shared"]["frames"]}
+    assert {"busy_worker", "busy_leaf"} <= frame_names
+    assert profiler.thread_totals()["识别线程"] == sum(round(w * 200) for w in profile["weights"])
+
+
+def test_toggle():
+    """toggle: 第一次开始，第二次停止；没有采样时不输出文件"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        profiler = SamplingProfiler(hz=50, output_dir=tmp_dir)
+        assert profiler.toggle() is None and profiler.running
+        time.sleep(0.1)
+        paths = profiler.toggle()
+        assert not profiler.running and paths and os.path.exists(paths["collapsed"])
+        assert profiler.stop() is None  # 已停止
+
+
+if __name__ == "__main__":
+    test_samples_threads_and_outputs()
+    test_toggle()
+    print("✅ 采样性能分析器测试全部通过")
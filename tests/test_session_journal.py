@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话日志测试
+验证录音阶段只追加写日志、finalize时一次性生成xlsx、以及异常退出后的恢复
+"""
+
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from utils.session_journal import SessionJournal
+from excel_utils import ExcelExporterEnhanced, recover_unfinished_sessions
+
+
+def _data_rows(path):
+    """读取第5行起的数据行 (标准序号, 测量值, 语音录入编号)"""
+    workbook = load_workbook(path)
+    worksheet = workbook.active
+    rows = [(row[0], row[5], row[9]) for row in worksheet.iter_rows(min_row=5, values_only=True)
+            if row[9] is not None]
+    workbook.close()
+    return rows
+
+
+def test_journal_append_and_load():
+    """日志追加、读取，崩溃时写了一半的最后一行被跳过"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "a.xlsx.journal.jsonl")
+        journal = SessionJournal(path, fsync_every=2)
+        journal.open({"filename": "a.xlsx", "part_no": "P-1"})
+        journal.append([{"voice_id": 1, "value": 1.5}, {"voice_id": 2, "value": "OK"}])
+        journal.close()
+
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"type":"record","voice_id":3,"val')
+
+        state = SessionJournal.load(path)
+        assert state.metadata["part_no"] == "P-1"
+        assert [r["voice_id"] for r in state.records] == [1, 2]
+        assert state.corrupted_lines == 1
+        assert not state.finalized
+        assert SessionJournal.find_unfinished(tmp_dir) == [path]
+
+        SessionJournal(path).mark_finalized()
+        assert SessionJournal.find_unfinished(tmp_dir) == []
+
+
+def test_recording_does_not_touch_workbook():
+    """录音阶段不写xlsx，finalize后数据完整且日志被清理"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "report.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.use_journal = True
+
+        mtime = None
+        for i, standard_id in enumerate((100, 100, 200)):
+            exporter.current_standard_id = standard_id
+            result = exporter.append_with_text([(10.0 + i, "原文", "处理")])
+            assert result[0][0] == i + 1
+            if mtime is None:
+                mtime = os.path.getmtime(path)
+        assert os.path.getmtime(path) == mtime
+        assert _data_rows(path) == []
+        assert os.path.exists(SessionJournal.path_for(path))
+
+        assert exporter.finalize_excel_file()
+        assert _data_rows(path) == [(100, 10.0, 1), (100, 11.0, 2), (200, 12.0, 3)]
+        assert not os.path.exists(SessionJournal.path_for(path))
+
+
+def test_recover_after_crash():
+    """未finalize的日志在下次启动时恢复为xlsx"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "crashed.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.use_journal = True
+        exporter.append_with_text([(1.25, "一点二五", "1.25"), ("OK", "OK", "OK")])
+        # 模拟异常退出：不调用finalize
+        exporter._journal.close()
+
+        recovered = recover_unfinished_sessions(tmp_dir)
+        assert recovered == [path]
+        assert _data_rows(path) == [(100, 1.25, 1), (100, "OK", 2)]
+        assert SessionJournal.find_unfinished(tmp_dir) == []
+
+
+def test_recover_template_report_in_place():
+    """模板报告异常退出后恢复：在原工作簿上生成，模板中已有的内容不被覆盖"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        ExcelExporterEnhanced(filename=template_path).create_new_file()
+        workbook = load_workbook(template_path)
+        workbook.active.cell(row=5, column=1, value=100)
+        workbook.save(template_path)
+        workbook.close()
+
+        path = os.path.join(tmp_dir, "report.xlsx")
+        exporter = ExcelExporterEnhanced(filename=path)
+        exporter.template_path = template_path
+        assert exporter.create_from_template("P1", "B1", "张三")
+        exporter.use_journal = True
+        exporter.append_with_text([(1.5, "一点五", "1.5")])
+        exporter._journal.close()
+
+        assert recover_unfinished_sessions(tmp_dir) == [path]
+        workbook = load_workbook(path)
+        worksheet = workbook.active
+        assert worksheet["A5"].value == 100
+        assert (worksheet["F6"].value, worksheet["J6"].value) == (1.5, 1)
+        workbook.close()
+
+
+if __name__ == "__main__":
+    test_journal_append_and_load()
+    test_recording_does_not_touch_workbook()
+    test_recover_after_crash()
+    test_recover_template_report_in_place()
+    print("✅ 会话日志测试全部通过")
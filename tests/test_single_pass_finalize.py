@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次遍历finalize测试
+验证新finalize生成的报告与原多次扫描流程内容一致（有/无测量规范、只写模式/模板模式），
+并且边框、居中、条件格式和警告合并单元格都保留
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from benchmarks.bench_excel_finalize import PART_NO, legacy_finalize, record_session, write_measure_spec
+from excel_utils import ExcelExporterEnhanced
+
+
+def _cell_values(path):
+    """全部单元格值（两次录入的时间戳可能跨秒，时间戳列不参与比较）"""
+    workbook = load_workbook(path)
+    rows = [list(row[:8]) + list(row[9:]) for row in workbook.active.iter_rows(values_only=True)]
+    workbook.close()
+    # 去掉末尾的空行
+    while rows and all(value is None for value in rows[-1]):
+        rows.pop()
+    return rows
+
+
+def _finalize_both(tmp_dir, records, template_path=None):
+    """同一会话分别用原流程和新流程生成报告，返回两个文件路径"""
+    paths = []
+    for name, finalize in (("legacy", legacy_finalize), ("single_pass", None)):
+        path = os.path.join(tmp_dir, f"{name}.xlsx")
+        if template_path:
+            shutil.copy2(template_path, path)
+        exporter = record_session(path, records)
+        if template_path:
+            exporter._from_template = True
+        if finalize:
+            finalize(exporter)
+        else:
+            assert exporter.finalize_excel_file()
+        paths.append(path)
+    return paths
+
+
+def test_same_values_with_spec():
+    """有测量规范：数值、规范、判断结果与原流程一致，样式齐全"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_measure_spec(tmp_dir)
+        legacy_path, new_path = _finalize_both(tmp_dir, 120)
+        assert _cell_values(new_path) == _cell_values(legacy_path)
+
+        workbook = load_workbook(new_path)
+        worksheet = workbook.active
+        assert worksheet["G5"].value in ("OK", "NOK")
+        assert worksheet["E5"].value == 1
+        assert worksheet["F5"].border.left.style == "thin"
+        assert worksheet["F5"].alignment.horizontal == "center"
+        assert worksheet["H3"].border.bottom.style == "thin"   # 空单元格也画网格
+        assert worksheet.column_dimensions["I"].width == 22
+        ranges = [str(cf.sqref) for cf in worksheet.conditional_formatting]
+        assert ranges == ["G5:G124"]
+        workbook.close()
+
+
+def test_same_values_without_spec():
+    """没有测量规范：只填测量序号，并在第5行显示合并的警告"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path, new_path = _finalize_both(tmp_dir, 10)
+        assert _cell_values(new_path) == _cell_values(legacy_path)
+
+        workbook = load_workbook(new_path)
+        worksheet = workbook.active
+        assert "B5:D5" in [str(merged) for merged in worksheet.merged_cells.ranges]
+        assert PART_NO in worksheet["B5"].value
+        assert worksheet["B5"].font.bold
+        workbook.close()
+
+
+def test_template_in_place():
+    """模板模式：在原工作簿上单次遍历写入，结果与原流程一致"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_measure_spec(tmp_dir)
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        ExcelExporterEnhanced(filename=template_path).create_new_file()
+
+        legacy_path, new_path = _finalize_both(tmp_dir, 30, template_path)
+        assert _cell_values(new_path) == _cell_values(legacy_path)
+
+        workbook = load_workbook(new_path)
+        assert workbook.active["J34"].border.right.style == "thin"
+        assert "measure_data" in workbook.named_styles
+        workbook.close()
+
+
+def test_new_file_after_template_uses_write_only():
+    """同一导出器先从模板创建、再新建无模板文件：finalize回到只写模式"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        ExcelExporterEnhanced(filename=template_path).create_new_file()
+
+        exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, "from_template.xlsx"))
+        exporter.template_path = template_path
+        assert exporter.create_from_template("P1", "B1", "张三")
+        exporter.filename = os.path.join(tmp_dir, "plain.xlsx")
+        exporter.create_new_file()
+
+        calls = []
+        original = exporter._finalize_write_only
+        exporter._finalize_write_only = lambda *args: calls.append("write_only") or original(*args)
+        exporter.append_with_text([(1.5, "一点五", "1.5")])
+        assert exporter.finalize_excel_file()
+        assert calls == ["write_only"]
+
+
+if __name__ == "__main__":
+    test_same_values_with_spec()
+    test_same_values_without_spec()
+    test_template_in_place()
+    test_new_file_after_template_uses_write_only()
+    print("✅ 单次遍历finalize测试全部通过")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+慢语音段现场保存测试
+验证超过阈值才保存、现场内容（音频/文本/各环节耗时/CPU/GC）、音频读回一致，以及目录数与总大小上限
+"""
+
+import sys
+import os
+import gc
+import tempfile
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.slow_capture import SlowUtteranceCapture, load_bundle
+
+
+@dataclass
+class FakeResult:
+    """与 RecognitionResult 相同字段的识别结果"""
+    text: str
+    partial_results: List[str]
+    audio_buffer: List[float]
+    segments: List[str] = field(default_factory=list)
+    asr_time: float = 0.0
+
+
+def make_entry(utterance_id: int, e2e_ms: float) -> dict:
+    """finish_utterance 返回的记录"""
+    return {
+        "type": "utterance", "session": "20251030_101500", "utt": utterance_id, "ts": 0.0, "outcome": "row",
+        "hops_ms": {"speech_start": 0.0, "speech_end": 800.0, "asr_start": 801.0, "asr_end": 800.0 + e2e_ms - 20,
+                    "excel_written": 800.0 + e2e_ms},
+        "e2e_ms": e2e_ms,
+    }
+
+
+def make_result(seconds: float = 1.0, sample_rate: int = 16000) -> FakeResult:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    audio = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    return FakeResult(text="一百二十三点五", partial_results=["一百", "一百二十三"], audio_buffer=list(audio),
+                      asr_time=2.4)
+
+
+def test_capture_over_slo():
+    """超过阈值时保存现场，音频按16位读回一致；未超过时不保存"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        capture = SlowUtteranceCapture(output_dir=tmp_dir, slo_ms=1000, enabled=True)
+        result = make_result()
+
+        assert not capture.check(make_entry(1, 300.0), result)
+        assert capture.check(make_entry(2, 2500.0), result)
+        gc.collect()
+        capture.flush()
+        bundles = capture.list_bundles()
+        assert len(bundles) == 1 and bundles[0].endswith("_utt2")
+
+        bundle, audio, sample_rate = load_bundle(bundles[0])
+        assert bundle["latency_ms"] == 2500.0 and bundle["slo_ms"] == 1000
+        assert bundle["text"] == "一百二十三点五" and bundle["partial_results"] == ["一百", "一百二十三"]
+        assert bundle["stages_ms"]["asr_end→excel_written"] == 20.0
+        assert bundle["asr_time_ms"] == 2400.0
+        assert "process_cpu_percent" in bundle["cpu"] and isinstance(bundle["gc_pauses"], list)
+        assert bundle["audio"] == {"file": "audio.wav", "sample_rate": 16000, "seconds": 1.0, "truncated": False}
+        assert sample_rate == 16000 and len(audio) == 16000
+        assert np.max(np.abs(audio - np.asarray(result.audio_buffer))) < 1e-3
+
+        # 没有写入Excel的语音段（如命令）按语音结束到最后一个环节计算
+        command_entry = {"utt": 3, "outcome": "command", "hops_ms": {"speech_end": 100.0, "command": 1700.0}}
+        assert capture.utterance_latency_ms(command_entry) == 1600.0
+        capture.gc_recorder.uninstall()
+
+
+def test_rotation_and_audio_cap():
+    """超过目录数上限删除最早的现场；音频超过上限只保留末尾"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        capture = SlowUtteranceCapture(output_dir=tmp_dir, slo_ms=100, enabled=True)
+        capture.max_bundles = 3
+        capture.max_audio_seconds = 0.5
+        for utterance_id in range(1, 6):
+            bundle = capture._snapshot(make_entry(utterance_id, 500.0), make_result(), 500.0)
+            bundle["utt"] = utterance_id
+            capture.write_bundle(bundle, np.zeros(100, dtype=np.float32), 16000)
+        names = [os.path.basename(path) for path in capture.list_bundles()]
+        assert len(names) == 3 and names[-1].endswith("_utt5")
+
+        # 总大小上限：至少保留最新一个
+        capture.max_total_bytes = 1
+        capture.write_bundle(dict(utt=6), np.zeros(100, dtype=np.float32), 16000)
+        assert [os.path.basename(path)[-5:] for path in capture.list_bundles()] == ["_utt6"]
+
+        assert capture.check(make_entry(7, 900.0), make_result(seconds=2.0))
+        capture.flush()
+        bundle, audio, _ = load_bundle(capture.list_bundles()[-1])
+        assert bundle["audio"]["truncated"] and len(audio) == 8000
+        capture.gc_recorder.uninstall()
+
+
+if __name__ == "__main__":
+    test_capture_over_slo()
+    test_rotation_and_audio_cap()
+    print("✅ 慢语音段现场保存测试全部通过")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SPC过程能力分析测试
+验证向量化判断与_calculate_judgment一致、均值/标准差/Cp/Cpk与逐组计算一致、以及汇总CSV/工作表输出
+"""
+
+import sys
+import os
+import csv
+import random
+import statistics
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+from excel_utils import ExcelExporterEnhanced
+from utils.spc_analysis import analyze, load_from_reports, write_summary_csv, write_summary_sheet
+
+SPEC = {
+    100: {'content': '外径', 'lower_limit': 9.5, 'upper_limit': 10.5},
+    200: {'content': '长度上限', 'lower_limit': None, 'upper_limit': 20.0},
+    300: {'content': '壁厚下限', 'lower_limit': 1.0, 'upper_limit': None},
+    400: {'content': '无规范', 'lower_limit': None, 'upper_limit': None},
+}
+
+
+def _sample(count=2000):
+    rng = random.Random(3)
+    centers = {100: 10.0, 200: 19.5, 300: 1.2, 400: 5.0, 500: 7.0}
+    standard_ids = [rng.choice(list(centers)) for _ in range(count)]
+    values = [round(rng.gauss(centers[standard_id], 0.3), 3) for standard_id in standard_ids]
+    return standard_ids, values
+
+
+def test_judgments_match_scalar_rules():
+    """逐值判断结果和偏差与导出器的_calculate_judgment一致"""
+    standard_ids, values = _sample()
+    result = analyze(standard_ids, values, SPEC)
+    exporter = ExcelExporterEnhanced(filename="unused.xlsx")
+
+    for standard_id, value, text, deviation in zip(standard_ids, values, result.results(), result.deviations):
+        if standard_id not in SPEC or standard_id == 400:
+            assert text == '无规范'
+            continue
+        expected = exporter._calculate_judgment(SPEC[standard_id], value)
+        assert text == expected['result']
+        assert abs(round(float(deviation), 2) - expected['deviation']) < 0.0101
+
+
+def test_summary_statistics():
+    """均值、样本标准差、Cp/Cpk、NOK数与逐组计算一致"""
+    standard_ids, values = _sample()
+    summary = {row["standard_id"]: row for row in analyze(standard_ids, values, SPEC).summary}
+    assert sorted(summary) == [100, 200, 300, 400, 500]
+
+    for standard_id, row in summary.items():
+        group = [v for s, v in zip(standard_ids, values) if s == standard_id]
+        mean, sigma = statistics.fmean(group), statistics.stdev(group)
+        assert row["count"] == len(group)
+        assert abs(row["mean"] - mean) < 1e-9 and abs(row["sigma"] - sigma) < 1e-9
+        assert (row["min"], row["max"]) == (min(group), max(group))
+
+    full = summary[100]
+    assert abs(full["cp"] - 1.0 / (6 * full["sigma"])) < 1e-9
+    assert abs(full["cpk"] - min(10.5 - full["mean"], full["mean"] - 9.5) / (3 * full["sigma"])) < 1e-9
+    assert full["nok_count"] == sum(1 for s, v in zip(standard_ids, values) if s == 100 and not 9.5 <= v <= 10.5)
+
+    # 单边规范只有Cpk，无规范时不统计OK/NOK
+    assert summary[200]["cp"] is None
+    assert abs(summary[200]["cpk"] - (20.0 - summary[200]["mean"]) / (3 * summary[200]["sigma"])) < 1e-9
+    assert summary[400]["cpk"] is None and summary[400]["nok_count"] is None
+
+
+def test_session_and_report_sources():
+    """会话数据与并行读取的报告得到相同汇总，并可写出CSV和工作表"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        session_summaries = []
+        for batch in ("B1", "B2"):
+            exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, f"Report_P1_{batch}_20250101_080000.xlsx"),
+                                             part_no="P1", batch_no=batch, inspector="张三")
+            exporter.current_standard_id = 100
+            exporter.append_with_text([(10.0 + i * 0.1, "", "") for i in range(5)] + [("OK", "OK", "OK")])
+            exporter.current_standard_id = 200
+            exporter.append_with_text([(19.0 + i * 0.2, "", "") for i in range(4)])
+            session_summaries.append(exporter.compute_session_spc())
+            assert exporter.finalize_excel_file()
+            paths.append(exporter.filename)
+
+        assert [row["count"] for row in session_summaries[0]] == [5, 4]
+        standard_ids, values = load_from_reports(paths, part_no="P1", workers=2)
+        summary = analyze(standard_ids, values, SPEC).summary
+        assert [(row["standard_id"], row["count"]) for row in summary] == [(100, 10), (200, 8)]
+        assert abs(summary[0]["mean"] - session_summaries[0][0]["mean"]) < 1e-9
+
+        csv_path = write_summary_csv(summary, os.path.join(tmp_dir, "spc.csv"))
+        with open(csv_path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows[0][:3] == ["标准序号", "标准内容", "样本数"] and rows[1][:3] == ["100", "外径", "10"]
+
+        write_summary_sheet(summary, paths[0])
+        workbook = load_workbook(paths[0])
+        assert workbook.sheetnames[-1] == "SPC统计" and len(workbook.sheetnames) == 2
+        assert workbook["SPC统计"]["C3"].value == 8
+        workbook.close()
+
+
+if __name__ == "__main__":
+    test_judgments_match_scalar_rules()
+    test_summary_statistics()
+    test_session_and_report_sources()
+    print("✅ SPC过程能力分析测试全部通过")
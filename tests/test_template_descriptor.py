@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模板描述缓存测试
+验证模板按mtime只解析一次、首个空行与原逐格扫描一致、以及新建报告时不打开工作簿
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+import excel_utils
+import utils.template_descriptor as template_descriptor
+from excel_utils import ExcelExporterEnhanced
+
+
+def _make_template(path, sample_rows=0):
+    """按默认方式生成模板，可带几行示例数据"""
+    ExcelExporterEnhanced(filename=path).create_new_file()
+    if sample_rows:
+        workbook = load_workbook(path)
+        for i in range(sample_rows):
+            workbook.active.cell(row=5 + i, column=1, value=100 + i)
+        workbook.save(path)
+        workbook.close()
+
+
+def test_descriptor_matches_cell_scan():
+    """首个空行、表头行与原逐格扫描结果一致"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        _make_template(template_path, sample_rows=3)
+
+        descriptor = template_descriptor.get_template_descriptor(template_path)
+        assert descriptor.has_title
+        assert descriptor.header_row == 4 and descriptor.data_start_row == 5
+
+        exporter = ExcelExporterEnhanced(filename=template_path)
+        exporter._find_next_available_row()
+        assert descriptor.next_free_row == exporter.next_insert_row == 8
+
+
+def test_parsed_once_per_mtime():
+    """模板未变化时不重复解析，修改后重新解析"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        _make_template(template_path)
+
+        calls = []
+        original = template_descriptor.parse_template
+        template_descriptor.parse_template = lambda path: calls.append(path) or original(path)
+        try:
+            first = template_descriptor.get_template_descriptor(template_path)
+            assert template_descriptor.get_template_descriptor(template_path) is first
+            assert len(calls) == 1
+
+            time.sleep(0.01)
+            _make_template(template_path, sample_rows=2)
+            assert template_descriptor.get_template_descriptor(template_path).next_free_row == 7
+            assert len(calls) == 2
+        finally:
+            template_descriptor.parse_template = original
+
+
+def test_new_session_does_not_open_workbook():
+    """从模板新建报告只复制文件，finalize时才打开工作簿"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        _make_template(template_path, sample_rows=1)
+        template_descriptor.get_template_descriptor(template_path)
+
+        exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, "report.xlsx"))
+        exporter.template_path = template_path
+
+        opened = []
+        original = excel_utils.load_workbook
+        excel_utils.load_workbook = lambda *args, **kwargs: opened.append(args) or original(*args, **kwargs)
+        try:
+            assert exporter.create_from_template("P1", "B1", "张三")
+            assert exporter.next_insert_row == 6
+            exporter.append_with_text([(1.5, "一点五", "1.5")])
+            assert opened == []
+
+            assert exporter.finalize_excel_file()
+            assert len(opened) == 1
+        finally:
+            excel_utils.load_workbook = original
+
+        workbook = load_workbook(exporter.filename)
+        worksheet = workbook.active
+        assert worksheet["A5"].value == 100
+        assert (worksheet["F6"].value, worksheet["J6"].value) == (1.5, 1)
+        workbook.close()
+
+
+def test_template_without_title_row():
+    """模板缺少标题行：描述记录has_title=False，finalize插入标题行，会话数据整体下移一行"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        template_path = os.path.join(tmp_dir, "template.xlsx")
+        _make_template(template_path)
+        workbook = load_workbook(template_path)
+        workbook.active.delete_rows(1)
+        workbook.save(template_path)
+        workbook.close()
+
+        descriptor = template_descriptor.get_template_descriptor(template_path)
+        assert not descriptor.has_title and descriptor.data_start_row == 4
+
+        exporter = ExcelExporterEnhanced(filename=os.path.join(tmp_dir, "report.xlsx"))
+        exporter.template_path = template_path
+        assert exporter.create_from_template("P1", "B1", "张三")
+        exporter.append_with_text([(1.5, "一点五", "1.5")])
+        assert exporter.finalize_excel_file()
+
+        workbook = load_workbook(exporter.filename)
+        worksheet = workbook.active
+        assert worksheet["A1"].value == "测量报告"
+        assert (worksheet["F6"].value, worksheet["J6"].value) == (1.5, 1)
+        workbook.close()
+
+
+if __name__ == "__main__":
+    test_descriptor_matches_cell_scan()
+    test_parsed_once_per_mtime()
+    test_new_session_does_not_open_workbook()
+    test_template_without_title_row()
+    print("✅ 模板描述缓存测试全部通过")
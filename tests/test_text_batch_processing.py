@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量文本处理API测试
+验证process_texts/extract_numbers_batch与逐条处理结果一致，且顺序确定
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_processor import (
+    TextProcessor, VoiceCommandProcessor,
+    process_text, process_texts, extract_numbers_batch, get_default_processor,
+    _worker_command_processor_for
+)
+
+SAMPLE_TEXTS = [
+    "三 十 七 点 五",
+    "一 百 二 十 三",
+    "二百",
+    "长度二百",
+    "点 八 四",
+    "切换到二百",
+    "十二点五",
+    "今天气温二 十五度",
+    "",
+    "OK",
+]
+
+
+def test_process_texts_matches_single_calls():
+    """批量处理结果与逐条处理一致"""
+    processor = TextProcessor()
+    expected = [processor.process_text(text) for text in SAMPLE_TEXTS]
+
+    result = list(processor.process_texts(SAMPLE_TEXTS))
+    print(f"批量处理结果: {result}")
+    assert result == expected
+
+
+def test_process_texts_accepts_generator():
+    """支持生成器输入并以生成器方式输出"""
+    processor = TextProcessor()
+    stream = processor.process_texts(text for text in SAMPLE_TEXTS)
+    assert not isinstance(stream, list)
+    assert next(stream) == processor.process_text(SAMPLE_TEXTS[0])
+
+
+def test_extract_numbers_batch_matches_single_calls():
+    """批量数字提取与实时识别流程一致（含严格验证）"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+    expected = [
+        processor.extract_numbers(text, processor.process_text(text), command_processor)
+        for text in SAMPLE_TEXTS
+    ]
+
+    result = list(processor.extract_numbers_batch(SAMPLE_TEXTS, command_processor))
+    print(f"批量提取结果: {result}")
+    assert result == expected
+    # 文本上下文中的100倍数仍然被跳过
+    assert result[SAMPLE_TEXTS.index("长度二百")] == []
+
+
+def test_process_pool_preserves_order():
+    """进程池模式保持输入顺序"""
+    processor = TextProcessor()
+    # 使用生成器输入强制启用进程池，小chunk保证有多个任务在途
+    texts = SAMPLE_TEXTS * 20
+    expected = [processor.process_text(text) for text in texts]
+
+    result = list(processor.process_texts((t for t in texts), workers=2, chunk_size=7))
+    assert result == expected
+
+    numbers = list(processor.extract_numbers_batch((t for t in texts), VoiceCommandProcessor(),
+                                                   workers=2, chunk_size=7))
+    assert numbers == list(processor.extract_numbers_batch(texts, VoiceCommandProcessor()))
+
+
+def test_process_pool_uses_command_processor_settings():
+    """进程池模式按调用方命令处理器的配置验证，结果与单进程一致"""
+    processor = TextProcessor()
+    command_processor = VoiceCommandProcessor()
+    command_processor.configure(match_mode="exact", min_match_length=4, confidence_threshold=0.95)
+    texts = SAMPLE_TEXTS * 20
+
+    numbers = list(processor.extract_numbers_batch((t for t in texts), command_processor,
+                                                   workers=2, chunk_size=7))
+    assert numbers == list(processor.extract_numbers_batch(texts, command_processor, workers=1))
+
+    # 子进程中的命令处理器使用相同配置
+    worker_processor = _worker_command_processor_for(("exact", 4, 0.95))
+    assert (worker_processor.match_mode, worker_processor.min_match_length,
+            worker_processor.confidence_threshold) == ("exact", 4, 0.95)
+
+
+def test_module_level_helpers_reuse_processor():
+    """模块级便捷函数复用同一个处理器实例"""
+    assert get_default_processor() is get_default_processor()
+    assert process_text("一 百 二 十 三") == "123"
+    assert list(process_texts(["二百"])) == ["200"]
+    assert list(extract_numbers_batch(["二百"])) == [[200.0]]
+
+
+if __name__ == "__main__":
+    test_process_texts_matches_single_calls()
+    test_process_texts_accepts_generator()
+    test_extract_numbers_batch_matches_single_calls()
+    test_process_pool_preserves_order()
+    test_process_pool_uses_command_processor_settings()
+    test_module_level_helpers_reuse_processor()
+    print("✅ 批量文本处理测试全部通过")
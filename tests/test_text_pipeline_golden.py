@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本处理黄金语料测试
+验证process_text / extract_numbers / 命令匹配 / 特定文本检查的输出与
+benchmarks/golden/text_pipeline_corpus.json 一致，并检查基线回归判定逻辑
+"""
+
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_text_pipeline import load_corpus, verify_corpus, compare_with_baseline, STAGES
+
+
+def test_golden_corpus_outputs():
+    """所有语料的各阶段输出与黄金语料一致"""
+    corpus = load_corpus()
+    assert corpus["cases"], "黄金语料不能为空"
+
+    mismatches = verify_corpus(corpus)
+    for line in mismatches:
+        print(f"❌ {line}")
+    assert mismatches == []
+
+
+def test_golden_corpus_covers_all_stages():
+    """语料覆盖每个阶段的命中情况"""
+    expected = [case["expected"] for case in load_corpus()["cases"]]
+
+    assert any(e["numbers"] for e in expected)
+    assert any(e["command"] for e in expected)
+    assert any(e["standard_id"] for e in expected)
+    assert any(e["special_text"] for e in expected)
+
+
+def test_compare_with_baseline_tolerance():
+    """吞吐量下降超过容忍度才判定为回归"""
+    baseline = {"stages": {stage: {"ops_per_sec": 1000.0} for stage in STAGES}}
+
+    within = {stage: {"ops_per_sec": 800.0} for stage in STAGES}
+    assert compare_with_baseline(within, baseline, 0.25) == []
+
+    regressed = dict(within, process_text={"ops_per_sec": 700.0})
+    regressions = compare_with_baseline(regressed, baseline, 0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("process_text")
+
+
+if __name__ == "__main__":
+    test_golden_corpus_outputs()
+    test_golden_corpus_covers_all_stages()
+    test_compare_with_baseline_tolerance()
+    print("✅ 文本处理黄金语料测试全部通过")
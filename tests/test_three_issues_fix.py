@@ -92,9 +92,10 @@ def test_voice_id_consistency():
             print("❌ 没有写入任何记录")
             return False
 
-        # 清理测试文件
-        if os.path.exists(test_filename):
-            os.remove(test_filename)
+        # 清理测试文件（未finalize时会话日志仍在）
+        for path in (test_filename, test_filename + ".journal.jsonl"):
+            if os.path.exists(path):
+                os.remove(path)
 
         print("✅ Voice ID一致性测试完成")
         return True
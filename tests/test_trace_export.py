@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线追踪导出测试
+验证跨线程耗时段、语音段ID标记、环形缓冲区上限、PerformanceStep/FastStep自动记录和Trace Event JSON格式
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.trace_export import PipelineTracer, pipeline_tracer, traced
+from utils.performance_monitor import FastStep, PerformanceMonitor, PerformanceStep
+
+
+def test_spans_across_threads():
+    """各线程的耗时段带线程名，语音段ID随线程传递，导出为合法的Trace Event JSON"""
+    tracer = PipelineTracer(capacity=1000)
+    assert tracer.span("关闭时") is tracer.span("另一个")  # 关闭时为共享空上下文
+    tracer.enable()
+
+    def capture():
+        for _ in range(3):
+            with tracer.span("音频输入", "audio"):
+                pass
+
+    def inference():
+        tracer.set_utterance(7)
+        tracer.instant("speech_end", "vad")
+        with tracer.span("最终识别", "asr", samples=16000):
+            with tracer.span("识别结果回调", "callback"):
+                pass
+        tracer.set_utterance(0)
+        with tracer.span("空闲", "asr"):
+            pass
+
+    threads = [threading.Thread(target=capture, name="采集线程"), threading.Thread(target=inference, name="识别线程")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = tracer.dump(os.path.join(tmp_dir, "trace.json"))
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+
+    events = trace["traceEvents"]
+    thread_names = {e["args"]["name"] for e in events if e["ph"] == "M" and e["name"] == "thread_name"}
+    assert {"采集线程", "识别线程"} <= thread_names
+
+    spans = [e for e in events if e["ph"] == "X"]
+    assert len(spans) == 6 and all(e["dur"] >= 0 and e["ts"] >= 0 for e in spans)
+    by_name = {e["name"]: e for e in spans}
+    assert by_name["最终识别"]["args"] == {"samples": 16000, "utt": 7}
+    assert by_name["识别结果回调"]["args"] == {"utt": 7}
+    assert "args" not in by_name["空闲"]
+    # 嵌套的回调段落在识别段内部
+    outer, inner = by_name["最终识别"], by_name["识别结果回调"]
+    assert outer["ts"] <= inner["ts"] and inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"] + 1e-3
+    assert [e for e in events if e["ph"] == "i"][0]["args"] == {"utt": 7}
+
+
+def test_ring_buffer_bounded():
+    """超过容量后只保留最近的事件"""
+    tracer = PipelineTracer(capacity=50)
+    tracer.enable()
+    for index in range(200):
+        with tracer.span("音频处理", "audio", index=index):
+            pass
+    assert tracer.event_count() == 50
+    spans = [e for e in tracer.to_trace_events() if e["ph"] == "X"]
+    assert spans[0]["args"]["index"] == 150
+
+    tracer.clear()
+    tracer.disable()
+    with tracer.span("关闭后"):
+        pass
+    assert tracer.event_count() == 0
+
+
+def test_steps_and_decorator_recorded():
+    """追踪开启时PerformanceStep、FastStep和traced装饰的函数自动记录"""
+    monitor = PerformanceMonitor(raw_records=False)
+    fast = FastStep("音频输入", monitor=monitor)
+
+    @traced("GUI:显示识别结果", "gui")
+    def slot(value):
+        return value * 2
+
+    pipeline_tracer.clear()
+    with fast:
+        pass
+    assert pipeline_tracer.event_count() == 0
+
+    pipeline_tracer.enable()
+    try:
+        with fast:
+            pass
+        with PerformanceStep("Excel写入", {"data_count": 2}):
+            pass
+        assert slot(21) == 42
+    finally:
+        pipeline_tracer.disable()
+    monitor.stop_aggregator()
+
+    spans = {e["name"]: e for e in pipeline_tracer.to_trace_events() if e["ph"] == "X"}
+    assert spans["音频输入"]["cat"] == "audio"
+    assert spans["Excel写入"]["args"] == {"data_count": 2}
+    assert spans["GUI:显示识别结果"]["cat"] == "gui"
+    pipeline_tracer.clear()
+
+
+if __name__ == "__main__":
+    test_spans_across_threads()
+    test_ring_buffer_bounded()
+    test_steps_and_decorator_recorded()
+    print("✅ 流水线追踪导出测试全部通过")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+语音段延迟关联ID测试
+验证每段语音从speech_start到写入Excel的逐环节打点、本会话百分位汇总和JSONL日志
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.production_latency_logger import MAX_ACTIVE_UTTERANCES, ProductionLatencyLogger
+
+
+def _run_utterance(latency, stages, delay=0.001):
+    utterance_id = latency.begin_utterance()
+    for stage in stages:
+        time.sleep(delay)
+        latency.mark_utterance(utterance_id, stage)
+    return utterance_id
+
+
+def test_stage_and_end_to_end_percentiles():
+    """相邻环节和端到端（语音结束→写入Excel）按会话统计"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        latency = ProductionLatencyLogger()
+        latency.log_dir = tmp_dir
+        latency.start_session()
+
+        for _ in range(5):
+            utterance_id = _run_utterance(latency, ["speech_end", "asr_start", "asr_end",
+                                                    "text_start", "text_end", "excel_written"])
+            asr_time = latency.utterance_elapsed(utterance_id, "asr_start", "asr_end")
+            assert asr_time is not None and asr_time >= 0.001
+            entry = latency.finish_utterance(utterance_id, text="十二点五")
+            assert entry["outcome"] == "row" and entry["e2e_ms"] >= 4.0
+            assert list(entry["hops_ms"]) == ["speech_start", "speech_end", "asr_start", "asr_end",
+                                              "text_start", "text_end", "excel_written"]
+
+        command_id = _run_utterance(latency, ["speech_end", "asr_start", "asr_end", "text_start",
+                                              "text_end", "command"])
+        latency.finish_utterance(command_id, "command")
+
+        summary = latency.get_session_summary()
+        assert summary["utterances"] == 6
+        assert summary["outcomes"] == {"row": 5, "command": 1}
+        assert summary["end_to_end"]["count"] == 5
+        assert summary["stages"]["asr_start→asr_end"]["count"] == 6
+        assert summary["stages"]["text_end→excel_written"]["count"] == 5
+        assert summary["stages"]["text_end→command"]["count"] == 1
+        stats = summary["end_to_end"]
+        assert 4.0 <= stats["p50"] <= stats["p95"] <= stats["p99"] <= stats["max"]
+
+        latency.end_session()
+        files = os.listdir(tmp_dir)
+        assert len(files) == 1 and files[0].startswith("utterance_latency_")
+        with open(os.path.join(tmp_dir, files[0]), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert [line["type"] for line in lines] == ["utterance"] * 6 + ["session"]
+        assert lines[0]["text"] == "十二点五" and lines[0]["session"] == summary["session"]
+        assert lines[-1]["end_to_end"]["count"] == 5
+
+
+def test_unknown_and_stale_utterances():
+    """ID为0或未知时不记录；未完成的语音段数量有上限；新会话清空统计"""
+    latency = ProductionLatencyLogger()
+    latency.utterance_log_enabled = False
+    latency.start_session()
+
+    latency.mark_utterance(0, "speech_end")
+    assert latency.finish_utterance(0) is None
+    assert latency.finish_utterance(12345) is None
+
+    first = latency.begin_utterance()
+    for _ in range(MAX_ACTIVE_UTTERANCES):
+        latency.begin_utterance()
+    assert latency.finish_utterance(first) is None
+
+    # 同一环节只记第一次
+    utterance_id = _run_utterance(latency, ["speech_end"])
+    before = latency.utterance_elapsed(utterance_id, "speech_start", "speech_end")
+    time.sleep(0.002)
+    latency.mark_utterance(utterance_id, "speech_end")
+    assert latency.utterance_elapsed(utterance_id, "speech_start", "speech_end") == before
+    assert latency.finish_utterance(utterance_id, "empty")["outcome"] == "empty"
+    assert latency.get_session_summary()["utterances"] == 1
+
+    latency.start_session()
+    assert latency.get_session_summary()["utterances"] == 0
+
+
+if __name__ == "__main__":
+    test_stage_and_end_to_end_percentiles()
+    test_unknown_and_stale_utterances()
+    print("✅ 语音段延迟关联ID测试全部通过")
@@ -7,7 +7,10 @@
 
 import re
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+import functools
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Iterator, Callable, Deque
 
 from utils.logging_utils import LoggingManager
 
@@ -19,17 +22,46 @@ logger = LoggingManager.get_logger(
     log_to_file=True
 )
 
-# 尝试导入cn2an库
-CN2AN_AVAILABLE = False
-try:
-    import cn2an  # type: ignore
-    CN2AN_AVAILABLE = True
-except ImportError:
-    cn2an = None
+# cn2an延迟导入（导入耗时约200ms，首次转换时才加载，或由warm_up_modules后台预热）
+from utils.lazy_imports import lazy_import, is_module_available
+
+CN2AN_AVAILABLE = is_module_available("cn2an")
+# 不可用时仍是代理对象（访问属性才会导入失败），调用处由CN2AN_AVAILABLE判断
+cn2an = lazy_import("cn2an")
+
+# 预编译的正则表达式（所有实例共享，避免每次调用重新编译/查缓存）
+_SPACE_PATTERN = re.compile(r'[\s　]')
+_ARABIC_NUMBER_PATTERN = re.compile(r'-?\d+\.?\d*')
+_ARABIC_DIGIT_PATTERN = re.compile(r'\d')
+_HUNDRED_THIRTEEN_PATTERN = re.compile(r'([一二三四五六七八九十])百十三')
+_COMMAND_PUNCT_PATTERN = re.compile(r'[。！？\.,!?\s]')
+
+# 多值语句默认分隔符（如"十二点五、十二点六 然后 十二点四"）
+DEFAULT_MULTI_VALUE_SEPARATORS: Tuple[str, ...] = ("、", "然后", "，", ",", "；", ";")
+
+# 批量处理参数
+BATCH_CHUNK_SIZE = 512          # 每个进程池任务处理的行数
+PARALLEL_MIN_ITEMS = 2000       # 已知长度小于该值时不启用进程池
 
 class TextProcessor:
     """优化的文本处理器类"""
 
+    # 序号相关关键词
+    SEQUENCE_KEYWORDS = (
+        "序号", "编号", "第", "页", "章", "节", "条", "款", "项", "级",
+        "楼", "层", "号", "室", "座", "排", "列", "行"
+    )
+
+    # 单字符特殊映射
+    CHAR_MAPPING = {
+        '两': '2',
+        '十': '10',
+        '百': '100',
+        '千': '1000',
+        '万': '10000',
+        '百万': '1000000'
+    }
+
     def __init__(self) -> None:
         logger.debug("初始化TextProcessor实例")
         # 简化的数字正则表达式
@@ -45,7 +77,7 @@ class TextProcessor:
 
     def remove_spaces(self, text: str) -> str:
         """去除文本中的空格"""
-        return re.sub(r'[\s　]', '', text) if text else text
+        return _SPACE_PATTERN.sub('', text) if text else text
 
     def convert_chinese_numbers_in_text(self, text: str) -> str:
         """
@@ -74,11 +106,7 @@ class TextProcessor:
         # 按长度排序，优先处理长的数字
         matches = sorted(set(matches), key=len, reverse=True)
 
-        # 序号相关关键词
-        sequence_keywords = [
-            "序号", "编号", "第", "页", "章", "节", "条", "款", "项", "级",
-            "楼", "层", "号", "室", "座", "排", "列", "行"
-        ]
+        sequence_keywords = self.SEQUENCE_KEYWORDS
 
         # 检查数字是否在序号上下文中
         def is_sequence_context(match: str, full_text: str) -> bool:
@@ -98,20 +126,13 @@ class TextProcessor:
         for match in matches:
             try:
                 # 去除空格后转换
-                clean_match = re.sub(r'[\s　]', '', match)
+                clean_match = _SPACE_PATTERN.sub('', match)
                 logger.debug(f"转换中文数字: '{match}' -> '{clean_match}'")
 
                 # 首先尝试特殊情况处理（单个字符）
                 if len(clean_match) == 1:
                     # 特殊字符映射
-                    char_mapping = {
-                        '两': '2',
-                        '十': '10',
-                        '百': '100',
-                        '千': '1000',
-                        '万': '10000',
-                        '百万': '1000000'
-                    }
+                    char_mapping = self.CHAR_MAPPING
                     if clean_match in char_mapping:
                         result = result.replace(match, char_mapping[clean_match], 1)
                         logger.debug(f"特殊字符映射: '{match}' -> '{char_mapping[clean_match]}'")
@@ -189,12 +210,11 @@ class TextProcessor:
                 result = result.replace(wrong, correct)
 
         # 通用模式：处理"[X]百十三"的情况
-        pattern = r'([一二三四五六七八九十])百十三'
         def replace_hundred_thirteen(match: re.Match[str]) -> str:
             first_digit = match.group(1)
             return f'{first_digit}百一十三'
 
-        result = re.sub(pattern, replace_hundred_thirteen, result)
+        result = _HUNDRED_THIRTEEN_PATTERN.sub(replace_hundred_thirteen, result)
 
         return result
 
@@ -248,10 +268,9 @@ class TextProcessor:
             text_to_extract = processed_text if processed_text else original_text
 
             # 如果处理后的文本包含阿拉伯数字，直接提取
-            import re
             if CN2AN_AVAILABLE and processed_text:
                 # 提取阿拉伯数字（包括小数，支持负数）
-                arabic_numbers = re.finditer(r'-?\d+\.?\d*', text_to_extract)
+                arabic_numbers = _ARABIC_NUMBER_PATTERN.finditer(text_to_extract)
                 numbers = []
                 for match in arabic_numbers:
                     try:
@@ -325,6 +344,95 @@ class TextProcessor:
             logger.error(f"数字提取过程出错: {str(e)}")
             return []
 
+    def split_measurement_segments(self, text: str,
+                                   separators: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        按显式分隔符把一句话拆分为多个测量值片段
+
+        Args:
+            text: 原始语音文本
+            separators: 分隔符列表，None表示使用DEFAULT_MULTI_VALUE_SEPARATORS
+
+        Returns:
+            去除空白后的非空片段列表（保持原有顺序）
+        """
+        if not text:
+            return []
+
+        pattern = _separator_pattern(tuple(separators) if separators is not None
+                                     else DEFAULT_MULTI_VALUE_SEPARATORS)
+        if pattern is None:
+            return [text.strip()] if text.strip() else []
+
+        return [segment.strip() for segment in pattern.split(text) if segment.strip()]
+
+    def extract_multiple_numbers(self, original_text: str,
+                                 command_processor: Optional['VoiceCommandProcessor'] = None,
+                                 separators: Optional[Iterable[str]] = None,
+                                 segments: Optional[List[str]] = None) -> List[float]:
+        """
+        多值模式：从一句话中按顺序提取多个测量值
+
+        片段来源：
+        - segments: 识别器根据VAD短停顿切分出的子片段文本（优先）
+        - 否则按显式分隔符（"、"、"然后"等）切分original_text
+
+        每个片段独立走process_text -> extract_numbers流程，严格验证规则对每个片段同样生效；
+        只有一个片段且能提取出数字时与extract_numbers的结果完全一致。
+
+        空格：process_text会去掉空格，"12.5 12.6"、"十二点五 十二点六"会连成一个数字。
+        - 空格隔开的每个部分都含阿拉伯数字时，每个部分是一个完整读数，先按空格拆分
+        - 否则片段整体提取不到数字时，再按空格拆一次，每个部分都能单独提取出数字才采用
+          （"三 十 七"整体有效，不会被拆开）
+
+        Args:
+            original_text: 原始语音文本
+            command_processor: 语音命令处理器（用于严格验证）
+            separators: 分隔符列表，None表示使用默认分隔符
+            segments: 停顿切分得到的子片段文本（可选）
+
+        Returns:
+            按语序排列的数字列表
+        """
+        pieces: List[str] = []
+        for segment in (segments if segments and len(segments) > 1 else [original_text]):
+            pieces.extend(self.split_measurement_segments(segment, separators))
+
+        if len(pieces) <= 1:
+            return self._extract_piece(original_text, command_processor)
+
+        numbers = []
+        for piece in pieces:
+            piece_numbers = self._extract_piece(piece, command_processor)
+            logger.debug(f"多值片段: '{piece}' -> {piece_numbers}")
+            numbers.extend(piece_numbers)
+        return numbers
+
+    def _extract_piece(self, text: str,
+                       command_processor: Optional['VoiceCommandProcessor'] = None) -> List[float]:
+        """提取一个片段中的读数（空格的处理见extract_multiple_numbers）"""
+        tokens = text.split()
+        if len(tokens) > 1 and all(_ARABIC_DIGIT_PATTERN.search(token) for token in tokens):
+            numbers = self._extract_space_separated(tokens, command_processor)
+            if numbers:
+                return numbers
+        numbers = self.extract_numbers(text, self.process_text(text), command_processor)
+        return numbers or self._extract_space_separated(tokens, command_processor)
+
+    def _extract_space_separated(self, tokens: List[str],
+                                 command_processor: Optional['VoiceCommandProcessor'] = None) -> List[float]:
+        """空格拆分出的各部分逐个提取；任何一个部分提取不到数字时返回空列表"""
+        if len(tokens) <= 1:
+            return []
+        numbers: List[float] = []
+        for token in tokens:
+            token_numbers = self.extract_numbers(token, self.process_text(token), command_processor)
+            if not token_numbers:
+                return []
+            numbers.extend(token_numbers)
+        logger.debug(f"多值片段按空格拆分: {tokens} -> {numbers}")
+        return numbers
+
     def _should_skip_number(self, number: float, start_pos: int, end_pos: int, text: str) -> bool:
         """
         检查是否应该跳过某个数字（严格验证规则）
@@ -390,6 +498,58 @@ class TextProcessor:
 
         return result
 
+    def process_texts(self, texts: Iterable[str], workers: Optional[int] = None,
+                      chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[str]:
+        """
+        批量处理文本（流式生成器）
+        复用当前实例的编译状态；workers>1且输入足够大时使用进程池，结果顺序与输入一致
+
+        Args:
+            texts: 原始文本序列（可以是任意可迭代对象，如逐行读取的文件）
+            workers: 进程数，None或1表示在当前进程顺序处理
+            chunk_size: 每个进程池任务包含的行数
+
+        Returns:
+            按输入顺序产出的处理后文本
+        """
+        if not _should_use_pool(texts, workers):
+            for text in texts:
+                yield self.process_text(text)
+            return
+
+        assert workers is not None
+        yield from _ordered_pool_map(_process_text_chunk, texts, workers, chunk_size)
+
+    def extract_numbers_batch(self, texts: Iterable[str],
+                              command_processor: Optional['VoiceCommandProcessor'] = None,
+                              workers: Optional[int] = None,
+                              chunk_size: int = BATCH_CHUNK_SIZE) -> Iterator[List[float]]:
+        """
+        批量提取数字（流式生成器）
+        对每行原始文本执行与实时识别相同的流程：process_text -> extract_numbers
+
+        Args:
+            texts: 原始语音文本序列
+            command_processor: 语音命令处理器（用于严格验证），进程池模式下在子进程中按相同配置重建
+            workers: 进程数，None或1表示在当前进程顺序处理
+            chunk_size: 每个进程池任务包含的行数
+
+        Returns:
+            按输入顺序产出的数字列表
+        """
+        if not _should_use_pool(texts, workers):
+            for text in texts:
+                yield self.extract_numbers(text, self.process_text(text), command_processor)
+            return
+
+        assert workers is not None
+        command_settings = None
+        if command_processor is not None:
+            command_settings = (command_processor.match_mode, command_processor.min_match_length,
+                                command_processor.confidence_threshold)
+        chunk_func = functools.partial(_extract_numbers_chunk, command_settings=command_settings)
+        yield from _ordered_pool_map(chunk_func, texts, workers, chunk_size)
+
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """
         计算两个文本之间的相似度
@@ -490,7 +650,7 @@ class TextProcessor:
         text_clean = text.lower().strip()
 
         # 移除常见的标点符号
-        text_clean = re.sub(r'[。！？\.,!?\s]', '', text_clean)
+        text_clean = _COMMAND_PUNCT_PATTERN.sub('', text_clean)
 
         return text_clean
 
@@ -504,6 +664,8 @@ class VoiceCommandProcessor:
         self.match_mode = "fuzzy"
         self.min_match_length = 2
         self.confidence_threshold = 0.8
+        # 命令关键词清理结果缓存（关键词来自配置，数量有限）
+        self._keyword_cache: Dict[str, str] = {}
 
     def configure(self, match_mode: str = "fuzzy", min_match_length: int = 2, confidence_threshold: float = 0.8) -> None:
         """配置匹配参数"""
@@ -560,8 +722,11 @@ class VoiceCommandProcessor:
         text_clean = self.process_command_text(text)
 
         for command_type, keywords in commands.items():
+            # 对于停止命令，要求更高的匹配度（允许包含匹配）
+            threshold = 0.7 if command_type == "stop" else self.confidence_threshold
+
             for keyword in keywords:
-                keyword_clean = self.text_processor.clean_text_for_command_matching(keyword)
+                keyword_clean = self._clean_keyword(keyword)
 
                 if self.match_mode == "exact":
                     # 精确匹配模式
@@ -569,20 +734,29 @@ class VoiceCommandProcessor:
                         return command_type
 
                 elif self.match_mode == "fuzzy":
+                    if command_type == "stop" and keyword_clean and keyword_clean in text_clean:
+                        return command_type
+
+                    # 编辑距离不小于长度差，先用上界排除不可能达到阈值的关键词，避免动态规划
+                    max_len = max(len(text_clean), len(keyword_clean))
+                    if not max_len or 1.0 - abs(len(text_clean) - len(keyword_clean)) / max_len < threshold:
+                        continue
+
                     # 模糊匹配模式
                     similarity = self.text_processor.calculate_similarity(text_clean, keyword_clean)
-
-                    # 对于停止命令，要求更高的匹配度
-                    if command_type == "stop":
-                        if similarity >= 0.7 or keyword_clean in text_clean:
-                            return command_type
-                    else:
-                        # 其他命令使用标准的相似度阈值
-                        if similarity >= self.confidence_threshold:
-                            return command_type
+                    if similarity >= threshold:
+                        return command_type
 
         return None
 
+    def _clean_keyword(self, keyword: str) -> str:
+        """获取清理后的命令关键词（带缓存）"""
+        keyword_clean = self._keyword_cache.get(keyword)
+        if keyword_clean is None:
+            keyword_clean = self.text_processor.clean_text_for_command_matching(keyword)
+            self._keyword_cache[keyword] = keyword_clean
+        return keyword_clean
+
     def match_standard_id_command(self, text: str, command_prefixes: List[str]) -> Optional[int]:
         """
         基于模式匹配标准序号命令
@@ -643,11 +817,180 @@ class VoiceCommandProcessor:
         logger.debug(f"未匹配到标准序号命令: '{text}'")
         return None
 
+class PartialCommandTracker:
+    """
+    流式部分结果命令快速通道
+    在部分识别结果上运行命令匹配，同一命令在连续K个部分结果（含重复的相同文本）中保持稳定后立即触发，
+    不必等待静音判定和最终解码；最终结果到达时抑制重复触发
+    """
+
+    def __init__(self, command_processor: VoiceCommandProcessor,
+                 commands: Dict[str, List[str]], stable_count: int = 2) -> None:
+        """
+        Args:
+            command_processor: 语音命令处理器（复用其匹配规则）
+            commands: 允许快速触发的命令字典 {command_type: [keywords]}
+            stable_count: 需要连续稳定的部分结果个数K
+        """
+        self.command_processor = command_processor
+        self.commands = commands
+        self.stable_count = max(1, stable_count)
+        self._candidate: Optional[str] = None
+        self._streak = 0
+        self.fired_command: Optional[str] = None
+
+    def feed_partial(self, text: str) -> Optional[str]:
+        """
+        处理一个部分识别结果
+
+        Args:
+            text: 部分识别文本
+
+        Returns:
+            本次达到稳定条件的命令类型；未触发或本句已触发过返回None
+        """
+        if self.fired_command or not text:
+            return None
+
+        command = self.command_processor.match_command(text, self.commands)
+        if command is None or command != self._candidate:
+            self._candidate = command
+            self._streak = 1 if command else 0
+        else:
+            self._streak += 1
+
+        if command and self._streak >= self.stable_count:
+            self.fired_command = command
+            logger.debug(f"⚡ 部分结果命令稳定触发: {command} (连续{self._streak}次)")
+            return command
+        return None
+
+    def consume_final(self, command: Optional[str]) -> bool:
+        """
+        最终结果到达时调用，重置本句状态
+
+        Args:
+            command: 最终结果匹配到的命令类型（无命令为None）
+
+        Returns:
+            True表示该命令已由快速通道执行，应抑制重复处理
+        """
+        suppress = command is not None and command == self.fired_command
+        self.reset()
+        return suppress
+
+    def reset(self) -> None:
+        """重置本句状态"""
+        self._candidate = None
+        self._streak = 0
+        self.fired_command = None
+
+
+# ============================================================================
+# 批量处理：进程池辅助函数（必须位于模块顶层，才能被子进程pickle）
+# ============================================================================
+
+_worker_processor: Optional[TextProcessor] = None
+_worker_command_processor: Optional[VoiceCommandProcessor] = None
+
+def _init_batch_worker() -> None:
+    """进程池初始化：每个子进程只创建一次处理器"""
+    global _worker_processor, _worker_command_processor
+    _worker_processor = TextProcessor()
+    _worker_command_processor = VoiceCommandProcessor()
+
+def _process_text_chunk(chunk: List[str]) -> List[str]:
+    """子进程：处理一批文本"""
+    processor = _worker_processor or get_default_processor()
+    return [processor.process_text(text) for text in chunk]
+
+def _worker_command_processor_for(command_settings: Tuple[str, int, float]) -> VoiceCommandProcessor:
+    """子进程：按调用方的配置（match_mode, min_match_length, confidence_threshold）取命令处理器"""
+    command_processor = _worker_command_processor or VoiceCommandProcessor()
+    command_processor.configure(*command_settings)
+    return command_processor
+
+def _extract_numbers_chunk(chunk: List[str],
+                           command_settings: Optional[Tuple[str, int, float]] = None) -> List[List[float]]:
+    """子进程：对一批文本提取数字；command_settings为None时不做命令严格验证"""
+    processor = _worker_processor or get_default_processor()
+    command_processor = None
+    if command_settings is not None:
+        command_processor = _worker_command_processor_for(command_settings)
+    return [processor.extract_numbers(text, processor.process_text(text), command_processor)
+            for text in chunk]
+
+@functools.lru_cache(maxsize=16)
+def _separator_pattern(separators: Tuple[str, ...]) -> Optional[re.Pattern[str]]:
+    """编译多值分隔符正则（按长度降序，保证"然后"等多字分隔符优先匹配）"""
+    cleaned = sorted({sep for sep in separators if sep}, key=len, reverse=True)
+    if not cleaned:
+        return None
+    return re.compile('|'.join(re.escape(sep) for sep in cleaned))
+
+
+def _iter_chunks(items: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """把可迭代对象切分为固定大小的列表，不一次性读入全部数据"""
+    chunk: List[str] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _should_use_pool(texts: Iterable[str], workers: Optional[int]) -> bool:
+    """判断是否值得启用进程池（已知长度的小输入直接顺序处理）"""
+    if not workers or workers <= 1:
+        return False
+    try:
+        return len(texts) >= PARALLEL_MIN_ITEMS  # type: ignore[arg-type]
+    except TypeError:
+        # 生成器等未知长度的输入，按调用方要求启用进程池
+        return True
+
+def _ordered_pool_map(func: Callable[[List[str]], List[Any]], texts: Iterable[str],
+                      workers: int, chunk_size: int) -> Iterator[Any]:
+    """
+    有序的进程池映射
+    最多保持 workers*2 个任务在途，按提交顺序取回结果，保证输出顺序确定且内存有界
+    """
+    # 进程池仅批量模式使用，延迟导入避免拖慢启动
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker) as executor:
+        for chunk in _iter_chunks(texts, max(1, chunk_size)):
+            pending.append(executor.submit(func, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
 # 便捷函数
+_default_processor: Optional[TextProcessor] = None
+
+def get_default_processor() -> TextProcessor:
+    """获取模块级共享的TextProcessor实例（避免每次调用都重新创建）"""
+    global _default_processor
+    if _default_processor is None:
+        _default_processor = TextProcessor()
+    return _default_processor
+
 def process_text(text: str) -> str:
     """便捷的文本处理函数"""
-    processor = TextProcessor()
-    return processor.process_text(text)
+    return get_default_processor().process_text(text)
+
+def process_texts(texts: Iterable[str], workers: Optional[int] = None) -> Iterator[str]:
+    """便捷的批量文本处理函数（流式生成器）"""
+    return get_default_processor().process_texts(texts, workers=workers)
+
+def extract_numbers_batch(texts: Iterable[str],
+                          command_processor: Optional[VoiceCommandProcessor] = None,
+                          workers: Optional[int] = None) -> Iterator[List[float]]:
+    """便捷的批量数字提取函数（流式生成器）"""
+    return get_default_processor().extract_numbers_batch(texts, command_processor, workers=workers)
 
 if __name__ == "__main__":
     # 测试
@@ -9,11 +9,12 @@ Utils工具包
 #from ..debug.debug_performance_tracker import debug_tracker
 from .production_latency_logger import (
     start_latency_session, end_latency_session,
-    log_voice_input_end, log_asr_complete, log_terminal_display
+    log_voice_input_end, log_asr_complete, log_terminal_display,
+    begin_utterance, mark_utterance, finish_utterance, get_session_latency_summary
 )
 
 # 导入核心模块
-from .performance_monitor import performance_monitor, PerformanceStep
+from .performance_monitor import performance_monitor, PerformanceStep, FastStep
 from .config_loader import config
 from .logging_utils import (
     LoggingManager, get_logger, setup_logger, get_app_logger, get_silent_logger
@@ -29,10 +30,15 @@ __all__ = [
     'log_voice_input_end',
     'log_asr_complete',
     'log_terminal_display',
+    'begin_utterance',
+    'mark_utterance',
+    'finish_utterance',
+    'get_session_latency_summary',
 
     # 核心模块
     'performance_monitor',
     'PerformanceStep',
+    'FastStep',
     'config',
 
     # 日志工具
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台批量写入线程
+调用方把记录放入有界队列后立即返回，写入线程在攒够batch_size条或
+距第一条待写记录超过flush_interval秒时（先到者为准）批量调用flush函数。
+
+持久化语义:
+    submit返回时记录只在内存队列中；flush函数成功返回后才算写入。
+    flush()/stop() 会等待此前提交的所有记录写完；进程崩溃时最多丢失
+    一个批次（batch_size条或flush_interval秒）的记录。
+    写入失败的批次保留在内存中，下一个周期重试。
+
+队列深度和每批写入耗时上报到performance_monitor
+"""
+
+import time
+import queue
+import threading
+import logging
+from typing import Any, Callable, List, Optional
+
+from utils.logging_utils import LoggingManager
+from utils.performance_monitor import performance_monitor, PerformanceStep
+
+logger = LoggingManager.get_logger(
+    name='batch_writer',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+# 队列控制标记
+_STOP = object()
+
+
+class _FlushRequest:
+    """flush请求：写入线程处理到该位置时写出全部待写记录并通知调用方"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.success = True
+
+
+class BackgroundBatchWriter:
+    """后台批量写入线程"""
+
+    def __init__(self, flush_func: Callable[[List[Any]], None], batch_size: int = 50,
+                 flush_interval: float = 0.5, max_queue_size: int = 1000, name: str = "批量写入"):
+        """
+        初始化写入线程
+
+        Args:
+            flush_func: 批量写入函数，参数为记录列表，失败时抛出异常
+            batch_size: 攒够多少条记录写入一次
+            flush_interval: 第一条待写记录最多等待多少秒
+            max_queue_size: 队列容量，满时submit阻塞（背压，不丢数据）
+            name: 名称（用于线程名和性能指标名）
+        """
+        self.flush_func = flush_func
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_interval))
+        self.name = name
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # 统计
+        self.flushed_batches = 0
+        self.flushed_items = 0
+        self.failed_flushes = 0
+        self.last_flush_latency = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def queue_depth(self) -> int:
+        """队列中尚未被写入线程取走的记录数"""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """启动写入线程"""
+        with self._start_lock:
+            if self.is_running:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"BatchWriter-{self.name}", daemon=True)
+            self._thread.start()
+            logger.debug(f"🧵 后台写入线程已启动: {self.name} (批量: {self.batch_size}, "
+                         f"间隔: {self.flush_interval * 1000:.0f}ms)")
+
+    def submit(self, items: List[Any]) -> None:
+        """
+        提交记录（按提交顺序写入）
+
+        Args:
+            items: 记录列表
+        """
+        if not self.is_running:
+            self.start()
+        for item in items:
+            self._queue.put(item)
+        performance_monitor.record_gauge(f"{self.name}队列深度", self._queue.qsize())
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待此前提交的记录全部写入
+
+        Returns:
+            是否全部写入成功
+        """
+        if not self.is_running:
+            return True
+        request = _FlushRequest()
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            logger.warning(f"⚠️ 等待后台写入超时: {self.name}")
+            return False
+        return request.success
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """
+        写出剩余记录并停止线程
+
+        Returns:
+            是否全部写入成功
+        """
+        if not self.is_running:
+            return True
+        success = self.flush(timeout)
+        thread = self._thread
+        self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+        return success
+
+    def _run(self) -> None:
+        """写入线程主循环"""
+        pending: List[Any] = []
+        deadline = 0.0
+
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(pending)
+                break
+            if isinstance(item, _FlushRequest):
+                item.success = self._flush(pending)
+                if not item.success:
+                    deadline = time.monotonic() + self.flush_interval
+                item.done.set()
+                continue
+            if item is not None:
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval
+                pending.append(item)
+
+            if pending and (len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                if not self._flush(pending):
+                    # 写入失败：保留记录，下个周期重试
+                    deadline = time.monotonic() + self.flush_interval
+
+        if pending:
+            logger.error(f"❌ 后台写入线程退出时仍有 {len(pending)} 条记录未写入: {self.name}")
+
+    def _flush(self, pending: List[Any]) -> bool:
+        """写出待写记录，成功后清空列表"""
+        if not pending:
+            return True
+
+        depth = self._queue.qsize()
+        performance_monitor.record_gauge(f"{self.name}队列深度", depth)
+        start = time.perf_counter()
+        try:
+            with PerformanceStep(f"{self.name}批量刷新", {'batch_size': len(pending), 'queue_depth': depth}):
+                self.flush_func(list(pending))
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.error(f"❌ 后台批量写入失败（{len(pending)} 条记录将重试）: {self.name}: {e}")
+            return False
+
+        self.last_flush_latency = time.perf_counter() - start
+        self.flushed_batches += 1
+        self.flushed_items += len(pending)
+        logger.debug(f"💾 {self.name}: 写入 {len(pending)} 条, 耗时 {self.last_flush_latency * 1000:.1f}ms, "
+                     f"队列剩余 {depth}")
+        pending.clear()
+        return True
@@ -54,13 +54,79 @@ class ConfigLoader:
                     "extended_capture_time": 2.0,
                     "confidence_threshold": 0.7
                 },
-                "extended_time": 2.0
+                "extended_time": 2.0,
+                "multi_value": {
+                    "enabled": False,
+                    "separators": ["、", "然后", "，", ",", "；", ";"],
+                    "pause_split": True,
+                    "pause_split_duration": 0.25
+                }
             },
             "system": {
                 "log_level": "INFO",
                 "global_unload": False,
                 "test_mode": False,
-                "vosk_log_level": 0
+                "vosk_log_level": 0,
+                "performance": {
+                    "raw_records": False,
+                    "max_raw_records": 100000,
+                    "ring_size": 4096,
+                    "aggregate_interval": 1.0,
+                    "sample_every": 1
+                },
+                "latency": {
+                    "utterance_log": True,
+                    "log_dir": "logs/latency"
+                },
+                "trace": {
+                    "enabled": False,
+                    "capacity": 200000,
+                    "output_dir": "debug/traces"
+                },
+                "metrics": {
+                    "enabled": False,
+                    "host": "127.0.0.1",
+                    "port": 9464,
+                    "file": "",
+                    "interval": 15.0
+                },
+                "slow_capture": {
+                    "enabled": False,
+                    "slo_ms": 2000,
+                    "output_dir": "debug/slow",
+                    "max_bundles": 20,
+                    "max_total_mb": 100,
+                    "max_audio_seconds": 60
+                },
+                "profiler": {
+                    "hz": 100,
+                    "output_dir": "debug/profiles",
+                    "max_depth": 128
+                },
+                "logging": {
+                    "async": True,
+                    "queue_size": 10000,
+                    "max_file_mb": 10,
+                    "backup_count": 5,
+                    "compress": True
+                },
+                "recognition_log": {
+                    "enabled": True,
+                    "log_dir": "logs/recognition",
+                    "batch_size": 50,
+                    "flush_interval": 1.0,
+                    "compress": True,
+                    "keep_days": 365
+                },
+                "memory": {
+                    "check_interval": 60.0,
+                    "warn_items": 100000,
+                    "warn_mb": 100,
+                    "sample_items": 1000,
+                    "tracemalloc": False,
+                    "tracemalloc_frames": 5,
+                    "top_n": 10
+                }
             },
             "audio": {
                 "sample_rate": 16000,
@@ -85,6 +151,38 @@ class ConfigLoader:
                     "include_timestamp": True,
                     "header_language": "zh",
                     "include_original": True
+                },
+                "performance": {
+                    "memory_row_management": True,
+                    "batch_size": 50,
+                    "background_writer": False,
+                    "flush_interval_ms": 500,
+                    "max_queue_size": 1000,
+                    "write_only_finalize": True
+                },
+                "journal": {
+                    "enabled": True,
+                    "fsync_every": 20,
+                    "fsync_interval": 1.0,
+                    "keep_after_finalize": False,
+                    "recover_on_startup": True
+                },
+                "finalize": {
+                    "background": True,
+                    "exit_timeout": 120
+                },
+                "export": {
+                    "sinks": [],
+                    "csv_dir": "",
+                    "sqlite_path": "",
+                    "parquet_dir": ""
+                },
+                "store": {
+                    "enabled": True,
+                    "path": ""
+                },
+                "measure_spec": {
+                    "sidecar_cache": True
                 }
             },
             "voice_commands": {
@@ -98,6 +196,12 @@ class ConfigLoader:
                     "match_mode": "fuzzy",
                     "min_match_length": 2,
                     "confidence_threshold": 0.8
+                },
+                "partial_fast_path": {
+                    "enabled": False,
+                    "stable_partials": 2,
+                    "partial_trigger_seconds": 0.3,
+                    "partial_interval": 0.2
                 }
             },
             "error_correction": {
@@ -280,6 +384,93 @@ class ConfigLoader:
         """获取测试模式设置"""
         return self.get("system.test_mode")
     
+    def get_performance_monitor_config(self) -> dict:
+        """获取性能监控配置（直方图统计 / 原始记录调试模式）"""
+        return self.get("system.performance", {
+            "raw_records": False,
+            "max_raw_records": 100000,
+            "ring_size": 4096,
+            "aggregate_interval": 1.0,
+            "sample_every": 1
+        })
+
+    def get_latency_log_config(self) -> dict:
+        """获取语音段延迟记录配置（关联ID逐环节打点、JSONL日志）"""
+        return self.get("system.latency", {
+            "utterance_log": True,
+            "log_dir": "logs/latency"
+        })
+
+    def get_trace_config(self) -> dict:
+        """获取流水线追踪配置（Chrome Trace Event导出）"""
+        return self.get("system.trace", {
+            "enabled": False,
+            "capacity": 200000,
+            "output_dir": "debug/traces"
+        })
+
+    def get_metrics_config(self) -> dict:
+        """获取本地指标导出配置（Prometheus文本格式）"""
+        return self.get("system.metrics", {
+            "enabled": False,
+            "host": "127.0.0.1",
+            "port": 9464,
+            "file": "",
+            "interval": 15.0
+        })
+
+    def get_slow_capture_config(self) -> dict:
+        """获取慢语音段现场保存配置"""
+        return self.get("system.slow_capture", {
+            "enabled": False,
+            "slo_ms": 2000,
+            "output_dir": "debug/slow",
+            "max_bundles": 20,
+            "max_total_mb": 100,
+            "max_audio_seconds": 60
+        })
+
+    def get_profiler_config(self) -> dict:
+        """获取采样性能分析器配置"""
+        return self.get("system.profiler", {
+            "hz": 100,
+            "output_dir": "debug/profiles",
+            "max_depth": 128
+        })
+
+    def get_logging_config(self) -> dict:
+        """获取日志后端配置（异步队列、按大小轮换、gzip压缩）"""
+        return self.get("system.logging", {
+            "async": True,
+            "queue_size": 10000,
+            "max_file_mb": 10,
+            "backup_count": 5,
+            "compress": True
+        })
+
+    def get_recognition_log_config(self) -> dict:
+        """获取结构化识别事件日志配置（每段语音一行JSONL，按天轮换压缩）"""
+        return self.get("system.recognition_log", {
+            "enabled": True,
+            "log_dir": "logs/recognition",
+            "batch_size": 50,
+            "flush_interval": 1.0,
+            "compress": True,
+            "keep_days": 365
+        })
+
+    def get_memory_config(self) -> dict:
+        """获取内存统计配置（各子系统大小、增长告警、tracemalloc差异）"""
+        return self.get("system.memory", {
+            "check_interval": 60.0,
+            "warn_items": 100000,
+            "warn_mb": 100,
+            "sample_items": 1000,
+            "tracemalloc": False,
+            "tracemalloc_frames": 5,
+            "top_n": 10
+        })
+
     def get_excel_file_name(self) -> str:
         """获取Excel文件名"""
         return self.get("excel.file_name")
@@ -348,6 +539,50 @@ class ConfigLoader:
         """获取FunASR模型路径"""
         return self.get("model.funasr.path", "")
 
+    def get_excel_performance_config(self) -> dict:
+        """获取Excel写入性能配置（后台批量写入）"""
+        return self.get("excel.performance", {
+            "memory_row_management": True,
+            "batch_size": 50,
+            "background_writer": False,
+            "flush_interval_ms": 500,
+            "max_queue_size": 1000,
+            "write_only_finalize": True
+        })
+
+    def get_excel_journal_config(self) -> dict:
+        """获取Excel会话日志配置（追加写日志，停止时生成xlsx）"""
+        return self.get("excel.journal", {
+            "enabled": True,
+            "fsync_every": 20,
+            "fsync_interval": 1.0,
+            "keep_after_finalize": False,
+            "recover_on_startup": True
+        })
+
+    def get_excel_finalize_config(self) -> dict:
+        """获取报告生成配置（停止时后台finalize）"""
+        return self.get("excel.finalize", {
+            "background": True,
+            "exit_timeout": 120
+        })
+
+    def get_excel_export_config(self) -> dict:
+        """获取流式导出配置（CSV / SQLite / Parquet）"""
+        return self.get("excel.export", {
+            "sinks": [],
+            "csv_dir": "",
+            "sqlite_path": "",
+            "parquet_dir": ""
+        })
+
+    def get_excel_store_config(self) -> dict:
+        """获取跨会话测量数据库配置"""
+        return self.get("excel.store", {
+            "enabled": True,
+            "path": ""
+        })
+
     def get_voice_commands_config(self) -> dict:
         """获取语音命令配置"""
         return self.get("voice_commands", {})
@@ -410,6 +645,15 @@ class ConfigLoader:
         """获取语音命令识别配置"""
         return self.get("voice_commands.config", {})
 
+    def get_partial_command_config(self) -> dict:
+        """获取部分结果命令快速通道配置（暂停/继续/停止）"""
+        return self.get("voice_commands.partial_fast_path", {
+            "enabled": False,
+            "stable_partials": 2,
+            "partial_trigger_seconds": 0.3,
+            "partial_interval": 0.2
+        })
+
     def get_vad_config(self) -> dict:
         """获取VAD配置"""
         return self.get("vad", {})
@@ -478,6 +722,19 @@ class ConfigLoader:
         """获取扩展采集时间"""
         return self.get("recognition.extended_time", 2.0)
 
+    def get_multi_value_config(self) -> dict:
+        """获取多值语句配置（一句话录入多个测量值）"""
+        return self.get("recognition.multi_value", {
+            "enabled": False,
+            "separators": ["、", "然后", "，", ",", "；", ";"],
+            "pause_split": True,
+            "pause_split_duration": 0.25
+        })
+
+    def is_multi_value_enabled(self) -> bool:
+        """获取多值模式是否启用"""
+        return self.get("recognition.multi_value.enabled", False)
+
     def get_funasr_model_path(self) -> str:
         """获取统一的FunASR模型路径"""
         return self.get("model.funasr_model_path", "./model/fun")
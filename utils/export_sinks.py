@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式导出目标（CSV / SQLite / Parquet）
+与xlsx并行输出测量记录，供MES等系统直接读取，不必再解析xlsx。
+
+每个导出目标实现同一接口:
+    open_session(session)   会话开始（报告文件名、零件号、批次号、检验员）
+    write(records)          追加记录，每条记录O(1)
+    finalize()              会话结束（Parquet在此一次写出）
+    close()                 释放资源
+
+ExportSinkManager 同时驱动多个导出目标，单个目标出错只记录日志，不影响xlsx和其他目标。
+导出目标在 config.yaml 的 excel.export 中配置。
+"""
+
+import os
+import abc
+import csv
+import threading
+import logging
+from typing import Any, Dict, List, Optional, TextIO
+
+from utils.logging_utils import LoggingManager
+from utils.config_loader import config
+from utils.lazy_imports import is_module_available
+from utils.measurement_store import MEASUREMENT_FIELDS, MeasurementStore, get_measurement_store, resolve_store_path
+
+logger = LoggingManager.get_logger(
+    name='export_sinks',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+# Parquet为可选依赖（pyarrow较重，写出时才导入）
+PYARROW_AVAILABLE = is_module_available("pyarrow")
+
+# 导出的字段（CSV列顺序 / SQLite列 / Parquet列）
+EXPORT_FIELDS = MEASUREMENT_FIELDS
+
+
+def flatten_record(session: Dict[str, Any], record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把导出器的行记录展开为导出字段
+
+    数值写入value列，OK/NOK等特定文本写入text_value列
+    """
+    value = record.get("value")
+    judgment = record.get("judgment") or {}
+    number: Optional[float] = None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    return {
+        "session": session.get("session", ""),
+        "part_no": session.get("part_no", ""),
+        "batch_no": session.get("batch_no", ""),
+        "inspector": session.get("inspector", ""),
+        "voice_id": record.get("voice_id"),
+        "standard_id": record.get("standard_id"),
+        "value": number,
+        "text_value": None if number is not None or value is None else str(value),
+        "judgment": judgment.get("result"),
+        "deviation": judgment.get("deviation"),
+        "timestamp": record.get("timestamp"),
+        "original_text": record.get("original_text"),
+    }
+
+
+class ExportSink(abc.ABC):
+    """导出目标基类"""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.session: Dict[str, Any] = {}
+        self.written = 0
+
+    def open_session(self, session: Dict[str, Any]) -> None:
+        """会话开始"""
+        self.session = dict(session)
+
+    @abc.abstractmethod
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """追加记录"""
+
+    def finalize(self) -> None:
+        """会话结束"""
+
+    def close(self) -> None:
+        """释放资源"""
+
+
+class CsvSink(ExportSink):
+    """每个会话一个追加写的CSV文件（与xlsx同名）"""
+
+    name = "csv"
+
+    def __init__(self, directory: str = "") -> None:
+        """
+        Args:
+            directory: CSV目录，为空时与xlsx放在同一目录
+        """
+        super().__init__()
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._file: Optional[TextIO] = None
+        self._writer: Optional[csv.DictWriter] = None
+
+    def open_session(self, session: Dict[str, Any]) -> None:
+        self.close()
+        super().open_session(session)
+        filename = session.get("filename", "measurements.xlsx")
+        directory = self.directory or os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, os.path.splitext(os.path.basename(filename))[0] + ".csv")
+
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS)
+        if is_new:
+            self._writer.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if self._file is None or self._writer is None:
+            raise RuntimeError(f"导出会话未打开: {self.name}")
+        self._writer.writerows(flatten_record(self.session, record) for record in records)
+        self._file.flush()
+        self.written += len(records)
+
+    def finalize(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+class SqliteSink(ExportSink):
+    """写入跨会话测量数据库（utils.measurement_store，按零件号、批次号、标准序号等建索引）"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = "") -> None:
+        """
+        Args:
+            path: 数据库文件路径，为空时使用 excel.store.path（默认报告目录下的measurements.db）
+        """
+        super().__init__()
+        self.path = path
+        self._store: Optional[MeasurementStore] = None
+
+    def open_session(self, session: Dict[str, Any]) -> None:
+        super().open_session(session)
+        path = self.path or resolve_store_path(os.path.dirname(session.get("filename", "")))
+        self._store = get_measurement_store(path)
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        if self._store is None:
+            raise RuntimeError(f"导出会话未打开: {self.name}")
+        # 与finalize的入库使用同一主键 (session, voice_id)，重复写入为覆盖
+        self._store.upsert_measurements(flatten_record(self.session, record) for record in records)
+        self.written += len(records)
+
+
+class ParquetSink(ExportSink):
+    """会话结束时一次写出Parquet文件（需要pyarrow）"""
+
+    name = "parquet"
+
+    def __init__(self, directory: str = "") -> None:
+        """
+        Args:
+            directory: Parquet目录，为空时与xlsx放在同一目录
+        """
+        super().__init__()
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._columns: Dict[str, List[Any]] = {}
+
+    def open_session(self, session: Dict[str, Any]) -> None:
+        super().open_session(session)
+        self._columns = {field: [] for field in EXPORT_FIELDS}
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            row = flatten_record(self.session, record)
+            for field in EXPORT_FIELDS:
+                self._columns[field].append(row[field])
+        self.written += len(records)
+
+    def finalize(self) -> None:
+        if not self._columns or not self._columns["voice_id"]:
+            return
+        filename = self.session.get("filename", "measurements.xlsx")
+        directory = self.directory or os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, os.path.splitext(os.path.basename(filename))[0] + ".parquet")
+
+        import pyarrow
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(pyarrow.table(self._columns), self.path)
+        self._columns = {field: [] for field in EXPORT_FIELDS}
+
+
+class ExportSinkManager:
+    """同时驱动多个导出目标（线程安全）"""
+
+    def __init__(self, sinks: Optional[List[ExportSink]] = None) -> None:
+        self.sinks: List[ExportSink] = list(sinks or [])
+        self._lock = threading.Lock()
+        self._session_open = False
+        self.errors = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.sinks)
+
+    def open_session(self, session: Dict[str, Any]) -> None:
+        """开始会话（文件名、零件号、批次号、检验员）"""
+        with self._lock:
+            self._call_all("open_session", session)
+            self._session_open = True
+
+    @property
+    def session_open(self) -> bool:
+        return self._session_open
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """把记录写入所有导出目标"""
+        if not records:
+            return
+        with self._lock:
+            self._call_all("write", records)
+
+    def finalize(self) -> None:
+        """结束会话（下一条记录到来时重新open_session）"""
+        with self._lock:
+            if self._session_open:
+                self._call_all("finalize")
+                self._session_open = False
+
+    def close(self) -> None:
+        """关闭所有导出目标"""
+        with self._lock:
+            self._call_all("close")
+            self._session_open = False
+
+    def _call_all(self, method: str, *args: Any) -> None:
+        for sink in self.sinks:
+            try:
+                getattr(sink, method)(*args)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"❌ 导出目标 {sink.name}.{method} 失败: {e}")
+
+
+def create_sink(sink_type: str, export_config: Optional[Dict[str, Any]] = None) -> Optional[ExportSink]:
+    """
+    按类型创建导出目标
+
+    Args:
+        sink_type: csv / sqlite / parquet
+        export_config: excel.export 配置
+    """
+    export_config = export_config or {}
+    if sink_type == "csv":
+        return CsvSink(export_config.get("csv_dir", ""))
+    if sink_type == "sqlite":
+        return SqliteSink(export_config.get("sqlite_path", ""))
+    if sink_type == "parquet":
+        if not PYARROW_AVAILABLE:
+            logger.warning("⚠️ 未安装pyarrow，跳过Parquet导出")
+            return None
+        return ParquetSink(export_config.get("parquet_dir", ""))
+    logger.warning(f"⚠️ 未知的导出目标类型: {sink_type}")
+    return None
+
+
+def create_export_sinks_from_config() -> ExportSinkManager:
+    """按 config.yaml 的 excel.export.sinks 创建导出目标（默认不启用）"""
+    export_config = config.get_excel_export_config()
+    sinks = []
+    for sink_type in export_config.get("sinks") or []:
+        sink = create_sink(str(sink_type).lower(), export_config)
+        if sink is not None:
+            sinks.append(sink)
+    if sinks:
+        logger.info(f"📤 已启用导出目标: {', '.join(sink.name for sink in sinks)}")
+    return ExportSinkManager(sinks)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台报告生成（finalize）
+停止录音时把导出器交给后台线程生成xlsx，调用方立即返回，可以马上开始下一批次。
+
+    job = get_finalize_worker().submit(exporter, on_progress=..., on_done=...)
+
+- 任务按提交顺序在同一个后台线程中执行（openpyxl保存不并发）
+- on_progress(job) 在阶段变化和每写入一批行时回调（job.phase / job.done / job.total）
+- on_done(job) 在任务结束时回调（job.success）
+- 回调在后台线程中执行，GUI需要转发到界面线程（voice_gui通过Qt信号）
+
+退出保证:
+    进程退出时（atexit）等待未完成的任务，最多 excel.finalize.exit_timeout 秒；
+    超时或失败的任务保留会话日志，下次启动时由 recover_unfinished_sessions 恢复。
+"""
+
+import time
+import queue
+import atexit
+import itertools
+import threading
+import logging
+from typing import Any, Callable, List, Optional
+
+from utils.logging_utils import LoggingManager
+from utils.config_loader import config
+from utils.trace_export import pipeline_tracer
+
+logger = LoggingManager.get_logger(
+    name='finalize_jobs',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+# finalize阶段（ExcelExporterEnhanced.finalize_excel_file按此顺序回报进度）
+FINALIZE_PHASE_NAMES = {
+    "queued": "排队中",
+    "collect": "读取记录",
+    "spec": "加载测量规范",
+    "write": "写入数据",
+    "save": "保存文件",
+    "store": "写入数据库",
+    "done": "完成",
+    "failed": "失败",
+}
+
+# 队列控制标记
+_STOP = object()
+
+_job_ids = itertools.count(1)
+
+
+class FinalizeJob:
+    """一个后台finalize任务"""
+
+    def __init__(self, exporter: Any, on_progress: Optional[Callable[["FinalizeJob"], None]] = None,
+                 on_done: Optional[Callable[["FinalizeJob"], None]] = None):
+        self.job_id = next(_job_ids)
+        self.exporter = exporter
+        self.filename: str = exporter.filename
+        self.on_progress = on_progress
+        self.on_done = on_done
+
+        self.phase = "queued"
+        self.done = 0
+        self.total = 0
+        self.success: Optional[bool] = None
+        self.record_count = 0
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._finished = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """从提交到结束（或当前）的秒数"""
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务结束，返回是否已结束"""
+        return self._finished.wait(timeout)
+
+    def _progress(self, phase: str, done: int, total: int) -> None:
+        """导出器的进度回调"""
+        self.phase, self.done, self.total = phase, done, total
+        self._notify(self.on_progress)
+
+    def _run(self) -> None:
+        self.started_at = time.monotonic()
+        try:
+            with pipeline_tracer.span("生成报告", "excel", file=self.filename):
+                self.success = bool(self.exporter.finalize_excel_file(progress_callback=self._progress))
+        except Exception as e:
+            logger.error(f"❌ 后台生成报告异常: {self.filename}: {e}")
+            self.success = False
+        self.record_count = len(self.exporter.get_session_data())
+        self.phase = "done" if self.success else "failed"
+        self.finished_at = time.monotonic()
+        self._finished.set()
+        if self.success:
+            logger.info(f"✅ 后台报告生成完成: {self.filename} "
+                        f"({self.record_count} 条记录, 耗时 {self.finished_at - self.started_at:.2f}s)")
+        else:
+            logger.error(f"❌ 后台报告生成失败，会话日志已保留，下次启动时恢复: {self.filename}")
+        self._notify(self.on_done)
+
+    def _notify(self, callback: Optional[Callable[["FinalizeJob"], None]]) -> None:
+        if callback is None:
+            return
+        try:
+            callback(self)
+        except Exception as e:
+            logger.warning(f"⚠️ finalize回调出错: {e}")
+
+
+class FinalizeWorker:
+    """后台finalize线程（任务按提交顺序执行）"""
+
+    def __init__(self, name: str = "报告生成"):
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._jobs: List[FinalizeJob] = []
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, exporter: Any, on_progress: Optional[Callable[[FinalizeJob], None]] = None,
+               on_done: Optional[Callable[[FinalizeJob], None]] = None) -> FinalizeJob:
+        """
+        提交导出器，在后台执行 finalize_excel_file
+
+        提交后调用方不能再向该导出器写入记录（下一批次使用新的导出器）
+        """
+        job = FinalizeJob(exporter, on_progress, on_done)
+        with self._lock:
+            self._jobs = [j for j in self._jobs if not j.finished]
+            self._jobs.append(job)
+            if not self.is_running:
+                self._thread = threading.Thread(target=self._run, name=f"FinalizeWorker-{self.name}", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        logger.info(f"📝 报告已转入后台生成: {job.filename}")
+        return job
+
+    def active_jobs(self) -> List[FinalizeJob]:
+        """未结束的任务"""
+        with self._lock:
+            return [job for job in self._jobs if not job.finished]
+
+    def active_filenames(self) -> List[str]:
+        """未结束任务的报告文件名（启动恢复时跳过这些会话日志）"""
+        return [job.filename for job in self.active_jobs()]
+
+    def wait_all(self, timeout: Optional[float] = None) -> bool:
+        """等待全部任务结束，返回是否全部结束"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for job in self.active_jobs():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not job.wait(remaining):
+                return False
+        return True
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """等待全部任务并停止线程，返回是否全部结束"""
+        finished = self.wait_all(timeout)
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            if finished:
+                thread.join(timeout)
+        return finished
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            job._run()
+
+
+_worker: Optional[FinalizeWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_finalize_worker() -> FinalizeWorker:
+    """全局finalize线程（首次使用时注册退出前等待）"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = FinalizeWorker()
+            atexit.register(_drain_at_exit)
+        return _worker
+
+
+def _drain_at_exit() -> None:
+    """进程退出前完成未结束的报告；超时的任务由会话日志在下次启动时恢复"""
+    if _worker is None:
+        return
+    pending = _worker.active_jobs()
+    if not pending:
+        return
+    timeout = float(config.get_excel_finalize_config().get("exit_timeout", 120))
+    logger.info(f"⏳ 退出前等待 {len(pending)} 个报告生成完成（最多 {timeout:.0f}s）...")
+    if not _worker.shutdown(timeout):
+        for job in _worker.active_jobs():
+            logger.warning(f"⚠️ 报告未能在退出前生成，会话日志已保留，下次启动时恢复: {job.filename}")
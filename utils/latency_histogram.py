@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对数分桶耗时直方图（HDR风格）
+按纳秒整数记录耗时，桶宽随数量级倍增，内存固定、记录O(1)：
+
+    hist = LatencyHistogram()
+    hist.record(0.0125)          # 秒
+    hist.record_ns(12_500_000)   # 纳秒
+    hist.percentile(99)          # 秒
+
+精度:
+    每个2的幂区间再等分为 2^(SUB_BUCKET_BITS-1) 个子桶，相对误差不超过 1/2^(SUB_BUCKET_BITS-1)
+    （默认8位，约0.8%）；最小值、最大值、总和精确记录。
+    超过 MAX_TRACKABLE_NS（约2.4小时）的耗时计入最高桶，最大值仍精确。
+
+本类不加锁，多线程共用时由调用方加锁（PerformanceMonitor在自身的锁内记录）。
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+SUB_BUCKET_BITS = 8
+MAX_TRACKABLE_NS = 1 << 43
+
+_SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+_HALF_SHIFT = SUB_BUCKET_BITS - 1
+
+
+def _bucket_index(value_ns: int) -> int:
+    """耗时（纳秒）→ 桶序号"""
+    shift = value_ns.bit_length() - SUB_BUCKET_BITS
+    if shift <= 0:
+        return value_ns
+    return (shift << _HALF_SHIFT) + (value_ns >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """桶序号 → 该桶覆盖的 [下限, 上限]（纳秒）"""
+    if index < _SUB_BUCKET_COUNT:
+        return index, index
+    shift = (index >> _HALF_SHIFT) - 1
+    mantissa = index - (shift << _HALF_SHIFT)
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+_BUCKET_COUNT = _bucket_index(MAX_TRACKABLE_NS - 1) + 1
+
+
+class LatencyHistogram:
+    """单个步骤的耗时直方图"""
+
+    __slots__ = ("_counts", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self._counts: List[int] = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, seconds: float) -> None:
+        """记录一次耗时（秒）"""
+        self.record_ns(int(seconds * 1e9))
+
+    def record_ns(self, value_ns: int) -> None:
+        """记录一次耗时（纳秒）"""
+        if value_ns < 0:
+            value_ns = 0
+        if self.count == 0 or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+        self.count += 1
+        self.total_ns += value_ns
+        self._counts[_bucket_index(value_ns) if value_ns < MAX_TRACKABLE_NS else _BUCKET_COUNT - 1] += 1
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """合并另一个直方图（如各线程的局部直方图）"""
+        if other.count == 0:
+            return
+        counts = self._counts
+        for index, value in enumerate(other._counts):
+            if value:
+                counts[index] += value
+        if self.count == 0 or other.min_ns < self.min_ns:
+            self.min_ns = other.min_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def reset(self) -> None:
+        """清空"""
+        self._counts = [0] * _BUCKET_COUNT
+        self.count = self.total_ns = self.min_ns = self.max_ns = 0
+
+    def percentile_ns(self, percent: float) -> int:
+        """百分位耗时（纳秒），取所在桶的中点并限制在[最小值, 最大值]内"""
+        if self.count == 0:
+            return 0
+        if percent >= 100:
+            return self.max_ns
+        rank = max(1, int(self.count * percent / 100.0 + 0.5))
+        seen = 0
+        for index, value in enumerate(self._counts):
+            if value:
+                seen += value
+                if seen >= rank:
+                    lower, upper = _bucket_bounds(index)
+                    return min(max((lower + upper) // 2, self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def percentile(self, percent: float) -> float:
+        """百分位耗时（秒）"""
+        return self.percentile_ns(percent) / 1e9
+
+    @property
+    def mean(self) -> float:
+        """平均耗时（秒）"""
+        return self.total_ns / self.count / 1e9 if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """汇总（秒）: count / total / avg / min / max / p50 / p95 / p99"""
+        return {
+            "count": self.count,
+            "total": self.total_ns / 1e9,
+            "avg": self.mean,
+            "min": self.min_ns / 1e9,
+            "max": self.max_ns / 1e9,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+    def copy(self) -> "LatencyHistogram":
+        """复制（导出时在调用方的锁内复制，锁外再计算）"""
+        clone = LatencyHistogram()
+        clone._counts = self._counts[:]
+        clone.count, clone.total_ns = self.count, self.total_ns
+        clone.min_ns, clone.max_ns = self.min_ns, self.max_ns
+        return clone
+
+    def cumulative_counts(self, bounds_ns: Sequence[int]) -> List[int]:
+        """
+        各上限（纳秒，升序）以内的累计次数（Prometheus直方图的le桶）
+        与上限落在同一个桶的耗时都计入，误差在一个桶宽以内
+        """
+        result: List[int] = []
+        counts = self._counts
+        seen = 0
+        index = 0
+        for bound in bounds_ns:
+            last = _bucket_index(bound) if bound < MAX_TRACKABLE_NS else _BUCKET_COUNT - 1
+            while index <= last:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def nonzero_buckets(self) -> Dict[int, int]:
+        """非空桶 {桶上限纳秒: 次数}（导出用）"""
+        return {_bucket_bounds(index)[1]: value for index, value in enumerate(self._counts) if value}
+
+    @staticmethod
+    def bucket_count() -> int:
+        """桶数（每个直方图固定分配）"""
+        return _BUCKET_COUNT
+
+    def __repr__(self) -> str:
+        if not self.count:
+            return "LatencyHistogram(count=0)"
+        return (f"LatencyHistogram(count={self.count}, p50={self.percentile(50):.6f}s, "
+                f"p99={self.percentile(99):.6f}s, max={self.max_ns / 1e9:.6f}s)")
+
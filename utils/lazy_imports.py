@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入工具
+把cn2an、openpyxl等重量级依赖移出启动路径：首次使用时才真正导入，
+或在后台线程中预热，避免拖慢main_f.py / voice_gui.py的启动
+"""
+
+import importlib
+import importlib.util
+import threading
+import logging
+from types import ModuleType
+from typing import Any, Dict, Iterable, Optional
+
+from utils.logging_utils import LoggingManager
+
+logger = LoggingManager.get_logger(
+    name='lazy_imports',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+
+class LazyModule(ModuleType):
+    """
+    延迟加载的模块代理
+    首次访问属性时导入真实模块并缓存，之后的访问直接转发
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        """导入真实模块（线程安全，只导入一次）"""
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+                    logger.debug(f"📦 延迟导入完成: {self.__name__}")
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        """真实模块是否已经导入"""
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "已加载" if self.is_loaded else "未加载"
+        return f"<LazyModule '{self.__name__}' ({state})>"
+
+
+class LazyCallable:
+    """
+    延迟解析的可调用对象（如 load_workbook、Font）
+    调用时才导入所在模块，适合保留原有的模块级名称
+    """
+
+    def __init__(self, module_name: str, attr_name: str) -> None:
+        self._module = lazy_import(module_name)
+        self._attr_name = attr_name
+        self._target: Any = None
+
+    def resolve(self) -> Any:
+        """返回真实对象"""
+        if self._target is None:
+            self._target = getattr(self._module, self._attr_name)
+        return self._target
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<LazyCallable '{self._module.__name__}.{self._attr_name}'>"
+
+
+# 延迟模块注册表（同名模块共享同一个代理）
+_lazy_modules: Dict[str, LazyModule] = {}
+_registry_lock = threading.Lock()
+
+
+def lazy_import(module_name: str) -> LazyModule:
+    """
+    获取模块的延迟代理
+
+    Args:
+        module_name: 模块名（支持子模块，如"openpyxl.styles"）
+
+    Returns:
+        LazyModule代理，首次访问属性时导入
+    """
+    with _registry_lock:
+        module = _lazy_modules.get(module_name)
+        if module is None:
+            module = LazyModule(module_name)
+            _lazy_modules[module_name] = module
+        return module
+
+
+def lazy_callable(module_name: str, attr_name: str) -> LazyCallable:
+    """获取模块中某个可调用对象的延迟代理"""
+    return LazyCallable(module_name, attr_name)
+
+
+def is_module_available(module_name: str) -> bool:
+    """
+    检查模块是否可导入（只查找，不执行导入）
+
+    Args:
+        module_name: 模块名
+
+    Returns:
+        模块是否存在
+    """
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def warm_up_modules(module_names: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+    """
+    预热延迟导入的模块
+
+    Args:
+        module_names: 要预热的模块名列表
+        background: 是否在后台守护线程中导入
+
+    Returns:
+        后台线程（background=False时返回None）
+    """
+    names = [name for name in module_names if is_module_available(name)]
+
+    def _warm_up() -> None:
+        for name in names:
+            try:
+                lazy_import(name)._load()
+            except Exception as e:
+                logger.warning(f"⚠️ 预热模块失败: {name}: {e}")
+
+    if not background:
+        _warm_up()
+        return None
+
+    thread = threading.Thread(target=_warm_up, name="LazyImportWarmUp", daemon=True)
+    thread.start()
+    logger.debug(f"🔥 后台预热模块: {', '.join(names)}")
+    return thread
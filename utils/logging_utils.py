@@ -3,12 +3,24 @@
 """
 统一日志处理工具类
 为整个项目提供标准化的日志配置和管理功能
+
+异步日志（system.logging.async，默认开启）:
+    各模块的控制台/文件处理器不直接挂在logger上，而是挂在一个 QueueListener 后台线程上；
+    记录日志的线程（如音频采集线程）只复制记录并入队，时间格式化和写文件都在后台线程完成。
+    日志文件按大小轮换（max_file_mb / backup_count），轮换出的旧文件可gzip压缩。
+    队列满时丢弃新记录并计数（LoggingManager.dropped_records），不阻塞调用方。
 """
 
 import os
+import gzip
+import queue
+import atexit
+import shutil
 import logging
+import threading
 from datetime import datetime
-from typing import Optional, Union
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Tuple, Union
 
 # 创建一个过滤器，专门过滤DEBUG级别的日志
 class NoDebugFilter(logging.Filter):
@@ -37,6 +49,78 @@ original_stream_handler = logging.StreamHandler
 # 注释掉有问题的代码，改为在使用时手动添加过滤器
 
 
+def _gzip_namer(name: str) -> str:
+    """轮换文件名：app.log.1 → app.log.1.gz"""
+    return f"{name}.gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """轮换时把旧日志压缩为gzip（在日志后台线程中执行）"""
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class _RoutedQueueHandler(QueueHandler):
+    """挂在logger上的入队处理器：只复制记录、确定消息文本，格式化留给后台线程"""
+
+    def __init__(self, log_queue: "queue.Queue", route: str):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 参数可能在入队后被修改，消息文本在此确定；时间格式化和异常堆栈格式化在后台线程
+        # 浅复制只复制属性字典（copy.copy 经 __reduce_ex__，慢约3倍）
+        original, record = record, logging.LogRecord.__new__(type(record))
+        record.__dict__.update(original.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        record.log_route = self.route
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LoggingManager.record_dropped()
+
+
+class _RouterHandler(logging.Handler):
+    """后台线程中按logger名把记录分发给该logger的控制台/文件处理器"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[str, List[logging.Handler]] = {}
+        self._routes_lock = threading.Lock()
+
+    def set_route(self, route: str, handlers: List[logging.Handler]) -> None:
+        with self._routes_lock:
+            old_handlers = self.routes.get(route, [])
+            self.routes[route] = handlers
+        for handler in old_handlers:
+            if handler not in handlers:
+                handler.close()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        with self._routes_lock:
+            handlers = self.routes.get(getattr(record, "log_route", ""), ())
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
+
+    def close(self) -> None:
+        with self._routes_lock:
+            for handlers in self.routes.values():
+                for handler in handlers:
+                    handler.close()
+        super().close()
+
+
 class LoggingManager:
     """
     统一日志管理类
@@ -49,6 +133,116 @@ class LoggingManager:
     
     # logs目录路径（使用小写保持一致性）
     LOGS_DIR = os.path.join(os.getcwd(), "logs")
+
+    # 异步日志：共享队列、后台分发线程和各logger的入队处理器
+    _queue: Optional["queue.Queue"] = None
+    _listener: Optional[QueueListener] = None
+    _router: Optional[_RouterHandler] = None
+    _queue_handlers: List[_RoutedQueueHandler] = []
+    _listener_lock = threading.Lock()
+    _settings: Optional[Dict] = None
+    dropped_records = 0
+    _dropped_lock = threading.Lock()  # 多个线程可能同时遇到队列满
+
+    @classmethod
+    def settings(cls) -> Dict:
+        """日志后端配置（system.logging，首次使用时读取）"""
+        if cls._settings is None:
+            from utils.config_loader import config
+            cls._settings = config.get_logging_config()
+        return cls._settings
+
+    @classmethod
+    def record_dropped(cls) -> None:
+        """队列满时丢弃的记录计数"""
+        with cls._dropped_lock:
+            cls.dropped_records += 1
+
+    @classmethod
+    def async_enabled(cls) -> bool:
+        return bool(cls.settings().get("async", True))
+
+    @classmethod
+    def _ensure_listener(cls) -> Tuple["queue.Queue", _RouterHandler]:
+        """启动后台分发线程（首次调用时），根日志器已有的处理器也改为经队列输出；返回(队列, 分发处理器)"""
+        with cls._listener_lock:
+            log_queue, router = cls._queue, cls._router
+            if cls._listener is not None and log_queue is not None and router is not None:
+                return log_queue, router
+
+            log_queue = queue.Queue(maxsize=int(cls.settings().get("queue_size", 10000)))
+            router = _RouterHandler()
+            listener = QueueListener(log_queue, router)
+            cls._queue, cls._router, cls._listener = log_queue, router, listener
+            listener.start()
+            atexit.register(cls.shutdown)
+
+            root = logging.getLogger()
+            root_handlers = [handler for handler in root.handlers if not isinstance(handler, QueueHandler)]
+            if root_handlers:
+                for handler in root_handlers:
+                    root.removeHandler(handler)
+                router.set_route("", root_handlers)
+                cls._attach_queue_handler(log_queue, root, "")
+            return log_queue, router
+
+    @classmethod
+    def _attach_queue_handler(cls, log_queue: "queue.Queue", logger: logging.Logger, route: str) -> None:
+        handler = _RoutedQueueHandler(log_queue, route)
+        cls._queue_handlers = [existing for existing in cls._queue_handlers if existing.route != route] + [handler]
+        logger.addHandler(handler)
+
+    @classmethod
+    def _after_fork_in_child(cls) -> None:
+        """子进程（fork）中没有父进程的后台线程：换新队列并重新启动"""
+        router = cls._router
+        if cls._listener is None or router is None:
+            return
+        cls._listener_lock = threading.Lock()
+        cls._dropped_lock = threading.Lock()
+        log_queue: "queue.Queue" = queue.Queue(maxsize=int(cls.settings().get("queue_size", 10000)))
+        listener = QueueListener(log_queue, router)
+        cls._queue, cls._listener = log_queue, listener
+        for handler in cls._queue_handlers:
+            handler.queue = log_queue
+        listener.start()
+
+    @classmethod
+    def flush(cls) -> None:
+        """等待队列中已有的日志写完"""
+        if cls._listener is not None and cls._queue is not None:
+            cls._queue.join()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """停止后台线程（写完队列中的日志）并关闭文件"""
+        with cls._listener_lock:
+            listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+
+    @classmethod
+    def queue_depth(cls) -> int:
+        """待写入的日志条数"""
+        return cls._queue.qsize() if cls._queue is not None else 0
+
+    @classmethod
+    def _create_file_handler(cls, log_file_path: str) -> logging.Handler:
+        """按大小轮换的文件处理器（max_file_mb为0时不轮换），轮换出的旧文件可gzip压缩"""
+        settings = cls.settings()
+        max_bytes = int(float(settings.get("max_file_mb", 10)) * 1024 * 1024)
+        file_handler = RotatingFileHandler(
+            filename=log_file_path,
+            encoding='utf-8-sig',  # 使用utf-8-sig确保Windows下正确处理BOM
+            mode='a',
+            maxBytes=max_bytes,
+            backupCount=int(settings.get("backup_count", 5)),
+            delay=True
+        )
+        if settings.get("compress", True):
+            file_handler.namer = _gzip_namer
+            file_handler.rotator = _gzip_rotator
+        return file_handler
     
     @classmethod
     def initialize_logs_directory(cls) -> None:
@@ -106,6 +300,7 @@ class LoggingManager:
         
         # 初始化log_file_path变量
         log_file_path = None
+        handlers: List[logging.Handler] = []
         
         # 配置控制台日志 - 先配置控制台日志，确保所有日志都经过正确的级别过滤
         if log_to_console:
@@ -116,7 +311,7 @@ class LoggingManager:
             console_handler.setFormatter(formatter)
             # 🔥 修复：手动添加过滤器，确保不显示DEBUG日志
             console_handler.addFilter(NoDebugFilter())
-            logger.addHandler(console_handler)
+            handlers.append(console_handler)
         
         # 配置文件日志
         if log_to_file:
@@ -129,23 +324,29 @@ class LoggingManager:
             log_file_path = os.path.join(cls.LOGS_DIR, log_file)
             
             try:
-                # 创建文件处理器 - 确保使用正确的UTF-8编码
-                file_handler = logging.FileHandler(
-                    filename=log_file_path,
-                    encoding='utf-8-sig',  # 使用utf-8-sig确保Windows下正确处理BOM
-                    mode='a'
-                )
+                # 创建文件处理器 - 确保使用正确的UTF-8编码，按大小轮换
+                file_handler = cls._create_file_handler(log_file_path)
                 file_handler.setLevel(file_level or level)
                 file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-                
-                # 所有处理器设置完成后，再记录日志
-                logger.debug(f"日志文件已创建: {log_file_path}")
+                handlers.append(file_handler)
             except Exception as e:
                 # 使用标准错误流输出错误信息
                 import sys
                 print(f"创建日志文件失败: {e}", file=sys.stderr)
-        
+
+        if cls.async_enabled():
+            # 处理器挂在后台线程上，logger上只有入队处理器
+            log_queue, router = cls._ensure_listener()
+            router.set_route(name, handlers)
+            cls._attach_queue_handler(log_queue, logger, name)
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+
+        # 所有处理器设置完成后，再记录日志
+        if log_file_path:
+            logger.debug("日志文件已创建: %s", log_file_path)
+
         return logger
     
     @classmethod
@@ -201,6 +402,10 @@ class LoggingManager:
         )
 
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=LoggingManager._after_fork_in_child)
+
+
 # 便捷函数：获取标准日志记录器
 def get_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     """
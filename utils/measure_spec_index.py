@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测量规范索引
+扫描 reports/templates/ 和 reports/ 建立 零件号 → {零件号}_MeasureSpec.xlsx 的映射，
+并把解析后的规范缓存在内存和旁路文件（.spec_cache/{文件名}.json）中。
+
+缓存失效规则:
+    - 目录列表：目录mtime变化时重新扫描（新增/删除规范文件）
+    - 规范内容：规范文件的mtime_ns或大小变化时重新解析
+    未变化的规范文件在进程内只解析一次，进程重启后从旁路文件读取，不再打开xlsx
+
+规范数据格式（与ExcelExporterEnhanced._calculate_judgment一致）:
+    {标准序号: {'content': 标准内容, 'lower_limit': 下限或None, 'upper_limit': 上限或None}}
+"""
+
+import os
+import json
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logging_utils import LoggingManager
+from utils.config_loader import config
+from utils.lazy_imports import lazy_callable
+
+logger = LoggingManager.get_logger(
+    name='measure_spec_index',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+load_workbook = lazy_callable("openpyxl", "load_workbook")
+
+SPEC_SUFFIX = "_MeasureSpec.xlsx"
+SIDECAR_DIR = ".spec_cache"
+SIDECAR_VERSION = 1
+
+SpecData = Dict[int, Dict[str, Any]]
+
+
+def _file_signature(path: str) -> Tuple[int, int]:
+    """文件签名 (mtime_ns, 大小)，文件不存在时抛出OSError"""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def parse_measure_spec(spec_path: str) -> SpecData:
+    """
+    解析测量规范文件（第1行为标题，第2行起：标准序号、标准内容、下限、上限）
+
+    Args:
+        spec_path: 规范文件路径
+
+    Returns:
+        规范数据；文件格式错误时返回空字典
+    """
+    try:
+        workbook = load_workbook(spec_path, read_only=True, data_only=True)
+        try:
+            spec_data: SpecData = {}
+            for row in workbook.active.iter_rows(min_row=2, max_col=4, values_only=True):
+                row = tuple(row) + (None,) * (4 - len(row))
+                standard_id, content, lower_limit, upper_limit = row[:4]
+                if standard_id is None:
+                    continue
+                try:
+                    standard_id = int(standard_id)
+                except (ValueError, TypeError):
+                    continue
+
+                spec_data[standard_id] = {
+                    'content': content or "",
+                    'lower_limit': float(lower_limit) if lower_limit is not None else None,
+                    'upper_limit': float(upper_limit) if upper_limit is not None else None
+                }
+            return spec_data
+        finally:
+            workbook.close()
+
+    except Exception as e:
+        logger.error(f"加载测量规范数据失败: {e}")
+        return {}
+
+
+class MeasureSpecIndex:
+    """测量规范索引（线程安全）"""
+
+    def __init__(self, search_dirs: List[str], use_sidecar: bool = True):
+        """
+        初始化索引
+
+        Args:
+            search_dirs: 查找目录，按优先级排列（同名文件取靠前的目录）
+            use_sidecar: 是否读写旁路缓存文件
+        """
+        self.search_dirs = list(search_dirs)
+        self.use_sidecar = use_sidecar
+
+        self._lock = threading.RLock()
+        self._dir_mtimes: Dict[str, Optional[int]] = {}
+        self._part_paths: Dict[str, str] = {}
+        # 规范文件路径 → (签名, 规范数据)
+        self._specs: Dict[str, Tuple[Tuple[int, int], SpecData]] = {}
+
+        # 统计
+        self.scans = 0
+        self.parses = 0
+        self.sidecar_hits = 0
+
+    def find(self, part_no: str) -> Optional[str]:
+        """
+        查找零件号对应的规范文件
+
+        Returns:
+            规范文件路径，不存在时返回None
+        """
+        with self._lock:
+            self._refresh_listing()
+            return self._part_paths.get(part_no)
+
+    def get(self, part_no: str) -> Tuple[Optional[str], SpecData]:
+        """
+        查找并加载零件号对应的规范
+
+        Returns:
+            (规范文件路径, 规范数据)；文件不存在时为 (None, {})
+        """
+        with self._lock:
+            spec_path = self.find(part_no)
+            if spec_path is None:
+                return None, {}
+            return spec_path, self.load(spec_path)
+
+    def load(self, spec_path: str) -> SpecData:
+        """
+        加载规范文件（内存缓存 → 旁路文件 → 解析xlsx）
+
+        Args:
+            spec_path: 规范文件路径
+
+        Returns:
+            规范数据；文件不存在或格式错误时返回空字典
+        """
+        with self._lock:
+            try:
+                signature = _file_signature(spec_path)
+            except OSError:
+                self._specs.pop(spec_path, None)
+                return {}
+
+            cached = self._specs.get(spec_path)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            spec_data = self._read_sidecar(spec_path, signature)
+            if spec_data is None:
+                spec_data = parse_measure_spec(spec_path)
+                self.parses += 1
+                if spec_data:
+                    self._write_sidecar(spec_path, signature, spec_data)
+                logger.debug(f"📊 解析测量规范: {spec_path} ({len(spec_data)} 条)")
+            else:
+                self.sidecar_hits += 1
+
+            self._specs[spec_path] = (signature, spec_data)
+            return spec_data
+
+    def invalidate(self) -> None:
+        """清空全部缓存（下次访问时重新扫描目录）"""
+        with self._lock:
+            self._dir_mtimes.clear()
+            self._part_paths.clear()
+            self._specs.clear()
+
+    def _refresh_listing(self) -> None:
+        """任一查找目录的mtime变化时重新扫描"""
+        mtimes: Dict[str, Optional[int]] = {}
+        for directory in self.search_dirs:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtimes[directory] = None
+        if mtimes == self._dir_mtimes:
+            return
+
+        part_paths: Dict[str, str] = {}
+        for directory in reversed(self.search_dirs):
+            if mtimes[directory] is None:
+                continue
+            for entry in os.scandir(directory):
+                if entry.name.endswith(SPEC_SUFFIX) and entry.is_file():
+                    part_paths[entry.name[:-len(SPEC_SUFFIX)]] = entry.path
+
+        self._part_paths = part_paths
+        self._dir_mtimes = mtimes
+        self.scans += 1
+        logger.debug(f"🔍 测量规范目录扫描完成: {len(part_paths)} 个零件号")
+
+    @staticmethod
+    def sidecar_path(spec_path: str) -> str:
+        """旁路缓存文件路径"""
+        directory, filename = os.path.split(spec_path)
+        return os.path.join(directory, SIDECAR_DIR, filename + ".json")
+
+    def _read_sidecar(self, spec_path: str, signature: Tuple[int, int]) -> Optional[SpecData]:
+        """读取签名一致的旁路缓存，否则返回None"""
+        if not self.use_sidecar:
+            return None
+        try:
+            with open(self.sidecar_path(spec_path), "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if (payload.get("version") != SIDECAR_VERSION or
+                [payload.get("mtime_ns"), payload.get("size")] != list(signature)):
+            return None
+        return {
+            int(standard_id): {'content': content, 'lower_limit': lower_limit, 'upper_limit': upper_limit}
+            for standard_id, content, lower_limit, upper_limit in payload.get("specs", [])
+        }
+
+    def _write_sidecar(self, spec_path: str, signature: Tuple[int, int], spec_data: SpecData) -> None:
+        """写入旁路缓存（失败不影响使用）"""
+        if not self.use_sidecar:
+            return
+        sidecar_path = self.sidecar_path(spec_path)
+        payload = {
+            "version": SIDECAR_VERSION,
+            "source": os.path.basename(spec_path),
+            "mtime_ns": signature[0],
+            "size": signature[1],
+            "specs": [[standard_id, spec['content'], spec['lower_limit'], spec['upper_limit']]
+                      for standard_id, spec in spec_data.items()]
+        }
+        try:
+            os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+            temp_path = sidecar_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, sidecar_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ 写入测量规范缓存失败: {sidecar_path}: {e}")
+
+
+# 每个报告目录一个索引实例
+_indexes: Dict[str, MeasureSpecIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_measure_spec_index(reports_dir: str) -> MeasureSpecIndex:
+    """
+    获取报告目录对应的规范索引（templates子目录优先）
+
+    Args:
+        reports_dir: 报告目录（Excel文件所在目录）
+    """
+    key = os.path.abspath(reports_dir or ".")
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = MeasureSpecIndex(
+                [os.path.join(key, "templates"), key],
+                use_sidecar=bool(config.get("excel.measure_spec.sidecar_cache", True))
+            )
+            _indexes[key] = index
+        return index
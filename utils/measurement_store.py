@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨会话测量数据库（SQLite）
+每次finalize把本次会话的全部测量记录upsert到 measurements.db，
+按零件号、批次号、检验员、标准序号和时间范围查询时走索引，不必再逐个打开xlsx报告。
+
+表结构:
+    sessions      每个报告一行（会话名 = 报告文件名去掉扩展名）
+    measurements  每条测量一行，主键 (session, voice_id)，重复写入为覆盖（幂等）
+
+命令行:
+    python -m utils.measurement_store query --db reports/measurements.db --part PART-A001 --standard 300 --since 2025-01-01
+    python -m utils.measurement_store import reports/ --db reports/measurements.db --workers 4
+"""
+
+import os
+import re
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 支持 python utils/measurement_store.py 直接运行
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_utils import LoggingManager
+from utils.config_loader import config
+
+logger = LoggingManager.get_logger(
+    name='measurement_store',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+STORE_FILENAME = "measurements.db"
+
+# 测量记录字段（utils.export_sinks 的CSV/Parquet导出使用同样的列）
+MEASUREMENT_FIELDS = [
+    "session", "part_no", "batch_no", "inspector", "voice_id", "standard_id",
+    "value", "text_value", "judgment", "deviation", "timestamp", "original_text"
+]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        session TEXT PRIMARY KEY,
+        part_no TEXT,
+        batch_no TEXT,
+        inspector TEXT,
+        report_path TEXT,
+        report_mtime REAL,
+        record_count INTEGER,
+        stored_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS measurements (
+        session TEXT NOT NULL,
+        voice_id INTEGER NOT NULL,
+        part_no TEXT,
+        batch_no TEXT,
+        inspector TEXT,
+        standard_id INTEGER,
+        value REAL,
+        text_value TEXT,
+        judgment TEXT,
+        deviation REAL,
+        timestamp TEXT,
+        original_text TEXT,
+        PRIMARY KEY (session, voice_id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_measurements_part_std_time
+        ON measurements (part_no, standard_id, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_measurements_part_batch_std
+        ON measurements (part_no, batch_no, standard_id);
+    CREATE INDEX IF NOT EXISTS idx_measurements_batch ON measurements (batch_no);
+    CREATE INDEX IF NOT EXISTS idx_measurements_inspector_time ON measurements (inspector, timestamp);
+    CREATE INDEX IF NOT EXISTS idx_measurements_time ON measurements (timestamp);
+"""
+
+_UPSERT_MEASUREMENT = (
+    f"INSERT INTO measurements ({', '.join(MEASUREMENT_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(MEASUREMENT_FIELDS))}) "
+    f"ON CONFLICT (session, voice_id) DO UPDATE SET "
+    + ", ".join(f"{field} = excluded.{field}" for field in MEASUREMENT_FIELDS
+                if field not in ("session", "voice_id"))
+)
+
+_UPSERT_SESSION = (
+    "INSERT INTO sessions (session, part_no, batch_no, inspector, report_path, report_mtime, record_count, stored_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (session) DO UPDATE SET part_no = excluded.part_no, batch_no = excluded.batch_no, "
+    "inspector = excluded.inspector, report_path = excluded.report_path, report_mtime = excluded.report_mtime, "
+    "record_count = excluded.record_count, stored_at = excluded.stored_at"
+)
+
+
+class MeasurementStore:
+    """跨会话测量数据库（线程安全，单连接）"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: 数据库文件路径
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 写入可能来自后台写入线程
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with _stores_lock:
+            if _stores.get(self.path) is self:
+                del _stores[self.path]
+        with self._lock:
+            self._conn.close()
+
+    def upsert_measurements(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        写入测量记录（同一会话同一voice_id覆盖）
+
+        Args:
+            rows: 按MEASUREMENT_FIELDS展开的记录
+
+        Returns:
+            写入条数
+        """
+        values = [tuple(row.get(field) for field in MEASUREMENT_FIELDS) for row in rows]
+        if not values:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT_MEASUREMENT, values)
+        return len(values)
+
+    def store_session(self, session: Dict[str, Any], rows: List[Dict[str, Any]]) -> int:
+        """
+        在一个事务中写入会话信息和全部测量记录（finalize / 导入时调用）
+
+        Args:
+            session: session、part_no、batch_no、inspector、report_path
+            rows: 按MEASUREMENT_FIELDS展开的记录
+
+        Returns:
+            写入条数
+        """
+        report_path = session.get("report_path")
+        report_mtime = os.path.getmtime(report_path) if report_path and os.path.exists(report_path) else None
+        values = [tuple(row.get(field) for field in MEASUREMENT_FIELDS) for row in rows]
+        with self._lock, self._conn:
+            self._conn.execute(_UPSERT_SESSION, (
+                session["session"], session.get("part_no"), session.get("batch_no"), session.get("inspector"),
+                report_path, report_mtime, len(values), datetime.now().isoformat(timespec="seconds")
+            ))
+            self._conn.executemany(_UPSERT_MEASUREMENT, values)
+        return len(values)
+
+    def stored_report_mtimes(self) -> Dict[str, float]:
+        """已入库报告的 路径 → 修改时间（导入时跳过未变化的报告）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT report_path, report_mtime FROM sessions WHERE report_path IS NOT NULL").fetchall()
+        return {row["report_path"]: row["report_mtime"] for row in rows}
+
+    def query(self, part_no: Optional[str] = None, batch_no: Optional[str] = None,
+              inspector: Optional[str] = None, standard_id: Optional[int] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        查询测量记录（条件均可省略，按时间排序）
+
+        Args:
+            part_no: 零件号
+            batch_no: 批次号
+            inspector: 检验员
+            standard_id: 标准序号
+            since: 开始时间（含），如 "2025-01-01" 或 "2025-01-01 08:00:00"
+            until: 结束时间（不含）
+            limit: 最多返回条数
+
+        Returns:
+            记录列表
+        """
+        sql, params = self._build_query("SELECT * FROM measurements", part_no, batch_no, inspector,
+                                        standard_id, since, until)
+        sql += " ORDER BY timestamp, session, voice_id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def numeric_values(self, **filters: Any) -> List[Tuple[int, float]]:
+        """符合条件的 (标准序号, 数值) 列表（跳过OK/NOK等文本，供SPC分析装载数组）"""
+        sql, params = self._build_query("SELECT standard_id, value FROM measurements", **filters)
+        sql += (" AND " if params else " WHERE ") + "value IS NOT NULL AND standard_id IS NOT NULL"
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(sql, params).fetchall()
+
+    def count(self, **filters: Any) -> int:
+        """符合条件的记录数（参数同query）"""
+        sql, params = self._build_query("SELECT COUNT(*) FROM measurements", **filters)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def explain(self, **filters: Any) -> str:
+        """查询计划（用于确认走索引）"""
+        sql, params = self._build_query("SELECT * FROM measurements", **filters)
+        with self._lock:
+            return "; ".join(row[-1] for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+
+    @staticmethod
+    def _build_query(select: str, part_no: Optional[str] = None, batch_no: Optional[str] = None,
+                     inspector: Optional[str] = None, standard_id: Optional[int] = None,
+                     since: Optional[str] = None, until: Optional[str] = None) -> Tuple[str, List[Any]]:
+        conditions, params = [], []
+        for column, value in (("part_no", part_no), ("batch_no", batch_no),
+                              ("inspector", inspector), ("standard_id", standard_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("timestamp < ?")
+            params.append(until)
+        if conditions:
+            select += " WHERE " + " AND ".join(conditions)
+        return select, params
+
+
+def resolve_store_path(reports_dir: str) -> str:
+    """数据库路径：excel.store.path，为空时放在报告目录下"""
+    path = config.get("excel.store.path", "")
+    return path or os.path.join(reports_dir or ".", STORE_FILENAME)
+
+
+_stores: Dict[str, MeasurementStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_measurement_store(path: str) -> MeasurementStore:
+    """获取数据库实例（同一路径共享一个连接）"""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = MeasurementStore(key)
+            _stores[key] = store
+        return store
+
+
+# ---------------------------------------------------------------------------
+# 历史报告导入
+# ---------------------------------------------------------------------------
+
+_REPORT_NAME = re.compile(r"^Report_(?P<part_no>.+)_(?P<batch_no>[^_]+)_(?P<stamp>\d{8}_\d{6})$")
+
+
+def read_report(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    读取一个xlsx报告（在进程池中运行，只读模式）
+
+    零件号/批次号/检验员取第2行（B2/D2/F2），为空时从文件名
+    Report_{零件号}_{批次号}_{时间}.xlsx 解析；数据从"标准序号"表头的下一行开始
+
+    Returns:
+        (会话信息, 展开后的测量记录)
+    """
+    from openpyxl import load_workbook
+
+    session_name = os.path.splitext(os.path.basename(path))[0]
+    name_match = _REPORT_NAME.match(session_name)
+    session = {
+        "session": session_name,
+        "part_no": name_match.group("part_no") if name_match else "",
+        "batch_no": name_match.group("batch_no") if name_match else "",
+        "inspector": "",
+        "report_path": os.path.abspath(path),
+    }
+
+    rows: List[Dict[str, Any]] = []
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        data_started = False
+        for row_index, row in enumerate(workbook.active.iter_rows(max_col=10, values_only=True), start=1):
+            row = tuple(row) + (None,) * (10 - len(row))
+            if row_index == 2:
+                session["part_no"] = str(row[1]) if row[1] else session["part_no"]
+                session["batch_no"] = str(row[3]) if row[3] else session["batch_no"]
+                session["inspector"] = str(row[5]) if row[5] else ""
+                continue
+            if not data_started:
+                data_started = row[0] is not None and '标准序号' in str(row[0])
+                continue
+
+            standard_id, value, voice_id = row[0], row[5], row[9]
+            if voice_id is None or value is None:
+                continue
+            try:
+                voice_id = int(voice_id)
+                standard_id = int(standard_id) if standard_id is not None else None
+            except (ValueError, TypeError):
+                continue
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            timestamp = row[8]
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.strftime("%Y-%m-%d %H:%M:%S")
+            rows.append({
+                "session": session_name,
+                "part_no": session["part_no"],
+                "batch_no": session["batch_no"],
+                "inspector": session["inspector"],
+                "voice_id": voice_id,
+                "standard_id": standard_id,
+                "value": float(value) if numeric else None,
+                "text_value": None if numeric else str(value),
+                "judgment": row[6],
+                "deviation": float(row[7]) if isinstance(row[7], (int, float)) else None,
+                "timestamp": str(timestamp) if timestamp is not None else None,
+                "original_text": None,
+            })
+    finally:
+        workbook.close()
+
+    return session, rows
+
+
+def import_reports(directory: str, store: MeasurementStore, workers: Optional[int] = None,
+                   force: bool = False) -> Dict[str, int]:
+    """
+    把目录中的历史报告导入数据库（进程池并行解析xlsx，主进程写库）
+
+    Args:
+        directory: 报告目录（Report_*.xlsx）
+        store: 目标数据库
+        workers: 进程数，默认CPU核数
+        force: 是否重新导入未变化的报告
+
+    Returns:
+        {"reports": 导入报告数, "skipped": 跳过数, "failed": 失败数, "measurements": 记录数}
+    """
+    stored = {} if force else store.stored_report_mtimes()
+    paths = []
+    skipped = 0
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith("Report_") and name.endswith(".xlsx")):
+            continue
+        path = os.path.abspath(os.path.join(directory, name))
+        if stored.get(path) == os.path.getmtime(path):
+            skipped += 1
+            continue
+        paths.append(path)
+
+    stats = {"reports": 0, "skipped": skipped, "failed": 0, "measurements": 0}
+    if not paths:
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+        results = executor.map(_read_report_safe, paths, chunksize=max(1, len(paths) // (workers * 4)))
+    else:
+        executor = None
+        results = map(_read_report_safe, paths)
+
+    try:
+        for path, result in zip(paths, results):
+            if result is None:
+                stats["failed"] += 1
+                logger.warning(f"⚠️ 导入报告失败: {path}")
+                continue
+            session, rows = result
+            stats["measurements"] += store.store_session(session, rows)
+            stats["reports"] += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    logger.info(f"📥 导入报告 {stats['reports']} 个（跳过 {stats['skipped']}，失败 {stats['failed']}），"
+                f"共 {stats['measurements']} 条测量记录")
+    return stats
+
+
+def _read_report_safe(path: str) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """进程池任务：单个报告出错不影响其他报告"""
+    try:
+        return read_report(path)
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 命令行
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="跨会话测量数据库：查询 / 导入历史报告")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="查询测量记录")
+    query_parser.add_argument("--db", default=os.path.join("reports", STORE_FILENAME), help="数据库路径")
+    query_parser.add_argument("--part", help="零件号")
+    query_parser.add_argument("--batch", help="批次号")
+    query_parser.add_argument("--inspector", help="检验员")
+    query_parser.add_argument("--standard", type=int, help="标准序号")
+    query_parser.add_argument("--since", help="开始时间（含），如 2025-01-01")
+    query_parser.add_argument("--until", help="结束时间（不含）")
+    query_parser.add_argument("--limit", type=int, default=1000, help="最多返回条数")
+    query_parser.add_argument("--format", choices=("table", "json", "count"), default="table", help="输出格式")
+
+    import_parser = subparsers.add_parser("import", help="导入目录中的历史报告")
+    import_parser.add_argument("directory", help="报告目录")
+    import_parser.add_argument("--db", default=None, help="数据库路径（默认为报告目录下的measurements.db）")
+    import_parser.add_argument("--workers", type=int, default=None, help="进程数（默认CPU核数）")
+    import_parser.add_argument("--force", action="store_true", help="重新导入未变化的报告")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        store = MeasurementStore(args.db or os.path.join(args.directory, STORE_FILENAME))
+        stats = import_reports(args.directory, store, workers=args.workers, force=args.force)
+        store.close()
+        print(json.dumps(stats, ensure_ascii=False))
+        return 0
+
+    if not os.path.exists(args.db):
+        print(f"❌ 数据库不存在: {args.db}")
+        return 1
+    store = MeasurementStore(args.db)
+    filters = dict(part_no=args.part, batch_no=args.batch, inspector=args.inspector,
+                   standard_id=args.standard, since=args.since, until=args.until)
+    if args.format == "count":
+        print(store.count(**filters))
+    else:
+        rows = store.query(limit=args.limit, **filters)
+        if args.format == "json":
+            print(json.dumps(rows, ensure_ascii=False, indent=2))
+        else:
+            columns = ["timestamp", "part_no", "batch_no", "inspector", "standard_id", "value", "judgment", "session"]
+            print("\t".join(columns))
+            for row in rows:
+                value = row["value"] if row["value"] is not None else row["text_value"]
+                print("\t".join(str(value if column == "value" else row[column] or "") for column in columns))
+            print(f"# {len(rows)} 条记录")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存统计（按子系统）
+长时间运行后RSS持续增长时，用于定位内存花在哪里：ASR模型、音频缓冲、结果列表、
+PerformanceMonitor原始记录、界面历史文本等各自多大、有多少条。
+
+    from utils.memory_accounting import memory_tracker
+
+    memory_tracker.track("results_buffer", lambda: system.results_buffer)
+    memory_tracker.report()          # {"results_buffer": {"items": 1234, "bytes": 456789}, ...}
+    memory_tracker.start()           # 后台每 check_interval 秒统计一次并检查增长阈值
+
+- 大小为估算值：递归累加 sys.getsizeof，超过 sample_items 条的容器只抽样等间隔的元素再按条数外推；
+  numpy数组按数据缓冲区计，模型按参数/缓冲张量计（model_size）
+- 增长告警：单个容器超过 warn_items 条或 warn_mb 时记 WARNING 日志并通知回调，之后每翻一倍再告警一次；
+  maxlen 不超过阈值的有界 deque 不按条数告警
+- tracemalloc（--debug 或 system.memory.tracemalloc）：每次统计输出与上次相比增长最多的 top_n 个代码行
+- 指标导出（utils/metrics_endpoint.py 的 memory_collector）读取最近一次统计结果，不在采集线程中重新统计
+"""
+
+import sys
+import time
+import logging
+import itertools
+import threading
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.config_loader import config
+
+logger = logging.getLogger(__name__)
+
+# 大小函数: 对象 → (条数或None, 字节数)
+SizeFunc = Callable[[Any], Tuple[Optional[int], int]]
+AlertCallback = Callable[[str, Dict[str, Any]], None]
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None))
+_SEQUENCE_TYPES = (list, tuple, set, frozenset, deque)
+
+MB = 1024 * 1024
+
+
+def deep_sizeof(obj: Any, sample_items: int = 1000, max_depth: int = 8) -> int:
+    """递归估算对象占用的字节数（共享对象只计一次，大容器抽样外推）"""
+    seen: set = set()
+
+    def sizeof(value: Any, depth: int) -> int:
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        size = sys.getsizeof(value, 0)
+        if isinstance(value, _ATOMIC_TYPES) or depth >= max_depth:
+            return size
+        if hasattr(value, "dtype") and hasattr(value, "nbytes"):
+            # numpy数组：getsizeof已包含自有数据；视图只计头部
+            return size
+        if isinstance(value, dict):
+            return size + sample_sum(value.items(), len(value), lambda item: sizeof(item[0], depth + 1)
+                                     + sizeof(item[1], depth + 1))
+        if isinstance(value, _SEQUENCE_TYPES):
+            return size + sample_sum(value, len(value), lambda item: sizeof(item, depth + 1))
+        attributes = getattr(value, "__dict__", None)
+        if attributes is not None:
+            size += sizeof(attributes, depth + 1)
+        for slot in getattr(type(value), "__slots__", ()):
+            if hasattr(value, slot):
+                size += sizeof(getattr(value, slot), depth + 1)
+        return size
+
+    def sample_sum(items, count: int, measure: Callable[[Any], int]) -> int:
+        if count <= sample_items:
+            return sum(measure(item) for item in items)
+        step = count // sample_items
+        sampled = list(itertools.islice(items, 0, None, step))
+        return int(sum(measure(item) for item in sampled) * count / len(sampled))
+
+    return sizeof(obj, 0)
+
+
+def model_size(model: Any) -> Tuple[Optional[int], int]:
+    """模型：(张量数, 参数与缓冲张量的字节数)；FunASR AutoModel 的网络在 .model 属性上"""
+    tensors = total = 0
+    seen: set = set()
+    for module in (model, getattr(model, "model", None)):
+        if module is None or not callable(getattr(module, "parameters", None)):
+            continue
+        for tensor in itertools.chain(module.parameters(), module.buffers()):
+            if id(tensor) in seen:
+                continue
+            seen.add(id(tensor))
+            tensors += 1
+            total += tensor.numel() * tensor.element_size()
+    return (tensors or None), total
+
+
+def text_document_size(widget: Any) -> Tuple[Optional[int], int]:
+    """Qt文本控件：(段落数, 文本字节数估算)；只计UTF-16文本，不含排版缓存"""
+    document = widget.document()
+    return document.blockCount(), document.characterCount() * 2
+
+
+@dataclass
+class TrackedObject:
+    """被统计的子系统"""
+    name: str
+    getter: Callable[[], Any]
+    size_func: Optional[SizeFunc] = None
+    warn_items: int = 0  # 0为不按条数告警
+    warn_bytes: int = 0  # 0为不按大小告警
+    next_items_alert: int = 0
+    next_bytes_alert: int = 0
+
+
+class MemoryTracker:
+    """按子系统统计内存大小，检查增长阈值，可选tracemalloc差异"""
+
+    def __init__(self, check_interval: Optional[float] = None, warn_items: Optional[int] = None,
+                 warn_mb: Optional[float] = None, sample_items: Optional[int] = None):
+        memory_config = config.get_memory_config()
+        self.check_interval = float(check_interval or memory_config.get("check_interval", 60.0))
+        self.warn_items = int(memory_config.get("warn_items", 100000) if warn_items is None else warn_items)
+        self.warn_bytes = int(float(memory_config.get("warn_mb", 100) if warn_mb is None else warn_mb) * MB)
+        self.sample_items = int(sample_items or memory_config.get("sample_items", 1000))
+        self.tracemalloc_frames = int(memory_config.get("tracemalloc_frames", 5))
+        self.top_n = int(memory_config.get("top_n", 10))
+        self.tracemalloc_enabled = bool(memory_config.get("tracemalloc", False))
+
+        self._tracked: Dict[str, TrackedObject] = {}
+        self._lock = threading.Lock()
+        self._callbacks: List[AlertCallback] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._previous_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc = False
+
+        self.last_report: Dict[str, Dict[str, Any]] = {}
+        self.last_report_at = 0.0
+        self.last_diff: List[Dict[str, Any]] = []
+        self.alert_counts: Dict[str, int] = {}
+        self.recent_alerts: Deque[Dict[str, Any]] = deque(maxlen=20)
+
+    # ---------- 注册 ----------
+
+    def track(self, name: str, getter: Callable[[], Any], size_func: Optional[SizeFunc] = None,
+              warn_items: Optional[int] = None, warn_mb: Optional[float] = None) -> None:
+        """
+        注册子系统（同名替换）
+
+        Args:
+            getter: 返回当前对象（每次统计时调用，不持有对象本身）
+            size_func: 自定义大小函数 对象 → (条数, 字节数)，默认按 len() 和 deep_sizeof 估算
+            warn_items / warn_mb: 告警阈值，None为使用配置，0为不告警
+        """
+        items_threshold = self.warn_items if warn_items is None else int(warn_items)
+        bytes_threshold = self.warn_bytes if warn_mb is None else int(warn_mb * MB)
+        with self._lock:
+            self._tracked[name] = TrackedObject(name, getter, size_func, items_threshold, bytes_threshold,
+                                                items_threshold, bytes_threshold)
+
+    def untrack(self, name: str) -> None:
+        with self._lock:
+            self._tracked.pop(name, None)
+
+    def add_alert_callback(self, callback: AlertCallback) -> None:
+        """告警回调 callback(消息, 告警)；在调用check()的线程中调用"""
+        self._callbacks.append(callback)
+
+    def remove_alert_callback(self, callback: AlertCallback) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    # ---------- 统计 ----------
+
+    def measure(self, tracked: TrackedObject) -> Optional[Dict[str, Any]]:
+        """统计单个子系统：{"items", "bytes", "maxlen"}；对象不存在时为None"""
+        obj = tracked.getter()
+        if obj is None:
+            return None
+        if tracked.size_func is not None:
+            items, size = tracked.size_func(obj)
+        else:
+            items = len(obj) if hasattr(obj, "__len__") else None
+            size = deep_sizeof(obj, self.sample_items)
+        return {"items": items, "bytes": int(size), "maxlen": getattr(obj, "maxlen", None)}
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """统计所有子系统（单个出错时跳过），结果保存在 last_report"""
+        with self._lock:
+            tracked_objects = list(self._tracked.values())
+        report: Dict[str, Dict[str, Any]] = {}
+        for tracked in tracked_objects:
+            try:
+                measured = self.measure(tracked)
+            except Exception as e:
+                logger.debug(f"内存统计失败: {tracked.name}: {e}")
+                continue
+            if measured is not None:
+                report[tracked.name] = measured
+        self.last_report, self.last_report_at = report, time.time()
+        return report
+
+    def check(self) -> List[Dict[str, Any]]:
+        """统计一次并检查增长阈值；开启tracemalloc时记录增长最多的代码行。返回本次的告警"""
+        report = self.report()
+        alerts: List[Dict[str, Any]] = []
+        with self._lock:
+            for name, measured in report.items():
+                tracked = self._tracked.get(name)
+                if tracked is not None:
+                    alerts.extend(self._check_thresholds(tracked, measured))
+
+        for alert in alerts:
+            self.alert_counts[alert["subsystem"]] = self.alert_counts.get(alert["subsystem"], 0) + 1
+            self.recent_alerts.append(alert)
+            logger.warning(alert["message"])
+            for callback in list(self._callbacks):
+                try:
+                    callback(alert["message"], alert)
+                except Exception as e:
+                    logger.error(f"内存告警回调出错: {e}")
+
+        if self.tracemalloc_enabled and tracemalloc.is_tracing():
+            diff = self.tracemalloc_diff()
+            if diff:
+                logger.info(f"📈 tracemalloc 增长最多的 {len(diff)} 处:\n" +
+                            "\n".join(f"   {item['location']} {item['size_diff'] / 1024:+.1f}KiB "
+                                      f"（共 {item['size'] / 1024:.1f}KiB，{item['count_diff']:+d} 块）" for item in diff))
+        return alerts
+
+    @staticmethod
+    def _check_thresholds(tracked: TrackedObject, measured: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """超过阈值告警一次，阈值翻倍；降回初始阈值以下后重置（调用方持有锁）"""
+        alerts = []
+        items, size = measured["items"], measured["bytes"]
+        maxlen = measured.get("maxlen")
+        if tracked.warn_items and items is not None and not (maxlen is not None and maxlen <= tracked.warn_items):
+            if items < tracked.warn_items:
+                tracked.next_items_alert = tracked.warn_items
+            elif items >= tracked.next_items_alert:
+                alerts.append({"subsystem": tracked.name, "kind": "items", "value": items,
+                               "threshold": tracked.next_items_alert, "ts": time.time(),
+                               "message": f"⚠️ 内存增长告警: {tracked.name} 已有 {items} 条"
+                                          f"（超过 {tracked.next_items_alert}，约 {size / MB:.1f}MB）"})
+                while tracked.next_items_alert <= items:
+                    tracked.next_items_alert *= 2
+        if tracked.warn_bytes:
+            if size < tracked.warn_bytes:
+                tracked.next_bytes_alert = tracked.warn_bytes
+            elif size >= tracked.next_bytes_alert:
+                alerts.append({"subsystem": tracked.name, "kind": "bytes", "value": size,
+                               "threshold": tracked.next_bytes_alert, "ts": time.time(),
+                               "message": f"⚠️ 内存增长告警: {tracked.name} 约 {size / MB:.1f}MB"
+                                          f"（超过 {tracked.next_bytes_alert / MB:.0f}MB）"})
+                while tracked.next_bytes_alert <= size:
+                    tracked.next_bytes_alert *= 2
+        return alerts
+
+    def format_report(self, report: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
+        """按大小排序的报告文本行（控制台/GUI显示）"""
+        from utils.metrics_endpoint import process_rss_bytes
+
+        report = self.report() if report is None else report
+        rss = process_rss_bytes()
+        lines = [f"🧠 内存占用（进程RSS {rss / MB:.1f}MB）" if rss else "🧠 内存占用"]
+        for name, measured in sorted(report.items(), key=lambda item: -item[1]["bytes"]):
+            items = "-" if measured["items"] is None else measured["items"]
+            lines.append(f"   {name:<20} {measured['bytes'] / MB:>9.2f}MB {items:>10} 条")
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"   tracemalloc: 当前 {current / MB:.1f}MB，峰值 {peak / MB:.1f}MB")
+        return lines
+
+    # ---------- tracemalloc ----------
+
+    def start_tracemalloc(self, frames: Optional[int] = None) -> None:
+        """开始跟踪内存分配（已在跟踪时沿用），记录基准快照"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.tracemalloc_frames)
+            self._started_tracemalloc = True
+        self.tracemalloc_enabled = True
+        self._previous_snapshot = self._take_snapshot()
+
+    def stop_tracemalloc(self) -> None:
+        self.tracemalloc_enabled = False
+        self._previous_snapshot = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def tracemalloc_diff(self, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """与上一次快照相比增长最多的代码行（并把本次快照作为下一次的基准）"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = self._take_snapshot()
+        previous, self._previous_snapshot = self._previous_snapshot, snapshot
+        if previous is None:
+            return []
+        diff = []
+        for stat in snapshot.compare_to(previous, "lineno")[:top_n or self.top_n]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            diff.append({"location": f"{frame.filename}:{frame.lineno}", "size_diff": stat.size_diff,
+                         "size": stat.size, "count_diff": stat.count_diff})
+        self.last_diff = diff
+        return diff
+
+    # ---------- 后台统计 ----------
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: Optional[float] = None, trace_allocations: Optional[bool] = None) -> bool:
+        """启动后台统计线程；trace_allocations为True时同时开启tracemalloc。已在运行时返回False"""
+        if interval:
+            self.check_interval = float(interval)
+        if trace_allocations or (trace_allocations is None and self.tracemalloc_enabled):
+            self.start_tracemalloc()
+        if self.running:
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MemoryTracker", daemon=True)
+        self._thread.start()
+        logger.debug(f"🧠 内存统计已启动（每 {self.check_interval:g}s）")
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.check_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"内存统计出错: {e}")
+
+
+def _register_builtin(tracker: MemoryTracker) -> None:
+    """进程内全局对象：PerformanceMonitor原始记录与延迟记录"""
+    def perf_records():
+        from utils.performance_monitor import performance_monitor
+        return performance_monitor._records
+
+    def latency_records():
+        from utils.production_latency_logger import production_latency_logger
+        return production_latency_logger.records
+
+    tracker.track("perf_records", perf_records)
+    tracker.track("latency_records", latency_records)
+
+
+# 全局内存统计
+memory_tracker = MemoryTracker()
+_register_builtin(memory_tracker)
+
+
+def memory_report() -> List[str]:
+    """立即统计一次，返回报告文本行"""
+    return memory_tracker.format_report()
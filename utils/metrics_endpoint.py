@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地指标导出（Prometheus / OpenMetrics 文本格式）
+识别状态、实时率、音频溢出与丢弃计数、队列深度、ASR与Excel写入耗时直方图、每分钟识别数、进程内存和各子系统内存，
+可用 curl、Prometheus 或 Grafana Agent 采集，无需查看日志即可看到长时间运行中的变化。
+
+    from utils.metrics_endpoint import metrics_registry, recognizer_collector, start_metrics_export
+
+    metrics_registry.register("recognizer", recognizer_collector(recognizer))
+    start_metrics_export()      # → http://127.0.0.1:9464/metrics 和/或定期重写的指标文件
+
+- 只在被采集时读取：步骤直方图在各自的锁内复制后于锁外分桶，识别器计数直接读字典，
+  音频热路径（FastStep）不受影响
+- HTTP服务只监听本机（system.metrics.host），在后台守护线程中运行
+- 指标文件先写临时文件再 os.replace，读取方不会读到半个文件
+
+开启方式: 配置 system.metrics.enabled 或命令行 --metrics
+"""
+
+import os
+import time
+import logging
+import threading
+import tracemalloc
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, cast
+
+from utils.config_loader import config
+from utils.latency_histogram import LatencyHistogram
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "voice_"
+
+# 耗时直方图的le上限（秒）：音频块为亚毫秒级，识别与写入在几十毫秒到数秒
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LATENCY_BUCKETS_NS = tuple(int(bound * 1e9) for bound in LATENCY_BUCKETS)
+
+# 每分钟识别数的滑动窗口（秒）
+RATE_WINDOW = 60.0
+
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: Optional[Dict[str, Any]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsWriter:
+    """一次采集的输出：同名指标的样本归到同一组（HELP/TYPE只写一次）"""
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def _family(self, name: str, metric_type: str, help_text: str) -> List[str]:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (metric_type, help_text, [])
+        return family[2]
+
+    def gauge(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        name = PREFIX + name
+        self._family(name, "gauge", help_text).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def counter(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        name = PREFIX + name + "_total"
+        self._family(name, "counter", help_text).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help_text: str, histogram: LatencyHistogram,
+                  labels: Optional[Dict[str, Any]] = None) -> None:
+        """耗时直方图（秒），le桶由对数分桶直方图累计得到"""
+        name = PREFIX + name
+        lines = self._family(name, "histogram", help_text)
+        labels = labels or {}
+        for bound, count in zip(LATENCY_BUCKETS, histogram.cumulative_counts(_LATENCY_BUCKETS_NS)):
+            lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+        lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total_ns / 1e9)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        output: List[str] = []
+        for name, (metric_type, help_text, lines) in self._families.items():
+            output.append(f"# HELP {name} {_escape_label(help_text)}")
+            output.append(f"# TYPE {name} {metric_type}")
+            output.extend(lines)
+        return "\n".join(output) + "\n"
+
+
+Collector = Callable[[MetricsWriter], None]
+
+
+class MetricsRegistry:
+    """指标来源注册表：每次采集依次调用各来源，单个来源出错不影响其他来源"""
+
+    def __init__(self):
+        self._collectors: Dict[str, Collector] = {}
+        self._collector_errors: Dict[str, int] = {}  # 各来源累计采集失败次数
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def register(self, name: str, collector: Collector) -> None:
+        """注册（同名来源会被替换，如重新创建识别器）"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def render(self) -> str:
+        """采集一次，返回Prometheus文本格式"""
+        with self._lock:
+            collectors = list(self._collectors.items())
+        writer = MetricsWriter()
+        for name, collector in collectors:
+            try:
+                collector(writer)
+            except Exception as e:
+                logger.warning(f"📈 指标来源 {name} 采集失败: {e}")
+                with self._lock:
+                    self._collector_errors[name] = self._collector_errors.get(name, 0) + 1
+        with self._lock:
+            errors = sorted(self._collector_errors.items())
+        for name, count in errors:
+            writer.counter("metrics_collector_errors", "指标来源累计采集失败次数", count, {"collector": name})
+        return writer.render()
+
+
+def process_rss_bytes() -> Optional[int]:
+    """进程常驻内存（字节）：优先 /proc，其次psutil，都没有时为None"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            return None
+    return None
+
+
+def process_collector(registry: "MetricsRegistry") -> Collector:
+    """进程：常驻内存、运行时长、线程数、异步日志队列"""
+    def collect(writer: MetricsWriter) -> None:
+        from utils.logging_utils import LoggingManager
+
+        rss = process_rss_bytes()
+        if rss is not None:
+            writer.gauge("process_resident_memory_bytes", "进程常驻内存（字节）", rss)
+        writer.gauge("process_uptime_seconds", "指标导出启动以来的秒数", time.time() - registry.started_at)
+        writer.gauge("process_threads", "Python线程数", threading.active_count())
+        writer.gauge("log_queue_depth", "异步日志队列中待写入的条数", LoggingManager.queue_depth())
+        writer.counter("log_dropped_records", "异步日志队列满时丢弃的条数", LoggingManager.dropped_records)
+    return collect
+
+
+def performance_collector(monitor=None) -> Collector:
+    """PerformanceMonitor：各步骤耗时直方图、数值指标（队列深度等）、FastStep丢弃样本数"""
+    def collect(writer: MetricsWriter) -> None:
+        if monitor is None:
+            from utils.performance_monitor import performance_monitor as current
+        else:
+            current = monitor
+        for step_name, histogram in sorted(current.histogram_snapshot().items()):
+            writer.histogram("step_duration_seconds", "各步骤耗时（秒），含Excel写入、音频输入等", histogram,
+                             {"step": step_name})
+        for gauge_name, gauge in sorted(current.get_all_gauges().items()):
+            writer.gauge("gauge_last", "数值指标最近一次的值（如队列深度）", gauge["last"], {"name": gauge_name})
+            writer.gauge("gauge_max", "数值指标本会话最大值", gauge["max"], {"name": gauge_name})
+        writer.counter("perf_dropped_samples", "FastStep环形缓冲区写满被覆盖的样本数", current.dropped_samples())
+    return collect
+
+
+def latency_collector(latency_logger=None) -> Collector:
+    """语音段延迟：相邻环节（含ASR识别 asr_start→asr_end、写入Excel）与端到端耗时直方图"""
+    def collect(writer: MetricsWriter) -> None:
+        if latency_logger is None:
+            from utils.production_latency_logger import production_latency_logger as current
+        else:
+            current = latency_logger
+        stages, end_to_end, outcomes = current.histogram_snapshot()
+        for stage, histogram in stages.items():
+            writer.histogram("utterance_stage_seconds", "语音段相邻环节耗时（秒）", histogram, {"stage": stage})
+        writer.histogram("utterance_e2e_seconds", "语音段端到端耗时（语音结束→写入Excel，秒）", end_to_end)
+        for outcome, count in sorted(outcomes.items()):
+            writer.counter("utterances", "本会话完成的语音段数", count, {"outcome": outcome})
+    return collect
+
+
+def memory_collector(tracker=None) -> Collector:
+    """内存统计：各子系统大小与条数（最近一次统计的结果）、增长告警次数、tracemalloc跟踪的内存"""
+    def collect(writer: MetricsWriter) -> None:
+        if tracker is None:
+            from utils.memory_accounting import memory_tracker as current
+        else:
+            current = tracker
+        for name, measured in sorted(current.last_report.items()):
+            writer.gauge("memory_subsystem_bytes", "各子系统大小估算（字节）", measured["bytes"], {"subsystem": name})
+            if measured["items"] is not None:
+                writer.gauge("memory_subsystem_items", "各子系统条数", measured["items"], {"subsystem": name})
+        for name, count in sorted(current.alert_counts.items()):
+            writer.counter("memory_growth_alerts", "内存增长告警次数", count, {"subsystem": name})
+        if current.last_report_at:
+            writer.gauge("memory_report_timestamp_seconds", "最近一次内存统计的时间", current.last_report_at)
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            writer.gauge("memory_traced_bytes", "tracemalloc跟踪的Python分配（字节）", traced)
+            writer.gauge("memory_traced_peak_bytes", "tracemalloc跟踪的分配峰值（字节）", peak)
+    return collect
+
+
+def recognizer_collector(recognizer) -> Collector:
+    """FunASRVoiceRecognizer.stats：识别次数、实时率、音频块与溢出计数（直接读字典，不加锁）"""
+    window: Deque[Tuple[float, int]] = deque()
+
+    def collect(writer: MetricsWriter) -> None:
+        stats = dict(recognizer.stats)
+        writer.gauge("recognizer_initialized", "识别器已初始化", bool(getattr(recognizer, "_is_initialized", False)))
+        writer.gauge("recognizer_model_loaded", "模型已加载", bool(getattr(recognizer, "_model_loaded", False)))
+        writer.counter("recognitions", "最终识别次数", stats.get("total_recognitions", 0))
+        writer.counter("recognitions_successful", "有文本的最终识别次数", stats.get("successful_recognitions", 0))
+        writer.counter("asr_processing_seconds", "最终识别累计推理耗时（秒）", stats.get("total_processing_time", 0.0))
+        writer.counter("speech_audio_seconds", "已识别语音累计时长（秒）", stats.get("total_audio_time", 0.0))
+        audio_time = stats.get("total_audio_time", 0.0)
+        writer.gauge("real_time_factor", "实时率（推理耗时/语音时长，小于1才跟得上）",
+                     stats.get("total_processing_time", 0.0) / audio_time if audio_time else 0.0)
+        writer.counter("audio_chunks", "读取的音频块数", stats.get("audio_chunks", 0))
+        writer.counter("audio_overflows", "音频输入缓冲区溢出次数", stats.get("audio_overflows", 0))
+        writer.counter("audio_read_errors", "其他音频读取错误次数", stats.get("audio_read_errors", 0))
+
+        # 每分钟识别数：最近 RATE_WINDOW 秒内的增量（首次采集时无窗口，记为0）
+        now = time.monotonic()
+        total = stats.get("total_recognitions", 0)
+        window.append((now, total))
+        while len(window) > 2 and now - window[1][0] >= RATE_WINDOW:
+            window.popleft()
+        oldest_time, oldest_total = window[0]
+        elapsed = now - oldest_time
+        writer.gauge("recognitions_per_minute", "最近一分钟左右的识别速率",
+                     (total - oldest_total) * 60.0 / elapsed if elapsed > 0 else 0.0)
+    return collect
+
+
+def state_collector(name: str, get_state: Callable[[], Any], states: Sequence[Any]) -> Collector:
+    """枚举状态：每个可能的值一条样本，当前状态为1（如 SystemState）"""
+    def collect(writer: MetricsWriter) -> None:
+        current = get_state()
+        for state in states:
+            value = getattr(state, "value", state)
+            writer.gauge(name, "当前状态（当前值为1）", state == current, {"state": value})
+    return collect
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: "MetricsRegistry"
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("📈 指标请求: " + format % args)
+
+
+class MetricsServer:
+    """本机HTTP指标端点（后台守护线程）"""
+
+    def __init__(self, registry: "MetricsRegistry", host: str = "127.0.0.1", port: int = 9464):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """实际监听的地址（port为0时由系统分配）"""
+        return cast(Tuple[str, int], self._server.server_address[:2])
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        host, port = self.address
+        logger.info(f"📈 指标端点: http://{host}:{port}/metrics")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=2)
+
+
+class MetricsFileWriter:
+    """定期重写的指标文件（先写临时文件再替换）"""
+
+    def __init__(self, registry: "MetricsRegistry", path: str, interval: float = 15.0):
+        self.registry = registry
+        self.path = path
+        self.interval = max(0.5, float(interval))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="MetricsFileWriter", daemon=True)
+
+    def write(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.render())
+        os.replace(temp_path, self.path)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.write()
+            except OSError as e:
+                logger.warning(f"📈 指标文件写入失败: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self) -> "MetricsFileWriter":
+        self._thread.start()
+        logger.info(f"📈 指标文件: {self.path}（每{self.interval:g}秒更新）")
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=2)
+        try:
+            self.write()  # 退出前写最后一次
+        except OSError:
+            pass
+
+
+# 全局注册表：进程、性能监控和语音段延迟默认注册，识别器与系统状态由 FunASRVoiceSystem 注册
+metrics_registry = MetricsRegistry()
+metrics_registry.register("process", process_collector(metrics_registry))
+metrics_registry.register("performance", performance_collector())
+metrics_registry.register("latency", latency_collector())
+metrics_registry.register("memory", memory_collector())
+
+_exporters: List[Any] = []
+
+
+def start_metrics_export(force: bool = False) -> List[Any]:
+    """
+    按 system.metrics 配置启动HTTP端点和/或指标文件（已启动时不重复启动）
+
+    Args:
+        force: 忽略 enabled 开关（命令行 --metrics）
+    """
+    metrics_config = config.get_metrics_config()
+    if _exporters or not (force or metrics_config.get("enabled", False)):
+        return _exporters
+    port = int(metrics_config.get("port", 9464) or 0)
+    if port:
+        try:
+            _exporters.append(MetricsServer(metrics_registry, metrics_config.get("host", "127.0.0.1"), port).start())
+        except OSError as e:
+            logger.error(f"📈 指标端点启动失败（端口 {port}）: {e}")
+    path = metrics_config.get("file", "")
+    if path:
+        _exporters.append(MetricsFileWriter(metrics_registry, path, metrics_config.get("interval", 15.0)).start())
+    return _exporters
+
+
+def stop_metrics_export() -> None:
+    """停止已启动的HTTP端点和指标文件"""
+    while _exporters:
+        _exporters.pop().stop()
+
+
+def render_metrics() -> str:
+    """采集一次全局注册表"""
+    return metrics_registry.render()
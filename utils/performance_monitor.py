@@ -3,16 +3,39 @@
 """
 性能监控模块
 用于精确记录和分析语音识别系统各步骤的性能指标
+
+各步骤耗时记录在对数分桶直方图中（utils.latency_histogram），内存固定、记录O(1)，
+长时间运行也不会累积记录；逐条原始记录（含元数据，供流水线分析）为可选的调试模式：
+    system.performance.raw_records: true   # 最多保留 max_raw_records 条
+
+每个音频块都要经过的热路径使用 FastStep（静态步骤ID，记录时不加锁）：
+
+    _STEP_AUDIO_INPUT = FastStep("音频输入")      # 模块级创建一次
+    with _STEP_AUDIO_INPUT:
+        data = stream.read(...)
+
+    - perf_counter_ns 计时，耗时写入本线程的环形缓冲区，不加锁、不分配元数据字典
+    - 后台汇总线程每 aggregate_interval 秒把各线程缓冲区合并进步骤直方图；
+      查询汇总/导出报告前也会先合并
+    - sample_every=N 时每N次只计时1次（直方图次数为采样次数）
+    - 监控禁用时只做一次标志判断
+
+PerformanceStep / FastStep 在流水线追踪开启时同时记录为耗时段（utils.trace_export）。
 """
 
 import time
 import logging
 import threading
-from typing import Dict, List, Optional, Any, Union
+from time import perf_counter_ns
+from typing import Deque, Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
 import statistics
 
+from utils.config_loader import config
+from utils.latency_histogram import LatencyHistogram
+from utils.trace_export import pipeline_tracer
+
 # 配置日志
 logger = logging.getLogger(__name__)
 
@@ -42,13 +65,35 @@ class PerformanceSummary:
 class PerformanceMonitor:
     """性能监控器"""
 
-    def __init__(self):
-        self._records: List[PerformanceRecord] = []
+    def __init__(self, raw_records: Optional[bool] = None, max_raw_records: Optional[int] = None):
+        perf_config = config.get_performance_monitor_config()
+        self._raw_enabled = bool(perf_config.get("raw_records", False) if raw_records is None else raw_records)
+        self._max_raw_records = int(max_raw_records or perf_config.get("max_raw_records", 100000))
+
+        # 每个步骤一个直方图；原始记录仅在调试模式下保留（有上限）
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._records: Deque[PerformanceRecord] = deque(maxlen=self._max_raw_records)
         self._current_operations: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
         self._session_start_time = time.time()
         self._enabled = True
 
+        # 数值指标（如队列深度）：{名称: {"count", "total", "max", "last"}}
+        self._gauges: Dict[str, Dict[str, float]] = {}
+
+        # FastStep：静态步骤ID、各线程环形缓冲区、后台汇总线程
+        ring_size = int(perf_config.get("ring_size", 4096))
+        self._ring_size = 1 << max(4, (ring_size - 1).bit_length())
+        self._aggregate_interval = float(perf_config.get("aggregate_interval", 1.0))
+        self.fast_sample_every = max(1, int(perf_config.get("sample_every", 1)))
+        self._step_names: List[str] = []
+        self._step_ids: Dict[str, int] = {}
+        self._rings: List[_ThreadRing] = []
+        self._ring_local = threading.local()
+        self._dropped_samples = 0
+        self._aggregator: Optional[threading.Thread] = None
+        self._aggregator_stop = threading.Event()
+
     def start_timer(self, step_name: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """开始计时"""
         if not self._enabled:
@@ -68,7 +113,8 @@ class PerformanceMonitor:
                 'thread_id': thread_id
             }
 
-        logger.debug(f"[PERF] 开始: {step_name} | 时间戳: {timestamp:.6f} | 线程: {thread_id} | 元数据: {metadata}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[PERF] 开始: {step_name} | 时间戳: {timestamp:.6f} | 线程: {thread_id} | 元数据: {metadata}")
 
         return operation_id
 
@@ -91,26 +137,31 @@ class PerformanceMonitor:
 
             duration = end_time - start_time
 
-            # 合并元数据
-            metadata = operation['metadata'].copy()
-            if additional_metadata:
-                metadata.update(additional_metadata)
+            histogram = self._histograms.get(step_name)
+            if histogram is None:
+                histogram = self._histograms[step_name] = LatencyHistogram()
+            histogram.record(duration)
 
-            # 创建性能记录
-            record = PerformanceRecord(
-                step_name=step_name,
-                start_time=start_time,
-                end_time=end_time,
-                duration=duration,
-                metadata=metadata,
-                thread_id=thread_id
-            )
+            if self._raw_enabled:
+                # 合并元数据
+                metadata = operation['metadata'].copy()
+                if additional_metadata:
+                    metadata.update(additional_metadata)
 
-            self._records.append(record)
+                # 创建性能记录
+                self._records.append(PerformanceRecord(
+                    step_name=step_name,
+                    start_time=start_time,
+                    end_time=end_time,
+                    duration=duration,
+                    metadata=metadata,
+                    thread_id=thread_id
+                ))
 
-            logger.debug(f"[PERF] 完成: {step_name} | 耗时: {duration:.6f}s | 开始: {start_time:.6f} | 结束: {end_time:.6f} | 线程: {thread_id} | 元数据: {metadata}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[PERF] 完成: {step_name} | 耗时: {duration:.6f}s | 开始: {start_time:.6f} | 结束: {end_time:.6f} | 线程: {thread_id}")
 
-            return duration
+        return duration
 
     def record_step(self, step_name: str, metadata: Optional[Dict[str, Any]] = None):
         """记录单个步骤（自动计时）"""
@@ -118,35 +169,80 @@ class PerformanceMonitor:
         time.sleep(0)  # 确保时间戳有微小差异
         return self.end_timer(operation_id)
 
+    def record_gauge(self, name: str, value: float) -> None:
+        """记录数值指标（如队列深度），保留次数/均值/最大值/最新值"""
+        if not self._enabled:
+            return
+
+        with self._lock:
+            gauge = self._gauges.get(name)
+            if gauge is None:
+                gauge = self._gauges[name] = {"count": 0, "total": 0.0, "max": value, "last": value}
+            gauge["count"] += 1
+            gauge["total"] += value
+            gauge["max"] = max(gauge["max"], value)
+            gauge["last"] = value
+
+    def get_gauge(self, name: str) -> Optional[Dict[str, float]]:
+        """获取数值指标汇总 {"count", "avg", "max", "last"}"""
+        with self._lock:
+            gauge = self._gauges.get(name)
+            if gauge is None:
+                return None
+            return {
+                "count": gauge["count"],
+                "avg": gauge["total"] / gauge["count"] if gauge["count"] else 0.0,
+                "max": gauge["max"],
+                "last": gauge["last"],
+            }
+
+    def get_all_gauges(self) -> Dict[str, Dict[str, float]]:
+        """获取所有数值指标汇总"""
+        with self._lock:
+            names = list(self._gauges)
+        return {name: gauge for name in names if (gauge := self.get_gauge(name)) is not None}
+
     def get_records_by_step(self, step_name: str) -> List[PerformanceRecord]:
-        """获取指定步骤的所有记录"""
+        """获取指定步骤的所有原始记录（仅原始记录模式下有数据）"""
         with self._lock:
             return [record for record in self._records if record.step_name == step_name]
 
-    def get_summary_by_step(self, step_name: str) -> Optional[PerformanceSummary]:
-        """获取指定步骤的性能汇总"""
-        records = self.get_records_by_step(step_name)
+    def get_histogram(self, step_name: str) -> Optional[LatencyHistogram]:
+        """获取指定步骤的耗时直方图"""
+        return self._histograms.get(step_name)
 
-        if not records:
-            return None
+    def histogram_snapshot(self) -> Dict[str, LatencyHistogram]:
+        """各步骤直方图的副本（指标导出用：锁内只复制，分桶计算在锁外）"""
+        self.flush_fast_timers()
+        with self._lock:
+            return {name: histogram.copy() for name, histogram in self._histograms.items() if histogram.count}
 
-        durations = [record.duration for record in records]
+    def get_summary_by_step(self, step_name: str) -> Optional[PerformanceSummary]:
+        """获取指定步骤的性能汇总（百分位由直方图给出，最小/最大值精确）"""
+        self.flush_fast_timers()
+        with self._lock:
+            histogram = self._histograms.get(step_name)
+            if histogram is None or histogram.count == 0:
+                return None
+            stats = histogram.summary()
 
         return PerformanceSummary(
             step_name=step_name,
-            total_count=len(records),
-            total_duration=sum(durations),
-            avg_duration=statistics.mean(durations),
-            min_duration=min(durations),
-            max_duration=max(durations),
-            median_duration=statistics.median(durations),
-            p95_duration=statistics.quantiles(durations, n=100)[94] if len(durations) >= 100 else max(durations),
-            p99_duration=statistics.quantiles(durations, n=100)[98] if len(durations) >= 100 else max(durations)
+            total_count=int(stats["count"]),
+            total_duration=stats["total"],
+            avg_duration=stats["avg"],
+            min_duration=stats["min"],
+            max_duration=stats["max"],
+            median_duration=stats["p50"],
+            p95_duration=stats["p95"],
+            p99_duration=stats["p99"]
         )
 
     def get_all_summaries(self) -> List[PerformanceSummary]:
         """获取所有步骤的性能汇总"""
-        step_names = set(record.step_name for record in self._records)
+        self.flush_fast_timers()
+        with self._lock:
+            step_names = list(self._histograms)
         summaries = []
 
         for step_name in step_names:
@@ -203,9 +299,16 @@ class PerformanceMonitor:
 
         return analysis
 
+    def total_count(self) -> int:
+        """已记录的操作总数"""
+        self.flush_fast_timers()
+        with self._lock:
+            return sum(histogram.count for histogram in self._histograms.values())
+
     def export_performance_report(self) -> str:
         """导出性能报告"""
-        if not self._records:
+        total_count = self.total_count()
+        if not total_count:
             return "暂无性能数据"
 
         report = []
@@ -213,7 +316,7 @@ class PerformanceMonitor:
         report.append("🔍 语音识别系统性能分析报告")
         report.append("=" * 80)
         report.append(f"分析时间段: {self._session_start_time:.6f} - {time.time():.6f}")
-        report.append(f"总操作数: {len(self._records)}")
+        report.append(f"总操作数: {total_count}")
         report.append("")
 
         # 各步骤性能汇总
@@ -221,15 +324,28 @@ class PerformanceMonitor:
         if summaries:
             report.append("📊 各步骤性能汇总 (按平均耗时排序):")
             report.append("-" * 80)
-            report.append(f"{'步骤名称':<20} {'次数':<6} {'平均耗时':<12} {'最小耗时':<12} {'最大耗时':<12} {'P95耗时':<12}")
+            report.append(f"{'步骤名称':<20} {'次数':<6} {'平均耗时':<12} {'最小耗时':<12} {'最大耗时':<12} {'P95耗时':<12} {'P99耗时':<12}")
             report.append("-" * 80)
 
             for summary in summaries:
                 report.append(f"{summary.step_name:<20} {summary.total_count:<6} {summary.avg_duration:<12.6f} "
-                             f"{summary.min_duration:<12.6f} {summary.max_duration:<12.6f} {summary.p95_duration:<12.6f}")
+                             f"{summary.min_duration:<12.6f} {summary.max_duration:<12.6f} {summary.p95_duration:<12.6f} "
+                             f"{summary.p99_duration:<12.6f}")
 
             report.append("")
 
+        # 数值指标
+        gauges = self.get_all_gauges()
+        if gauges:
+            report.append("📏 数值指标:")
+            report.append("-" * 80)
+            report.append(f"{'指标名称':<20} {'次数':<6} {'平均值':<12} {'最大值':<12} {'最新值':<12}")
+            report.append("-" * 80)
+            for name, gauge in sorted(gauges.items()):
+                report.append(f"{name:<20} {gauge['count']:<6} {gauge['avg']:<12.2f} "
+                             f"{gauge['max']:<12.2f} {gauge['last']:<12.2f}")
+            report.append("")
+
         # 瓶颈分析
         if summaries:
             bottleneck = summaries[0]  # 平均耗时最长的步骤
@@ -239,7 +355,7 @@ class PerformanceMonitor:
             report.append(f"出现次数: {bottleneck.total_count}")
             report.append("")
 
-        # 流水线分析
+        # 流水线分析（需要原始记录）
         pipeline_steps = [
             '音频输入',
             '音频处理',
@@ -299,8 +415,13 @@ class PerformanceMonitor:
     def clear_records(self):
         """清空所有记录"""
         with self._lock:
+            for ring in self._rings:
+                ring.read = ring.written
+            self._dropped_samples = 0
+            self._histograms.clear()
             self._records.clear()
             self._current_operations.clear()
+            self._gauges.clear()
             self._session_start_time = time.time()
 
     def enable(self):
@@ -317,6 +438,115 @@ class PerformanceMonitor:
         """检查是否启用"""
         return self._enabled
 
+    def set_raw_records(self, enabled: bool) -> None:
+        """开启/关闭原始记录模式（短时调试用，保留每次计时的元数据）"""
+        self._raw_enabled = enabled
+        logger.info(f"性能监控原始记录已{'开启' if enabled else '关闭'}")
+
+    def raw_records_enabled(self) -> bool:
+        """是否保留原始记录"""
+        return self._raw_enabled
+
+
+    # ---------- FastStep 支持 ----------
+
+    def register_step(self, step_name: str) -> int:
+        """注册步骤名，返回静态步骤ID（同名返回同一ID）"""
+        with self._lock:
+            step_id = self._step_ids.get(step_name)
+            if step_id is None:
+                if len(self._step_names) > _STEP_ID_MASK:
+                    raise ValueError(f"FastStep步骤数超过上限 {_STEP_ID_MASK + 1}")
+                step_id = self._step_ids[step_name] = len(self._step_names)
+                self._step_names.append(step_name)
+            return step_id
+
+    def _thread_ring(self) -> "_ThreadRing":
+        """当前线程的环形缓冲区（每个线程首次计时时创建并登记）"""
+        ring = getattr(self._ring_local, "ring", None)
+        if ring is None:
+            ring = self._ring_local.ring = _ThreadRing(self._ring_size)
+            with self._lock:
+                self._rings.append(ring)
+                if self._aggregator is None or not self._aggregator.is_alive():
+                    self._aggregator_stop.clear()
+                    self._aggregator = threading.Thread(target=self._aggregate_loop,
+                                                        name="PerfAggregator", daemon=True)
+                    self._aggregator.start()
+        return ring
+
+    def flush_fast_timers(self) -> int:
+        """把各线程环形缓冲区中的FastStep耗时合并进步骤直方图，返回合并条数"""
+        merged = 0
+        with self._lock:
+            if not self._rings:
+                return 0
+            names, histograms = self._step_names, self._histograms
+            finished = []
+            for ring in self._rings:
+                # 先判断线程是否已退出，再读写入位置，保证移除的缓冲区已全部合并
+                if not ring.thread.is_alive():
+                    finished.append(ring)
+                written = ring.written
+                start = ring.read
+                if written - start > ring.mask + 1:
+                    # 汇总前缓冲区已被写满一圈，最早的样本被覆盖
+                    self._dropped_samples += written - start - ring.mask - 1
+                    start = written - ring.mask - 1
+                slots, mask = ring.slots, ring.mask
+                for index in range(start, written):
+                    value = slots[index & mask]
+                    name = names[value & _STEP_ID_MASK]
+                    histogram = histograms.get(name)
+                    if histogram is None:
+                        histogram = histograms[name] = LatencyHistogram()
+                    histogram.record_ns(value >> _STEP_ID_BITS)
+                ring.read = written
+                merged += written - start
+            # 已退出线程的缓冲区合并后移除
+            if finished:
+                self._rings = [ring for ring in self._rings if ring not in finished]
+        return merged
+
+    def dropped_samples(self) -> int:
+        """因缓冲区写满被覆盖的FastStep样本数（持续不为0时调大ring_size或缩短aggregate_interval）"""
+        with self._lock:
+            return self._dropped_samples
+
+    def _aggregate_loop(self) -> None:
+        while not self._aggregator_stop.wait(self._aggregate_interval):
+            try:
+                self.flush_fast_timers()
+            except Exception as e:
+                logger.warning(f"[PERF] 汇总FastStep耗时出错: {e}")
+
+    def stop_aggregator(self) -> None:
+        """停止后台汇总线程（剩余样本立即合并）"""
+        self._aggregator_stop.set()
+        if self._aggregator is not None:
+            self._aggregator.join(timeout=2)
+            self._aggregator = None
+        self.flush_fast_timers()
+
+
+# FastStep环形缓冲区槽位: (耗时纳秒 << _STEP_ID_BITS) | 步骤ID
+_STEP_ID_BITS = 12
+_STEP_ID_MASK = (1 << _STEP_ID_BITS) - 1
+
+
+class _ThreadRing:
+    """单个线程的FastStep环形缓冲区（只由所属线程写入，汇总线程读取）"""
+
+    __slots__ = ("slots", "mask", "written", "read", "thread")
+
+    def __init__(self, size: int):
+        self.slots: List[int] = [0] * size
+        self.mask = size - 1
+        self.written = 0
+        self.read = 0
+        self.thread = threading.current_thread()
+
+
 # 全局性能监控实例
 performance_monitor = PerformanceMonitor()
 
@@ -347,9 +577,12 @@ class PerformanceStep:
         self.step_name = step_name
         self.metadata = metadata or {}
         self.operation_id = None
+        self._trace_start = 0
 
     def __enter__(self):
         self.operation_id = performance_monitor.start_timer(self.step_name, self.metadata)
+        if pipeline_tracer.enabled:
+            self._trace_start = perf_counter_ns()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -358,4 +591,55 @@ class PerformanceStep:
             metadata['error'] = str(exc_type.__name__)
             metadata['error_message'] = str(exc_val)
 
-        performance_monitor.end_timer(self.operation_id, metadata)
\ No newline at end of file
+        performance_monitor.end_timer(self.operation_id, metadata)
+        if self._trace_start:
+            pipeline_tracer.complete(self.step_name, self._trace_start, perf_counter_ns(), "step", metadata)
+
+class FastStep:
+    """
+    热路径计时上下文管理器（模块级创建，反复使用）
+
+    与PerformanceStep相比：不生成操作ID、不加锁、不复制元数据、不格式化日志。
+    同一线程内不能嵌套使用同一个FastStep实例（不同实例可以嵌套）。
+    """
+
+    __slots__ = ("step_name", "step_id", "sample_every", "_monitor", "_local")
+
+    def __init__(self, step_name: str, sample_every: Optional[int] = None,
+                 monitor: Optional[PerformanceMonitor] = None):
+        self._monitor = monitor or performance_monitor
+        self.step_name = step_name
+        self.step_id = self._monitor.register_step(step_name)
+        self.sample_every = max(1, int(sample_every or self._monitor.fast_sample_every))
+        self._local = threading.local()
+
+    def __enter__(self):
+        local = self._local
+        if self._monitor._enabled:
+            if self.sample_every == 1:
+                local.start = perf_counter_ns()
+                return self
+            count = getattr(local, "count", 0) + 1
+            local.count = count
+            if count % self.sample_every == 0:
+                local.start = perf_counter_ns()
+                return self
+        local.start = 0
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        local = self._local
+        start = local.start
+        if start:
+            end = perf_counter_ns()
+            duration = end - start
+            if pipeline_tracer.enabled:
+                pipeline_tracer.complete(self.step_name, start, end, "audio")
+            try:
+                ring = local.ring
+            except AttributeError:
+                ring = local.ring = self._monitor._thread_ring()
+            index = ring.written
+            ring.slots[index & ring.mask] = duration << _STEP_ID_BITS | self.step_id
+            ring.written = index + 1
+        return False
@@ -3,13 +3,52 @@
 """
 生产环境延迟记录器
 轻量级的延迟记录系统，适合生产环境常态化使用
+
+每段语音（utterance）在 speech_start 时分配一个ID，随识别结果依次经过各环节并记录时间戳：
+    speech_start → speech_end → asr_start → asr_end → text_start → text_end → command / excel_written
+
+    uid = begin_utterance()                 # 识别器：检测到语音开始
+    mark_utterance(uid, "speech_end")       # 各环节打点（perf_counter）
+    finish_utterance(uid)                   # 处理结束：计入本会话直方图并写一行JSONL
+
+- 本会话各相邻环节耗时和端到端耗时（speech_end → excel_written）的百分位: get_session_latency_summary()
+- 每段语音一行紧凑JSONL（system.latency.log_dir/utterance_latency_YYYYMMDD.jsonl），会话结束时追加一行汇总
 """
 
+import os
+import json
 import time
 import logging
 import threading
-from collections import deque
-from typing import Deque, Dict, Any, List, Optional
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Deque, Dict, Any, List, Optional, TextIO, Tuple
+
+from utils.config_loader import config
+from utils.latency_histogram import LatencyHistogram
+
+# 语音段经过的环节（按流水线顺序）
+UTTERANCE_STAGES = (
+    "speech_start", "speech_end", "asr_start", "asr_end",
+    "text_start", "text_end", "command", "excel_written",
+)
+
+UTTERANCE_STAGE_NAMES = {
+    "speech_start": "语音开始",
+    "speech_end": "语音结束",
+    "asr_start": "识别开始",
+    "asr_end": "识别完成",
+    "text_start": "文本处理开始",
+    "text_end": "文本处理完成",
+    "command": "命令执行",
+    "excel_written": "写入Excel",
+}
+
+# 端到端：语音结束 → 写入Excel行
+END_TO_END = ("speech_end", "excel_written")
+
+# 未完成的语音段最多保留数（过短被丢弃的语音段不会finish）
+MAX_ACTIVE_UTTERANCES = 32
 
 class ProductionLatencyLogger:
     """生产环境延迟记录器"""
@@ -21,12 +60,169 @@ class ProductionLatencyLogger:
         self.lock = threading.Lock()
         self.logger = logging.getLogger("LATENCY")
 
+        # 语音段关联ID：{ID: {环节: perf_counter时间戳}}
+        self._next_utterance_id = 1
+        self._active: "OrderedDict[int, Dict[str, float]]" = OrderedDict()
+        self._utterance_started_at: Dict[int, float] = {}
+        self._session_id = ""
+        self._reset_session_stats()
+
+        latency_config = config.get_latency_log_config()
+        self.utterance_log_enabled = bool(latency_config.get("utterance_log", True))
+        self.log_dir = latency_config.get("log_dir", "logs/latency")
+        self._log_file: Optional[TextIO] = None
+        self._log_path = ""
+
+    def _reset_session_stats(self) -> None:
+        self._stage_histograms: Dict[str, LatencyHistogram] = {}
+        self._end_to_end = LatencyHistogram()
+        self._outcomes: Dict[str, int] = {}
+        self._utterance_count = 0
+
     def start_session(self):
-        """开始新的语音识别会话"""
+        """开始新的语音识别会话（清空本会话的语音段统计）"""
         with self.lock:
             self.current_session_start = time.time()
+            self._session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._active.clear()
+            self._utterance_started_at.clear()
+            self._reset_session_stats()
             self.logger.debug(f"[LATENCY] 会话开始")
 
+    # ---------- 语音段关联ID ----------
+
+    def begin_utterance(self) -> int:
+        """语音开始：分配语音段ID并记录 speech_start"""
+        now = time.perf_counter()
+        with self.lock:
+            utterance_id = self._next_utterance_id
+            self._next_utterance_id += 1
+            self._active[utterance_id] = {"speech_start": now}
+            self._utterance_started_at[utterance_id] = time.time()
+            while len(self._active) > MAX_ACTIVE_UTTERANCES:
+                stale_id, _ = self._active.popitem(last=False)
+                self._utterance_started_at.pop(stale_id, None)
+        return utterance_id
+
+    def mark_utterance(self, utterance_id: int, stage: str) -> None:
+        """记录语音段经过某环节的时间（同一环节只记第一次）"""
+        if not utterance_id:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            hops = self._active.get(utterance_id)
+            if hops is not None and stage not in hops:
+                hops[stage] = now
+
+    def utterance_elapsed(self, utterance_id: int, start_stage: str, end_stage: str) -> Optional[float]:
+        """语音段两个环节之间的秒数（任一环节未记录时为None）"""
+        with self.lock:
+            hops = self._active.get(utterance_id)
+            if hops is None or start_stage not in hops or end_stage not in hops:
+                return None
+            return hops[end_stage] - hops[start_stage]
+
+    def finish_utterance(self, utterance_id: int, outcome: Optional[str] = None, text: str = "") -> Optional[Dict[str, Any]]:
+        """
+        语音段处理结束：相邻环节耗时计入本会话直方图，写一行JSONL
+
+        Args:
+            outcome: row / command / text / empty / ignored；为None时按是否写入Excel判断
+        Returns:
+            该语音段的记录（各环节相对speech_start的毫秒数）；ID未知时为None
+        """
+        if not utterance_id:
+            return None
+        with self.lock:
+            hops = self._active.pop(utterance_id, None)
+            started_at = self._utterance_started_at.pop(utterance_id, time.time())
+            if hops is None:
+                return None
+            outcome = outcome or ("row" if "excel_written" in hops else "text")
+
+            ordered = [stage for stage in UTTERANCE_STAGES if stage in hops]
+            for previous, stage in zip(ordered, ordered[1:]):
+                key = f"{previous}→{stage}"
+                histogram = self._stage_histograms.get(key)
+                if histogram is None:
+                    histogram = self._stage_histograms[key] = LatencyHistogram()
+                histogram.record(hops[stage] - hops[previous])
+
+            end_to_end = None
+            if END_TO_END[0] in hops and END_TO_END[1] in hops:
+                end_to_end = hops[END_TO_END[1]] - hops[END_TO_END[0]]
+                self._end_to_end.record(end_to_end)
+            self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+            self._utterance_count += 1
+
+            origin = hops["speech_start"]
+            entry: Dict[str, Any] = {
+                "type": "utterance",
+                "session": self._session_id,
+                "utt": utterance_id,
+                "ts": round(started_at, 3),
+                "outcome": outcome,
+                "hops_ms": {stage: round((hops[stage] - origin) * 1000, 1) for stage in ordered},
+            }
+            if end_to_end is not None:
+                entry["e2e_ms"] = round(end_to_end * 1000, 1)
+            if text:
+                entry["text"] = text[:30]
+            self._write_log_line(entry)
+
+        if end_to_end is not None:
+            self.logger.debug(f"[LATENCY] 语音段#{utterance_id} 完成 | 端到端: {end_to_end*1000:.1f}ms | {outcome}")
+        return entry
+
+    def get_session_summary(self) -> Dict[str, Any]:
+        """本会话各环节与端到端耗时的百分位（毫秒）"""
+        def to_ms(histogram: LatencyHistogram) -> Dict[str, float]:
+            stats = histogram.summary()
+            return {
+                "count": int(stats["count"]),
+                **{key: round(stats[key] * 1000, 2) for key in ("avg", "p50", "p95", "p99", "max")}
+            }
+
+        with self.lock:
+            return {
+                "session": self._session_id,
+                "utterances": self._utterance_count,
+                "outcomes": dict(self._outcomes),
+                "stages": {key: to_ms(histogram) for key, histogram in self._stage_histograms.items()},
+                "end_to_end": to_ms(self._end_to_end),
+            }
+
+    def histogram_snapshot(self) -> Tuple[Dict[str, LatencyHistogram], LatencyHistogram, Dict[str, int]]:
+        """本会话各环节直方图、端到端直方图和结果计数的副本（指标导出用）"""
+        with self.lock:
+            stages = {key: histogram.copy() for key, histogram in self._stage_histograms.items()}
+            return stages, self._end_to_end.copy(), dict(self._outcomes)
+
+    def _write_log_line(self, entry: Dict[str, Any]) -> None:
+        """追加一行JSONL（调用方持有锁）"""
+        if not self.utterance_log_enabled:
+            return
+        try:
+            path = os.path.join(self.log_dir, f"utterance_latency_{datetime.now():%Y%m%d}.jsonl")
+            if self._log_file is None or path != self._log_path:
+                self._close_log()
+                os.makedirs(self.log_dir, exist_ok=True)
+                self._log_file = open(path, "a", encoding="utf-8")
+                self._log_path = path
+            self._log_file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._log_file.flush()
+        except OSError as e:
+            self.logger.warning(f"[LATENCY] 写入语音段延迟日志失败: {e}")
+            self.utterance_log_enabled = False
+
+    def _close_log(self) -> None:
+        if self._log_file is not None:
+            try:
+                self._log_file.close()
+            except OSError:
+                pass
+            self._log_file = None
+
     def record_voice_input_end(self, audio_duration: float):
         """记录语音输入结束"""
         if not self.current_session_start:
@@ -125,12 +321,22 @@ class ProductionLatencyLogger:
         return summary
 
     def end_session(self):
-        """结束当前会话"""
+        """结束当前会话（有语音段时记录并写入本会话延迟汇总）"""
+        summary = self.get_session_summary()
         with self.lock:
             if self.current_session_start:
                 session_duration = time.time() - self.current_session_start
                 self.logger.debug(f"[LATENCY] 会话结束 | 总时长: {session_duration:.2f}s")
                 self.current_session_start = None
+            if summary["utterances"]:
+                self._write_log_line({"type": "session", **summary})
+            self._close_log()
+
+        if summary["utterances"]:
+            end_to_end = summary["end_to_end"]
+            self.logger.info(f"[LATENCY] 本会话 {summary['utterances']} 段语音 | 端到端(语音结束→写入Excel) "
+                             f"p50: {end_to_end['p50']:.1f}ms p95: {end_to_end['p95']:.1f}ms "
+                             f"p99: {end_to_end['p99']:.1f}ms 最大: {end_to_end['max']:.1f}ms")
 
 # 全局实例
 production_latency_logger = ProductionLatencyLogger()
@@ -158,4 +364,20 @@ def end_latency_session():
 
 def get_latency_summary():
     """获取延迟摘要"""
-    return production_latency_logger.get_recent_summary()
\ No newline at end of file
+    return production_latency_logger.get_recent_summary()
+
+def begin_utterance() -> int:
+    """语音开始：分配语音段ID"""
+    return production_latency_logger.begin_utterance()
+
+def mark_utterance(utterance_id: int, stage: str):
+    """记录语音段经过某环节"""
+    production_latency_logger.mark_utterance(utterance_id, stage)
+
+def finish_utterance(utterance_id: int, outcome: Optional[str] = None, text: str = ""):
+    """语音段处理结束"""
+    return production_latency_logger.finish_utterance(utterance_id, outcome, text)
+
+def get_session_latency_summary() -> Dict[str, Any]:
+    """本会话各环节与端到端耗时的百分位（毫秒）"""
+    return production_latency_logger.get_session_summary()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化识别事件日志（JSONL）
+识别日志（voice_recognition_*.log）是给人看的中文文本行，班后分析只能用正则抓取；
+本模块每段语音写一行紧凑JSON，字段固定，可直接过滤和统计:
+
+    {"ts":1761790502.1,"session":"20251030_101500","utt":42,"outcome":"row","raw":"一百二十三点五",
+     "text":"123.5","numbers":[123.5],"standard_id":300,"records":[17],"judgments":["OK"],
+     "asr_ms":212.4,"e2e_ms":301.9,"hops_ms":{"speech_start":0.0,"speech_end":812.3,...}}
+
+- 写入: record() 只把事件放入队列，后台批量写入线程（BackgroundBatchWriter）序列化并追加到文件
+- 轮换: 按天一个文件 recognition_YYYYMMDD.jsonl，跨天时前一天的文件压缩为 .jsonl.gz，超过 keep_days 的删除
+- 查询: 逐行读取（.gz 边解压边读），不把文件整体读入内存
+
+命令行:
+    python -m utils.recognition_events query --since 2025-10-01 --outcome row --judgment NOK
+    python -m utils.recognition_events stats --since 2025-10-01 --by day
+    python -m utils.recognition_events stats --by standard_id --min-latency 1000
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import shutil
+import argparse
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+# 支持 python utils/recognition_events.py 直接运行
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config_loader import config
+from utils.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+FILE_PREFIX = "recognition_"
+_FILE_PATTERN = re.compile(r"^recognition_(\d{8})\.jsonl(\.gz)?$")
+
+# stats --by 可选的分组
+GROUP_KEYS = ("day", "hour", "session", "outcome", "command", "standard_id", "judgment")
+
+
+def _compact(event: Dict[str, Any]) -> Dict[str, Any]:
+    """去掉空字段（None、空字符串、空列表）"""
+    return {key: value for key, value in event.items() if value is not None and value != "" and value != []}
+
+
+class RecognitionEventLog:
+    """按天轮换的识别事件JSONL日志（后台线程批量写入）"""
+
+    def __init__(self, log_dir: Optional[str] = None, enabled: Optional[bool] = None,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 compress: Optional[bool] = None, keep_days: Optional[int] = None):
+        event_config = config.get_recognition_log_config()
+        self.log_dir = log_dir or event_config.get("log_dir", "logs/recognition")
+        self.enabled = bool(event_config.get("enabled", True) if enabled is None else enabled)
+        self.batch_size = int(batch_size or event_config.get("batch_size", 50))
+        self.flush_interval = float(event_config.get("flush_interval", 1.0) if flush_interval is None
+                                    else flush_interval)
+        self.compress = bool(event_config.get("compress", True) if compress is None else compress)
+        self.keep_days = int(event_config.get("keep_days", 365) if keep_days is None else keep_days)
+
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._day = ""
+        self.events_written = 0
+
+    # ---------- 写入 ----------
+
+    def record(self, event: Dict[str, Any]) -> bool:
+        """提交一条事件（调用方线程只入队）；未启用时返回False"""
+        if not self.enabled:
+            return False
+        event = _compact(event)
+        event.setdefault("ts", round(time.time(), 3))
+        self._ensure_writer().submit([event])
+        return True
+
+    def record_utterance(self, entry: Optional[Dict[str, Any]], fields: Dict[str, Any]) -> bool:
+        """
+        一段语音处理结束：合并识别/处理字段与延迟记录（finish_utterance的返回值）
+
+        Args:
+            entry: 延迟记录 {session, utt, ts, outcome, hops_ms, e2e_ms}；语音段ID未知时为None
+            fields: raw / text / numbers / command / standard_id / records / judgments / asr_ms 等
+        """
+        event: Dict[str, Any] = {}
+        if entry:
+            event.update(ts=entry.get("ts"), session=entry.get("session"), utt=entry.get("utt"),
+                         outcome=entry.get("outcome"))
+        event.update(fields)
+        if entry:
+            event.update(e2e_ms=entry.get("e2e_ms"), hops_ms=entry.get("hops_ms") or None)
+        return self.record(event)
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                from utils.batch_writer import BackgroundBatchWriter
+                self._writer = BackgroundBatchWriter(self._write_batch, batch_size=self.batch_size,
+                                                     flush_interval=self.flush_interval, name="识别事件日志")
+            return self._writer
+
+    def _write_batch(self, events: List[Dict[str, Any]]) -> None:
+        """写入线程：按事件日期分组，每组一次写入"""
+        groups: Dict[str, List[str]] = {}
+        for event in events:
+            day = datetime.fromtimestamp(event["ts"]).strftime("%Y%m%d")
+            groups.setdefault(day, []).append(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+        for day, lines in groups.items():
+            file = self._file
+            if day != self._day or file is None:
+                file = self._open_day(day)
+            file.write("\n".join(lines) + "\n")
+            file.flush()
+        self.events_written += len(events)
+
+    def _open_day(self, day: str) -> TextIO:
+        """切换到某天的文件并返回；其他天未压缩的文件压缩，过期文件删除"""
+        self._close_file()
+        os.makedirs(self.log_dir, exist_ok=True)
+        file = open(os.path.join(self.log_dir, f"{FILE_PREFIX}{day}.jsonl"), "a", encoding="utf-8")
+        self._file = file
+        self._day = day
+        self.rotate(keep=day)
+        return file
+
+    def rotate(self, keep: Optional[str] = None) -> None:
+        """压缩除今天和 keep（正在写的一天）以外的未压缩文件，删除超过 keep_days 的文件"""
+        today = datetime.now().strftime("%Y%m%d")
+        cutoff = (datetime.now() - timedelta(days=self.keep_days)).strftime("%Y%m%d") if self.keep_days > 0 else ""
+        for day, path in list_event_files(self.log_dir):
+            try:
+                if cutoff and day < cutoff:
+                    os.remove(path)
+                    logger.info(f"🗑️ 删除过期识别事件日志: {path}")
+                elif self.compress and day not in (today, keep) and path.endswith(".jsonl"):
+                    compress_file(path)
+            except OSError as e:
+                logger.warning(f"⚠️ 识别事件日志轮换失败: {path}: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已提交的事件写入文件"""
+        return self._writer.flush(timeout) if self._writer is not None else True
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """写完剩余事件，停止写入线程并关闭文件"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        success = writer.stop(timeout) if writer is not None else True
+        self._close_file()
+        return success
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+
+def compress_file(path: str) -> str:
+    """
+    把 .jsonl 压缩为 .jsonl.gz（先写临时文件再替换），返回新路径
+    当天已有 .gz 时（跨天后又写入了前一天的事件）追加为新的gzip成员，读取时连续解压
+    """
+    target = f"{path}.gz"
+    tmp_path = f"{target}.tmp"
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    if os.path.exists(target):
+        with open(tmp_path, "rb") as src, open(target, "ab") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, target)
+    os.remove(path)
+    return target
+
+
+# ---------------------------------------------------------------------------
+# 流式查询
+# ---------------------------------------------------------------------------
+
+def _parse_day(value: Optional[str]) -> str:
+    """'2025-10-01' / '20251001' → '20251001'"""
+    return value.replace("-", "")[:8] if value else ""
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """'2025-10-01' / '2025-10-01 08:00' / '2025-10-01T08:00:00' → 时间戳"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).timestamp()
+
+
+def list_event_files(log_dir: str, since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[str, str]]:
+    """按日期排序的 (YYYYMMDD, 路径)；按文件日期粗筛，until当天的文件也保留（由事件时间精确过滤）"""
+    if not os.path.isdir(log_dir):
+        return []
+    since_day, until_day = _parse_day(since), _parse_day(until)
+    files = []
+    for name in os.listdir(log_dir):
+        match = _FILE_PATTERN.match(name)
+        if not match:
+            continue
+        day = match.group(1)
+        if (since_day and day < since_day) or (until_day and day > until_day):
+            continue
+        files.append((day, os.path.join(log_dir, name)))
+    return sorted(files)
+
+
+def iter_events(log_dir: str, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """逐行读取时间范围内的事件（跳过写了一半的行）"""
+    since_ts, until_ts = _parse_time(since), _parse_time(until)
+    for _, path in list_event_files(log_dir, since, until):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                ts = event.get("ts", 0)
+                if (since_ts is not None and ts < since_ts) or (until_ts is not None and ts >= until_ts):
+                    continue
+                yield event
+
+
+def event_matches(event: Dict[str, Any], outcome: Optional[str] = None, command: Optional[str] = None,
+                  standard_id: Optional[int] = None, judgment: Optional[str] = None, text: Optional[str] = None,
+                  session: Optional[str] = None, min_latency_ms: Optional[float] = None) -> bool:
+    """事件是否满足全部过滤条件（未给出的条件不过滤）"""
+    if outcome and event.get("outcome") != outcome:
+        return False
+    if command and event.get("command") != command:
+        return False
+    if standard_id is not None and event.get("standard_id") != standard_id:
+        return False
+    if judgment and judgment not in event.get("judgments", ()):
+        return False
+    if text and text not in event.get("raw", "") and text not in event.get("text", ""):
+        return False
+    if session and event.get("session") != session:
+        return False
+    if min_latency_ms is not None and event.get("e2e_ms", -1) < min_latency_ms:
+        return False
+    return True
+
+
+def _group_values(event: Dict[str, Any], by: str) -> List[str]:
+    if by == "day":
+        return [datetime.fromtimestamp(event.get("ts", 0)).strftime("%Y-%m-%d")]
+    if by == "hour":
+        return [datetime.fromtimestamp(event.get("ts", 0)).strftime("%Y-%m-%d %H:00")]
+    if by == "judgment":
+        return list(event.get("judgments") or ["-"])
+    value = event.get(by)
+    return [str(value) if value is not None else "-"]
+
+
+def aggregate(events: Iterable[Dict[str, Any]], by: str = "day") -> Dict[str, Dict[str, Any]]:
+    """
+    流式分组统计（每组只保留计数和延迟直方图，内存与事件数无关）
+
+    Returns:
+        {分组: {"events", "numbers", "records", "outcomes": {...}, "e2e_ms": {count,p50,p95,p99,max}}}
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    histograms: Dict[str, LatencyHistogram] = {}
+    for event in events:
+        for key in _group_values(event, by):
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {"events": 0, "numbers": 0, "records": 0, "outcomes": {}}
+                histograms[key] = LatencyHistogram()
+            group["events"] += 1
+            group["numbers"] += len(event.get("numbers", ()))
+            group["records"] += len(event.get("records", ()))
+            outcome = event.get("outcome", "-")
+            group["outcomes"][outcome] = group["outcomes"].get(outcome, 0) + 1
+            if "e2e_ms" in event:
+                histograms[key].record(event["e2e_ms"] / 1000.0)
+
+    for key, group in groups.items():
+        stats = histograms[key].summary()
+        group["e2e_ms"] = {"count": int(stats["count"]),
+                           **{name: round(stats[name] * 1000, 1) for name in ("p50", "p95", "p99", "max")}}
+    return dict(sorted(groups.items()))
+
+
+# 全局事件日志
+recognition_events = RecognitionEventLog()
+
+
+def record_recognition_event(entry: Optional[Dict[str, Any]], fields: Dict[str, Any]) -> bool:
+    """记录一段语音的识别事件"""
+    return recognition_events.record_utterance(entry, fields)
+
+
+# ---------------------------------------------------------------------------
+# 命令行
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="结构化识别事件日志：过滤 / 跨天统计")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--dir", default=recognition_events.log_dir, help="日志目录")
+        sub.add_argument("--since", help="开始时间（含），如 2025-10-01 或 '2025-10-01 08:00'")
+        sub.add_argument("--until", help="结束时间（不含）")
+        sub.add_argument("--outcome", help="结果类型: row / command / text / ignored")
+        sub.add_argument("--cmd", dest="voice_command", help="语音命令，如 pause / standard_id")
+        sub.add_argument("--standard", type=int, help="标准序号")
+        sub.add_argument("--judgment", help="判定结果，如 NOK")
+        sub.add_argument("--text", help="原始或处理后文本包含")
+        sub.add_argument("--session", help="会话ID")
+        sub.add_argument("--min-latency", type=float, help="端到端延迟下限（毫秒）")
+
+    query_parser = subparsers.add_parser("query", help="输出匹配的事件（JSONL）")
+    add_filters(query_parser)
+    query_parser.add_argument("--limit", type=int, default=0, help="最多输出条数（0为不限）")
+    query_parser.add_argument("--count", action="store_true", help="只输出条数")
+
+    stats_parser = subparsers.add_parser("stats", help="分组统计")
+    add_filters(stats_parser)
+    stats_parser.add_argument("--by", choices=GROUP_KEYS, default="day", help="分组字段")
+    stats_parser.add_argument("--json", action="store_true", help="输出JSON")
+
+    args = parser.parse_args(argv)
+    filters = dict(outcome=args.outcome, command=args.voice_command, standard_id=args.standard,
+                   judgment=args.judgment, text=args.text, session=args.session, min_latency_ms=args.min_latency)
+    events = (event for event in iter_events(args.dir, args.since, args.until) if event_matches(event, **filters))
+
+    if args.command == "query":
+        count = 0
+        for event in events:
+            count += 1
+            if not args.count:
+                print(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+            if args.limit and count >= args.limit:
+                break
+        if args.count:
+            print(count)
+        return 0
+
+    groups = aggregate(events, args.by)
+    if args.json:
+        print(json.dumps(groups, ensure_ascii=False, indent=2))
+        return 0
+    print(f"{args.by:<16} {'事件':>7} {'数字':>7} {'写入行':>7} {'p50(ms)':>9} {'p95(ms)':>9} {'max(ms)':>9}  结果")
+    for key, group in groups.items():
+        latency = group["e2e_ms"]
+        outcomes = " ".join(f"{name}={count}" for name, count in sorted(group["outcomes"].items()))
+        print(f"{key:<16} {group['events']:>7} {group['numbers']:>7} {group['records']:>7} "
+              f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['max']:>9.1f}  {outcomes}")
+    print(f"# {len(groups)} 组，{sum(group['events'] for group in groups.values())} 条事件")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采样性能分析器（运行中随时开关，不需要重启）
+PerformanceStep / 调试追踪器只能测量手动包起来的代码段；本分析器由后台线程按固定频率读取
+sys._current_frames()，统计各线程的调用栈，停止时输出火焰图文件：
+
+    debug/profiles/profile_YYYYMMDD_HHMMSS.collapsed        折叠栈（flamegraph.pl / speedscope / inferno）
+    debug/profiles/profile_YYYYMMDD_HHMMSS.speedscope.json  每个线程一个profile（https://www.speedscope.app）
+
+    from utils.sampling_profiler import sampling_profiler
+
+    sampling_profiler.start()
+    ...
+    paths = sampling_profiler.stop()     # {"collapsed": ..., "speedscope": ...}
+
+- 墙钟采样：等待中的线程（如读音频、等队列）也会出现在结果里，看得到“卡在哪里”
+- 调用栈按函数（代码对象）合并，帧名缓存在字典中，每次采样只遍历栈帧
+- 100Hz 下的开销见 benchmarks/bench_sampling_profiler.py
+
+开关方式: 命令行 --profile（退出时输出）、GUI菜单「调试 → 采样性能分析」（Ctrl+Shift+P）、
+控制台模式按 P 键、POSIX 下 kill -USR1 <pid>
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from types import FrameType
+from typing import Dict, List, Optional, Tuple
+
+from utils.config_loader import config
+
+logger = logging.getLogger(__name__)
+
+# 采样键: (线程名, 调用栈[根→叶的代码对象])
+_StackKey = Tuple[str, Tuple[object, ...]]
+
+
+class SamplingProfiler:
+    """后台线程定时读取各线程调用栈的采样分析器"""
+
+    def __init__(self, hz: Optional[float] = None, output_dir: Optional[str] = None,
+                 max_depth: Optional[int] = None):
+        profiler_config = config.get_profiler_config()
+        self.hz = float(hz or profiler_config.get("hz", 100))
+        self.output_dir = output_dir or profiler_config.get("output_dir", "debug/profiles")
+        self.max_depth = int(max_depth or profiler_config.get("max_depth", 128))
+
+        self._counts: "Counter[_StackKey]" = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.sampler_cpu_time = 0.0  # 采样线程自身的CPU时间（秒）
+        self.late_samples = 0  # 未能按时采样的次数（GIL被长时间占用）
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """开始采样（清空上一次的结果）；已在运行时返回False"""
+        with self._lock:
+            if self.running:
+                return False
+            self._counts = Counter()
+            self.samples = self.late_samples = 0
+            self.sampler_cpu_time = self.duration = 0.0
+            self.started_at = time.time()
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self._thread.start()
+        logger.info(f"🔬 采样性能分析已开始（{self.hz:g}Hz）")
+        return True
+
+    def stop(self, dump: bool = True) -> Optional[Dict[str, str]]:
+        """停止采样；dump为True时输出火焰图文件并返回路径"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return None
+            self._stop_event.set()
+            thread.join(timeout=2)
+            self._thread = None
+        logger.info(f"🔬 采样性能分析已停止：{self.duration:.1f}s，{self.samples} 次采样，"
+                    f"采样线程CPU {self.sampler_cpu_time * 1000:.0f}ms")
+        if not dump or not self.samples:
+            return None
+        return self.dump()
+
+    def toggle(self) -> Optional[Dict[str, str]]:
+        """开始/停止（停止时返回输出文件路径）"""
+        if self.running:
+            return self.stop()
+        self.start()
+        return None
+
+    @staticmethod
+    def _sample_stacks(counts: "Counter[_StackKey]", own_ident: int, thread_names: Dict[int, str],
+                       max_depth: int) -> Dict[int, str]:
+        """采样一次各线程调用栈（栈帧引用只在本函数内持有），返回更新后的线程名表"""
+        frames = sys._current_frames()
+        if any(ident not in thread_names for ident in frames):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()
+                            if thread.ident is not None}
+        for ident, top in frames.items():
+            if ident == own_ident:
+                continue
+            stack: List[object] = []
+            frame: Optional[FrameType] = top
+            while frame is not None and len(stack) < max_depth:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            stack.reverse()
+            counts[(thread_names.get(ident, f"Thread-{ident}"), tuple(stack))] += 1
+        return thread_names
+
+    def _run(self) -> None:
+        interval = 1.0 / self.hz
+        own_ident = threading.get_ident()
+        thread_names: Dict[int, str] = {}
+        counts = self._counts
+        max_depth = self.max_depth
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        next_sample = wall_start
+
+        while not self._stop_event.is_set():
+            thread_names = self._sample_stacks(counts, own_ident, thread_names, max_depth)
+            self.samples += 1
+
+            next_sample += interval
+            delay = next_sample - time.perf_counter()
+            if delay < 0:
+                # 落后超过一个间隔时不补采，从现在重新计时
+                self.late_samples += 1
+                next_sample = time.perf_counter()
+            else:
+                self._stop_event.wait(delay)
+
+        self.duration = time.perf_counter() - wall_start
+        self.sampler_cpu_time = time.thread_time() - cpu_start
+
+    # ---------- 输出 ----------
+
+    @staticmethod
+    def _frame_label(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def thread_totals(self) -> Dict[str, int]:
+        """各线程的采样数"""
+        totals: Dict[str, int] = {}
+        for (thread_name, _), count in self._counts.items():
+            totals[thread_name] = totals.get(thread_name, 0) + count
+        return totals
+
+    def collapsed_lines(self) -> List[str]:
+        """折叠栈：'线程;根函数;...;叶函数 次数'（线程名作为根帧，火焰图中按线程分开）"""
+        labels: Dict[object, str] = {}
+        lines: List[str] = []
+        for (thread_name, stack), count in sorted(self._counts.items(), key=lambda item: item[0][0]):
+            parts = [thread_name.replace(";", ":")]
+            for code in stack:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = self._frame_label(code).replace(";", ":")
+                parts.append(label)
+            lines.append(f"{';'.join(parts)} {count}")
+        return lines
+
+    def to_speedscope(self) -> Dict:
+        """speedscope文件格式：共享帧表，每个线程一个sampled profile（权重为秒）"""
+        frame_index: Dict[object, int] = {}
+        frames: List[Dict] = []
+        profiles: Dict[str, Dict] = {}
+        interval = 1.0 / self.hz
+        for (thread_name, stack), count in self._counts.items():
+            indexes = []
+            for code in stack:
+                index = frame_index.get(code)
+                if index is None:
+                    index = frame_index[code] = len(frames)
+                    frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+                indexes.append(index)
+            profile = profiles.get(thread_name)
+            if profile is None:
+                profile = profiles[thread_name] = {
+                    "type": "sampled", "name": thread_name, "unit": "seconds",
+                    "startValue": 0, "endValue": 0, "samples": [], "weights": [],
+                }
+            profile["samples"].append(indexes)
+            profile["weights"].append(count * interval)
+            profile["endValue"] += count * interval
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"VoiceInput {datetime.fromtimestamp(self.started_at):%Y-%m-%d %H:%M:%S}",
+            "exporter": "utils.sampling_profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: -profile["endValue"]),
+        }
+
+    def dump(self, path_prefix: Optional[str] = None) -> Dict[str, str]:
+        """输出折叠栈与speedscope文件，返回 {"collapsed": 路径, "speedscope": 路径}"""
+        if path_prefix is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path_prefix = os.path.join(self.output_dir, f"profile_{datetime.fromtimestamp(self.started_at):%Y%m%d_%H%M%S}")
+        paths = {"collapsed": f"{path_prefix}.collapsed", "speedscope": f"{path_prefix}.speedscope.json"}
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed_lines()) + "\n")
+        with open(paths["speedscope"], "w", encoding="utf-8") as f:
+            json.dump(self.to_speedscope(), f, ensure_ascii=False)
+        logger.info(f"🔬 火焰图已输出: {paths['collapsed']}（speedscope: {paths['speedscope']}）")
+        return paths
+
+
+# 全局分析器
+sampling_profiler = SamplingProfiler()
+
+
+def install_signal_toggle() -> bool:
+    """POSIX下用 SIGUSR1 开关采样（kill -USR1 <pid>）；只能在主线程调用"""
+    import signal
+
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(signum, frame):
+        # 停止时要等待采样线程并写文件，放到单独线程，避免阻塞被打断的主线程
+        threading.Thread(target=sampling_profiler.toggle, name="ProfilerToggle", daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, handler)
+    return True
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话日志（追加写JSONL）
+录音阶段每条识别结果只追加一行JSON，不再对整个工作簿 load → save；
+停止时由Excel导出器从日志一次性生成xlsx。日志同时是崩溃恢复的数据来源。
+
+文件格式（每行一个JSON对象）:
+    {"type": "session", ...会话信息...}            第一行，记录Excel文件名、零件号等
+    {"type": "record", "voice_id": 1, ...}          每条识别结果
+    {"type": "finalized", "timestamp": "..."}       xlsx生成完成后追加
+
+持久化语义:
+    每次append都会写入并flush到操作系统（进程崩溃不丢数据）；
+    fsync按批进行（每fsync_every条或每fsync_interval秒），断电时最多丢失最后一批
+"""
+
+import os
+import json
+import time
+import glob
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, TextIO
+
+from utils.logging_utils import LoggingManager
+
+logger = LoggingManager.get_logger(
+    name='session_journal',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
+@dataclass
+class JournalState:
+    """从日志文件读取的会话状态"""
+    path: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    finalized: bool = False
+    corrupted_lines: int = 0
+
+
+class SessionJournal:
+    """追加写的会话日志"""
+
+    def __init__(self, path: str, fsync_every: int = 20, fsync_interval: float = 1.0):
+        """
+        初始化会话日志
+
+        Args:
+            path: 日志文件路径
+            fsync_every: 每追加多少条记录执行一次fsync
+            fsync_interval: 距上次fsync超过多少秒时执行fsync
+        """
+        self.path = path
+        self.fsync_every = max(1, int(fsync_every))
+        self.fsync_interval = float(fsync_interval)
+
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.record_count = 0
+
+    @staticmethod
+    def path_for(excel_filename: str) -> str:
+        """Excel文件对应的日志路径（与xlsx放在同一目录）"""
+        return excel_filename + JOURNAL_SUFFIX
+
+    @property
+    def is_open(self) -> bool:
+        return self._file is not None
+
+    def open(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        打开日志（追加模式）；新文件写入会话信息行
+
+        Args:
+            metadata: 会话信息（Excel文件名、零件号、批次号、检验员等）
+        """
+        with self._lock:
+            if self._file is not None:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._open_for_append()
+            if is_new:
+                header = {"type": "session", "created": datetime.now().isoformat(timespec="seconds")}
+                header.update(metadata or {})
+                self._write_line(header)
+                self._sync()
+            logger.debug(f"📒 会话日志已打开: {self.path}")
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """
+        追加识别记录
+
+        Args:
+            records: 记录列表，每条包含voice_id、standard_id、value、timestamp、original_text、row
+        """
+        if not records:
+            return
+        with self._lock:
+            file = self._opened_file()
+            for record in records:
+                entry = {"type": "record"}
+                entry.update(record)
+                self._write_line(entry)
+            file.flush()
+            self.record_count += len(records)
+            self._unsynced += len(records)
+            if (self._unsynced >= self.fsync_every or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def sync(self) -> None:
+        """立即fsync"""
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+
+    def mark_finalized(self) -> None:
+        """标记xlsx已生成（恢复时跳过该日志）"""
+        with self._lock:
+            if self._file is None:
+                self._open_for_append()
+            self._write_line({"type": "finalized", "timestamp": datetime.now().isoformat(timespec="seconds")})
+            self._sync()
+
+    def close(self) -> None:
+        """fsync并关闭日志"""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._sync()
+            finally:
+                self._file.close()
+                self._file = None
+
+    def remove(self) -> None:
+        """关闭并删除日志文件"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _open_for_append(self) -> None:
+        """以追加模式打开；上次崩溃留下未写完的行时先补换行，避免与新行粘连"""
+        needs_newline = False
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        file = open(self.path, "a", encoding="utf-8")
+        if needs_newline:
+            file.write("\n")
+        self._file = file
+
+    def _opened_file(self) -> TextIO:
+        """已打开的日志文件；未打开时抛出RuntimeError"""
+        if self._file is None:
+            raise RuntimeError(f"会话日志未打开: {self.path}")
+        return self._file
+
+    def _write_line(self, entry: Dict[str, Any]) -> None:
+        self._opened_file().write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def _sync(self) -> None:
+        file = self._opened_file()
+        file.flush()
+        os.fsync(file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def load(path: str) -> JournalState:
+        """
+        读取日志文件
+
+        崩溃时最后一行可能只写了一半，无法解析的行会被跳过并计数
+
+        Args:
+            path: 日志文件路径
+
+        Returns:
+            JournalState
+        """
+        state = JournalState(path=path)
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    state.corrupted_lines += 1
+                    continue
+                entry_type = entry.pop("type", None)
+                if entry_type == "session":
+                    state.metadata = entry
+                elif entry_type == "record":
+                    state.records.append(entry)
+                elif entry_type == "finalized":
+                    state.finalized = True
+        if state.corrupted_lines:
+            logger.warning(f"⚠️ 会话日志中有 {state.corrupted_lines} 行无法解析（可能是崩溃时未写完）: {path}")
+        return state
+
+    @staticmethod
+    def find_unfinished(directory: str) -> List[str]:
+        """
+        查找目录中未生成xlsx的会话日志（程序崩溃或异常退出留下的）
+
+        Args:
+            directory: 查找目录
+
+        Returns:
+            日志文件路径列表（按修改时间排序）
+        """
+        unfinished = []
+        for path in glob.glob(os.path.join(directory, "*" + JOURNAL_SUFFIX)):
+            try:
+                if not SessionJournal.load(path).finalized:
+                    unfinished.append(path)
+            except OSError as e:
+                logger.warning(f"⚠️ 读取会话日志失败: {path}: {e}")
+        return sorted(unfinished, key=os.path.getmtime)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+慢语音段现场保存
+语音段处理耗时（语音结束 → 写入Excel/命令执行完成）超过阈值（system.slow_capture.slo_ms）时，
+自动把当时的现场写入 debug/slow/ 下的一个目录，之后可用 debug/replay_slow_utterance.py 离线重放：
+
+    debug/slow/slow_20251030_101502_utt42/
+        audio.wav       该语音段的音频（16位单声道）
+        bundle.json     部分/最终识别文本、各环节耗时、队列深度、CPU负载、最近的GC停顿
+
+    from utils.slow_capture import slow_capture
+    slow_capture.check(finish_utterance(uid, outcome, text), result, sample_rate)
+
+- 判断与现场快照在回调线程中完成（只复制），写文件在后台线程，不阻塞识别
+- 目录数和总大小有上限，超出时删除最早的现场；音频超过 max_audio_seconds 时只保留末尾
+- GC停顿通过 gc.callbacks 记录在有界队列中，开启时才注册
+"""
+
+import gc
+import os
+import json
+import time
+import queue
+import shutil
+import wave
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.config_loader import config
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_PREFIX = "slow_"
+AUDIO_FILE = "audio.wav"
+BUNDLE_FILE = "bundle.json"
+
+# 现场中保留的最近GC停顿数
+GC_PAUSE_HISTORY = 64
+
+
+class GcPauseRecorder:
+    """通过 gc.callbacks 记录最近的GC停顿（毫秒）"""
+
+    def __init__(self, history: int = GC_PAUSE_HISTORY):
+        self.pauses: Deque[Tuple[float, int, float, int]] = deque(maxlen=history)
+        self._start = 0
+        self._installed = False
+
+    def install(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self) -> None:
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def _callback(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == "start":
+            self._start = time.perf_counter_ns()
+        elif self._start:
+            duration_ms = (time.perf_counter_ns() - self._start) / 1e6
+            self._start = 0
+            self.pauses.append((time.time(), info.get("generation", -1), duration_ms, info.get("collected", 0)))
+
+    def recent(self, since: float = 0.0) -> List[Dict[str, Any]]:
+        """since（time.time()）之后的GC停顿"""
+        return [
+            {"at": round(at, 3), "generation": generation, "ms": round(duration_ms, 3), "collected": collected}
+            for at, generation, duration_ms, collected in list(self.pauses) if at >= since
+        ]
+
+
+class SlowUtteranceCapture:
+    """超过延迟阈值的语音段现场保存"""
+
+    def __init__(self, output_dir: Optional[str] = None, slo_ms: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        capture_config = config.get_slow_capture_config()
+        self.enabled = bool(capture_config.get("enabled", False) if enabled is None else enabled)
+        self.slo_ms = float(slo_ms if slo_ms is not None else capture_config.get("slo_ms", 2000))
+        self.output_dir = output_dir or capture_config.get("output_dir", "debug/slow")
+        self.max_bundles = max(1, int(capture_config.get("max_bundles", 20)))
+        self.max_total_bytes = int(float(capture_config.get("max_total_mb", 100)) * 1024 * 1024)
+        self.max_audio_seconds = float(capture_config.get("max_audio_seconds", 60))
+
+        self.captured = 0
+        self.dropped = 0
+        self.gc_recorder = GcPauseRecorder()
+        self._queue: "queue.Queue[Optional[Tuple[Dict[str, Any], np.ndarray, int]]]" = queue.Queue(maxsize=4)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._last_cpu: Tuple[float, float] = (time.monotonic(), time.process_time())
+        if self.enabled:
+            self.gc_recorder.install()
+
+    @staticmethod
+    def utterance_latency_ms(entry: Dict[str, Any]) -> Optional[float]:
+        """语音段处理耗时：有端到端（语音结束→写入Excel）时取之，否则取语音结束到最后一个环节"""
+        if entry.get("e2e_ms") is not None:
+            return float(entry["e2e_ms"])
+        hops = entry.get("hops_ms") or {}
+        if "speech_end" not in hops:
+            return None
+        return max(hops.values()) - hops["speech_end"]
+
+    def check(self, entry: Optional[Dict[str, Any]], result: Any, sample_rate: int = 16000) -> bool:
+        """
+        语音段结束时调用：超过阈值则保存现场（后台写入）
+
+        Args:
+            entry: finish_utterance 返回的记录（含 hops_ms / e2e_ms）
+            result: RecognitionResult（文本、部分结果、音频）
+        Returns:
+            是否触发了保存
+        """
+        if not self.enabled or not entry:
+            return False
+        # 每段语音都取一次进程CPU时间，慢语音段的CPU占用即上一段语音结束以来的平均值
+        now, cpu_now = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self._last_cpu
+        self._last_cpu = (now, cpu_now)
+        latency_ms = self.utterance_latency_ms(entry)
+        if latency_ms is None or latency_ms < self.slo_ms:
+            return False
+
+        bundle = self._snapshot(entry, result, latency_ms)
+        bundle["cpu"]["process_cpu_percent"] = round((cpu_now - last_cpu) / (now - last_wall) * 100, 1) \
+            if now > last_wall else 0.0
+        audio_buffer = getattr(result, "audio_buffer", None)
+        audio = np.asarray(audio_buffer if audio_buffer is not None else [], dtype=np.float32)
+        max_samples = int(self.max_audio_seconds * sample_rate)
+        bundle["audio"] = {
+            "file": AUDIO_FILE,
+            "sample_rate": sample_rate,
+            "seconds": round(min(len(audio), max_samples) / sample_rate, 3),
+            "truncated": len(audio) > max_samples,
+        }
+        if len(audio) > max_samples:
+            audio = audio[-max_samples:]
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((bundle, audio, sample_rate))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"🐢 慢语音段#{entry.get('utt')} 现场写入排队已满，跳过")
+            return False
+        logger.warning(f"🐢 语音段#{entry.get('utt')} 耗时 {latency_ms:.0f}ms 超过阈值 {self.slo_ms:.0f}ms，保存现场")
+        return True
+
+    def _snapshot(self, entry: Dict[str, Any], result: Any, latency_ms: float) -> Dict[str, Any]:
+        """在回调线程中复制现场数据（文本、耗时、队列深度、CPU、GC）"""
+        from utils.performance_monitor import performance_monitor
+
+        hops = entry.get("hops_ms") or {}
+        ordered = sorted(hops.items(), key=lambda item: item[1])
+        stages_ms = {f"{previous}→{stage}": round(end - start, 1)
+                     for (previous, start), (stage, end) in zip(ordered, ordered[1:])}
+        started_at = float(entry.get("ts") or time.time())
+        return {
+            "utt": entry.get("utt"),
+            "session": entry.get("session", ""),
+            "captured_at": datetime.now().isoformat(timespec="seconds"),
+            "slo_ms": self.slo_ms,
+            "latency_ms": round(latency_ms, 1),
+            "outcome": entry.get("outcome"),
+            "text": getattr(result, "text", ""),
+            "partial_results": list(getattr(result, "partial_results", None) or []),
+            "segments": list(getattr(result, "segments", None) or []),
+            "asr_time_ms": round(getattr(result, "asr_time", 0.0) * 1000, 1),
+            "hops_ms": hops,
+            "stages_ms": stages_ms,
+            "queues": {name: gauge for name, gauge in performance_monitor.get_all_gauges().items()
+                       if "队列" in name},
+            "cpu": self._cpu_snapshot(),
+            "gc_pauses": self.gc_recorder.recent(since=started_at - 5.0),
+            "threads": sorted(thread.name for thread in threading.enumerate()),
+        }
+
+    @staticmethod
+    def _cpu_snapshot() -> Dict[str, Any]:
+        """系统负载（进程CPU占用由check补充）"""
+        snapshot: Dict[str, Any] = {"cpu_count": os.cpu_count()}
+        if hasattr(os, "getloadavg"):
+            snapshot["loadavg"] = [round(value, 2) for value in os.getloadavg()]
+        if PSUTIL_AVAILABLE:
+            snapshot["system_cpu_percent"] = psutil.cpu_percent(interval=None)
+        return snapshot
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._write_loop, name="SlowCaptureWriter", daemon=True)
+                self._worker.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.write_bundle(*item)
+            except Exception as e:
+                logger.error(f"🐢 慢语音段现场写入失败: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """等待排队的现场写完（测试与退出时用）"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def write_bundle(self, bundle: Dict[str, Any], audio: np.ndarray, sample_rate: int) -> str:
+        """写一个现场目录并按上限轮换，返回目录路径"""
+        name = f"{BUNDLE_PREFIX}{datetime.now():%Y%m%d_%H%M%S}_utt{bundle.get('utt') or 0}"
+        path = os.path.join(self.output_dir, name)
+        os.makedirs(path, exist_ok=True)
+
+        with wave.open(os.path.join(path, AUDIO_FILE), "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+        with open(os.path.join(path, BUNDLE_FILE), "w", encoding="utf-8") as f:
+            json.dump(bundle, f, ensure_ascii=False, indent=2, default=str)
+
+        self.captured += 1
+        self._rotate()
+        logger.info(f"🐢 慢语音段现场已保存: {path}")
+        return path
+
+    def list_bundles(self) -> List[str]:
+        """现有现场目录（从旧到新）"""
+        if not os.path.isdir(self.output_dir):
+            return []
+        paths = [os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir)
+                 if name.startswith(BUNDLE_PREFIX)]
+        return sorted(paths, key=lambda path: (os.stat(path).st_mtime_ns, path))
+
+    def _rotate(self) -> None:
+        """超过目录数或总大小上限时删除最早的现场（至少保留最新一个）"""
+        bundles = self.list_bundles()
+        sizes = [_directory_size(path) for path in bundles]
+        total = sum(sizes)
+        while len(bundles) > 1 and (len(bundles) > self.max_bundles or total > self.max_total_bytes):
+            oldest = bundles.pop(0)
+            total -= sizes.pop(0)
+            shutil.rmtree(oldest, ignore_errors=True)
+            logger.debug(f"🐢 删除最早的慢语音段现场: {oldest}")
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
+
+
+def load_bundle(path: str) -> Tuple[Dict[str, Any], np.ndarray, int]:
+    """读取现场目录：(bundle.json内容, float32音频[-1, 1], 采样率)"""
+    with open(os.path.join(path, BUNDLE_FILE), encoding="utf-8") as f:
+        bundle = json.load(f)
+    with wave.open(os.path.join(path, AUDIO_FILE), "rb") as wav_file:
+        sample_rate = wav_file.getframerate()
+        frames = wav_file.readframes(wav_file.getnframes())
+    audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+    return bundle, audio, sample_rate
+
+
+# 全局实例
+slow_capture = SlowUtteranceCapture()
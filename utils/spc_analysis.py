@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SPC过程能力分析（向量化）
+把一个零件号的测量值按标准序号分组装入NumPy数组，一次性计算:
+    - 每个测量值的判断结果和偏差（与ExcelExporterEnhanced._calculate_judgment规则一致）
+    - 每个标准序号的样本数、均值、标准差（样本标准差）、最小/最大值、Cp、Cpk、OK/NOK数
+
+数据来源:
+    - 本次会话（ExcelExporterEnhanced.compute_session_spc）
+    - 跨会话测量数据库（utils.measurement_store）
+    - 一组xlsx报告（进程池并行读取）
+
+Cp  = (上限 - 下限) / 6σ            （只有单边规范时为空）
+Cpk = min(上限 - 均值, 均值 - 下限) / 3σ （单边规范时取存在的一边）
+
+命令行:
+    python -m utils.spc_analysis PART-A001 --csv spc.csv
+    python -m utils.spc_analysis PART-A001 --source reports --reports-dir reports --sheet spc.xlsx
+"""
+
+import os
+import sys
+import csv
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 支持 python utils/spc_analysis.py 直接运行
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logging_utils import LoggingManager
+
+logger = LoggingManager.get_logger(
+    name='spc_analysis',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+SpecData = Dict[int, Dict[str, Any]]
+
+# 汇总表的列（键名, 表头）
+SUMMARY_COLUMNS = [
+    ("standard_id", "标准序号"),
+    ("content", "标准内容"),
+    ("count", "样本数"),
+    ("mean", "均值"),
+    ("sigma", "标准差"),
+    ("min", "最小值"),
+    ("max", "最大值"),
+    ("lower_limit", "下限"),
+    ("upper_limit", "上限"),
+    ("cp", "Cp"),
+    ("cpk", "Cpk"),
+    ("ok_count", "OK数"),
+    ("nok_count", "NOK数"),
+    ("nok_rate", "不合格率"),
+]
+
+SUMMARY_SHEET_NAME = "SPC统计"
+
+
+@dataclass
+class SpcAnalysis:
+    """分析结果：逐值的判断数组 + 按标准序号的汇总"""
+
+    standard_ids: np.ndarray
+    values: np.ndarray
+    has_spec: np.ndarray
+    is_ok: np.ndarray
+    deviations: np.ndarray
+    summary: List[Dict[str, Any]]
+
+    def results(self) -> List[str]:
+        """逐值判断结果文本（OK / NOK / 无规范）"""
+        return np.where(~self.has_spec, '无规范', np.where(self.is_ok, 'OK', 'NOK')).tolist()
+
+
+def spec_limits(standard_ids: np.ndarray, spec_data: SpecData) -> Tuple[np.ndarray, np.ndarray]:
+    """按标准序号取规范上下限（无规范时为NaN）"""
+    lower = np.full(len(standard_ids), np.nan)
+    upper = np.full(len(standard_ids), np.nan)
+    for index, standard_id in enumerate(standard_ids.tolist()):
+        spec_info = spec_data.get(int(standard_id))
+        if spec_info is None:
+            continue
+        if spec_info.get('lower_limit') is not None:
+            lower[index] = spec_info['lower_limit']
+        if spec_info.get('upper_limit') is not None:
+            upper[index] = spec_info['upper_limit']
+    return lower, upper
+
+
+def judge_values(values: np.ndarray, lower: np.ndarray,
+                 upper: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    向量化判断（规则同_calculate_judgment，偏差不做四舍五入）
+
+    Args:
+        values: 测量值
+        lower: 每个测量值的下限（NaN表示无下限）
+        upper: 每个测量值的上限（NaN表示无上限）
+
+    Returns:
+        (是否有规范, 是否OK, 偏差)；无规范的测量值偏差为NaN
+    """
+    no_lower = np.isnan(lower)
+    no_upper = np.isnan(upper)
+    has_spec = ~(no_lower & no_upper)
+    with np.errstate(invalid='ignore'):
+        is_ok = has_spec & (no_lower | (values >= lower)) & (no_upper | (values <= upper))
+    # fmin/fmax忽略NaN：单边规范时自动取存在的一边
+    deviations = np.where(is_ok,
+                          np.fmin(values - lower, upper - values),
+                          np.fmax(lower - values, values - upper))
+    return has_spec, is_ok, deviations
+
+
+def analyze(standard_ids: Iterable[int], values: Iterable[float], spec_data: Optional[SpecData] = None) -> SpcAnalysis:
+    """
+    计算逐值判断和按标准序号的SPC统计
+
+    Args:
+        standard_ids: 每个测量值的标准序号
+        values: 测量值
+        spec_data: 测量规范 {标准序号: {'content', 'lower_limit', 'upper_limit'}}
+
+    Returns:
+        SpcAnalysis
+    """
+    spec_data = spec_data or {}
+    standard_ids = np.asarray(standard_ids, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        empty = np.zeros(0, dtype=bool)
+        return SpcAnalysis(standard_ids, values, empty, empty, np.zeros(0), [])
+
+    groups, inverse = np.unique(standard_ids, return_inverse=True)
+    group_lower, group_upper = spec_limits(groups, spec_data)
+    has_spec, is_ok, deviations = judge_values(values, group_lower[inverse], group_upper[inverse])
+
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=values) / counts
+    # 两遍法求方差，避免大均值时的精度损失
+    squares = np.bincount(inverse, weights=(values - means[inverse]) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigmas = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+        valid_sigma = sigmas > 0
+        cp = np.where(valid_sigma, (group_upper - group_lower) / (6 * sigmas), np.nan)
+        cpk = np.where(valid_sigma, np.fmin(group_upper - means, means - group_lower) / (3 * sigmas), np.nan)
+
+    order = np.argsort(inverse, kind='stable')
+    boundaries = np.cumsum(counts)[:-1]
+    sorted_values = values[order]
+    minimums = np.minimum.reduceat(sorted_values, np.r_[0, boundaries])
+    maximums = np.maximum.reduceat(sorted_values, np.r_[0, boundaries])
+    ok_counts = np.bincount(inverse, weights=is_ok, minlength=len(groups)).astype(np.int64)
+    judged_counts = np.bincount(inverse, weights=has_spec, minlength=len(groups)).astype(np.int64)
+
+    summary = []
+    for index, standard_id in enumerate(groups.tolist()):
+        judged = int(judged_counts[index])
+        nok = judged - int(ok_counts[index])
+        summary.append({
+            "standard_id": standard_id,
+            "content": (spec_data.get(standard_id) or {}).get('content', ""),
+            "count": int(counts[index]),
+            "mean": float(means[index]),
+            "sigma": _optional(sigmas[index]),
+            "min": float(minimums[index]),
+            "max": float(maximums[index]),
+            "lower_limit": _optional(group_lower[index]),
+            "upper_limit": _optional(group_upper[index]),
+            "cp": _optional(cp[index]),
+            "cpk": _optional(cpk[index]),
+            "ok_count": int(ok_counts[index]) if judged else None,
+            "nok_count": nok if judged else None,
+            "nok_rate": nok / judged if judged else None,
+        })
+    return SpcAnalysis(standard_ids, values, has_spec, is_ok, deviations, summary)
+
+
+def _optional(value: float) -> Optional[float]:
+    """NaN / 无穷大转为None（写入表格时为空）"""
+    return float(value) if np.isfinite(value) else None
+
+
+# ---------------------------------------------------------------------------
+# 数据加载
+# ---------------------------------------------------------------------------
+
+def arrays_from_records(records: Iterable[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    从行记录中取出数值测量（OK/NOK等文本、缺少标准序号的记录跳过）
+
+    Args:
+        records: 含 standard_id、value 的记录（导出器会话记录或测量数据库的行）
+
+    Returns:
+        (标准序号数组, 测量值数组)
+    """
+    pairs = [(record["standard_id"], record["value"]) for record in records
+             if record.get("standard_id") is not None
+             and isinstance(record.get("value"), (int, float)) and not isinstance(record.get("value"), bool)]
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    standard_ids, values = zip(*pairs)
+    return np.asarray(standard_ids, dtype=np.int64), np.asarray(values, dtype=np.float64)
+
+
+def load_from_store(store: Any, part_no: str, **filters: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    从跨会话测量数据库读取一个零件号的测量值
+
+    Args:
+        store: MeasurementStore
+        part_no: 零件号
+        filters: 其他查询条件（batch_no、inspector、since、until等）
+    """
+    rows = store.numeric_values(part_no=part_no, **filters)
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+    data = np.array(rows, dtype=np.float64)
+    return data[:, 0].astype(np.int64), data[:, 1]
+
+
+def load_from_reports(paths: List[str], part_no: Optional[str] = None,
+                      workers: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    并行读取一组xlsx报告（进程池），合并为数组
+
+    Args:
+        paths: 报告文件路径
+        part_no: 只保留该零件号的报告，为None时全部保留
+        workers: 进程数，默认CPU核数
+    """
+    from utils.measurement_store import _read_report_safe
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            results = list(executor.map(_read_report_safe, paths))
+    else:
+        results = [_read_report_safe(path) for path in paths]
+
+    rows: List[Dict[str, Any]] = []
+    for path, result in zip(paths, results):
+        if result is None:
+            logger.warning(f"⚠️ 读取报告失败: {path}")
+            continue
+        session, session_rows = result
+        if part_no is None or session["part_no"] == part_no:
+            rows.extend(session_rows)
+    return arrays_from_records(rows)
+
+
+def find_reports(reports_dir: str, part_no: str) -> List[str]:
+    """报告目录中某零件号的报告（Report_{零件号}_*.xlsx）"""
+    prefix = f"Report_{part_no}_"
+    return [os.path.join(reports_dir, name) for name in sorted(os.listdir(reports_dir))
+            if name.startswith(prefix) and name.endswith(".xlsx")]
+
+
+# ---------------------------------------------------------------------------
+# 输出
+# ---------------------------------------------------------------------------
+
+def write_summary_csv(summary: List[Dict[str, Any]], path: str) -> str:
+    """汇总写入CSV（utf-8-sig，Excel可直接打开）"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([title for _, title in SUMMARY_COLUMNS])
+        for row in summary:
+            writer.writerow(["" if row[key] is None else row[key] for key, _ in SUMMARY_COLUMNS])
+    return path
+
+
+def write_summary_sheet(summary: List[Dict[str, Any]], path: str, sheet_name: str = SUMMARY_SHEET_NAME) -> str:
+    """
+    汇总写入xlsx工作表（文件已存在时替换同名工作表，保留其他工作表）
+
+    Args:
+        summary: analyze()的汇总
+        path: xlsx路径
+        sheet_name: 工作表名称
+    """
+    from openpyxl import Workbook, load_workbook
+    from openpyxl.styles import Font
+
+    if os.path.exists(path):
+        workbook = load_workbook(path)
+        if sheet_name in workbook.sheetnames:
+            del workbook[sheet_name]
+        worksheet = workbook.create_sheet(sheet_name)
+    else:
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = sheet_name
+
+    worksheet.append([title for _, title in SUMMARY_COLUMNS])
+    for cell in worksheet[1]:
+        cell.font = Font(bold=True)
+    for row in summary:
+        worksheet.append([row[key] for key, _ in SUMMARY_COLUMNS])
+    for row_index in range(2, len(summary) + 2):
+        for column in (4, 5, 10, 11):
+            worksheet.cell(row=row_index, column=column).number_format = '0.0000'
+        worksheet.cell(row=row_index, column=14).number_format = '0.00%'
+    worksheet.freeze_panes = "A2"
+
+    workbook.save(path)
+    workbook.close()
+    return path
+
+
+def format_summary(summary: List[Dict[str, Any]]) -> str:
+    """汇总格式化为文本表"""
+    def fmt(value: Any, digits: int = 4) -> str:
+        if value is None:
+            return "-"
+        return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+    lines = [f"{'标准序号':>8} {'样本数':>8} {'均值':>10} {'标准差':>10} {'Cp':>8} {'Cpk':>8} {'NOK':>6}"]
+    for row in summary:
+        lines.append(f"{row['standard_id']:>8} {row['count']:>8} {fmt(row['mean']):>10} {fmt(row['sigma']):>10} "
+                     f"{fmt(row['cp'], 2):>8} {fmt(row['cpk'], 2):>8} {fmt(row['nok_count']):>6}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# 命令行
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SPC过程能力分析（按标准序号统计均值、标准差、Cp/Cpk）")
+    parser.add_argument("part_no", help="零件号")
+    parser.add_argument("--reports-dir", default="reports", help="报告目录（查找测量规范和报告）")
+    parser.add_argument("--source", choices=("store", "reports"), default="store",
+                        help="数据来源：测量数据库 / 并行读取xlsx报告")
+    parser.add_argument("--db", default=None, help="测量数据库路径（默认按 excel.store 配置）")
+    parser.add_argument("--batch", help="只统计该批次（仅store来源）")
+    parser.add_argument("--since", help="开始时间（含，仅store来源）")
+    parser.add_argument("--until", help="结束时间（不含，仅store来源）")
+    parser.add_argument("--workers", type=int, default=None, help="读取报告的进程数")
+    parser.add_argument("--csv", help="汇总写入CSV")
+    parser.add_argument("--sheet", help="汇总写入xlsx的工作表")
+    args = parser.parse_args(argv)
+
+    from utils.measure_spec_index import get_measure_spec_index
+
+    if args.source == "reports":
+        standard_ids, values = load_from_reports(find_reports(args.reports_dir, args.part_no),
+                                                 args.part_no, args.workers)
+    else:
+        from utils.measurement_store import MeasurementStore, resolve_store_path
+
+        db_path = args.db or resolve_store_path(args.reports_dir)
+        if not os.path.exists(db_path):
+            print(f"❌ 数据库不存在: {db_path}")
+            return 1
+        store = MeasurementStore(db_path)
+        standard_ids, values = load_from_store(store, args.part_no, batch_no=args.batch,
+                                               since=args.since, until=args.until)
+        store.close()
+
+    _, spec_data = get_measure_spec_index(args.reports_dir).get(args.part_no)
+    result = analyze(standard_ids, values, spec_data)
+    print(f"📈 {args.part_no}: {len(values)} 个测量值，{len(result.summary)} 个标准序号"
+          + ("" if spec_data else "（未找到测量规范，无Cp/Cpk）"))
+    print(format_summary(result.summary))
+
+    if args.csv:
+        print(f"💾 {write_summary_csv(result.summary, args.csv)}")
+    if args.sheet:
+        print(f"💾 {write_summary_sheet(result.summary, args.sheet)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
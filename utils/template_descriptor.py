@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报告模板描述缓存
+模板几乎不变，每次新建报告都重新打开模板逐格扫描没有必要。
+模板按 (mtime_ns, 大小) 只解析一次，记录标题行、表头行、数据开始行和第一个空行，
+新建报告时只复制文件，直到finalize才打开工作簿。
+"""
+
+import os
+import threading
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from utils.logging_utils import LoggingManager
+from utils.lazy_imports import lazy_callable
+
+logger = LoggingManager.get_logger(
+    name='template_descriptor',
+    level=logging.DEBUG,
+    console_level=logging.INFO,
+    log_to_console=True,
+    log_to_file=True
+)
+
+load_workbook = lazy_callable("openpyxl", "load_workbook")
+
+# 统一从第5行开始输入数据
+DEFAULT_DATA_START_ROW = 5
+
+
+@dataclass(frozen=True)
+class TemplateDescriptor:
+    """模板结构描述"""
+    path: str
+    signature: Tuple[int, int]
+    has_title: bool                      # 第1行是否已是"测量报告"标题（否则finalize时插入标题行）
+    header_row: Optional[int]            # "标准序号"表头所在行
+    next_free_row: int                   # 第5行起第一个空行（新记录的起始行）
+    max_row: int
+
+    @property
+    def data_start_row(self) -> Optional[int]:
+        """数据开始行（表头的下一行）"""
+        return self.header_row + 1 if self.header_row is not None else None
+
+
+def parse_template(path: str) -> TemplateDescriptor:
+    """
+    解析模板结构（只读模式，只遍历一次）
+
+    Args:
+        path: 模板文件路径
+
+    Returns:
+        TemplateDescriptor
+    """
+    stat = os.stat(path)
+    workbook = load_workbook(path, read_only=True)
+    try:
+        has_title = False
+        header_row: Optional[int] = None
+        next_free_row: Optional[int] = None
+        max_row = 0
+
+        for row_index, row in enumerate(workbook.active.iter_rows(values_only=True), start=1):
+            max_row = row_index
+            if row_index == 1:
+                has_title = bool(row) and row[0] is not None and str(row[0]).strip() == "测量报告"
+            if header_row is None and any(value and '标准序号' in str(value) for value in row):
+                header_row = row_index
+            if (next_free_row is None and row_index >= DEFAULT_DATA_START_ROW and
+                    all(value is None or not str(value).strip() for value in row)):
+                next_free_row = row_index
+    finally:
+        workbook.close()
+
+    if next_free_row is None:
+        next_free_row = max(DEFAULT_DATA_START_ROW, max_row + 1)
+
+    return TemplateDescriptor(
+        path=path,
+        signature=(stat.st_mtime_ns, stat.st_size),
+        has_title=has_title,
+        header_row=header_row,
+        next_free_row=next_free_row,
+        max_row=max_row
+    )
+
+
+_descriptors: Dict[str, TemplateDescriptor] = {}
+_descriptors_lock = threading.Lock()
+
+
+def get_template_descriptor(path: str) -> Optional[TemplateDescriptor]:
+    """
+    获取模板描述（模板mtime或大小变化时重新解析）
+
+    Args:
+        path: 模板文件路径
+
+    Returns:
+        TemplateDescriptor；模板不存在或无法解析时返回None
+    """
+    key = os.path.abspath(path)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return None
+
+    with _descriptors_lock:
+        cached = _descriptors.get(key)
+        if cached is not None and cached.signature == (stat.st_mtime_ns, stat.st_size):
+            return cached
+
+        try:
+            descriptor = parse_template(key)
+        except Exception as e:
+            logger.error(f"解析模板失败: {path}: {e}")
+            return None
+
+        _descriptors[key] = descriptor
+        logger.debug(f"📐 模板已解析: {path} (表头第{descriptor.header_row}行, "
+                     f"首个空行第{descriptor.next_free_row}行)")
+        return descriptor
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线跨线程追踪（Chrome Trace Event JSON，可在 chrome://tracing 或 https://ui.perfetto.dev 打开）
+性能报告只有各步骤的统计值，看不出采集线程、识别推理、回调、Excel写入和GUI槽函数之间的重叠；
+追踪开启后各线程的耗时段写入有界环形缓冲区，需要时导出为文件。
+
+    from utils.trace_export import pipeline_tracer, traced
+
+    pipeline_tracer.enable()
+    with pipeline_tracer.span("最终识别", "asr", samples=len(audio)):
+        ...
+    pipeline_tracer.dump()      # → debug/traces/trace_YYYYMMDD_HHMMSS.json
+
+- 关闭时 span() 返回共享的空上下文，只有一次标志判断
+- PerformanceStep / FastStep 在追踪开启时自动记录为耗时段
+- set_utterance(ID) 后本线程的耗时段都带上语音段关联ID（args.utt）
+- 缓冲区满后丢弃最早的事件（system.trace.capacity）
+
+开启方式: 配置 system.trace.enabled、命令行 --trace、GUI菜单「调试 → 记录性能追踪」
+"""
+
+import os
+import json
+import logging
+import itertools
+import threading
+import functools
+from collections import deque
+from datetime import datetime
+from time import perf_counter_ns
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from utils.config_loader import config
+
+logger = logging.getLogger(__name__)
+
+# 事件: (类型, 名称, 分类, 开始ns, 持续ns, 线程ID, 参数)
+_Event = Tuple[str, str, str, int, int, int, Optional[Dict[str, Any]]]
+
+
+class _NullSpan:
+    """追踪关闭时的空上下文"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一个耗时段（退出时写入环形缓冲区）"""
+
+    __slots__ = ("_tracer", "_name", "_cat", "_args", "_start")
+
+    def __init__(self, tracer: "PipelineTracer", name: str, cat: str, args: Dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer.complete(self._name, self._start, perf_counter_ns(), self._cat, self._args)
+        return False
+
+
+class PipelineTracer:
+    """跨线程耗时段追踪器（记录不加锁，deque.append在CPython中是原子的）"""
+
+    def __init__(self, capacity: Optional[int] = None, output_dir: Optional[str] = None):
+        trace_config = config.get_trace_config()
+        self.capacity = int(capacity or trace_config.get("capacity", 200000))
+        self.output_dir = output_dir or trace_config.get("output_dir", "debug/traces")
+        self.enabled = False
+        self._events: Deque[_Event] = deque(maxlen=self.capacity)
+        self._thread_names: Dict[int, str] = {}
+        self._thread_ids = itertools.count(1)
+        self._local = threading.local()
+        self._pid = os.getpid()
+        if trace_config.get("enabled", False):
+            self.enable()
+
+    def enable(self) -> None:
+        """开启追踪"""
+        if not self.enabled:
+            self.enabled = True
+            logger.info(f"🧭 性能追踪已开启（环形缓冲区 {self.capacity} 个事件）")
+
+    def disable(self) -> None:
+        """关闭追踪（已记录的事件保留，仍可导出）"""
+        if self.enabled:
+            self.enabled = False
+            logger.info("🧭 性能追踪已关闭")
+
+    def set_utterance(self, utterance_id: int) -> None:
+        """设置本线程当前的语音段关联ID（0为清除）"""
+        self._local.utterance_id = utterance_id
+
+    def current_utterance(self) -> int:
+        return getattr(self._local, "utterance_id", 0)
+
+    def span(self, name: str, cat: str = "pipeline", **args: Any):
+        """耗时段上下文管理器（关闭时为空操作）"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def complete(self, name: str, start_ns: int, end_ns: int, cat: str = "pipeline",
+                 args: Optional[Dict[str, Any]] = None) -> None:
+        """记录一个已结束的耗时段（perf_counter_ns时间戳）"""
+        tid = self._thread_id()
+        utterance_id = getattr(self._local, "utterance_id", 0)
+        if utterance_id and (args is None or "utt" not in args):
+            args = dict(args or {}, utt=utterance_id)
+        self._events.append(("X", name, cat, start_ns, end_ns - start_ns, tid, args))
+
+    def instant(self, name: str, cat: str = "pipeline", **args: Any) -> None:
+        """记录一个瞬时事件（如 speech_start）"""
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        tid = self._thread_id()
+        utterance_id = getattr(self._local, "utterance_id", 0)
+        if utterance_id and "utt" not in args:
+            args["utt"] = utterance_id
+        self._events.append(("i", name, cat, now, 0, tid, args or None))
+
+    def _thread_id(self) -> int:
+        """本线程的追踪线程号（按线程首次记录顺序编号；系统线程ID在线程退出后会被复用）"""
+        try:
+            return self._local.tid
+        except AttributeError:
+            tid = self._local.tid = next(self._thread_ids)
+            self._thread_names[tid] = threading.current_thread().name
+            return tid
+
+    def event_count(self) -> int:
+        return len(self._events)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def to_trace_events(self) -> List[Dict[str, Any]]:
+        """转换为Trace Event格式（时间单位微秒，按开始时间排序）"""
+        events = sorted(list(self._events), key=lambda event: event[3])
+        trace: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0, "args": {"name": "VoiceInput"}}
+        ]
+        for tid, name in list(self._thread_names.items()):
+            trace.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}})
+
+        origin = events[0][3] if events else 0
+        for phase, name, cat, start_ns, duration_ns, tid, args in events:
+            entry: Dict[str, Any] = {
+                "name": name, "cat": cat, "ph": phase, "pid": self._pid, "tid": tid,
+                "ts": (start_ns - origin) / 1000.0,
+            }
+            if phase == "X":
+                entry["dur"] = duration_ns / 1000.0
+            else:
+                entry["s"] = "t"
+            if args:
+                entry["args"] = args
+            trace.append(entry)
+        return trace
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """导出当前缓冲区为Trace Event JSON文件，返回文件路径"""
+        if path is None:
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = os.path.join(self.output_dir, f"trace_{datetime.now():%Y%m%d_%H%M%S}.json")
+        trace = {"traceEvents": self.to_trace_events(), "displayTimeUnit": "ms"}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, ensure_ascii=False, default=str)
+        logger.info(f"🧭 性能追踪已导出: {path}（{len(trace['traceEvents'])} 个事件）")
+        return path
+
+
+# 全局追踪器
+pipeline_tracer = PipelineTracer()
+
+
+def traced(name: Optional[str] = None, cat: str = "pipeline") -> Callable:
+    """函数耗时段装饰器（追踪关闭时直接调用原函数）"""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not pipeline_tracer.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                pipeline_tracer.complete(span_name, start, perf_counter_ns(), cat)
+        return wrapper
+    return decorator
@@ -14,6 +14,10 @@ import subprocess
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from utils.logging_utils import LoggingManager
+from utils.trace_export import pipeline_tracer, traced
+from utils.metrics_endpoint import start_metrics_export
+from utils.sampling_profiler import sampling_profiler
+from utils.memory_accounting import memory_tracker, text_document_size
 
 logger = LoggingManager.get_logger(
     name='voice_gui',
@@ -30,7 +34,7 @@ from PySide6.QtWidgets import (
     QLineEdit, QFrame, QScrollArea
 )
 from PySide6.QtCore import Qt, QThread, Signal, QTimer, QPropertyAnimation, QEasingCurve
-from PySide6.QtGui import QFont, QTextCursor, QPalette, QColor, QTextCharFormat
+from PySide6.QtGui import QFont, QTextCursor, QPalette, QColor, QTextCharFormat, QAction
 
 os.environ['TQDM_DISABLE'] = '1'
 os.environ['PYTHONWARNINGS'] = 'ignore'
@@ -47,6 +51,8 @@ class WorkingVoiceWorker(QThread):
     voice_command_state_changed = Signal(str)  # 语音命令状态变化信号
     voice_activity = Signal(int)  # 语音活动级别信号 (0-100)
     command_result = Signal(str)  # 命令结果信号(关键修复，命令在历史显示窗口显示）
+    finalize_progress = Signal(str, str, int, int)  # 后台报告生成进度 (文件, 阶段, 已处理行, 总行数)
+    finalize_finished = Signal(str, bool, int)  # 后台报告生成完成 (文件, 是否成功, 记录数)
     finished = Signal()
     
     system_initialized = Signal()
@@ -102,6 +108,13 @@ class WorkingVoiceWorker(QThread):
             self.voice_system.set_state_change_callback(self._handle_voice_command_state_change)
             #logger.debug(f"[🔗 WORKER设置] ✅ 状态变化回调设置成功")
 
+            # 停止后报告在后台生成，进度和完成通过信号转发到界面线程
+            if hasattr(self.voice_system, 'set_finalize_callbacks'):
+                self.voice_system.set_finalize_callbacks(
+                    on_progress=lambda job: self.finalize_progress.emit(job.filename, job.phase, job.done, job.total),
+                    on_done=lambda job: self.finalize_finished.emit(job.filename, bool(job.success), job.record_count)
+                )
+
             # 🔥 关键修复：设置VAD回调以解决GUI无响应问题
             if hasattr(self.voice_system, 'set_vad_callback'):
                 #logger.info(f"[🔗 WORKER设置] ✅ voice_system有set_vad_callback方法，开始设置")
@@ -158,11 +171,21 @@ class WorkingVoiceWorker(QThread):
 
             def custom_process_recognition_result(original_text, processed_text, numbers):
                 try:
+                    previous_count = len(getattr(self.voice_system, 'number_results', None) or [])
+
                     if original_process_result:
                         original_process_result(original_text, processed_text, numbers)
 
                     has_new_record = False
-                    if hasattr(self.voice_system, 'number_results') and self.voice_system.number_results:
+                    new_records = (getattr(self.voice_system, 'number_results', None) or [])[previous_count:]
+                    if len(new_records) > 1:
+                        # 多值语句：一次写入多行，逐条显示
+                        for record_id, record_number, _ in new_records:
+                            display_text = self._format_record_display(record_id, record_number)
+                            self.recognition_result.emit(display_text)
+                            self.log_message.emit(f"🎤 识别结果: {display_text}")
+                        has_new_record = True
+                    elif hasattr(self.voice_system, 'number_results') and self.voice_system.number_results:
                         # 注意：这里假设调用original_process_result后会立即产生新记录
                         latest_record = self.voice_system.number_results[-1]
                         if len(latest_record) >= 3:
@@ -202,7 +225,7 @@ class WorkingVoiceWorker(QThread):
                                 elif isinstance(record_number, str) and record_text and record_text.strip():
                                     display_text = f"[{record_id}] {record_number}"
                                 else:
-                                    display_text = f"[{record_id}] {record_number}"
+                                    display_text = self._format_record_display(record_id, record_number)
 
                                 self.recognition_result.emit(display_text)
                                 self.log_message.emit(f"🎤 识别结果: {display_text}")
@@ -250,6 +273,10 @@ class WorkingVoiceWorker(QThread):
                     on_partial_result=gui_partial_result_callback
                 )
 
+            # run_continuous会重新注册识别器回调，部分结果通过系统转发给GUI
+            if hasattr(self.voice_system, 'set_partial_result_callback'):
+                self.voice_system.set_partial_result_callback(gui_partial_result_callback)
+
             self.log_message.emit("🎙️ 开始连续语音识别...")
             self.status_changed.emit("正在识别...")
 
@@ -295,6 +322,16 @@ class WorkingVoiceWorker(QThread):
                 logger.error(f"恢复系统时出错: {e}")
         self.status_changed.emit("正在识别...")
 
+    def _format_record_display(self, record_id, record_number) -> str:
+        """记录显示文本，带实时判断结果（如 "[3] 12.5 ❌NOK"）"""
+        display_text = f"[{record_id}] {record_number}"
+        get_judgment = getattr(self.voice_system, 'get_record_judgment', None)
+        judgment = get_judgment(record_id) if get_judgment else None
+        if judgment:
+            icon = {"OK": "✅", "NOK": "❌"}.get(judgment.get("result"), "")
+            display_text += f" {icon}{judgment.get('result')}"
+        return display_text
+
     def _handle_voice_command_state_change(self, state: str, message: str):
         """处理语音命令引起的状态变化"""
         if state == "paused":
@@ -634,6 +671,7 @@ class WorkingSimpleMainWindow(QMainWindow):
 
         self.init_ui()
         self.setup_timer()
+        self.setup_memory_tracking()
 
         # 如果是调试模式，自动填充验证信息
         if self.debug_mode:
@@ -690,6 +728,8 @@ class WorkingSimpleMainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("就绪")
 
+        self.create_menu_bar()
+
         self.apply_styles()
         
                 
@@ -697,6 +737,95 @@ class WorkingSimpleMainWindow(QMainWindow):
         self.append_log("🎯 启用真实VAD能量显示模式")
 
 
+    def create_menu_bar(self):
+        """创建菜单栏（调试菜单：流水线性能追踪、采样性能分析、内存占用）"""
+        debug_menu = self.menuBar().addMenu("调试")
+
+        self.trace_action = QAction("记录性能追踪", self)
+        self.trace_action.setCheckable(True)
+        self.trace_action.setChecked(pipeline_tracer.enabled)
+        self.trace_action.toggled.connect(self.toggle_trace)
+        debug_menu.addAction(self.trace_action)
+
+        export_trace_action = QAction("导出性能追踪...", self)
+        export_trace_action.triggered.connect(self.export_trace)
+        debug_menu.addAction(export_trace_action)
+
+        debug_menu.addSeparator()
+        self.profile_action = QAction("采样性能分析", self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setShortcut("Ctrl+Shift+P")
+        self.profile_action.setChecked(sampling_profiler.running)
+        self.profile_action.toggled.connect(self.toggle_profiler)
+        debug_menu.addAction(self.profile_action)
+
+        memory_action = QAction("内存占用", self)
+        memory_action.setShortcut("Ctrl+Shift+M")
+        memory_action.triggered.connect(self.show_memory_report)
+        debug_menu.addAction(memory_action)
+
+    def toggle_trace(self, checked: bool):
+        """开启/关闭流水线性能追踪"""
+        if checked:
+            pipeline_tracer.enable()
+            self.append_log("🧭 性能追踪已开启（调试 → 导出性能追踪 生成Chrome Trace文件）")
+        else:
+            pipeline_tracer.disable()
+            self.append_log("🧭 性能追踪已关闭")
+
+    def toggle_profiler(self, checked: bool):
+        """开始/停止采样性能分析（停止时输出火焰图）"""
+        if checked:
+            sampling_profiler.start()
+            self.append_log(f"🔬 采样性能分析已开始（{sampling_profiler.hz:g}Hz），再次点击停止并输出火焰图")
+            return
+        try:
+            paths = sampling_profiler.stop()
+        except OSError as e:
+            self.append_log(f"❌ 火焰图输出失败: {e}")
+            return
+        if not paths:
+            self.append_log("🔬 采样性能分析已停止（无采样）")
+            return
+        self.append_log(f"🔬 火焰图已输出（speedscope.app 打开 .speedscope.json）")
+        speedscope_path = os.path.abspath(paths["speedscope"])
+        self._append_clickable_file_link(os.path.basename(speedscope_path), speedscope_path)
+
+    def setup_memory_tracking(self):
+        """
+        内存统计：界面历史/日志文本也计入；定时在界面线程中统计（Qt控件只能在界面线程读取），
+        告警显示在日志区。调试模式下同时输出tracemalloc增长最多的代码行
+        """
+        memory_tracker.track("gui_history", lambda: getattr(self, 'history_text', None), size_func=text_document_size)
+        memory_tracker.track("gui_log", lambda: getattr(self, 'log_text', None), size_func=text_document_size)
+        memory_tracker.add_alert_callback(lambda message, alert: self.append_log(message))
+        if self.debug_mode:
+            memory_tracker.start_tracemalloc()
+
+        self.memory_timer = QTimer(self)
+        self.memory_timer.timeout.connect(memory_tracker.check)
+        self.memory_timer.start(int(memory_tracker.check_interval * 1000))
+
+    def show_memory_report(self):
+        """显示各子系统内存占用"""
+        for line in memory_tracker.format_report():
+            self.append_log(line)
+        for item in memory_tracker.last_diff[:5]:
+            self.append_log(f"   📈 {os.path.basename(item['location'])} {item['size_diff'] / 1024:+.1f}KiB")
+
+    def export_trace(self):
+        """导出环形缓冲区中的追踪事件（chrome://tracing 或 Perfetto 打开）"""
+        if not pipeline_tracer.event_count():
+            self.append_log("🧭 暂无追踪事件，请先开启「记录性能追踪」")
+            return
+        try:
+            path = os.path.abspath(pipeline_tracer.dump())
+        except OSError as e:
+            self.append_log(f"❌ 性能追踪导出失败: {e}")
+            return
+        self.append_log(f"🧭 性能追踪已导出（chrome://tracing 或 ui.perfetto.dev 打开）")
+        self._append_clickable_file_link(os.path.basename(path), path)
+
     def create_control_panel(self):
         """创建控制面板"""
         panel = QWidget()
@@ -1122,6 +1251,8 @@ class WorkingSimpleMainWindow(QMainWindow):
         self.worker.status_changed.connect(self.update_status)
         self.worker.voice_command_state_changed.connect(self.handle_voice_command_state_change)
         self.worker.system_initialized.connect(self.on_system_initialized)
+        self.worker.finalize_progress.connect(self.on_finalize_progress)
+        self.worker.finalize_finished.connect(self.on_finalize_finished)
         self.worker.finished.connect(self.on_worker_finished)
         
         # 优化启动流程：增加详细的状态反馈，减少用户等待焦虑
@@ -1166,9 +1297,37 @@ class WorkingSimpleMainWindow(QMainWindow):
 
             self.append_log("⏹️ 等待系统完全停止...")
 
+        # 报告在后台生成时，完成后由 on_finalize_finished 显示保存信息
+        system = getattr(self.worker, 'voice_system', None) if self.worker else None
+        job = getattr(system, 'last_finalize_job', None)
+        if job is not None:
+            if not job.finished:
+                self.append_log(f"📝 报告正在后台生成，可以开始下一批次: {os.path.basename(job.filename)}")
+            return
+
         # 显示Excel文件保存信息（在停止时显示，而不是在worker完成时）
         self._show_excel_save_info()
 
+    @traced("GUI:报告进度", "gui")
+    def on_finalize_progress(self, file_path: str, phase: str, done: int, total: int):
+        """后台报告生成进度（状态栏显示）"""
+        from utils.finalize_jobs import FINALIZE_PHASE_NAMES
+
+        phase_name = FINALIZE_PHASE_NAMES.get(phase, phase)
+        progress = f" {done}/{total} 行" if phase == "write" and total else ""
+        self.status_bar.showMessage(f"📝 正在生成报告 {os.path.basename(file_path)}: {phase_name}{progress}")
+
+    def on_finalize_finished(self, file_path: str, success: bool, record_count: int):
+        """后台报告生成完成"""
+        if not success:
+            self.append_log(f"❌ 报告生成失败，会话日志已保留，下次启动时恢复: {os.path.basename(file_path)}")
+            self.status_bar.showMessage("❌ 报告生成失败", 5000)
+            return
+        try:
+            self._show_report_info(file_path, record_count)
+        except Exception as e:
+            self.append_log(f"❌ 获取Excel保存信息失败: {e}")
+
 
     def on_worker_finished(self):
         """工作线程完成"""
@@ -1212,44 +1371,49 @@ class WorkingSimpleMainWindow(QMainWindow):
 
                 if hasattr(system, 'excel_exporter') and system.excel_exporter:
                     excel_exporter = system.excel_exporter
+                    self._show_report_info(excel_exporter.filename, len(excel_exporter.get_session_data()))
+                else:
+                    self.append_log("ℹ️ Excel导出功能未启用")
+                    self.status_bar.showMessage("ℹ️ Excel导出功能未启用", 3000)
+        except Exception as e:
+            self.append_log(f"❌ 获取Excel保存信息失败: {e}")
+            self.status_bar.showMessage("❌ 获取Excel信息失败", 3000)
 
-                    file_path = excel_exporter.filename
-                    file_name = os.path.basename(file_path)
-
-                    if os.path.exists(file_path):
-                        file_size = os.path.getsize(file_path)
-                        file_mtime = os.path.getmtime(file_path)
-                        mtime_str = datetime.fromtimestamp(file_mtime).strftime("%Y-%m-%d %H:%M:%S")
+    def _show_report_info(self, file_path: str, record_count: int):
+        """在识别历史和状态栏显示已生成的报告"""
+        file_name = os.path.basename(file_path)
 
-                        record_count = len(excel_exporter.get_session_data())
+        if os.path.exists(file_path):
+            file_size = os.path.getsize(file_path)
+            file_mtime = os.path.getmtime(file_path)
+            mtime_str = datetime.fromtimestamp(file_mtime).strftime("%Y-%m-%d %H:%M:%S")
 
-                        if record_count == 0:
-                            try:
-                                import pandas as pd
-                                df = pd.read_excel(file_path)
-                                record_count = len(df)
-                            except:
-                                record_count = 0
+            if record_count == 0:
+                # 只读模式按语音录入编号列（第10列，数据从第5行开始）计数，GUI路径不导入pandas
+                try:
+                    from openpyxl import load_workbook
+                    workbook = load_workbook(file_path, read_only=True)
+                    try:
+                        record_count = sum(1 for (voice_id,) in workbook.active.iter_rows(
+                            min_row=5, min_col=10, max_col=10, values_only=True) if voice_id is not None)
+                    finally:
+                        workbook.close()
+                except Exception:
+                    record_count = 0
 
-                        self._append_excel_info_to_history(file_name, file_path, record_count, file_size, mtime_str)
+            self._append_excel_info_to_history(file_name, file_path, record_count, file_size, mtime_str)
 
-                        self.append_log(f"📁 Excel文件已生成: {file_name} ({record_count}条记录)")
-                        logger.info(f"Excel文件已生成: {file_path}")
-                        logger.info(f"记录数量: {record_count} 条, 文件大小: {self._format_file_size(file_size)}")
+            self.append_log(f"📁 Excel文件已生成: {file_name} ({record_count}条记录)")
+            logger.info(f"Excel文件已生成: {file_path}")
+            logger.info(f"记录数量: {record_count} 条, 文件大小: {self._format_file_size(file_size)}")
 
-                        self.status_bar.showMessage(f"✅ Excel已保存: {file_name} ({record_count}条记录)", 8000)
+            self.status_bar.showMessage(f"✅ Excel已保存: {file_name} ({record_count}条记录)", 8000)
 
-                        self._excel_info_shown = True
+            self._excel_info_shown = True
 
-                    else:
-                        self.append_log("⚠️ Excel文件不存在")
-                        self.status_bar.showMessage("⚠️ Excel文件未生成", 3000)
-                else:
-                    self.append_log("ℹ️ Excel导出功能未启用")
-                    self.status_bar.showMessage("ℹ️ Excel导出功能未启用", 3000)
-        except Exception as e:
-            self.append_log(f"❌ 获取Excel保存信息失败: {e}")
-            self.status_bar.showMessage("❌ 获取Excel信息失败", 3000)
+        else:
+            self.append_log("⚠️ Excel文件不存在")
+            self.status_bar.showMessage("⚠️ Excel文件未生成", 3000)
 
     def _format_file_size(self, size_bytes):
         """格式化文件大小显示"""
@@ -1349,6 +1513,7 @@ class WorkingSimpleMainWindow(QMainWindow):
 
         self.append_log("🛑 语音识别已停止")
 
+    @traced("GUI:状态", "gui")
     def update_status(self, status):
         """更新状态"""
         self.status_label.setText(f"🟢 {status}")
@@ -1432,6 +1597,7 @@ class WorkingSimpleMainWindow(QMainWindow):
         except Exception as e:
             logger.error(f"添加文本到历史记录失败: {e}")
 
+    @traced("GUI:显示识别结果", "gui")
     def display_result(self, result):
         """显示识别结果 - 只显示record类型的信息"""
         if not result or not result.strip():
@@ -1494,12 +1660,14 @@ class WorkingSimpleMainWindow(QMainWindow):
         # 记录日志
         logger.info(f"🎤 识别(record): {result}")
         
+    @traced("GUI:部分结果", "gui")
     def update_partial_result(self, text):
         """更新部分识别结果"""
         current_status = self.status_label.text()
         if "就绪" in current_status or "识别" in current_status:
             self.current_text_label.setText(f"识别中: {text}")
 
+    @traced("GUI:能量条", "gui")
     def update_voice_energy(self, energy_level):
         """更新语音能量显示"""
         # 注释掉调试日志，减少控制台输出
@@ -1548,6 +1716,7 @@ class WorkingSimpleMainWindow(QMainWindow):
         self.mode_display_label.setText(f"当前模式: {mode}")
         self.append_log(f"模式已更改为: {mode}")
 
+    @traced("GUI:日志", "gui")
     def append_log(self, message):
         """添加日志"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -1905,6 +2074,14 @@ class WorkingSimpleMainWindow(QMainWindow):
         else:
             event.accept()
 
+        # 退出时仍在采样则输出火焰图
+        if event.isAccepted() and sampling_profiler.running:
+            try:
+                sampling_profiler.stop()
+            except OSError as e:
+                logger.error(f"火焰图输出失败: {e}")
+
+    @traced("GUI:命令结果", "gui")
     def handle_command_result(self, command_text: str):
         """处理命令结果，添加到历史记录"""
         try:
@@ -1929,7 +2106,15 @@ def main():
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='FunASR语音识别系统')
     parser.add_argument('--debug', action='store_true', help='调试模式：自动填充验证信息')
+    parser.add_argument('--trace', action='store_true', help='开启流水线性能追踪（调试菜单导出）')
+    parser.add_argument('--metrics', action='store_true', help='开启本地指标导出（Prometheus文本格式）')
+    parser.add_argument('--profile', action='store_true', help='启动即开始采样性能分析（调试菜单停止并输出火焰图）')
     args = parser.parse_args()
+    if args.trace:
+        pipeline_tracer.enable()
+    start_metrics_export(force=args.metrics)
+    if args.profile:
+        sampling_profiler.start()
 
     app = QApplication(sys.argv)
     app.setStyle("Fusion")